@@ -0,0 +1,20 @@
+"""
+Benchmark suite for Financial Assistant.
+
+Generates seeded synthetic data (accounts, categories, rules, transactions
+with recurring merchants, and CSV statements in several bank formats) and
+times the application's hot paths end to end.
+
+Usage:
+    python -m benchmarks generate --transactions 100000 --out data/bench
+    python -m benchmarks run --transactions 10000 --output results.json
+    python -m benchmarks run --baseline benchmarks/baselines/10k.json
+"""
+
+import os
+import sys
+
+# Make the application modules importable (same layout as tests/conftest.py)
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
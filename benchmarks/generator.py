@@ -0,0 +1,696 @@
+"""
+Seeded synthetic data generator.
+
+Produces a complete application database (accounts, categories, rules,
+budgets and 10k-5M transactions with recurring merchants mixed into
+realistic everyday spending) plus CSV statements in the bank formats the
+CSV parser supports. The same seed always produces the same data.
+"""
+
+import contextlib
+import csv
+import io
+import os
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from init_db import seed_default_categories
+from utils.schema import (
+    BALANCE_TRACKING_SCHEMA, CATEGORY_CLOSURE_SCHEMA, DAILY_BALANCES_SCHEMA, DATA_VERSIONS_SCHEMA,
+    RECURRING_ALERTS_SCHEMA
+)
+
+
+# Everyday merchants: (name, category, median amount, spread, weight)
+MERCHANTS = [
+    ('COSTCO WHSE', 'Groceries', 120.0, 0.5, 4),
+    ('WALMART SUPERCENTER', 'Groceries', 60.0, 0.6, 6),
+    ('SAFEWAY STORE', 'Groceries', 45.0, 0.5, 6),
+    ('TRADER JOES', 'Groceries', 40.0, 0.4, 5),
+    ('WHOLE FOODS MARKET', 'Groceries', 55.0, 0.5, 4),
+    ('KROGER', 'Groceries', 50.0, 0.5, 4),
+    ('SHELL OIL', 'Gas', 45.0, 0.3, 5),
+    ('CHEVRON', 'Gas', 48.0, 0.3, 4),
+    ('UNION 76', 'Gas', 42.0, 0.3, 2),
+    ('STARBUCKS', 'Dining Out', 7.0, 0.4, 8),
+    ('MCDONALDS', 'Dining Out', 11.0, 0.4, 5),
+    ('CHIPOTLE MEXICAN GRILL', 'Dining Out', 14.0, 0.3, 4),
+    ('DOORDASH', 'Dining Out', 32.0, 0.4, 4),
+    ('UBER EATS', 'Dining Out', 29.0, 0.4, 3),
+    ('OLIVE GARDEN', 'Dining Out', 58.0, 0.4, 2),
+    ('AMAZON MKTPLACE', 'Shopping', 35.0, 0.9, 9),
+    ('TARGET', 'Shopping', 48.0, 0.7, 5),
+    ('BEST BUY', 'Shopping', 140.0, 0.9, 1),
+    ('HOME DEPOT', 'Home Maintenance', 85.0, 0.8, 2),
+    ('LOWES', 'Home Maintenance', 75.0, 0.8, 2),
+    ('CVS PHARMACY', 'Healthcare', 22.0, 0.6, 3),
+    ('WALGREENS', 'Healthcare', 18.0, 0.6, 3),
+    ('KAISER COPAY', 'Healthcare', 30.0, 0.2, 1),
+    ('UBER TRIP', 'Public Transit', 18.0, 0.5, 3),
+    ('LYFT RIDE', 'Public Transit', 16.0, 0.5, 2),
+    ('BART CLIPPER', 'Public Transit', 25.0, 0.2, 2),
+    ('AMC THEATRES', 'Entertainment', 28.0, 0.3, 1),
+    ('STEAM GAMES', 'Entertainment', 20.0, 0.6, 1),
+    ('NORDSTROM', 'Clothing', 95.0, 0.6, 1),
+    ('OLD NAVY', 'Clothing', 45.0, 0.5, 2),
+    ('GREAT CLIPS', 'Personal Care', 25.0, 0.1, 1),
+    ('UNITED AIRLINES', 'Travel', 380.0, 0.5, 0.3),
+    ('MARRIOTT HOTEL', 'Travel', 220.0, 0.5, 0.3),
+    ('JIFFY LUBE', 'Car Maintenance', 70.0, 0.3, 0.5),
+]
+
+# Recurring merchants: (description, category, frequency, amount, jitter, account type)
+RECURRING = [
+    ('NETFLIX.COM', 'Subscriptions', 'monthly', 15.49, 0.0, 'credit'),
+    ('SPOTIFY USA', 'Subscriptions', 'monthly', 10.99, 0.0, 'credit'),
+    ('APPLE.COM/BILL', 'Subscriptions', 'monthly', 2.99, 0.0, 'credit'),
+    ('HULU', 'Subscriptions', 'monthly', 7.99, 0.0, 'credit'),
+    ('NYTIMES DIGITAL', 'Subscriptions', 'monthly', 4.25, 0.0, 'credit'),
+    ('PLANET FITNESS', 'Hobbies', 'monthly', 24.99, 0.0, 'credit'),
+    ('AMAZON PRIME', 'Subscriptions', 'annual', 139.00, 0.0, 'credit'),
+    ('RENT PAYMENT PROPERTY MGMT', 'Rent', 'monthly', 2150.00, 0.0, 'checking'),
+    ('PG&E UTILITY BILL', 'Utilities', 'monthly', 140.00, 0.08, 'checking'),
+    ('COMCAST XFINITY', 'Utilities', 'monthly', 79.99, 0.0, 'checking'),
+    ('VERIZON WIRELESS', 'Utilities', 'monthly', 85.00, 0.03, 'checking'),
+    ('GEICO AUTO INSURANCE', 'Insurance', 'monthly', 128.40, 0.0, 'checking'),
+    ('TOYOTA FINANCIAL', 'Car Payment', 'monthly', 389.00, 0.0, 'checking'),
+    ('STATE FARM HOME', 'Insurance', 'quarterly', 310.00, 0.0, 'checking'),
+    ('COUNTY PROPERTY TAX', 'Property Tax', 'annual', 2400.00, 0.0, 'checking'),
+    ('WEEKLY FARMERS BOX', 'Groceries', 'weekly', 32.00, 0.05, 'credit'),
+    ('CHILDCARE CENTER', 'Personal Care', 'biweekly', 450.00, 0.0, 'checking'),
+]
+
+# Income streams: (description, category, frequency, amount, jitter)
+INCOME = [
+    ('ACME CORP PAYROLL DIRECT DEP', 'Salary', 'biweekly', 3250.00, 0.0),
+    ('INTEREST PAYMENT', 'Investment', 'monthly', 4.10, 0.5),
+]
+
+# Default rules seeded alongside the data: (pattern, category, priority)
+RULES = [
+    ('COSTCO|COSTCO WHSE', 'Groceries', 95),
+    ('WALMART|WAL-MART', 'Groceries', 95),
+    ('SAFEWAY', 'Groceries', 95),
+    ('TRADER JOE|TRADER JOES', 'Groceries', 95),
+    ('WHOLE FOODS', 'Groceries', 95),
+    ('KROGER', 'Groceries', 95),
+    ('SHELL|SHELL OIL', 'Gas', 95),
+    ('CHEVRON', 'Gas', 95),
+    ('STARBUCKS', 'Dining Out', 90),
+    ('MCDONALDS', 'Dining Out', 90),
+    ('CHIPOTLE', 'Dining Out', 90),
+    ('DOORDASH|UBER EATS', 'Dining Out', 90),
+    ('AMAZON', 'Shopping', 80),
+    ('TARGET', 'Shopping', 80),
+    ('HOME DEPOT|LOWES', 'Home Maintenance', 85),
+    ('CVS|WALGREENS', 'Healthcare', 85),
+    ('UBER|LYFT', 'Public Transit', 70),
+    ('NETFLIX|HULU|SPOTIFY', 'Subscriptions', 95),
+    ('RENT', 'Rent', 90),
+    ('PG&E|XFINITY|VERIZON', 'Utilities', 90),
+    ('GEICO|STATE FARM', 'Insurance', 90),
+    ('PAYROLL', 'Salary', 95),
+]
+
+ACCOUNTS = [
+    ('Everyday Checking', 'checking', 'First National Bank', 4200.00),
+    ('High Yield Savings', 'savings', 'First National Bank', 15000.00),
+    ('Rewards Visa', 'credit', 'Chase', 0.00),
+    ('Travel Card', 'credit', 'American Express', 0.00),
+]
+
+FREQUENCY_DAYS = {'weekly': 7, 'biweekly': 14, 'monthly': None, 'quarterly': None, 'annual': None}
+FREQUENCY_MONTHS = {'monthly': 1, 'quarterly': 3, 'annual': 12}
+
+# Bank statement formats written by write_statements()
+STATEMENT_FORMATS = [
+    'standard', 'chase', 'credit_card', 'debit_credit',
+    'european', 'semicolon', 'accounting', 'tab'
+]
+
+# Share of generated transactions that already carry a category
+CATEGORIZED_SHARE = 0.6
+
+INSERT_CHUNK = 100_000
+
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        type TEXT NOT NULL CHECK(type IN ('checking', 'savings', 'credit')),
+        institution TEXT,
+        initial_balance DECIMAL(12, 2) DEFAULT 0.00,
+        current_balance DECIMAL(12, 2) DEFAULT 0.00,
+        reference_date DATE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        parent_id INTEGER,
+        level INTEGER NOT NULL CHECK(level BETWEEN 1 AND 3),
+        type TEXT NOT NULL CHECK(type IN ('income', 'expense', 'transfer')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (parent_id) REFERENCES categories(id) ON DELETE CASCADE,
+        UNIQUE(name, parent_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id INTEGER NOT NULL,
+        date DATE NOT NULL,
+        description TEXT NOT NULL,
+        amount REAL NOT NULL,
+        category_id INTEGER,
+        notes TEXT,
+        tags TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE,
+        FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS categorization_rules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pattern TEXT NOT NULL,
+        category_id INTEGER NOT NULL,
+        priority INTEGER DEFAULT 0,
+        match_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE,
+        UNIQUE(pattern)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS budgets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category_id INTEGER NOT NULL,
+        amount DECIMAL(10, 2) NOT NULL CHECK(amount > 0),
+        period_type TEXT NOT NULL CHECK(period_type IN ('monthly', 'yearly')),
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        alert_threshold INTEGER DEFAULT 80 CHECK(alert_threshold BETWEEN 0 AND 100),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE,
+        UNIQUE(category_id, period_type, start_date)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS savings_goals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        target_amount DECIMAL(12, 2) NOT NULL,
+        current_amount DECIMAL(12, 2) DEFAULT 0.00,
+        target_date DATE,
+        category_id INTEGER,
+        status TEXT CHECK(status IN ('active', 'completed', 'cancelled')) DEFAULT 'active',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (category_id) REFERENCES categories(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recurring_transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        merchant_name TEXT NOT NULL,
+        description_pattern TEXT,
+        frequency TEXT NOT NULL CHECK(frequency IN ('weekly', 'biweekly', 'monthly', 'quarterly', 'annual')),
+        average_amount DECIMAL(12, 2) NOT NULL,
+        amount_variance DECIMAL(12, 2) DEFAULT 0.00,
+        category_id INTEGER,
+        last_transaction_date DATE,
+        next_expected_date DATE,
+        status TEXT CHECK(status IN ('active', 'paused', 'cancelled')) DEFAULT 'active',
+        alert_if_missing BOOLEAN DEFAULT 1,
+        alert_if_amount_changes BOOLEAN DEFAULT 1,
+        confidence_score DECIMAL(3, 2) DEFAULT 0.85,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (category_id) REFERENCES categories(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recurring_transaction_instances (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recurring_id INTEGER NOT NULL,
+        transaction_id INTEGER,
+        expected_date DATE,
+        actual_date DATE,
+        expected_amount DECIMAL(12, 2),
+        actual_amount DECIMAL(12, 2),
+        variance_amount DECIMAL(12, 2),
+        status TEXT CHECK(status IN ('on_time', 'late', 'missed', 'amount_changed', 'expected')) DEFAULT 'expected',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (recurring_id) REFERENCES recurring_transactions(id) ON DELETE CASCADE,
+        FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE SET NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS transaction_notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        transaction_id INTEGER NOT NULL,
+        note TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        color TEXT DEFAULT '#667eea',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS transaction_tags (
+        transaction_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (transaction_id, tag_id),
+        FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE,
+        FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_transactions_account ON transactions(account_id)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category_id)",
+    "CREATE INDEX IF NOT EXISTS idx_categories_parent ON categories(parent_id)",
+    "CREATE INDEX IF NOT EXISTS idx_rules_priority ON categorization_rules(priority DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_budgets_category_period ON budgets(category_id, period_type, start_date, end_date)",
+    "CREATE INDEX IF NOT EXISTS idx_recurring_status ON recurring_transactions(status)",
+    "CREATE INDEX IF NOT EXISTS idx_recurring_next_expected ON recurring_transactions(next_expected_date)",
+    "CREATE INDEX IF NOT EXISTS idx_instances_recurring ON recurring_transaction_instances(recurring_id)",
+    "CREATE INDEX IF NOT EXISTS idx_instances_transaction ON recurring_transaction_instances(transaction_id)",
+    "CREATE INDEX IF NOT EXISTS idx_transaction_notes_transaction_id ON transaction_notes(transaction_id)",
+    "CREATE INDEX IF NOT EXISTS idx_transaction_tags_transaction_id ON transaction_tags(transaction_id)",
+    "CREATE INDEX IF NOT EXISTS idx_transaction_tags_tag_id ON transaction_tags(tag_id)",
+] + RECURRING_ALERTS_SCHEMA + CATEGORY_CLOSURE_SCHEMA + DATA_VERSIONS_SCHEMA + BALANCE_TRACKING_SCHEMA + DAILY_BALANCES_SCHEMA
+
+
+def create_schema(conn: sqlite3.Connection):
+    """Create the full application schema (base tables plus all migrations)."""
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+
+def _add_months(d: date, months: int) -> date:
+    """Add calendar months, clamping the day to the end of the month."""
+    month_index = d.month - 1 + months
+    year = d.year + month_index // 12
+    month = month_index % 12 + 1
+    next_month = date(year + (month == 12), month % 12 + 1, 1)
+    last_day = (next_month - timedelta(days=1)).day
+    return date(year, month, min(d.day, last_day))
+
+
+class DataGenerator:
+    """
+    Deterministic generator for benchmark datasets.
+
+    Args:
+        seed: Random seed; identical seeds produce identical data
+        years: Years of history to generate (ending yesterday)
+        end_date: Last transaction date (defaults to yesterday)
+    """
+
+    def __init__(self, seed: int = 42, years: int = 3, end_date: Optional[date] = None):
+        self.seed = seed
+        self.years = years
+        self.end_date = end_date or (date.today() - timedelta(days=1))
+        self.start_date = self.end_date - timedelta(days=365 * years)
+        self.rng = np.random.default_rng(seed)
+
+        self.category_ids: Dict[str, int] = {}
+        self.account_ids: List[Tuple[int, str]] = []
+
+    # ------------------------------------------------------------------
+    # Reference data
+    # ------------------------------------------------------------------
+
+    def _seed_reference_data(self, conn: sqlite3.Connection):
+        """Insert categories, accounts, rules and budgets."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed_default_categories(conn)
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name FROM categories")
+        self.category_ids = {name: cat_id for cat_id, name in cursor.fetchall()}
+
+        self.account_ids = []
+        for name, acc_type, institution, balance in ACCOUNTS:
+            cursor.execute("""
+                INSERT INTO accounts (name, type, institution, initial_balance, current_balance, reference_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (name, acc_type, institution, balance, balance, self.start_date.isoformat()))
+            self.account_ids.append((cursor.lastrowid, acc_type))
+
+        cursor.executemany("""
+            INSERT OR IGNORE INTO categorization_rules (pattern, category_id, priority)
+            VALUES (?, ?, ?)
+        """, [(pattern, self.category_ids[cat], priority) for pattern, cat, priority in RULES])
+
+        month_start = self.end_date.replace(day=1)
+        month_end = _add_months(month_start, 1) - timedelta(days=1)
+        budgets = [
+            ('Groceries', 800), ('Dining Out', 350), ('Gas', 250), ('Shopping', 400),
+            ('Subscriptions', 60), ('Utilities', 350), ('Entertainment', 100), ('Healthcare', 150),
+        ]
+        cursor.executemany("""
+            INSERT OR IGNORE INTO budgets (category_id, amount, period_type, start_date, end_date)
+            VALUES (?, ?, 'monthly', ?, ?)
+        """, [
+            (self.category_ids[cat], amount, month_start.isoformat(), month_end.isoformat())
+            for cat, amount in budgets
+        ])
+        conn.commit()
+
+    # ------------------------------------------------------------------
+    # Transactions
+    # ------------------------------------------------------------------
+
+    def _schedule(self, frequency: str, offset_days: int) -> List[date]:
+        """Dates for a recurring stream between start_date and end_date."""
+        first = self.start_date + timedelta(days=offset_days)
+        dates = []
+        if frequency in FREQUENCY_MONTHS:
+            k = 0
+            while True:
+                d = _add_months(first, k * FREQUENCY_MONTHS[frequency])
+                if d > self.end_date:
+                    break
+                dates.append(d)
+                k += 1
+        else:
+            step = FREQUENCY_DAYS[frequency]
+            d = first
+            while d <= self.end_date:
+                dates.append(d)
+                d += timedelta(days=step)
+        return dates
+
+    def _recurring_rows(self) -> List[Tuple]:
+        """All recurring and income transactions across accounts."""
+        rows = []
+        by_type: Dict[str, List[int]] = {}
+        for account_id, acc_type in self.account_ids:
+            by_type.setdefault(acc_type, []).append(account_id)
+
+        streams = [
+            (desc, cat, freq, amount, jitter, by_type.get(acc_type, [self.account_ids[0][0]])[0], -1)
+            for desc, cat, freq, amount, jitter, acc_type in RECURRING
+        ]
+        checking = by_type['checking'][0]
+        savings = by_type.get('savings', [checking])[0]
+        streams += [
+            (desc, cat, freq, amount, jitter, checking if cat == 'Salary' else savings, 1)
+            for desc, cat, freq, amount, jitter in INCOME
+        ]
+
+        for desc, cat, freq, amount, jitter, account_id, sign in streams:
+            offset = int(self.rng.integers(0, 28))
+            dates = self._schedule(freq, offset)
+            if not dates:
+                continue
+            # Occasional one- or two-day slips (weekends, processing delays)
+            slips = self.rng.choice([0, 0, 0, 1, 2], size=len(dates))
+            factors = 1 + self.rng.uniform(-jitter, jitter, size=len(dates)) if jitter else np.ones(len(dates))
+            category_id = self.category_ids.get(cat)
+            for d, slip, factor in zip(dates, slips, factors):
+                d = min(d + timedelta(days=int(slip)), self.end_date)
+                rows.append((account_id, d.isoformat(), desc, round(sign * amount * float(factor), 2), category_id))
+        return rows
+
+    def _random_rows(self, count: int) -> List[Tuple]:
+        """Everyday spending rows drawn from MERCHANTS."""
+        if count <= 0:
+            return []
+
+        weights = np.array([m[4] for m in MERCHANTS], dtype=float)
+        merchant_idx = self.rng.choice(len(MERCHANTS), size=count, p=weights / weights.sum())
+        span = (self.end_date - self.start_date).days + 1
+        day_offsets = self.rng.integers(0, span, size=count)
+        medians = np.array([m[2] for m in MERCHANTS])[merchant_idx]
+        spreads = np.array([m[3] for m in MERCHANTS])[merchant_idx]
+        amounts = np.round(medians * np.exp(self.rng.normal(0, spreads)), 2)
+        amounts = np.maximum(amounts, 0.5)
+        # A couple of dozen store numbers per merchant, so descriptions repeat
+        store_numbers = 100 + (merchant_idx * 37 + self.rng.integers(0, 25, size=count)) % 9900
+        categorized = self.rng.random(count) < CATEGORIZED_SHARE
+        credit_accounts = [a for a, t in self.account_ids if t == 'credit'] or [self.account_ids[0][0]]
+        checking = [a for a, t in self.account_ids if t == 'checking'] or [self.account_ids[0][0]]
+        spend_accounts = np.array(credit_accounts + checking)
+        account_choice = spend_accounts[self.rng.integers(0, len(spend_accounts), size=count)]
+        pos_style = self.rng.integers(0, 4, size=count)
+
+        start_ordinal = self.start_date.toordinal()
+        rows = []
+        for i in range(count):
+            name, cat = MERCHANTS[merchant_idx[i]][:2]
+            style = pos_style[i]
+            if style == 0:
+                description = f"{name} #{store_numbers[i]}"
+            elif style == 1:
+                description = f"POS PURCHASE {name} {store_numbers[i]}"
+            else:
+                description = name
+            rows.append((
+                int(account_choice[i]),
+                date.fromordinal(start_ordinal + int(day_offsets[i])).isoformat(),
+                description,
+                -float(amounts[i]),
+                self.category_ids.get(cat) if categorized[i] else None
+            ))
+        return rows
+
+    def build_database(self, db_path: str, transactions: int = 10_000) -> Dict:
+        """
+        Create a populated database.
+
+        Args:
+            db_path: Path of the database to create (overwritten)
+            transactions: Approximate number of transactions to generate
+
+        Returns:
+            Summary dictionary (counts, date range, account ids)
+        """
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            create_schema(conn)
+            self._seed_reference_data(conn)
+
+            recurring = self._recurring_rows()
+            remaining = max(transactions - len(recurring), 0)
+
+            insert_sql = """
+                INSERT INTO transactions (account_id, date, description, amount, category_id)
+                VALUES (?, ?, ?, ?, ?)
+            """
+            rows = recurring[:transactions]
+            inserted = 0
+            while True:
+                chunk = min(INSERT_CHUNK, remaining)
+                rows.extend(self._random_rows(chunk))
+                remaining -= chunk
+                if not rows:
+                    break
+                # Keep rows ordered by date within each chunk, like real statements
+                rows.sort(key=lambda r: r[1])
+                conn.executemany(insert_sql, rows)
+                inserted += len(rows)
+                rows = []
+                if remaining <= 0:
+                    break
+
+            conn.execute("""
+                UPDATE accounts
+                SET current_balance = initial_balance + COALESCE(
+                    (SELECT SUM(amount) FROM transactions t WHERE t.account_id = accounts.id), 0)
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return {
+            'seed': self.seed,
+            'transactions': inserted,
+            'recurring_transactions': min(len(recurring), transactions),
+            'accounts': [a for a, _ in self.account_ids],
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat(),
+        }
+
+    # ------------------------------------------------------------------
+    # CSV statements
+    # ------------------------------------------------------------------
+
+    def statement_rows(self, db_path: str, count: int, duplicate_share: float = 0.2) -> List[Dict]:
+        """
+        Rows for a statement: mostly new transactions plus re-exported ones.
+
+        Args:
+            db_path: Database the statement will be imported into
+            count: Number of rows
+            duplicate_share: Fraction of rows copied from existing transactions
+
+        Returns:
+            List of {'date': date, 'description': str, 'amount': float}
+        """
+        duplicates = int(count * duplicate_share)
+        conn = sqlite3.connect(db_path)
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            ids = self.rng.integers(1, total + 1, size=duplicates) if total and duplicates else []
+            existing = [
+                conn.execute("SELECT date, description, amount FROM transactions WHERE id = ?",
+                             (int(i),)).fetchone()
+                for i in ids
+            ]
+        finally:
+            conn.close()
+
+        new_rows = self._random_rows(count - len(existing))
+        rows = [
+            {'date': date.fromisoformat(r[1]), 'description': r[2], 'amount': r[3]}
+            for r in new_rows
+        ]
+        rows += [
+            {'date': date.fromisoformat(d), 'description': desc, 'amount': amount}
+            for d, desc, amount in existing if d
+        ]
+        rows.sort(key=lambda r: r['date'])
+        return rows
+
+    def write_statements(self, rows: List[Dict], out_dir: str,
+                         formats: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Write the same rows as CSV statements in several bank formats.
+
+        Returns:
+            Mapping of format name to file path
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        paths = {}
+        for fmt in formats or STATEMENT_FORMATS:
+            path = os.path.join(out_dir, f'statement_{fmt}.csv')
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                _STATEMENT_WRITERS[fmt](f, rows)
+            paths[fmt] = path
+        return paths
+
+
+def _us(d: date) -> str:
+    return d.strftime('%m/%d/%Y')
+
+
+def _running_balances(rows: List[Dict], opening: float = 5000.0):
+    balance = opening
+    for row in rows:
+        balance += row['amount']
+        yield row, round(balance, 2)
+
+
+def _write_standard(f, rows, delimiter=','):
+    writer = csv.writer(f, delimiter=delimiter)
+    writer.writerow(['Date', 'Description', 'Amount', 'Balance'])
+    for row, balance in _running_balances(rows):
+        writer.writerow([_us(row['date']), row['description'], f"{row['amount']:.2f}", f"{balance:.2f}"])
+
+
+def _write_chase(f, rows):
+    writer = csv.writer(f)
+    writer.writerow(['Details', 'Posting Date', 'Description', 'Amount', 'Type', 'Balance', 'Check or Slip #'])
+    for row, balance in _running_balances(rows):
+        credit = row['amount'] > 0
+        writer.writerow([
+            'CREDIT' if credit else 'DEBIT', _us(row['date']), row['description'],
+            f"{row['amount']:.2f}", 'ACH_CREDIT' if credit else 'DEBIT_CARD', f"{balance:.2f}", ''
+        ])
+
+
+def _write_credit_card(f, rows):
+    writer = csv.writer(f)
+    writer.writerow(['Status', 'Date', 'Description', 'Debit', 'Credit', 'Member Name'])
+    for row in rows:
+        amount = row['amount']
+        writer.writerow([
+            'Posted', _us(row['date']), row['description'],
+            f"{-amount:.2f}" if amount < 0 else '', f"{amount:.2f}" if amount > 0 else '', 'Jordan Doe'
+        ])
+
+
+def _write_debit_credit(f, rows):
+    writer = csv.writer(f)
+    writer.writerow(['Transaction Date', 'Merchant', 'Debit', 'Credit', 'Balance'])
+    for row, balance in _running_balances(rows):
+        amount = row['amount']
+        writer.writerow([
+            row['date'].isoformat(), row['description'],
+            f"{-amount:.2f}" if amount < 0 else '', f"{amount:.2f}" if amount > 0 else '', f"{balance:.2f}"
+        ])
+
+
+def _european_amount(value: float) -> str:
+    whole, frac = f"{value:.2f}".split('.')
+    whole = f"{int(whole):,}".replace(',', '.')
+    return f"{whole},{frac}"
+
+
+def _write_european(f, rows):
+    writer = csv.writer(f)
+    writer.writerow(['Date', 'Details', 'Withdrawal', 'Deposit'])
+    for row in rows:
+        amount = row['amount']
+        writer.writerow([
+            row['date'].strftime('%d.%m.%Y'), row['description'],
+            _european_amount(-amount) if amount < 0 else '', _european_amount(amount) if amount > 0 else ''
+        ])
+
+
+def _write_semicolon(f, rows):
+    writer = csv.writer(f, delimiter=';')
+    writer.writerow(['Date', 'Description', 'Amount', 'Balance'])
+    for row, balance in _running_balances(rows):
+        writer.writerow([row['date'].isoformat(), row['description'], f"{row['amount']:.2f}", f"{balance:.2f}"])
+
+
+def _write_accounting(f, rows):
+    writer = csv.writer(f)
+    writer.writerow(['Posting Date', 'Payee', 'Transaction Amount', 'Running Balance'])
+    for row, balance in _running_balances(rows):
+        amount = row['amount']
+        formatted = f"({-amount:.2f})" if amount < 0 else f"{amount:.2f}"
+        writer.writerow([_us(row['date']), row['description'], formatted, f"{balance:.2f}"])
+
+
+def _write_tab(f, rows):
+    _write_standard(f, rows, delimiter='\t')
+
+
+_STATEMENT_WRITERS = {
+    'standard': _write_standard,
+    'chase': _write_chase,
+    'credit_card': _write_credit_card,
+    'debit_credit': _write_debit_credit,
+    'european': _write_european,
+    'semicolon': _write_semicolon,
+    'accounting': _write_accounting,
+    'tab': _write_tab,
+}
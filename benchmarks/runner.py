@@ -0,0 +1,332 @@
+"""
+Benchmark runner and baseline comparison.
+
+Generates (or reuses) a dataset, times the registered scenarios and writes
+machine-readable JSON results. Results can be compared against a stored
+baseline; scenarios slower than the tolerance are reported as regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import benchmarks  # noqa: F401  (puts src/ on sys.path)
+from benchmarks.generator import DataGenerator
+from benchmarks.scenarios import SCENARIOS, BenchContext
+from utils import sql_tracer
+
+
+RESULTS_VERSION = 1
+
+# Differences below this many seconds are treated as noise when comparing
+NOISE_FLOOR = 0.002
+
+
+def _build_sample(db_path: str, sample_path: str, rows: int) -> int:
+    """
+    Copy the database, keeping only the most recent `rows` transactions.
+
+    Returns:
+        Number of expense transactions in the sample
+    """
+    shutil.copyfile(db_path, sample_path)
+    conn = sqlite3.connect(sample_path)
+    try:
+        conn.execute("""
+            DELETE FROM transactions WHERE id NOT IN (
+                SELECT id FROM transactions ORDER BY date DESC, id DESC LIMIT ?
+            )
+        """, (rows,))
+        conn.commit()
+        conn.execute("VACUUM")
+        return conn.execute("SELECT COUNT(*) FROM transactions WHERE amount < 0").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def prepare(workdir: str, transactions: int = 10_000, seed: int = 42,
+            statement_rows: int = 1_000, sample_rows: int = 2_000,
+            years: int = 3) -> BenchContext:
+    """
+    Generate the dataset and build a BenchContext for it.
+
+    Args:
+        workdir: Directory for the generated database and statements
+        transactions: Transactions in the main database
+        seed: Random seed
+        statement_rows: Rows per generated CSV statement
+        sample_rows: Transactions in the recurring-detection sample database
+        years: Years of history
+
+    Returns:
+        BenchContext ready for run_scenarios()
+    """
+    from app import create_app
+    from services.recurring_detector import RecurringDetector
+
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, 'bench.db')
+    sample_path = os.path.join(workdir, 'bench_sample.db')
+
+    generator = DataGenerator(seed=seed, years=years)
+    summary = generator.build_database(db_path, transactions)
+    summary['sample_expenses'] = _build_sample(db_path, sample_path, min(sample_rows, transactions))
+
+    # Saved patterns give the recurring endpoints something to read
+    RecurringDetector(db_path).save_recurring_patterns(RecurringDetector(sample_path).detect_patterns())
+
+    rows = generator.statement_rows(db_path, statement_rows)
+    statements = generator.write_statements(rows, os.path.join(workdir, 'statements'))
+
+    app = create_app()
+    # Query counts are recorded per scenario, so skip the per-request budget warning
+    app.config.update({
+        'TESTING': True,
+        'DATABASE': db_path,
+        'ARCHIVE_DIR': os.path.join(workdir, 'archives'),
+        'SQL_QUERY_BUDGET': 0,
+    })
+
+    return BenchContext(workdir, db_path, sample_path, statements, summary['accounts'][0], app, summary)
+
+
+def run_scenario(ctx: BenchContext, name: str, repeat: int = 3) -> Dict:
+    """Time one scenario `repeat` times (after one untimed warm-up run)."""
+    bench = SCENARIOS[name]
+    timings: List[float] = []
+    rows = 0
+    queries = 0
+
+    for attempt in range(repeat + 1):
+        state = bench.setup(ctx) if bench.setup else None
+        stats, token = sql_tracer.start_trace()
+        start = time.perf_counter()
+        try:
+            # Keep the services' console output out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = bench.func(ctx, state)
+        finally:
+            elapsed = time.perf_counter() - start
+            sql_tracer.stop_trace(token)
+            if isinstance(state, str) and state.startswith(ctx.workdir) and os.path.exists(state):
+                os.remove(state)
+        if attempt == 0:
+            continue  # warm-up
+        timings.append(elapsed)
+        queries = stats.query_count
+
+    median = statistics.median(timings)
+    return {
+        'median_s': round(median, 6),
+        'min_s': round(min(timings), 6),
+        'max_s': round(max(timings), 6),
+        'runs': len(timings),
+        'rows': rows,
+        'rows_per_s': round(rows / median, 1) if median > 0 else None,
+        'sql_queries': queries,
+    }
+
+
+def run_scenarios(ctx: BenchContext, names: Optional[List[str]] = None, repeat: int = 3,
+                  progress=None) -> Dict[str, Dict]:
+    """Run the selected scenarios (all by default); failures are recorded, not raised."""
+    results = {}
+    for name in names or list(SCENARIOS):
+        try:
+            results[name] = run_scenario(ctx, name, repeat)
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def build_report(ctx: BenchContext, results: Dict[str, Dict], args: Dict) -> Dict:
+    """Wrap results with enough metadata to make runs comparable."""
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+        },
+        'dataset': ctx.summary,
+        'parameters': args,
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.2) -> List[Dict]:
+    """
+    Compare two result reports scenario by scenario.
+
+    Args:
+        current: Report produced by this run
+        baseline: Stored report
+        tolerance: Allowed slowdown before a scenario counts as a regression (0.2 = 20%)
+
+    Returns:
+        List of {'scenario', 'baseline_s', 'current_s', 'ratio', 'status'}
+    """
+    rows = []
+    base_results = baseline.get('results', {})
+    for name, result in current.get('results', {}).items():
+        base = base_results.get(name)
+        entry = {'scenario': name, 'baseline_s': None, 'current_s': result.get('median_s'),
+                 'ratio': None, 'status': 'new'}
+        if 'error' in result:
+            entry['status'] = 'error'
+        elif base and 'median_s' in base:
+            entry['baseline_s'] = base['median_s']
+            ratio = result['median_s'] / base['median_s'] if base['median_s'] else None
+            entry['ratio'] = round(ratio, 3) if ratio is not None else None
+            delta = result['median_s'] - base['median_s']
+            if abs(delta) < NOISE_FLOOR or ratio is None:
+                entry['status'] = 'same'
+            elif ratio > 1 + tolerance:
+                entry['status'] = 'regression'
+            elif ratio < 1 / (1 + tolerance):
+                entry['status'] = 'improvement'
+            else:
+                entry['status'] = 'same'
+        rows.append(entry)
+    for name in base_results:
+        if name not in current.get('results', {}):
+            rows.append({'scenario': name, 'baseline_s': base_results[name].get('median_s'),
+                         'current_s': None, 'ratio': None, 'status': 'missing'})
+    return rows
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    """Render compare() output as a fixed-width table."""
+    lines = [f"{'scenario':<32} {'baseline':>10} {'current':>10} {'ratio':>7}  status"]
+    for row in rows:
+        base = f"{row['baseline_s'] * 1000:.1f}ms" if row['baseline_s'] is not None else '-'
+        cur = f"{row['current_s'] * 1000:.1f}ms" if row['current_s'] is not None else '-'
+        ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else '-'
+        lines.append(f"{row['scenario']:<32} {base:>10} {cur:>10} {ratio:>7}  {row['status']}")
+    return '\n'.join(lines)
+
+
+def _print_progress(name: str, result: Dict):
+    if 'error' in result:
+        print(f"  ✗ {name:<32} {result['error']}")
+    else:
+        rate = f"{result['rows_per_s']:,.0f} rows/s" if result['rows_per_s'] else ''
+        print(f"  ✓ {name:<32} {result['median_s'] * 1000:>10.1f} ms  {rate}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Financial Assistant benchmarks')
+    sub = parser.add_subparsers(dest='command')
+
+    def add_dataset_args(p):
+        p.add_argument('--transactions', type=int, default=10_000, help='Transactions to generate (10k-5M)')
+        p.add_argument('--seed', type=int, default=42, help='Random seed')
+        p.add_argument('--years', type=int, default=3, help='Years of history')
+        p.add_argument('--statement-rows', type=int, default=1_000, help='Rows per CSV statement')
+        p.add_argument('--sample-rows', type=int, default=2_000,
+                       help='Transactions in the recurring-detection sample database')
+
+    gen = sub.add_parser('generate', help='Generate a dataset without running benchmarks')
+    add_dataset_args(gen)
+    gen.add_argument('--out', required=True, help='Output directory')
+
+    run = sub.add_parser('run', help='Generate a dataset and time the scenarios')
+    add_dataset_args(run)
+    run.add_argument('--workdir', help='Directory for generated data (default: temporary)')
+    run.add_argument('--scenario', action='append', dest='scenarios',
+                     help='Scenario name or prefix (repeatable; default: all)')
+    run.add_argument('--repeat', type=int, default=3, help='Timed runs per scenario')
+    run.add_argument('--output', help='Write JSON results to this file')
+    run.add_argument('--baseline', help='Compare against this results file')
+    run.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown vs baseline')
+    run.add_argument('--fail-on-regression', action='store_true', help='Exit 1 on regressions')
+
+    cmp_parser = sub.add_parser('compare', help='Compare two results files')
+    cmp_parser.add_argument('current')
+    cmp_parser.add_argument('baseline')
+    cmp_parser.add_argument('--tolerance', type=float, default=0.2)
+    cmp_parser.add_argument('--fail-on-regression', action='store_true')
+
+    sub.add_parser('list', help='List scenarios')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name, bench in SCENARIOS.items():
+            print(f"{name:<32} {bench.description}")
+        return 0
+
+    if args.command == 'compare':
+        with open(args.current) as f:
+            current = json.load(f)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.tolerance)
+        print(format_comparison(rows))
+        regressed = any(r['status'] in ('regression', 'error') for r in rows)
+        return 1 if regressed and args.fail_on_regression else 0
+
+    if args.command == 'generate':
+        ctx = prepare(args.out, args.transactions, args.seed, args.statement_rows,
+                      args.sample_rows, args.years)
+        print(json.dumps(ctx.summary, indent=2))
+        return 0
+
+    if args.command != 'run':
+        parser.print_help()
+        return 2
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='fa_bench_')
+    print(f"Generating {args.transactions:,} transactions (seed {args.seed}) in {workdir}...")
+    start = time.perf_counter()
+    ctx = prepare(workdir, args.transactions, args.seed, args.statement_rows,
+                  args.sample_rows, args.years)
+    print(f"Dataset ready in {time.perf_counter() - start:.1f}s\n")
+
+    names = list(SCENARIOS)
+    if args.scenarios:
+        names = [n for n in names if any(n == s or n.startswith(s) for s in args.scenarios)]
+
+    results = run_scenarios(ctx, names, args.repeat, progress=_print_progress)
+    report = build_report(ctx, results, {
+        'transactions': args.transactions, 'seed': args.seed, 'years': args.years,
+        'statement_rows': args.statement_rows, 'sample_rows': args.sample_rows,
+        'repeat': args.repeat,
+    })
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nResults written to {args.output}")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        print('\n' + format_comparison(rows))
+        if args.fail_on_regression and any(r['status'] in ('regression', 'error') for r in rows):
+            exit_code = 1
+
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Timed benchmark scenarios.
+
+Each scenario exercises one hot path against the generated dataset and
+returns the number of rows it processed, so the runner can report
+throughput alongside wall-clock time. Scenarios that write get a fresh
+copy of the database for every run.
+"""
+
+import os
+import shutil
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generator import STATEMENT_FORMATS
+
+
+class Scenario:
+    """A named, timed unit of work."""
+
+    def __init__(self, name: str, func: Callable, setup: Optional[Callable] = None,
+                 description: str = ''):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.description = description
+
+
+SCENARIOS: 'OrderedDict[str, Scenario]' = OrderedDict()
+
+
+def scenario(name: str, setup: Optional[Callable] = None):
+    """Register a scenario. The function receives (ctx, state) and returns rows processed."""
+    def register(func):
+        SCENARIOS[name] = Scenario(name, func, setup, (func.__doc__ or '').strip())
+        return func
+    return register
+
+
+class BenchContext:
+    """
+    Shared state for a benchmark run.
+
+    Attributes:
+        workdir: Directory holding generated files
+        db_path: Main generated database
+        sample_db_path: Smaller database for the quadratic recurring paths
+        statements: Mapping of statement format to CSV path
+        account_id: Account statements are imported into
+        app: Flask application configured against db_path
+        summary: Dataset summary from DataGenerator.build_database()
+    """
+
+    def __init__(self, workdir: str, db_path: str, sample_db_path: str,
+                 statements: Dict[str, str], account_id: int, app,
+                 summary: Optional[Dict] = None):
+        self.workdir = workdir
+        self.db_path = db_path
+        self.sample_db_path = sample_db_path
+        self.statements = statements
+        self.account_id = account_id
+        self.app = app
+        self.summary = summary or {}
+        self._parsed: Optional[List[Dict]] = None
+        self._copies = 0
+
+    def parsed_statement(self) -> List[Dict]:
+        """Standard-format statement parsed once and tagged with the account."""
+        if self._parsed is None:
+            from services.csv_parser import CSVParser
+            self._parsed = CSVParser().parse_file(self.statements['standard'])
+            for txn in self._parsed:
+                txn['account_id'] = self.account_id
+        return [dict(txn) for txn in self._parsed]
+
+    def url_params(self) -> Dict[str, str]:
+        """Values substituted into endpoint URLs."""
+        end = date.fromisoformat(self.summary['end_date'])
+        last_month = end.replace(day=1)
+        previous_month = (last_month - timedelta(days=1)).replace(day=1)
+        return {
+            'account_id': self.account_id,
+            'last_month': last_month.strftime('%Y-%m'),
+            'previous_month': previous_month.strftime('%Y-%m'),
+        }
+
+    def scratch_copy(self, source: Optional[str] = None) -> str:
+        """Copy a database so a scenario can modify it freely."""
+        self._copies += 1
+        path = os.path.join(self.workdir, f'scratch_{self._copies}.db')
+        shutil.copyfile(source or self.db_path, path)
+        return path
+
+    def get(self, url: str, db_path: Optional[str] = None):
+        """GET a URL through the test client and fail loudly on errors."""
+        with self.app.test_client() as client:
+            previous = self.app.config['DATABASE']
+            self.app.config['DATABASE'] = db_path or self.db_path
+            try:
+                response = client.get(url)
+            finally:
+                self.app.config['DATABASE'] = previous
+        if response.status_code >= 400:
+            raise RuntimeError(f"GET {url} returned {response.status_code}: {response.data[:200]!r}")
+        return response
+
+
+# ----------------------------------------------------------------------
+# Import pipeline
+# ----------------------------------------------------------------------
+
+def _register_parse(fmt: str):
+    @scenario(f'parse.{fmt}')
+    def parse(ctx, state):
+        from services.csv_parser import CSVParser
+        return len(CSVParser().parse_file(ctx.statements[fmt]))
+    parse.__doc__ = f"Parse the {fmt} statement with CSVParser"
+
+
+for _fmt in STATEMENT_FORMATS:
+    _register_parse(_fmt)
+
+
+@scenario('validate.statement')
+def validate_statement(ctx, state):
+    """Validate every statement row, including the account lookup."""
+    from services.transaction_validator import TransactionValidator
+    rows = ctx.parsed_statement()
+    TransactionValidator(ctx.db_path).validate_transactions(rows)
+    return len(rows)
+
+
+@scenario('validate.batch')
+def validate_batch(ctx, state):
+    """Validate every statement row column-wise with one account lookup."""
+    from services.transaction_validator import TransactionValidator
+    rows = ctx.parsed_statement()
+    TransactionValidator(ctx.db_path).validate_batch(rows)
+    return len(rows)
+
+
+@scenario('duplicates.check')
+def duplicates_check(ctx, state):
+    """Check every statement row against existing transactions."""
+    from services.duplicate_detector import DuplicateDetector
+    rows = ctx.parsed_statement()
+    DuplicateDetector(ctx.db_path).check_duplicates_bulk(rows)
+    return len(rows)
+
+
+@scenario('categorize.statement')
+def categorize_statement(ctx, state):
+    """Run the rule engine over every statement row."""
+    from services.categorization_engine import CategorizationEngine
+    rows = ctx.parsed_statement()
+    CategorizationEngine(ctx.db_path).categorize_transactions_bulk(rows)
+    return len(rows)
+
+
+@scenario('import.bulk_insert', setup=lambda ctx: ctx.scratch_copy())
+def import_bulk_insert(ctx, db_path):
+    """Insert the statement rows with Transaction.bulk_create."""
+    from models.transaction import Transaction
+    rows = ctx.parsed_statement()
+    with ctx.app.app_context():
+        ctx.app.config['DATABASE'], previous = db_path, ctx.app.config['DATABASE']
+        try:
+            Transaction.bulk_create(rows)
+        finally:
+            ctx.app.config['DATABASE'] = previous
+    return len(rows)
+
+
+def _import_statement(ctx, db_path, staged):
+    from services.import_pipeline import import_file
+    import_file(db_path, ctx.statements['standard'], ctx.account_id,
+                'statement_standard.csv', staged=staged)
+    return len(ctx.parsed_statement())
+
+
+@scenario('import.pipeline', setup=lambda ctx: ctx.scratch_copy())
+def import_pipeline(ctx, db_path):
+    """Import the standard statement through the per-row pipeline stages."""
+    return _import_statement(ctx, db_path, staged=False)
+
+
+@scenario('import.staged', setup=lambda ctx: ctx.scratch_copy())
+def import_staged(ctx, db_path):
+    """Import the standard statement through the staging table (set-based SQL)."""
+    return _import_statement(ctx, db_path, staged=True)
+
+
+@scenario('import.end_to_end', setup=lambda ctx: ctx.scratch_copy())
+def import_end_to_end(ctx, db_path):
+    """Upload and confirm the standard statement through the HTTP routes."""
+    previous = ctx.app.config['DATABASE']
+    ctx.app.config['DATABASE'] = db_path
+    try:
+        with ctx.app.test_client() as client, open(ctx.statements['standard'], 'rb') as f:
+            response = client.post('/import/upload', data={
+                'file': (f, 'statement_standard.csv'),
+                'account_id': str(ctx.account_id)
+            }, content_type='multipart/form-data')
+            if response.status_code != 200:
+                raise RuntimeError(f"upload failed: {response.data[:200]!r}")
+            response = client.post('/import/confirm')
+            if response.status_code != 200:
+                raise RuntimeError(f"confirm failed: {response.data[:200]!r}")
+    finally:
+        ctx.app.config['DATABASE'] = previous
+    return len(ctx.parsed_statement())
+
+
+# ----------------------------------------------------------------------
+# Recurring detection
+# ----------------------------------------------------------------------
+
+@scenario('recurring.detect')
+def recurring_detect(ctx, state):
+    """Detect recurring patterns over the sample database."""
+    from services.recurring_detector import RecurringDetector
+    RecurringDetector(ctx.sample_db_path).detect_patterns()
+    return ctx.summary['sample_expenses']
+
+
+@scenario('recurring.detect_parallel')
+def recurring_detect_parallel(ctx, state):
+    """Detect recurring patterns over the sample database with two worker processes."""
+    from services.recurring_detector import RecurringDetector
+    RecurringDetector(ctx.sample_db_path).detect_patterns(workers=2)
+    return ctx.summary['sample_expenses']
+
+
+@scenario('recurring.scan_and_save', setup=lambda ctx: ctx.scratch_copy(ctx.sample_db_path))
+def recurring_scan_and_save(ctx, db_path):
+    """Detect and persist recurring patterns over the sample database."""
+    from services.recurring_detector import RecurringDetector
+    RecurringDetector(db_path).scan_and_save_all()
+    return ctx.summary['sample_expenses']
+
+
+@scenario('recurring.match_new')
+def recurring_match_new(ctx, state):
+    """Match statement rows against saved recurring patterns."""
+    from services.recurring_detector import RecurringDetector
+    detector = RecurringDetector(ctx.db_path)
+    rows = ctx.parsed_statement()
+    for txn in rows:
+        detector.check_new_transaction(txn)
+    return len(rows)
+
+
+@scenario('recurring.match_bulk')
+def recurring_match_bulk(ctx, state):
+    """Match all statement rows against saved recurring patterns in one pass."""
+    from services.recurring_detector import RecurringDetector
+    rows = ctx.parsed_statement()
+    RecurringDetector(ctx.db_path).match_transactions(rows)
+    return len(rows)
+
+
+# ----------------------------------------------------------------------
+# Read paths (HTTP endpoints)
+# ----------------------------------------------------------------------
+
+def _register_endpoint(name: str, url: str):
+    @scenario(name)
+    def endpoint(ctx, state):
+        ctx.get(url.format(**ctx.url_params()))
+        return ctx.summary['transactions']
+    endpoint.__doc__ = f"GET {url}"
+
+
+ENDPOINTS = [
+    ('reports.income_expenses', '/reports/api/income-expenses'),
+    ('reports.category_breakdown', '/reports/api/category-breakdown'),
+    ('reports.category_trends', '/reports/api/monthly-category-trends'),
+    ('reports.top_categories', '/reports/api/top-categories'),
+    ('reports.month_comparison', '/reports/api/month-comparison?month1={previous_month}&month2={last_month}'),
+    ('reports.merchants', '/reports/api/merchants'),
+    ('reports.net_worth', '/reports/api/net-worth'),
+    ('reports.cash_flow_forecast', '/reports/api/cash-flow-forecast?months=24'),
+    ('categories.all', '/categories/api/all'),
+    ('categories.stats', '/categories/api/stats'),
+    ('budgets.list', '/budgets/api/'),
+    ('budgets.summary', '/budgets/api/summary'),
+    ('recurring.all', '/recurring/api/all'),
+    ('recurring.stats', '/recurring/api/stats'),
+    ('recurring.alerts', '/recurring/api/alerts'),
+    ('dashboard.health', '/dashboard/api/health'),
+    ('transactions.page', '/transactions/api/all'),
+    ('transactions.stats', '/transactions/api/stats'),
+    ('accounts.details', '/accounts/{account_id}/details'),
+    ('accounts.transactions_page', '/api/accounts/{account_id}/transactions?limit=50&offset=1000'),
+]
+
+for _name, _url in ENDPOINTS:
+    _register_endpoint(_name, _url)
@@ -26,6 +26,11 @@ def create_app():
         'data',
         'financial_assistant.db'
     )
+    app.config['ARCHIVE_DIR'] = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        'data',
+        'archives'
+    )
     
     # Custom Jinja filters
     @app.template_filter('format_currency')
@@ -36,6 +41,18 @@ def create_app():
         except (ValueError, TypeError):
             return "$0.00"
     
+    # Leveled key=value logging for all services (LOG_LEVEL)
+    from utils.log import configure_logging
+    configure_logging()
+    
+    # Per-request SQL tracing (query counts, timings, budget warnings)
+    from utils import sql_tracer
+    sql_tracer.init_app(app)
+    
+    # Request metrics exposed at /metrics
+    from utils import metrics
+    metrics.init_app(app)
+    
     # Register routes
     register_routes(app)
     
@@ -54,6 +71,7 @@ def register_routes(app):
     from routes.budgets import budgets_bp
     from routes.recurring import recurring_bp
     from routes.dashboard import dashboard_bp
+    from routes.jobs import jobs_bp
     
     # Register blueprints
     app.register_blueprint(accounts_bp)
@@ -65,6 +83,7 @@ def register_routes(app):
     app.register_blueprint(budgets_bp)
     app.register_blueprint(recurring_bp)
     app.register_blueprint(dashboard_bp)
+    app.register_blueprint(jobs_bp)
     
     @app.route('/')
     def index():
@@ -78,6 +97,12 @@ def register_routes(app):
         """Health check endpoint."""
         return {'status': 'ok', 'message': 'Financial Assistant is running'}
     
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics endpoint."""
+        from utils.metrics import REGISTRY, CONTENT_TYPE
+        return REGISTRY.render(), 200, {'Content-Type': CONTENT_TYPE}
+    
     @app.errorhandler(404)
     def not_found(error):
         """Handle 404 errors."""
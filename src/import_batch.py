@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Batch Importer for Bank Statements
+
+Imports many CSV statements (and zip archives of statements) in one
+transaction, e.g. to backfill years of history. Files are parsed in
+parallel, mapped to accounts and deduplicated against the database and
+against each other.
+
+Each file is mapped to an account by, in order: --map, --rule, an `<id>_`
+filename prefix, an account name contained in the filename, --account-id.
+
+Usage:
+    python src/import_batch.py FILE [FILE ...] [--account-id ID]
+        [--map FILENAME=ID ...] [--rule PATTERN=ID ...] [--workers N] [--no-archive]
+
+Example:
+    python src/import_batch.py statements.zip --rule "chase_*.csv=1" --rule "amex_*.csv=2"
+"""
+
+import sys
+import argparse
+from services.batch_import import BatchImportError, import_batch
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+# Archive base directory
+ARCHIVE_DIR = 'data/archives'
+
+
+def _parse_pairs(values, option):
+    """Parse NAME=ID arguments into (name, id) pairs."""
+    pairs = []
+    for value in values or []:
+        name, sep, account_id = value.rpartition('=')
+        if not sep or not name or not account_id.isdigit():
+            raise argparse.ArgumentTypeError(f"{option} expects NAME=ID, got '{value}'")
+        pairs.append((name, int(account_id)))
+    return pairs
+
+
+def run_batch_import(files, account_id=None, mapping=None, rules=None, workers=None, archive=True):
+    """
+    Import the files and print the combined summary.
+
+    Args:
+        files: CSV files and zip archives
+        account_id: Default account ID
+        mapping: Filename -> account ID
+        rules: (glob pattern, account ID) pairs
+        workers: Parser processes (default: automatic)
+        archive: Archive the imported files
+    """
+    print("=" * 60)
+    print("Batch Statement Import")
+    print("=" * 60)
+    print(f"Files: {len(files)}")
+    print()
+
+    def progress(current, total=None, message=None):
+        if message:
+            print(f"  [{current}/{total}] {message}")
+
+    summary = import_batch(
+        DB_PATH, files,
+        default_account_id=account_id,
+        mapping=mapping,
+        rules=rules,
+        archive_dir=ARCHIVE_DIR if archive else None,
+        workers=workers,
+        progress=progress
+    )
+
+    print()
+    print("Files:")
+    print("-" * 60)
+    for file_summary in summary['files']:
+        print(f"{file_summary['filename']} → account {file_summary['account_id']}")
+        print(f"   Parsed: {file_summary['rows_parsed']}, imported: {file_summary['count']}, "
+              f"duplicates: {file_summary['duplicates_skipped']} (db) + "
+              f"{file_summary['batch_duplicates']} (batch), invalid: {file_summary['invalid']}")
+        for warning in file_summary['warnings']:
+            print(f"   ⚠ {warning}")
+
+    print()
+    print("=" * 60)
+    print(f"Import Complete!")
+    print(f"  {summary['message']}")
+    print(f"  Elapsed: {summary['elapsed_ms'] / 1000:.1f}s")
+    print("=" * 60)
+
+
+def main():
+    """Main entry point with argument parsing."""
+    parser = argparse.ArgumentParser(
+        description="Import many CSV statements (or zip archives) in one transaction"
+    )
+
+    parser.add_argument(
+        'files',
+        nargs='+',
+        help='CSV files and zip archives to import'
+    )
+
+    parser.add_argument(
+        '--account-id',
+        type=int,
+        help='Account for files no mapping or rule matches'
+    )
+
+    parser.add_argument(
+        '--map',
+        action='append',
+        metavar='FILENAME=ID',
+        help='Import FILENAME into account ID (repeatable)'
+    )
+
+    parser.add_argument(
+        '--rule',
+        action='append',
+        metavar='PATTERN=ID',
+        help='Import files matching the glob PATTERN into account ID (repeatable)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Worker processes for parsing (default: one per file up to the CPU count)'
+    )
+
+    parser.add_argument(
+        '--no-archive',
+        action='store_true',
+        help='Do not archive the imported files'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        run_batch_import(
+            args.files,
+            account_id=args.account_id,
+            mapping=dict(_parse_pairs(args.map, '--map')),
+            rules=_parse_pairs(args.rule, '--rule'),
+            workers=args.workers,
+            archive=not args.no_archive
+        )
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    except BatchImportError as e:
+        print(f"\n✗ Nothing imported: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n\nImport cancelled by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
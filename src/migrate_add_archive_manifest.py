@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the archive manifest.
+
+This creates:
+1. archive_manifest - One row per archived statement file with its
+   account, statement period, row count, content hash, original and
+   stored size and compression codec, so archives are listed and filtered
+   with a query instead of a directory walk
+2. Indexes for filtering by account, archive date and content hash
+
+Existing archives under ARCHIVE_DIR are indexed as they are (uncompressed
+files stay readable); new archives are stored compressed by
+services/file_archiver.py, which also creates the table on first use.
+"""
+
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from utils.schema import ARCHIVE_MANIFEST_SCHEMA as SCHEMA
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+# Archive base directory
+ARCHIVE_DIR = 'data/archives'
+
+
+def _archived_at(path: Path) -> str:
+    """Archive time from the `_YYYYMMDD_HHMMSS` filename suffix, else the file's mtime."""
+    try:
+        stamp = datetime.strptime('_'.join(path.stem.split('_')[-2:]), '%Y%m%d_%H%M%S')
+    except ValueError:
+        stamp = datetime.fromtimestamp(path.stat().st_mtime)
+    return stamp.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def index_existing_archives(cursor, archive_dir: str = ARCHIVE_DIR) -> int:
+    """
+    Add archives that are not in the manifest yet.
+
+    Args:
+        cursor: Database cursor
+        archive_dir: Archive base directory
+
+    Returns:
+        Number of archives added
+    """
+    base = Path(archive_dir)
+    if not base.exists():
+        return 0
+
+    cursor.execute("SELECT archive_path FROM archive_manifest")
+    known = {row[0] for row in cursor.fetchall()}
+
+    added = 0
+    for path in sorted(base.rglob('*.csv')):
+        if str(path) in known:
+            continue
+
+        try:
+            account_id = int(path.name.split('_')[0])
+        except ValueError:
+            account_id = None
+
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        size = path.stat().st_size
+        cursor.execute("""
+            INSERT INTO archive_manifest
+                (archive_path, account_id, original_filename, sha256, codec, original_size, size, archived_at)
+            VALUES (?, ?, ?, ?, 'none', ?, ?, ?)
+        """, (str(path), account_id, path.name, digest, size, size, _archived_at(path)))
+        added += 1
+
+    return added
+
+
+def migrate():
+    """Add the archive_manifest table and index existing archives."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Creating archive_manifest table...")
+
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+        print(f"Indexing existing archives in {os.path.abspath(ARCHIVE_DIR)}...")
+        added = index_existing_archives(cursor)
+
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM archive_manifest")
+        archives = cursor.fetchone()[0]
+
+        print(f"\n✅ Migration completed successfully!")
+        print(f"Indexed {added} existing archives ({archives} in the manifest)")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Archive Manifest Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
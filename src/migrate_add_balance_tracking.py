@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Migration script to keep account balances current incrementally.
+
+This creates:
+1. Triggers on transactions that apply every insert, delete and change of
+   amount/account to accounts.current_balance (current_balance stays
+   initial_balance + SUM(amount) without re-summing history)
+2. account_balance_checkpoints - Running totals of each account's
+   transactions (in date, id order) at every CHECKPOINT_INTERVAL-th
+   transaction, so a running balance can start from the nearest checkpoint
+3. Triggers that drop the checkpoints after a changed transaction
+   (they are recomputed on demand by BalanceService)
+4. An (account_id, date) index for per-account date-ordered scans
+
+Checkpoints store the sum of transaction amounts only; the account's
+initial_balance is added when reading, so editing it invalidates nothing.
+
+Requires migrate_add_account_balance.py to have been run first.
+"""
+
+import sqlite3
+
+from utils.schema import BALANCE_TRACKING_REBUILD as REBUILD, BALANCE_TRACKING_SCHEMA as SCHEMA
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the balance triggers and checkpoints, then reconcile balances."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(accounts)")
+        columns = [row[1] for row in cursor.fetchall()]
+
+        if 'current_balance' not in columns:
+            print("✗ accounts.current_balance column not found")
+            print("  Run migrate_add_account_balance.py first")
+            return
+
+        print("Creating balance triggers and checkpoints...")
+
+        for statement in SCHEMA + REBUILD:
+            cursor.execute(statement)
+
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM account_balance_checkpoints")
+        checkpoints = cursor.fetchone()[0]
+
+        print(f"\n✅ Migration completed successfully!")
+        print("Current balances reconciled with transaction history")
+        print(f"Created {checkpoints} running balance checkpoints")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Balance Tracking Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the category closure table.
+
+This creates:
+1. category_closure - One row per (ancestor, descendant) pair, including each
+   category with itself at depth 0, so a whole subtree is one indexed join
+2. Triggers on categories that keep the closure in sync on insert, re-parent
+   and delete
+3. The initial closure rows for the existing category tree
+"""
+
+import sqlite3
+
+from utils.schema import CATEGORY_CLOSURE_REBUILD as REBUILD, CATEGORY_CLOSURE_SCHEMA as SCHEMA
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the category closure table and triggers, then fill it."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Creating category closure table and triggers...")
+
+        for statement in SCHEMA + REBUILD:
+            cursor.execute(statement)
+
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM categories")
+        categories = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM category_closure")
+        pairs = cursor.fetchone()[0]
+
+        print(f"\n✅ Migration completed successfully!")
+        print(f"Indexed {pairs} ancestor/descendant pairs for {categories} categories")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Category Closure Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
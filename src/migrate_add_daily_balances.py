@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the daily balance table.
+
+This creates:
+1. daily_balances - One row per account and day with transactions, holding
+   the day's net change. An account's balance on day D is its initial
+   balance plus the cumulative net change up to D, so a point-in-time
+   lookup is a binary search over a few rows per day instead of re-summing
+   every transaction
+2. Triggers on transactions that apply each insert, delete and change of
+   amount/account/date to its day in O(1), so backdated imports stay cheap
+3. The initial rows, aggregated from the existing transactions
+
+Storing daily net changes rather than cumulative balances keeps every
+update local to one day; BalanceService builds the cumulative series.
+"""
+
+import sqlite3
+
+from utils.schema import DAILY_BALANCES_REBUILD as REBUILD, DAILY_BALANCES_SCHEMA as SCHEMA
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the daily balance table and triggers, then fill it."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Creating daily balance table and triggers...")
+
+        for statement in SCHEMA + REBUILD:
+            cursor.execute(statement)
+
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT account_id) FROM daily_balances")
+        days, accounts = cursor.fetchone()
+
+        print(f"\n✅ Migration completed successfully!")
+        print(f"Stored {days} account-days for {accounts} accounts")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Daily Balances Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration script to add data versions for categories and transactions.
+
+This creates:
+1. data_versions - Version counters (shared with the recurring alerts migration)
+2. 'categories' and 'transactions' counters
+3. Triggers that bump a table's counter whenever its rows change
+
+In-process caches compare these counters to decide whether cached results
+derived from the tables are still valid.
+"""
+
+import sqlite3
+
+from utils.schema import DATA_VERSIONS_SCHEMA as SCHEMA, VERSIONED_TABLES
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the category and transaction version counters and triggers."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Creating data version counters and triggers...")
+
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+        conn.commit()
+
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='trigger' AND name IN ({})
+        """.format(', '.join('?' * (3 * len(VERSIONED_TABLES)))), [
+            f"trg_{table}_{event}_version"
+            for table in VERSIONED_TABLES
+            for event in ('insert', 'update', 'delete')
+        ])
+        triggers = cursor.fetchall()
+
+        print(f"\n✅ Migration completed successfully!")
+        print(f"Versioned tables: {', '.join(VERSIONED_TABLES)}")
+        print(f"Created {len(triggers)} version triggers")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Data Versions Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Migration script to add import batch tracking.
+
+This creates:
+1. import_batches - One row per imported statement file: its account,
+   file name and hash, the import run it belongs to and whether it has
+   been undone
+2. transactions.import_batch_id - The batch each imported row came from
+   (NULL for manual and older rows), indexed so a batch is summarized or
+   undone with one indexed query
+3. Indexes for listing batches by account and by creation time
+
+Undoing a batch (services/import_batches.py) deletes its rows with one
+DELETE; the balance and daily balance triggers keep the aggregates in step.
+The service also creates the table and column on first use.
+"""
+
+import sqlite3
+
+from utils.schema import ensure_import_batches_schema as ensure_schema
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the import_batches table and the transactions.import_batch_id column."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Creating import_batches table...")
+
+        if ensure_schema(cursor):
+            print("✓ Added transactions.import_batch_id")
+        else:
+            print("✓ transactions.import_batch_id already exists")
+
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM import_batches")
+        batches = cursor.fetchone()[0]
+
+        print(f"\n✅ Migration completed successfully!")
+        print(f"Tracking {batches} import batches (existing transactions have no batch)")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Import Batches Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
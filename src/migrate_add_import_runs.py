@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the import run history.
+
+This creates:
+1. import_runs - One summary row per CSV import (completed, failed or
+   cancelled) with its row counts, warnings, per-stage metrics and elapsed
+   time, so import diagnostics can be queried after the fact instead of
+   read off stdout
+2. Indexes for listing runs by account and by start time
+
+Rows are written by services/import_history.py, which also creates the
+table on first use if this migration has not been run. A table created
+before cancelled runs were recorded is rebuilt with the wider status check.
+"""
+
+import sqlite3
+
+from utils.schema import ensure_import_runs_schema as ensure_schema
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the import_runs table."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Creating import_runs table...")
+
+        if ensure_schema(cursor):
+            print("✓ Rebuilt import_runs to record cancelled imports")
+
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM import_runs")
+        runs = cursor.fetchone()[0]
+
+        print(f"\n✅ Migration completed successfully!")
+        print(f"Import history ready ({runs} imports recorded)")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Import History Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the imported files ledger.
+
+This creates:
+1. imported_files - One row per statement file imported into an account,
+   keyed by the SHA-256 of its content, with its size, row count, date
+   range, archive path and import run. An upload whose hash is already in
+   the ledger for the same account is rejected before it is parsed, and
+   files with identical content share one archived copy.
+2. An index for looking files up by hash across accounts
+
+Rows are written by services/imported_files.py, which also creates the
+table on first use if this migration has not been run.
+"""
+
+import sqlite3
+
+from utils.schema import IMPORTED_FILES_SCHEMA as SCHEMA
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the imported_files table."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Creating imported_files table...")
+
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM imported_files")
+        files = cursor.fetchone()[0]
+
+        print(f"\n✅ Migration completed successfully!")
+        print(f"Imported files ledger ready ({files} files recorded)")
+        print("Files imported before this migration are not in the ledger;")
+        print("re-uploading them is still caught by duplicate detection.")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Imported Files Ledger Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the background jobs table.
+
+This creates:
+1. jobs - One row per background job (recategorization, recurring scans,
+   balance rebuilds, ...) with its status, progress counters, parameters,
+   result and error, so job history survives server restarts (live
+   progress of running jobs is held in memory and written when they finish)
+2. Indexes for listing jobs by status and by creation time
+
+Jobs are run in-process by services/job_runner.py, which also creates the
+table on first use if this migration has not been run.
+"""
+
+import sqlite3
+
+from utils.schema import JOBS_SCHEMA as SCHEMA
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the jobs table."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Creating jobs table...")
+
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM jobs")
+        jobs = cursor.fetchone()[0]
+
+        print(f"\n✅ Migration completed successfully!")
+        print(f"Jobs table ready ({jobs} jobs recorded)")
+
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Background Jobs Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Migration script to add materialized recurring alerts.
+
+This creates:
+1. data_versions - Version counters bumped by triggers when tracked tables change
+2. Triggers on recurring_transactions and recurring_transaction_instances
+3. recurring_alerts - Missing-payment and amount-change alerts, computed once per version
+4. recurring_alerts_state - Data version and day the alerts were computed for
+
+Requires migrate_add_recurring_transactions.py to have been run first.
+"""
+
+import sqlite3
+
+from utils.schema import RECURRING_ALERTS_SCHEMA as SCHEMA
+
+# Database path
+DB_PATH = 'data/financial_assistant.db'
+
+
+def migrate():
+    """Add the recurring alert tables and version triggers to the database."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type='table' AND name='recurring_transactions'
+        """)
+        
+        if not cursor.fetchone():
+            print("✗ recurring_transactions table not found")
+            print("  Run migrate_add_recurring_transactions.py first")
+            return
+        
+        print("Creating recurring alert tables and triggers...")
+        
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        
+        conn.commit()
+        
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='trigger' AND name LIKE 'trg_recurring_%_version'
+        """)
+        triggers = cursor.fetchall()
+        
+        print(f"\n✅ Migration completed successfully!")
+        print("Tables: data_versions, recurring_alerts, recurring_alerts_state")
+        print(f"Created {len(triggers)} version triggers")
+        
+    except Exception as e:
+        print(f"✗ Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Recurring Alerts Migration")
+    print("=" * 60)
+    migrate()
+    print("\n" + "=" * 60)
+    print("Migration complete!")
+    print("=" * 60)
@@ -5,6 +5,7 @@ Account model for managing bank and credit card accounts.
 import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional
+from utils.db import get_connection
 
 
 class Account:
@@ -43,7 +44,7 @@ class Account:
             raise ValueError("Account type must be checking, savings, or credit")
         
         # Insert into database
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -66,7 +67,7 @@ class Account:
         Returns:
             List of account dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -93,7 +94,7 @@ class Account:
         Returns:
             Account dictionary or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -171,7 +172,7 @@ class Account:
         params.append(account_id)
         
         # Execute update
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -220,7 +221,7 @@ class Account:
             This will also delete all transactions associated with the account
             due to CASCADE foreign key constraint.
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Enable foreign keys
@@ -244,7 +245,7 @@ class Account:
         Returns:
             Number of transactions
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -257,4 +258,39 @@ class Account:
         
         finally:
             conn.close()
+    
+    def get_statistics(self, account_id: int) -> Dict:
+        """
+        Get transaction statistics for an account in one aggregate query.
+        
+        Args:
+            account_id: Account ID
+        
+        Returns:
+            Dictionary with total_transactions, total_credits, total_debits
+            (as a positive amount) and net_cash_flow
+        """
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(CASE WHEN amount > 0 THEN amount END), 0),
+                       COALESCE(SUM(CASE WHEN amount < 0 THEN amount END), 0)
+                FROM transactions
+                WHERE account_id = ?
+            """, (account_id,))
+            
+            count, credits, debits = cursor.fetchone()
+            
+            return {
+                'total_transactions': count,
+                'total_credits': round(credits, 2),
+                'total_debits': round(abs(debits), 2),
+                'net_cash_flow': round(credits + debits, 2)  # debits are negative
+            }
+        
+        finally:
+            conn.close()
 
@@ -6,6 +6,7 @@ Handles CRUD operations for budgets
 import sqlite3
 from typing import Optional, List, Dict
 from datetime import date
+from utils.db import get_connection
 
 
 class Budget:
@@ -16,7 +17,7 @@ class Budget:
     
     def _get_connection(self):
         """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -2,8 +2,18 @@
 Category Model for database operations.
 """
 
+import copy
 import sqlite3
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Optional, Tuple
+from utils.db import get_connection, get_data_version, table_exists
+from utils.metrics import record_cache_hit, record_cache_miss
+
+
+# Categories with transaction counts and their hierarchy, per database path,
+# tagged with the (categories, transactions) data versions they were built at
+_catalog_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+_catalog_lock = threading.Lock()
 
 
 class Category:
@@ -25,7 +35,7 @@ class Category:
         Returns:
             List of category dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -52,7 +62,7 @@ class Category:
         Returns:
             Category dictionary or None
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -81,7 +91,7 @@ class Category:
         Returns:
             List of category dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -99,6 +109,15 @@ class Category:
         
         return [dict(row) for row in rows]
     
+    def get_all_with_counts(self) -> List[Dict]:
+        """
+        Get all categories with their transaction counts.
+        
+        Returns:
+            List of category dictionaries with 'transaction_count'
+        """
+        return self.get_catalog()['categories']
+    
     def get_hierarchy(self) -> Dict:
         """
         Get categories organized as a hierarchy.
@@ -106,8 +125,73 @@ class Category:
         Returns:
             Dictionary with 'income' and 'expense' trees
         """
-        all_categories = self.get_all()
+        return self.get_catalog()['hierarchy']
+    
+    def get_catalog(self) -> Dict:
+        """
+        Get all categories with transaction counts together with their hierarchy.
+        
+        The result is cached in-process and rebuilt only when the categories
+        or transactions data version changes. Without those counters (the
+        data versions migration not run) it is rebuilt on every call.
+        
+        Returns:
+            Dictionary with 'categories' (flat list) and 'hierarchy' (trees)
+        """
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            versions = (get_data_version(cursor, 'categories'),
+                        get_data_version(cursor, 'transactions'))
+            cacheable = None not in versions
+            
+            if cacheable:
+                with _catalog_lock:
+                    cached = _catalog_cache.get(self.db_path)
+                if cached and cached[0] == versions:
+                    record_cache_hit('categories')
+                    return copy.deepcopy(cached[1])
+            
+            record_cache_miss('categories')
+            catalog = self._build_catalog(cursor)
+        finally:
+            conn.close()
+        
+        if cacheable:
+            with _catalog_lock:
+                _catalog_cache[self.db_path] = (versions, catalog)
+        
+        return copy.deepcopy(catalog)
+    
+    def _build_catalog(self, cursor: sqlite3.Cursor) -> Dict:
+        """Read categories and counts (one grouped query) and build the trees."""
+        cursor.execute("""
+            SELECT c.*,
+                   p.name as parent_name,
+                   COALESCE(counts.transaction_count, 0) as transaction_count
+            FROM categories c
+            LEFT JOIN categories p ON c.parent_id = p.id
+            LEFT JOIN (
+                SELECT category_id, COUNT(*) as transaction_count
+                FROM transactions
+                WHERE category_id IS NOT NULL
+                GROUP BY category_id
+            ) counts ON counts.category_id = c.id
+            ORDER BY c.type, c.level, c.name
+        """)
+        
+        categories = [dict(row) for row in cursor.fetchall()]
         
+        return {
+            'categories': categories,
+            'hierarchy': self._build_hierarchy(copy.deepcopy(categories))
+        }
+    
+    @staticmethod
+    def _build_hierarchy(all_categories: List[Dict]) -> Dict:
+        """Nest categories under their parents, grouped by type."""
         # Build hierarchy
         hierarchy = {
             'income': [],
@@ -125,7 +209,7 @@ class Category:
         for cat in all_categories:
             if cat['parent_id'] is None:
                 # Root level
-                hierarchy[cat['type']].append(cat)
+                hierarchy.setdefault(cat['type'], []).append(cat)
             else:
                 # Child level
                 parent = cat_by_id.get(cat['parent_id'])
@@ -158,7 +242,7 @@ class Category:
         if level not in [1, 2, 3]:
             raise ValueError("Category level must be 1, 2, or 3")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -190,9 +274,19 @@ class Category:
         Returns:
             True if updated, False if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
+        # A category cannot be moved below itself or one of its descendants
+        if parent_id is not None and table_exists(cursor, 'category_closure'):
+            cursor.execute("""
+                SELECT 1 FROM category_closure
+                WHERE ancestor_id = ? AND descendant_id = ?
+            """, (category_id, parent_id))
+            if cursor.fetchone():
+                conn.close()
+                raise ValueError("Category cannot be moved below itself or its subcategories")
+        
         # Build update query
         updates = []
         params = []
@@ -231,7 +325,7 @@ class Category:
         Returns:
             True if deleted, False if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("DELETE FROM categories WHERE id = ?", (category_id,))
@@ -242,6 +336,42 @@ class Category:
         
         return deleted
     
+    def get_subtree_ids(self, category_id: int) -> List[int]:
+        """
+        Get the IDs of a category and all of its subcategories.
+        
+        Args:
+            category_id: Category ID
+        
+        Returns:
+            List of category IDs, the category itself first
+        """
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        
+        if table_exists(cursor, 'category_closure'):
+            cursor.execute("""
+                SELECT descendant_id FROM category_closure
+                WHERE ancestor_id = ?
+                ORDER BY depth, descendant_id
+            """, (category_id,))
+        else:
+            cursor.execute("""
+                WITH RECURSIVE subtree(id, depth) AS (
+                    SELECT id, 0 FROM categories WHERE id = ?
+                    UNION ALL
+                    SELECT c.id, subtree.depth + 1
+                    FROM categories c
+                    JOIN subtree ON c.parent_id = subtree.id
+                )
+                SELECT id FROM subtree ORDER BY depth, id
+            """, (category_id,))
+        
+        ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        
+        return ids
+    
     def get_full_path(self, category_id: int) -> str:
         """
         Get full category path (e.g., "Expenses → Food → Groceries").
@@ -252,7 +382,7 @@ class Category:
         Returns:
             Full path string
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
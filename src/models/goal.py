@@ -2,13 +2,14 @@
 import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional
+from utils.db import get_connection
 
 class Goal:
     def __init__(self, db_path: str):
         self.db_path = db_path
     
     def get_all(self) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -24,7 +25,7 @@ class Goal:
             conn.close()
     
     def create(self, name: str, target_amount: float, target_date: str, category_id: int = None) -> int:
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -39,7 +40,7 @@ class Goal:
             conn.close()
     
     def update(self, goal_id: int, updates: Dict) -> bool:
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -65,7 +66,7 @@ class Goal:
             conn.close()
     
     def delete(self, goal_id: int) -> bool:
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -5,6 +5,7 @@ Transaction Model for database operations.
 import sqlite3
 from typing import List, Dict, Optional
 from datetime import date
+from utils.db import get_connection
 
 
 class Transaction:
@@ -40,7 +41,7 @@ class Transaction:
         Returns:
             Transaction ID
         """
-        conn = sqlite3.connect(Transaction._get_db_path())
+        conn = get_connection(Transaction._get_db_path())
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -57,7 +58,9 @@ class Transaction:
         return transaction_id
     
     @staticmethod
-    def bulk_create(transactions: List[Dict]) -> int:
+    def bulk_create(transactions: List[Dict], db_path: Optional[str] = None,
+                    conn: Optional[sqlite3.Connection] = None,
+                    import_batch_id: Optional[int] = None) -> int:
         """
         Create multiple transactions efficiently.
         
@@ -65,11 +68,19 @@ class Transaction:
             transactions: List of transaction dictionaries with keys:
                          account_id, date, description, amount, 
                          category_id (optional), notes (optional), tags (optional)
+            db_path: Optional database path (default: Flask config), for
+                     callers outside an application context
+            conn: Optional open connection; the rows are then inserted in
+                  its transaction, which the caller commits
+            import_batch_id: Optional import batch the rows belong to
         
         Returns:
-            Number of transactions created
+            Number of transactions created. Each dictionary's 'id' is set
+            to the id of its new row.
         """
-        conn = sqlite3.connect(Transaction._get_db_path())
+        own_connection = conn is None
+        if own_connection:
+            conn = get_connection(db_path or Transaction._get_db_path())
         cursor = conn.cursor()
         
         # Prepare data for bulk insert
@@ -82,26 +93,41 @@ class Transaction:
                 t.get('category_id'),
                 t.get('notes'),
                 t.get('tags')
-            )
+            ) + ((import_batch_id,) if import_batch_id else ())
             for t in transactions
         ]
         
-        cursor.executemany("""
-            INSERT INTO transactions 
-            (account_id, date, description, amount, category_id, notes, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, data)
+        if import_batch_id:
+            cursor.executemany("""
+                INSERT INTO transactions 
+                (account_id, date, description, amount, category_id, notes, tags, import_batch_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, data)
+        else:
+            cursor.executemany("""
+                INSERT INTO transactions 
+                (account_id, date, description, amount, category_id, notes, tags)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, data)
         
         count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        
+        # Rows inserted by one statement in one transaction get consecutive ids
+        if count > 0:
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            for offset, t in enumerate(transactions):
+                t['id'] = last_id - count + 1 + offset
+        
+        if own_connection:
+            conn.commit()
+            conn.close()
         
         return count
     
     @staticmethod
     def get_by_id(transaction_id: int) -> Optional[Dict]:
         """Get transaction by ID."""
-        conn = sqlite3.connect(Transaction._get_db_path())
+        conn = get_connection(Transaction._get_db_path())
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -128,7 +154,7 @@ class Transaction:
         Returns:
             List of transaction dictionaries
         """
-        conn = sqlite3.connect(Transaction._get_db_path())
+        conn = get_connection(Transaction._get_db_path())
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -162,7 +188,7 @@ class Transaction:
         Returns:
             List of transaction dictionaries
         """
-        conn = sqlite3.connect(Transaction._get_db_path())
+        conn = get_connection(Transaction._get_db_path())
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -192,7 +218,7 @@ class Transaction:
         Returns:
             True if deleted, False if not found
         """
-        conn = sqlite3.connect(Transaction._get_db_path())
+        conn = get_connection(Transaction._get_db_path())
         cursor = conn.cursor()
         
         cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
@@ -206,7 +232,7 @@ class Transaction:
     @staticmethod
     def count_by_account(account_id: int) -> int:
         """Get transaction count for an account."""
-        conn = sqlite3.connect(Transaction._get_db_path())
+        conn = get_connection(Transaction._get_db_path())
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -247,7 +273,7 @@ class Transaction:
         Returns:
             List of transaction dictionaries
         """
-        conn = sqlite3.connect(Transaction._get_db_path())
+        conn = get_connection(Transaction._get_db_path())
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4,12 +4,16 @@ Account routes for account management.
 
 from flask import Blueprint, request, jsonify, render_template, current_app
 from models.account import Account
-from models.transaction import Transaction
+from services.balance_service import BalanceService
 
 
 # Create blueprint
 accounts_bp = Blueprint('accounts', __name__)
 
+# Transactions per page on the account details page
+TRANSACTIONS_PAGE_SIZE = 50
+MAX_TRANSACTIONS_PAGE_SIZE = 500
+
 
 @accounts_bp.route('/accounts')
 def accounts_page():
@@ -61,6 +65,48 @@ def get_account(account_id):
     })
 
 
+@accounts_bp.route('/api/accounts/<int:account_id>/balance-history', methods=['GET'])
+def get_balance_history(account_id):
+    """
+    Get an account's end-of-day balance for every day in a range.
+
+    Args:
+        account_id: Account ID
+
+    Query params:
+        date_from: First day, YYYY-MM-DD (default: first transaction day)
+        date_to: Last day, YYYY-MM-DD (default: today)
+
+    Returns:
+        JSON list of {date, balance} points or 404
+    """
+    account_model = Account(current_app.config['DATABASE'])
+    if not account_model.get_by_id(account_id):
+        return jsonify({
+            'success': False,
+            'error': 'Account not found'
+        }), 404
+
+    try:
+        history = BalanceService(current_app.config['DATABASE']).get_balance_history(
+            account_id,
+            date_from=request.args.get('date_from'),
+            date_to=request.args.get('date_to')
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid date: {e}'
+        }), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    return jsonify({
+        'success': True,
+        'history': history
+    })
+
+
 @accounts_bp.route('/api/accounts', methods=['POST'])
 def create_account():
     """
@@ -247,26 +293,58 @@ def account_details(account_id):
     if not account:
         return render_template('404.html'), 404
     
-    # Get account transactions
-    transactions = Transaction.get_by_account(account_id)
-    
-    # Calculate statistics
-    total_transactions = len(transactions)
-    total_credits = sum(t['amount'] for t in transactions if t['amount'] > 0)
-    total_debits = sum(t['amount'] for t in transactions if t['amount'] < 0)
-    net_cash_flow = total_credits + total_debits  # debits are negative
-    
-    statistics = {
-        'total_transactions': total_transactions,
-        'total_credits': total_credits,
-        'total_debits': abs(total_debits),
-        'net_cash_flow': net_cash_flow
-    }
+    statistics = account_model.get_statistics(account_id)
     
+    # Transactions are loaded page by page from get_account_transactions
     return render_template(
         'account_details.html',
         account=account,
         statistics=statistics,
-        transactions=transactions
+        page_size=TRANSACTIONS_PAGE_SIZE
     )
 
+
+@accounts_bp.route('/api/accounts/<int:account_id>/transactions', methods=['GET'])
+def get_account_transactions(account_id):
+    """
+    Get one page of an account's transactions, newest first, with the
+    balance after each.
+    
+    Args:
+        account_id: Account ID
+    
+    Query params:
+        limit: Page size (default 50, at most 500)
+        offset: Number of newest transactions to skip
+    
+    Returns:
+        JSON page of transactions with the total count and whether more follow
+    """
+    try:
+        limit = min(max(request.args.get('limit', TRANSACTIONS_PAGE_SIZE, type=int), 1),
+                    MAX_TRANSACTIONS_PAGE_SIZE)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        db_path = current_app.config['DATABASE']
+        account_model = Account(db_path)
+        if not account_model.get_by_id(account_id):
+            return jsonify({
+                'success': False,
+                'error': 'Account not found'
+            }), 404
+        
+        total = account_model.get_transaction_count(account_id)
+        transactions = BalanceService(db_path).get_running_balances(
+            account_id, limit=limit, offset=offset)
+        
+        return jsonify({
+            'success': True,
+            'transactions': transactions,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'has_more': offset + len(transactions) < total
+        })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
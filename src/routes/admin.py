@@ -3,8 +3,10 @@ Admin routes for database management.
 """
 
 from flask import Blueprint, request, jsonify, render_template, current_app
-import sqlite3
 import os
+from utils.db import get_connection, table_exists
+from services.balance_service import BalanceService
+from routes.jobs import submit_job, wants_async
 
 # Create blueprint
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -57,7 +59,7 @@ def reset_database():
     
     try:
         db_path = current_app.config['DATABASE']
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
         
         # Count before deletion
@@ -67,6 +69,12 @@ def reset_database():
         cursor.execute("SELECT COUNT(*) FROM accounts")
         account_count = cursor.fetchone()[0]
         
+        # Import batches and the imported files ledger only describe the
+        # transactions being deleted (the files can be imported again)
+        for table in ('import_batches', 'imported_files'):
+            if table_exists(cursor, table):
+                cursor.execute(f"DELETE FROM {table}")
+        
         # Delete data based on reset_type
         if reset_type == 'all':
             # Delete all transactions first (due to foreign key)
@@ -109,12 +117,38 @@ def reset_database():
         }), 500
 
 
+@admin_bp.route('/api/rebuild-balances', methods=['POST'])
+def rebuild_balances():
+    """
+    Recompute account balances, running balance checkpoints and daily balances.
+    
+    Query params:
+        async: '1' to run as a background job (returns 202 with a job ID)
+    """
+    try:
+        service = BalanceService(current_app.config['DATABASE'])
+        
+        if wants_async():
+            return submit_job('rebuild_balances', service.rebuild)
+        
+        return jsonify({
+            'success': True,
+            **service.rebuild()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Balance rebuild failed: {str(e)}'
+        }), 500
+
+
 @admin_bp.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get database statistics."""
     try:
         db_path = current_app.config['DATABASE']
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
         
         cursor.execute("SELECT COUNT(*) FROM transactions")
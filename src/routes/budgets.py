@@ -32,7 +32,10 @@ def get_all_budgets():
         
         budget_service = BudgetService(current_app.config['DATABASE'])
         progress_list = budget_service.get_all_budgets_progress(period_type)
-        summary = budget_service.get_budget_summary()
+        # The summary always covers the monthly budgets
+        summary = budget_service.get_budget_summary(
+            progress_list if period_type == 'monthly' else None
+        )
         
         return jsonify({
             'success': True,
@@ -6,6 +6,8 @@ from flask import Blueprint, request, jsonify, render_template, current_app
 from models.category import Category
 from models.transaction import Transaction
 from services.categorization_engine import CategorizationEngine
+from routes.jobs import submit_job, wants_async
+from utils.db import get_connection
 
 # Create blueprint
 categories_bp = Blueprint('categories', __name__, url_prefix='/categories')
@@ -32,21 +34,8 @@ def get_all_categories():
         JSON list of categories with usage stats
     """
     try:
-        import sqlite3
         category_model = Category(current_app.config['DATABASE'])
-        categories = category_model.get_all()
-        
-        # Get transaction count for each category
-        conn = sqlite3.connect(current_app.config['DATABASE'])
-        cursor = conn.cursor()
-        
-        for cat in categories:
-            cursor.execute("""
-                SELECT COUNT(*) FROM transactions WHERE category_id = ?
-            """, (cat['id'],))
-            cat['transaction_count'] = cursor.fetchone()[0]
-        
-        conn.close()
+        categories = category_model.get_all_with_counts()
         
         return jsonify({
             'success': True,
@@ -217,8 +206,7 @@ def create_rule():
 def delete_rule(rule_id):
     """Delete a categorization rule."""
     try:
-        import sqlite3
-        conn = sqlite3.connect(current_app.config['DATABASE'])
+        conn = get_connection(current_app.config['DATABASE'])
         cursor = conn.cursor()
         
         cursor.execute("DELETE FROM categorization_rules WHERE id = ?", (rule_id,))
@@ -273,8 +261,7 @@ def categorize_transaction(transaction_id):
         
         # Update transaction category
         conn = current_app.config['DATABASE']
-        import sqlite3
-        db_conn = sqlite3.connect(conn)
+        db_conn = get_connection(conn)
         cursor = db_conn.cursor()
         
         cursor.execute("""
@@ -340,8 +327,7 @@ def bulk_categorize():
             return jsonify({'success': False, 'error': 'No transaction IDs provided'}), 400
         
         # Update all transactions
-        import sqlite3
-        conn = sqlite3.connect(current_app.config['DATABASE'])
+        conn = get_connection(current_app.config['DATABASE'])
         cursor = conn.cursor()
         
         placeholders = ','.join(['?'] * len(transaction_ids))
@@ -388,7 +374,7 @@ def get_rules():
     """Get all categorization rules."""
     try:
         import sqlite3
-        conn = sqlite3.connect(current_app.config['DATABASE'])
+        conn = get_connection(current_app.config['DATABASE'])
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -412,8 +398,7 @@ def get_rules():
 def get_category_stats():
     """Get categorization statistics."""
     try:
-        import sqlite3
-        conn = sqlite3.connect(current_app.config['DATABASE'])
+        conn = get_connection(current_app.config['DATABASE'])
         cursor = conn.cursor()
         
         cursor.execute("SELECT COUNT(*) FROM categories")
@@ -455,86 +440,18 @@ def recategorize_all_transactions():
     
     Query params:
         mode: 'soft' (uncategorized only, default) or 'hard' (ALL transactions, override existing)
+        async: '1' to run as a background job (returns 202 with a job ID)
     """
     try:
-        import sqlite3
-        
         mode = request.args.get('mode', 'soft')
-        
-        conn = sqlite3.connect(current_app.config['DATABASE'])
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Get transactions based on mode
-        if mode == 'hard':
-            # HARD mode: Get ALL transactions (override existing categories)
-            cursor.execute("""
-                SELECT id, description, amount, category_id
-                FROM transactions
-                ORDER BY date DESC
-            """)
-        else:
-            # SOFT mode (default): Only uncategorized transactions
-            cursor.execute("""
-                SELECT id, description, amount, category_id
-                FROM transactions
-                WHERE category_id IS NULL
-                ORDER BY date DESC
-            """)
-        
-        transactions = cursor.fetchall()
-        total_transactions = len(transactions)
-        
-        if total_transactions == 0:
-            conn.close()
-            message = 'All transactions are already categorized!' if mode == 'soft' else 'No transactions found!'
-            return jsonify({
-                'success': True,
-                'total': 0,
-                'categorized': 0,
-                'success_rate': 100.0,
-                'message': message
-            })
-        
-        # Initialize categorization engine
         engine = CategorizationEngine(current_app.config['DATABASE'])
         
-        categorized_count = 0
-        
-        for txn in transactions:
-            # Create transaction dict
-            transaction = {
-                'id': txn['id'],
-                'description': txn['description'],
-                'amount': txn['amount']
-            }
-            
-            # Try to categorize
-            result = engine.categorize_transaction(transaction)
-            
-            if result and result['category_id']:
-                category_id = result['category_id']
-                
-                # Update transaction
-                cursor.execute("""
-                    UPDATE transactions 
-                    SET category_id = ?
-                    WHERE id = ?
-                """, (category_id, txn['id']))
-                
-                categorized_count += 1
-        
-        conn.commit()
-        conn.close()
-        
-        success_rate = (categorized_count / total_transactions * 100) if total_transactions > 0 else 0
+        if wants_async():
+            return submit_job('recategorize', engine.recategorize_all, {'mode': mode})
         
         return jsonify({
             'success': True,
-            'total': total_transactions,
-            'categorized': categorized_count,
-            'success_rate': round(success_rate, 1),
-            'mode': mode
+            **engine.recategorize_all(mode=mode)
         })
         
     except Exception as e:
@@ -4,6 +4,7 @@ import sqlite3
 from datetime import date, timedelta
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from utils.db import get_connection
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 
@@ -15,7 +16,7 @@ def dashboard_page():
 def get_financial_health():
     """Get comprehensive financial health metrics"""
     try:
-        conn = sqlite3.connect(current_app.config['DATABASE'])
+        conn = get_connection(current_app.config['DATABASE'])
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4,6 +4,8 @@ Import routes for CSV file upload and transaction import.
 
 from flask import Blueprint, render_template, request, jsonify, session, flash, redirect, url_for
 from werkzeug.utils import secure_filename
+import functools
+import json
 import os
 import sys
 import tempfile
@@ -16,14 +18,20 @@ from models.account import Account
 from models.transaction import Transaction
 from services.csv_parser import CSVParser, CSVParseError
 from services.transaction_validator import TransactionValidator
-from services.file_archiver import FileArchiver
 from services.duplicate_detector import DuplicateDetector
-from services.categorization_engine import CategorizationEngine
+from services.import_pipeline import import_file
+from services.batch_import import BatchImportError, import_batch
+from services.import_batches import ImportBatches
+from services.import_history import ImportHistory
+from services.imported_files import ImportedFiles, save_and_hash
+from routes.jobs import submit_job, wants_async
 
 import_bp = Blueprint('import', __name__, url_prefix='/import')
 
 ALLOWED_EXTENSIONS = {'csv'}
 
+BATCH_EXTENSIONS = {'csv', 'zip'}
+
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -42,7 +50,13 @@ def import_page():
 
 @import_bp.route('/upload', methods=['POST'])
 def upload_file():
-    """Handle CSV file upload and parse transactions."""
+    """
+    Handle CSV file upload and parse transactions.
+    
+    The upload is hashed while it is written to disk; a file already
+    imported into the account is rejected with 409 before it is parsed,
+    unless the form sets `force`.
+    """
     
     # Check if file was uploaded
     if 'file' not in request.files:
@@ -82,7 +96,20 @@ def upload_file():
     temp_path = os.path.join(temp_dir, f"{datetime.now().timestamp()}_{filename}")
     
     try:
-        file.save(temp_path)
+        file_hash, file_size = save_and_hash(file.stream, temp_path)
+        
+        # Exact re-upload: nothing to parse or dedupe
+        if not request.form.get('force'):
+            previous = ImportedFiles(current_app.config['DATABASE']).find(file_hash, account_id)
+            if previous:
+                os.remove(temp_path)
+                return jsonify({
+                    'error': (f"This file was already imported into {account['name']} on "
+                              f"{previous['imported_at']} ({previous['row_count']} rows, "
+                              f"{previous['date_from']} to {previous['date_to']})"),
+                    'already_imported': True,
+                    'imported_file': previous
+                }), 409
         
         # Parse CSV
         parser = CSVParser()
@@ -93,21 +120,20 @@ def upload_file():
             txn['account_id'] = account_id
         
         # Validate transactions
-        validator = TransactionValidator(db_path='data/financial_assistant.db')
-        validated_results = validator.validate_transactions(transactions)
+        validator = TransactionValidator(current_app.config['DATABASE'])
+        failures = validator.validate_batch(transactions)
         
         # Separate valid and invalid transactions
-        valid_transactions = []
-        invalid_transactions = []
-        
-        for txn, result in validated_results:
-            if result.is_valid:
-                valid_transactions.append(txn)
-            else:
-                invalid_transactions.append({
-                    'transaction': txn,
-                    'errors': result.to_dict()['errors']
-                })
+        valid_transactions = [
+            txn for index, txn in enumerate(transactions) if index not in failures
+        ]
+        invalid_transactions = [
+            {
+                'transaction': transactions[index],
+                'errors': [error.to_dict() for error in errors]
+            }
+            for index, errors in failures.items()
+        ]
         
         # Calculate summary statistics (following accounting standards)
         # total_credits = money coming in (positive amounts, deposits/income)
@@ -121,6 +147,8 @@ def upload_file():
         session['import_filename'] = filename
         session['import_temp_file'] = temp_path  # Keep temp file for re-parsing
         session['import_valid_count'] = len(valid_transactions)  # For verification
+        session['import_file_hash'] = file_hash
+        session['import_file_size'] = file_size
         
         return jsonify({
             'success': True,
@@ -158,7 +186,16 @@ def upload_file():
 
 @import_bp.route('/confirm', methods=['POST'])
 def confirm_import():
-    """Confirm and save transactions to database."""
+    """
+    Confirm and save transactions to database.
+    
+    Runs the staged import pipeline (validate, dedupe, categorize, insert,
+    link recurring, archive). With `mode=staged` the rows are instead
+    validated, deduplicated (exact matches only), categorized and inserted
+    set-based from a staging table. With `async=1` it runs as a background
+    job and returns 202 with a job ID; progress is streamed from
+    /jobs/api/<id>/events.
+    """
     from flask import current_app
     
     # Get import info from session
@@ -173,125 +210,206 @@ def confirm_import():
     if not os.path.exists(temp_file_path):
         return jsonify({'error': 'Uploaded file no longer available. Please upload again.'}), 400
     
+    import_params = {
+        'file_path': temp_file_path,
+        'account_id': account_id,
+        'filename': filename,
+        'expected_count': expected_count,
+        'file_hash': session.get('import_file_hash'),
+        'file_size': session.get('import_file_size'),
+        'staged': request.args.get('mode') == 'staged'
+    }
+    run_import = functools.partial(import_file, current_app.config['DATABASE'],
+                                   archive_dir=current_app.config['ARCHIVE_DIR'])
+    
     try:
-        # Re-parse the CSV file to get transactions
-        parser = CSVParser()
-        transactions = parser.parse_file(temp_file_path)
-        
-        # Validate and filter transactions
-        validator = TransactionValidator(current_app.config['DATABASE'])
-        valid_transactions = []
-        
-        for txn in transactions:
-            txn['account_id'] = account_id
-            result = validator.validate_transaction(txn)
-            if result.is_valid:
-                valid_transactions.append(txn)
-        
-        if len(valid_transactions) != expected_count:
-            print(f"Warning: Expected {expected_count} valid transactions, got {len(valid_transactions)}")
-        
-        # Check for duplicates
-        print(f"\n=== DUPLICATE DETECTION START ===")
-        print(f"Checking {len(valid_transactions)} transactions for duplicates...")
-        detector = DuplicateDetector(current_app.config['DATABASE'])
-        non_duplicate_transactions = []
-        duplicate_count = 0
-        
-        for i, txn in enumerate(valid_transactions):
-            duplicate_check = detector.check_duplicate(txn)
-            
-            if i < 3:  # Debug first 3 transactions
-                print(f"\nTransaction {i+1}: {txn['date']} - {txn['description'][:30]} - ${txn['amount']}")
-                print(f"  is_duplicate: {duplicate_check['is_duplicate']}, confidence: {duplicate_check['confidence']:.2f}")
-                if duplicate_check['matches']:
-                    print(f"  Found {len(duplicate_check['matches'])} potential matches")
-            
-            # Only import if not a duplicate (is_duplicate = False means unique)
-            if not duplicate_check['is_duplicate']:
-                non_duplicate_transactions.append(txn)
-            else:
-                duplicate_count += 1
-                confidence = duplicate_check['confidence']
-                print(f"✗ DUPLICATE (confidence: {confidence:.0%}): {txn['date']} - {txn['description'][:50]} - ${txn['amount']}")
-        
-        print(f"\n=== DUPLICATE DETECTION COMPLETE ===")
-        print(f"Total checked: {len(valid_transactions)}")
-        print(f"New (unique): {len(non_duplicate_transactions)}")
-        print(f"Duplicates: {duplicate_count}")
-        print(f"=====================================\n")
-        
-        # Auto-categorize new transactions
-        print(f"\n=== AUTO-CATEGORIZATION START ===")
-        categorization_engine = CategorizationEngine(current_app.config['DATABASE'])
-        categorized_count = 0
-        
-        for txn in non_duplicate_transactions:
-            result = categorization_engine.categorize_transaction(txn)
-            
-            if result['category_id']:
-                txn['category_id'] = result['category_id']
-                categorized_count += 1
-                
-                if categorized_count <= 3:  # Debug first 3
-                    print(f"✓ Categorized: {txn['description'][:40]} → {result['category_name']} (confidence: {result['confidence']:.0%})")
-        
-        print(f"\n=== AUTO-CATEGORIZATION COMPLETE ===")
-        print(f"Categorized: {categorized_count}/{len(non_duplicate_transactions)}")
-        print(f"Uncategorized: {len(non_duplicate_transactions) - categorized_count}")
-        print(f"=====================================\n")
-        
-        # Save non-duplicate transactions to database (with categories)
-        count = Transaction.bulk_create(non_duplicate_transactions) if non_duplicate_transactions else 0
-        
-        # Archive the CSV file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                archive_base = os.path.join(
-                    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                    'data',
-                    'archives'
-                )
-                archiver = FileArchiver(archive_base)
-                archive_result = archiver.archive_file(temp_file_path, account_id, filename)
-                
-                if not archive_result['success']:
-                    print(f"Warning: Failed to archive file: {archive_result.get('error')}")
-                
-                # Clean up temp file
-                os.remove(temp_file_path)
-            except Exception as e:
-                print(f"Warning: Error during file archiving: {str(e)}")
-                # Don't fail the import if archiving fails
+        if wants_async():
+            # The job owns the temp file from here on
+            response = submit_job('import', run_import, import_params)
+        else:
+            response = jsonify({
+                'success': True,
+                **run_import(**import_params)
+            })
         
         # Clear session
         session.pop('import_account_id', None)
         session.pop('import_filename', None)
         session.pop('import_temp_file', None)
         session.pop('import_valid_count', None)
+        session.pop('import_file_hash', None)
+        session.pop('import_file_size', None)
         
-        # Build response message
-        message_parts = [f'Successfully imported {count} new transactions']
-        
-        if duplicate_count > 0:
-            message_parts.append(f'Skipped {duplicate_count} duplicate(s)')
-        
-        if categorized_count > 0:
-            message_parts.append(f'Auto-categorized {categorized_count} transactions')
-        
-        message = '. '.join(message_parts) + '.'
-        
+        return response
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to save transactions: {str(e)}'}), 500
+
+
+@import_bp.route('/batch', methods=['POST'])
+def batch_import():
+    """
+    Import several CSV files and/or zip archives of CSVs in one transaction.
+    
+    Form fields:
+        files: CSV or zip files (repeated)
+        account_id: Optional default account for files nothing else maps
+        mapping: Optional JSON object of filename -> account ID
+        rules: Optional JSON list of [glob pattern, account ID] pairs
+    
+    Files are mapped to accounts by mapping, rules, an `<id>_` filename
+    prefix or an account name in the filename, then the default account.
+    With `async=1` the import runs as a background job and returns 202.
+    """
+    from flask import current_app
+    
+    uploads = [f for f in request.files.getlist('files') if f.filename]
+    if not uploads:
+        return jsonify({'error': 'No files uploaded'}), 400
+    
+    for upload in uploads:
+        if '.' not in upload.filename or upload.filename.rsplit('.', 1)[1].lower() not in BATCH_EXTENSIONS:
+            return jsonify({'error': f'Only CSV and zip files are allowed: {upload.filename}'}), 400
+    
+    try:
+        account_id = request.form.get('account_id', type=int)
+        mapping = {name: int(value) for name, value in json.loads(request.form.get('mapping') or '{}').items()}
+        rules = [(pattern, int(value)) for pattern, value in json.loads(request.form.get('rules') or '[]')]
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({'error': f'Invalid account mapping: {str(e)}'}), 400
+    
+    # Files are matched by their stored (sanitized) names
+    mapping = {secure_filename(name): value for name, value in mapping.items()}
+    
+    # The import (or its job) removes this directory when done; one
+    # subdirectory per file keeps equal names apart
+    work_dir = tempfile.mkdtemp(prefix='batch_upload_')
+    paths = []
+    for index, upload in enumerate(uploads):
+        os.mkdir(os.path.join(work_dir, str(index)))
+        path = os.path.join(work_dir, str(index), secure_filename(upload.filename))
+        upload.save(path)
+        paths.append(path)
+    
+    batch_params = {
+        'paths': paths,
+        'default_account_id': account_id,
+        'mapping': mapping,
+        'rules': rules,
+        'work_dir': work_dir
+    }
+    run_batch = functools.partial(import_batch, current_app.config['DATABASE'],
+                                  archive_dir=current_app.config['ARCHIVE_DIR'])
+    
+    try:
+        if wants_async():
+            return submit_job('batch_import', run_batch, batch_params)
+        return jsonify({'success': True, **run_batch(**batch_params)})
+    except BatchImportError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to import batch: {str(e)}'}), 500
+
+
+@import_bp.route('/api/history', methods=['GET'])
+def import_history():
+    """
+    Get past import runs, newest first.
+    
+    Query params:
+        account_id: Optional account filter
+        status: Optional status filter ('completed', 'failed' or 'cancelled')
+        limit: Maximum number of runs (default 50, at most 500)
+    """
+    from flask import current_app
+    
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        runs = ImportHistory(current_app.config['DATABASE']).list(
+            account_id=request.args.get('account_id', type=int),
+            status=request.args.get('status'),
+            limit=limit
+        )
+        return jsonify({'success': True, 'imports': runs})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@import_bp.route('/api/history/<int:run_id>', methods=['GET'])
+def import_run(run_id):
+    """Get one import run with its warnings and per-stage metrics."""
+    from flask import current_app
+    
+    try:
+        run = ImportHistory(current_app.config['DATABASE']).get(run_id)
+        if not run:
+            return jsonify({'success': False, 'error': 'Import not found'}), 404
+        return jsonify({'success': True, 'import': run})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@import_bp.route('/api/batches', methods=['GET'])
+def import_batches():
+    """
+    Get import batches with their row count, total and date range, newest first.
+    
+    Query params:
+        account_id: Optional account filter
+        status: Optional status filter ('active' or 'undone')
+        limit: Maximum number of batches (default 50, at most 500)
+    """
+    from flask import current_app
+    
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        batches = ImportBatches(current_app.config['DATABASE']).list(
+            account_id=request.args.get('account_id', type=int),
+            status=request.args.get('status'),
+            limit=limit
+        )
+        return jsonify({'success': True, 'batches': batches})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@import_bp.route('/api/batches/<int:batch_id>', methods=['GET'])
+def import_batch_detail(batch_id):
+    """Get one import batch with its row summary."""
+    from flask import current_app
+    
+    try:
+        batch = ImportBatches(current_app.config['DATABASE']).get(batch_id)
+        if not batch:
+            return jsonify({'success': False, 'error': 'Import batch not found'}), 404
+        return jsonify({'success': True, 'batch': batch})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@import_bp.route('/api/batches/<int:batch_id>/undo', methods=['POST'])
+def undo_import_batch(batch_id):
+    """
+    Undo an import: delete every transaction of the batch.
+    
+    Balances, daily balances and recurring patterns are kept consistent and
+    the file can be imported again.
+    """
+    from flask import current_app
+    
+    try:
+        result = ImportBatches(current_app.config['DATABASE']).undo(batch_id)
+        if result is None:
+            return jsonify({'success': False, 'error': 'Import batch not found'}), 404
         return jsonify({
             'success': True,
-            'message': message,
-            'count': count,
-            'duplicates_skipped': duplicate_count,
-            'categorized': categorized_count,
-            'account_id': account_id
+            'message': f"Removed {result['transactions_deleted']} transactions.",
+            **result
         })
-    
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
     except Exception as e:
-        return jsonify({'error': f'Failed to save transactions: {str(e)}'}), 500
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @import_bp.route('/manual', methods=['POST'])
@@ -0,0 +1,139 @@
+"""
+Background job routes.
+
+Long-running routes accept `async=1` (query string or JSON body) to run on
+the job runner instead of inside the request; they answer 202 with a job
+ID that is polled at /jobs/api/<id> or streamed as server-sent events from
+/jobs/api/<id>/events.
+"""
+
+import json
+import time
+from typing import Callable, Dict, Optional
+
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context, url_for
+from services.job_runner import JobRunner
+
+
+# Seconds between two progress checks of a streamed job
+STREAM_POLL_INTERVAL = 0.25
+
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+
+def wants_async() -> bool:
+    """Whether the client asked for the operation to run as a background job."""
+    value = request.args.get('async')
+    if value is None and request.is_json:
+        value = (request.get_json(silent=True) or {}).get('async')
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def submit_job(job_type: str, func: Callable, params: Optional[Dict] = None):
+    """
+    Queue a job and build the 202 response pointing at its status URL.
+
+    Args:
+        job_type: Job type (e.g. 'recategorize')
+        func: Callable run as func(progress=..., **params)
+        params: JSON-serializable keyword arguments for func
+
+    Returns:
+        (response, 202) tuple
+    """
+    job_id = JobRunner(current_app.config['DATABASE']).submit(job_type, func, params)
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for('jobs.get_job', job_id=job_id)
+    }), 202
+
+
+@jobs_bp.route('/api/', methods=['GET'])
+def list_jobs():
+    """
+    Get the job history, newest first.
+
+    Query params:
+        status: Optional status filter
+        type: Optional job type filter
+        limit: Maximum number of jobs (default 50, at most 500)
+    """
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        jobs = JobRunner(current_app.config['DATABASE']).list(
+            status=request.args.get('status'),
+            job_type=request.args.get('type'),
+            limit=limit
+        )
+        return jsonify({'success': True, 'jobs': jobs})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@jobs_bp.route('/api/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status, progress and result."""
+    try:
+        job = JobRunner(current_app.config['DATABASE']).get(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@jobs_bp.route('/api/<int:job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """
+    Stream a job's progress as server-sent events.
+
+    Sends a 'progress' event whenever the status, counters or message
+    change and a final 'done' event with the finished job, or an 'error'
+    event if the job disappears while it is streamed.
+    """
+    runner = JobRunner(current_app.config['DATABASE'])
+    if not runner.get(job_id):
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    def events():
+        last = None
+        while True:
+            job = runner.get(job_id)
+            if job is None:
+                # Removed while streaming (e.g. by a database reset)
+                yield f"event: error\ndata: {json.dumps({'success': False, 'error': 'Job not found'})}\n\n"
+                return
+            if job['status'] not in ('pending', 'running'):
+                yield f"event: done\ndata: {json.dumps(job, default=str)}\n\n"
+                return
+
+            state = (job['status'], job['progress_current'], job['progress_total'], job['message'])
+            if state != last:
+                last = state
+                yield f"event: progress\ndata: {json.dumps(job, default=str)}\n\n"
+            time.sleep(STREAM_POLL_INTERVAL)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+@jobs_bp.route('/api/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Request cancellation of a pending or running job."""
+    try:
+        runner = JobRunner(current_app.config['DATABASE'])
+        job = runner.get(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+        if not runner.cancel(job_id):
+            return jsonify({
+                'success': False,
+                'error': f"Job is not running (status: {job['status']})"
+            }), 409
+
+        return jsonify({'success': True, 'job': runner.get(job_id)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from services.recurring_manager import RecurringManager
 from services.recurring_detector import RecurringDetector
+from routes.jobs import submit_job, wants_async
 
 recurring_bp = Blueprint('recurring', __name__, url_prefix='/recurring')
 
@@ -92,13 +93,32 @@ def get_recurring_alerts():
 
 @recurring_bp.route('/api/scan', methods=['POST'])
 def scan_for_patterns():
-    """Scan transactions and detect recurring patterns."""
+    """Scan transactions and detect recurring patterns (JSON 'async': true runs it as a job)."""
     try:
         account_id = request.json.get('account_id') if request.json else None
         min_confidence = request.json.get('min_confidence', 0.75) if request.json else 0.75
-        
-        detector = RecurringDetector(current_app.config['DATABASE'])
-        result = detector.scan_and_save_all(account_id=account_id)
+        workers = request.json.get('workers', 1) if request.json else 1
+        calendar_aware = bool(request.json.get('calendar_aware', False)) if request.json else False
+        
+        if isinstance(workers, bool) or not isinstance(workers, int):
+            return jsonify({'success': False, 'error': 'workers must be an integer'}), 400
+        if (isinstance(min_confidence, bool) or not isinstance(min_confidence, (int, float))
+                or not 0 <= min_confidence <= 1):
+            return jsonify({'success': False, 'error': 'min_confidence must be a number between 0 and 1'}), 400
+        # One process per CPU at most
+        workers = max(1, min(workers, os.cpu_count() or 1))
+        
+        detector = RecurringDetector(current_app.config['DATABASE'], calendar_aware=calendar_aware)
+        params = {
+            'account_id': account_id,
+            'min_confidence': float(min_confidence),
+            'workers': workers
+        }
+        
+        if wants_async():
+            return submit_job('recurring_scan', detector.scan_and_save_all, params)
+        
+        result = detector.scan_and_save_all(**params)
         
         return jsonify({
             'success': True,
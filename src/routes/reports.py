@@ -14,6 +14,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from services.report_service import ReportService
+from services.forecast_service import ForecastService
+from services.balance_service import BalanceService
+from utils.db import get_connection
 
 reports_bp = Blueprint('reports', __name__, url_prefix='/reports')
 
@@ -87,12 +90,16 @@ def get_category_breakdown_data():
     account_id = request.args.get('account_id', type=int)
     start_date = _parse_date(request.args.get('start_date'))
     end_date = _parse_date(request.args.get('end_date'))
+    level = request.args.get('level', type=int)
+    category_id = request.args.get('category_id', type=int)
     
     report_service = ReportService(current_app.config['DATABASE'])
     data = report_service.get_category_breakdown(
         account_id=account_id,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        level=level,
+        category_id=category_id
     )
     
     # Color palette for categories
@@ -120,13 +127,17 @@ def get_monthly_category_trends_data():
     account_id = request.args.get('account_id', type=int)
     start_date = _parse_date(request.args.get('start_date'))
     end_date = _parse_date(request.args.get('end_date'))
+    level = request.args.get('level', type=int)
+    category_id = request.args.get('category_id', type=int)
     
     report_service = ReportService(current_app.config['DATABASE'])
     data = report_service.get_monthly_category_trends(
         account_id=account_id,
         start_date=start_date,
         end_date=end_date,
-        top_n=10
+        top_n=10,
+        level=level,
+        category_id=category_id
     )
     
     # Color palette for categories (same as pie chart for consistency)
@@ -288,7 +299,7 @@ def get_month_comparison_data():
     import sqlite3
     from collections import defaultdict
     
-    conn = sqlite3.connect(current_app.config['DATABASE'])
+    conn = get_connection(current_app.config['DATABASE'])
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -378,7 +389,7 @@ def get_merchant_data():
     import sqlite3
     from collections import defaultdict
     
-    conn = sqlite3.connect(current_app.config['DATABASE'])
+    conn = get_connection(current_app.config['DATABASE'])
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -461,18 +472,11 @@ def get_net_worth_data():
     from datetime import datetime, timedelta
     from dateutil.relativedelta import relativedelta
     
-    conn = sqlite3.connect(current_app.config['DATABASE'])
+    conn = get_connection(current_app.config['DATABASE'])
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
     try:
-        # Get all accounts with their reference balances
-        cursor.execute("""
-            SELECT id, name, initial_balance, reference_date
-            FROM accounts
-        """)
-        accounts = cursor.fetchall()
-        
         # Determine date range
         if not date_from:
             # Get earliest reference date
@@ -483,43 +487,28 @@ def get_net_worth_data():
         if not date_to:
             date_to = date.today().strftime('%Y-%m-%d')
         
+        conn.close()
+        
         start = datetime.strptime(date_from, '%Y-%m-%d').date()
         end = datetime.strptime(date_to, '%Y-%m-%d').date()
         
-        # Generate monthly snapshots
-        snapshots = []
-        current = start.replace(day=1)  # Start of month
-        
+        # Monthly snapshot dates (start of each month)
+        snapshot_dates = []
+        current = start.replace(day=1)
         while current <= end:
-            month_str = current.strftime('%Y-%m-%d')
-            net_worth = 0
-            
-            for account in accounts:
-                # Start with reference balance
-                balance = account['initial_balance'] or 0
-                
-                # Add transactions up to this month
-                cursor.execute("""
-                    SELECT SUM(amount) as total
-                    FROM transactions
-                    WHERE account_id = ?
-                      AND date <= ?
-                """, (account['id'], month_str))
-                
-                result = cursor.fetchone()
-                transaction_sum = result['total'] if result['total'] else 0
-                balance += transaction_sum
-                net_worth += balance
-            
-            snapshots.append({
-                'date': current.strftime('%Y-%m'),
-                'net_worth': round(net_worth, 2)
-            })
-            
-            # Move to next month
+            snapshot_dates.append(current)
             current = current + relativedelta(months=1)
         
-        conn.close()
+        # Every account's balance on every snapshot date in one lookup
+        balances = BalanceService(current_app.config['DATABASE']).get_balances_on(snapshot_dates)
+        
+        snapshots = [
+            {
+                'date': month.strftime('%Y-%m'),
+                'net_worth': round(sum(account[i] for account in balances.values()), 2)
+            }
+            for i, month in enumerate(snapshot_dates)
+        ]
         
         # Calculate growth
         if len(snapshots) >= 2:
@@ -548,6 +537,32 @@ def get_net_worth_data():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@reports_bp.route('/api/cash-flow-forecast')
+def get_cash_flow_forecast():
+    """Get projected daily balances per account from recurring payments and category baselines"""
+    try:
+        months = min(max(request.args.get('months', 12, type=int), 1), 60)
+        history_months = min(max(request.args.get('history_months', 6, type=int), 1), 36)
+        account_id = request.args.get('account_id', type=int)
+        start_date = _parse_date(request.args.get('start_date'))
+
+        service = ForecastService(current_app.config['DATABASE'])
+        forecast = service.forecast(
+            months=months,
+            account_id=account_id,
+            start_date=start_date,
+            history_months=history_months
+        )
+
+        return jsonify({
+            'success': True,
+            **forecast
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @reports_bp.route('/builder')
 def report_builder_page():
     """Display customizable report builder page"""
@@ -571,7 +586,7 @@ def generate_custom_report():
     import sqlite3
     from collections import defaultdict
     
-    conn = sqlite3.connect(current_app.config['DATABASE'])
+    conn = get_connection(current_app.config['DATABASE'])
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -11,6 +11,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from models.transaction import Transaction
 from models.account import Account
+from utils.db import get_connection
 
 
 transactions_bp = Blueprint('transactions', __name__, url_prefix='/transactions')
@@ -153,7 +154,7 @@ def get_transaction_stats():
         import sqlite3
         
         # Identify transfer transactions (category type = 'transfer')
-        conn = sqlite3.connect(current_app.config['DATABASE'])
+        conn = get_connection(current_app.config['DATABASE'])
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -6,7 +6,7 @@ Scans all existing transactions to detect recurring patterns and saves them to t
 Run this after importing historical data to identify subscriptions and bills.
 
 Usage:
-    python src/scan_recurring.py [--account-id ID] [--min-confidence 0.75]
+    python src/scan_recurring.py [--account-id ID] [--min-confidence 0.75] [--workers N] [--calendar]
 
 Created: 2025-10-19
 Author: Saeed Hoss
@@ -20,19 +20,21 @@ from services.recurring_detector import RecurringDetector
 DB_PATH = 'data/financial_assistant.db'
 
 
-def scan_recurring_transactions(account_id=None, min_confidence=0.75):
+def scan_recurring_transactions(account_id=None, min_confidence=0.75, workers=1, calendar_aware=False):
     """
     Scan all transactions for recurring patterns.
     
     Args:
         account_id: Optional account ID to limit scope
         min_confidence: Minimum confidence score to save patterns
+        workers: Number of processes used for detection
+        calendar_aware: Fit monthly/quarterly/annual cadences in calendar months
     """
     print("=" * 60)
     print("Recurring Transaction Scanner")
     print("=" * 60)
     
-    detector = RecurringDetector(DB_PATH)
+    detector = RecurringDetector(DB_PATH, calendar_aware=calendar_aware)
     
     if account_id:
         print(f"Scanning account ID: {account_id}")
@@ -40,11 +42,15 @@ def scan_recurring_transactions(account_id=None, min_confidence=0.75):
         print("Scanning ALL accounts")
     
     print(f"Minimum confidence: {min_confidence}")
+    if workers > 1:
+        print(f"Worker processes: {workers}")
+    if calendar_aware:
+        print("Cadences: calendar months")
     print()
     
     # Detect patterns
     print("Analyzing transactions for recurring patterns...")
-    patterns = detector.detect_patterns(account_id=account_id, min_confidence=min_confidence)
+    patterns = detector.detect_patterns(account_id=account_id, min_confidence=min_confidence, workers=workers)
     
     print(f"✓ Found {len(patterns)} recurring patterns")
     print()
@@ -82,14 +88,15 @@ def scan_recurring_transactions(account_id=None, min_confidence=0.75):
     saved = 0
     errors = 0
     
-    for pattern in patterns:
-        try:
-            recurring_id = detector.save_recurring_pattern(pattern)
+    # All patterns are saved in one transaction; re-scans update existing ones
+    try:
+        recurring_ids = detector.save_recurring_patterns(patterns)
+        for pattern, recurring_id in zip(patterns, recurring_ids):
             saved += 1
             print(f"✓ Saved: {pattern['merchant_name']} (ID: {recurring_id})")
-        except Exception as e:
-            errors += 1
-            print(f"✗ Error saving {pattern['merchant_name']}: {e}")
+    except Exception as e:
+        errors = len(patterns)
+        print(f"✗ Error saving patterns: {e}")
     
     print()
     print("=" * 60)
@@ -122,12 +129,27 @@ def main():
         help='Minimum confidence score to save patterns (default: 0.75)'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for pattern analysis (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--calendar',
+        action='store_true',
+        help='Fit monthly/quarterly/annual cadences in calendar months instead of 30/90/365 days'
+    )
+    
     args = parser.parse_args()
     
     try:
         scan_recurring_transactions(
             account_id=args.account_id,
-            min_confidence=args.min_confidence
+            min_confidence=args.min_confidence,
+            workers=args.workers,
+            calendar_aware=args.calendar
         )
     except KeyboardInterrupt:
         print("\n\nScan cancelled by user.")
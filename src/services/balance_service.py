@@ -0,0 +1,366 @@
+"""
+Balance Service
+
+Reads account balances without re-summing transaction history:
+- current balances come from accounts.current_balance, kept up to date by
+  the triggers added in migrate_add_balance_tracking.py
+- running balances (the balance after each transaction) are computed with a
+  window function that starts from the nearest account_balance_checkpoints
+  row instead of the account's first transaction
+- balances on arbitrary dates are looked up by binary search over the
+  cumulative daily net changes in daily_balances (migrate_add_daily_balances.py)
+
+Checkpoints dropped by the triggers are recomputed lazily from the last
+valid one, so only the transactions after a change are re-summed.
+"""
+
+import sqlite3
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from utils.db import get_connection, table_exists
+from utils.schema import BALANCE_TRACKING_REBUILD, CHECKPOINT_INTERVAL, DAILY_BALANCES_REBUILD
+
+
+DateLike = Union[str, date]
+
+
+class BalanceService:
+    """Service for current, running and point-in-time account balances."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the balance service.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def _get_connection(self):
+        """Get database connection"""
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get_current_balances(self) -> Dict[int, float]:
+        """
+        Get the current balance of every account.
+
+        Returns:
+            Dictionary of account ID to current balance
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT id, COALESCE(current_balance, 0) as balance FROM accounts")
+            return {row['id']: round(float(row['balance']), 2) for row in cursor.fetchall()}
+        finally:
+            conn.close()
+
+    def get_running_balances(self, account_id: int, limit: Optional[int] = None,
+                             offset: int = 0) -> List[Dict]:
+        """
+        Get an account's transactions, newest first, with the balance after each.
+
+        Args:
+            account_id: Account ID
+            limit: Optional number of transactions to return
+            offset: Number of newest transactions to skip
+
+        Returns:
+            List of transaction dictionaries (with category_name,
+            category_type and account_name) including 'balance'
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            if limit is None and not offset:
+                # Whole history: one pass from the first transaction
+                rows = self._running_rows(cursor, account_id, 0.0, ('', 0), None)
+            else:
+                rows = self._running_page(cursor, account_id, limit, offset)
+        finally:
+            conn.close()
+
+        rows.reverse()
+        for row in rows:
+            row['balance'] = round(row['balance'], 2)
+        return rows
+
+    def _running_page(self, cursor: sqlite3.Cursor, account_id: int, limit: Optional[int],
+                      offset: int) -> List[Dict]:
+        """Running balances for one page, summed from the nearest earlier checkpoint."""
+        checkpoints = table_exists(cursor, 'account_balance_checkpoints')
+        if checkpoints:
+            self._refresh_checkpoints(cursor, account_id)
+            cursor.connection.commit()
+
+        # Bounds of the requested page (newest and oldest transaction)
+        cursor.execute("""
+            SELECT id, date FROM transactions
+            WHERE account_id = ?
+            ORDER BY date DESC, id DESC
+            LIMIT ? OFFSET ?
+        """, (account_id, -1 if limit is None else limit, offset))
+        page = cursor.fetchall()
+        if not page:
+            return []
+        newest, oldest = page[0], page[-1]
+
+        base_cumulative, after = 0.0, ('', 0)
+        if checkpoints:
+            cursor.execute("""
+                SELECT date, transaction_id, cumulative
+                FROM account_balance_checkpoints
+                WHERE account_id = ? AND (date, transaction_id) < (?, ?)
+                ORDER BY date DESC, transaction_id DESC
+                LIMIT 1
+            """, (account_id, oldest['date'], oldest['id']))
+            row = cursor.fetchone()
+            if row:
+                base_cumulative, after = row['cumulative'], (row['date'], row['transaction_id'])
+
+        rows = self._running_rows(cursor, account_id, base_cumulative, after,
+                                  (newest['date'], newest['id']))
+        page_ids = {row['id'] for row in page}
+        return [row for row in rows if row['id'] in page_ids]
+
+    def _running_rows(self, cursor: sqlite3.Cursor, account_id: int, base_cumulative: float,
+                      after: tuple, until: Optional[tuple]) -> List[Dict]:
+        """
+        Transactions in (after, until] in date order with their running balance.
+
+        Args:
+            base_cumulative: Sum of the account's transactions up to `after`
+            after: Exclusive (date, id) lower bound
+            until: Inclusive (date, id) upper bound, or None for no bound
+        """
+        query = """
+            SELECT t.*, c.name as category_name, c.type as category_type, a.name as account_name,
+                   COALESCE(a.initial_balance, 0) + ? + SUM(t.amount) OVER (
+                       ORDER BY t.date, t.id ROWS UNBOUNDED PRECEDING
+                   ) as balance
+            FROM transactions t
+            LEFT JOIN categories c ON t.category_id = c.id
+            LEFT JOIN accounts a ON t.account_id = a.id
+            WHERE t.account_id = ?
+              AND (t.date, t.id) > (?, ?)
+        """
+        params = [base_cumulative, account_id, after[0], after[1]]
+        if until:
+            query += " AND (t.date, t.id) <= (?, ?)"
+            params.extend(until)
+        query += " ORDER BY t.date, t.id"
+
+        cursor.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_balances_on(self, dates: Iterable[DateLike],
+                        account_ids: Optional[List[int]] = None) -> Dict[int, List[float]]:
+        """
+        Get account balances at the end of each given day.
+
+        Args:
+            dates: Days to look up ('YYYY-MM-DD' strings or date objects, any order)
+            account_ids: Optional accounts to include (default: all)
+
+        Returns:
+            Dictionary of account ID to balances, one per requested day
+        """
+        days = np.array([str(d) for d in dates], dtype='datetime64[D]')
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            initial = self._initial_balances(cursor, account_ids)
+            series = self._daily_series(cursor, account_ids)
+        finally:
+            conn.close()
+
+        balances = {}
+        for account_id, opening in initial.items():
+            values = np.full(len(days), opening, dtype=np.float64)
+            if account_id in series:
+                account_days, cumulative = series[account_id]
+                # Last stored day on or before each requested day
+                index = np.searchsorted(account_days, days, side='right') - 1
+                known = index >= 0
+                values[known] += cumulative[index[known]]
+            balances[account_id] = np.round(values, 2).tolist()
+        return balances
+
+    def get_balance_on(self, account_id: int, on_date: DateLike) -> float:
+        """
+        Get an account's balance at the end of a day.
+
+        Args:
+            account_id: Account ID
+            on_date: Day to look up
+
+        Returns:
+            Balance (0.0 for an unknown account)
+        """
+        balances = self.get_balances_on([on_date], [account_id])
+        return balances[account_id][0] if account_id in balances else 0.0
+
+    def get_balance_history(self, account_id: int, date_from: Optional[DateLike] = None,
+                            date_to: Optional[DateLike] = None) -> List[Dict]:
+        """
+        Get an account's end-of-day balance for every day in a range.
+
+        Args:
+            account_id: Account ID
+            date_from: First day (default: the account's first transaction day)
+            date_to: Last day (default: today)
+
+        Returns:
+            List of {'date', 'balance'} dictionaries in date order
+        """
+        if date_from is None:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT MIN(date) FROM transactions WHERE account_id = ?", (account_id,))
+                date_from = cursor.fetchone()[0]
+            finally:
+                conn.close()
+            if date_from is None:
+                return []
+
+        start = np.datetime64(str(date_from), 'D')
+        end = np.datetime64(str(date_to or date.today()), 'D')
+        if end < start:
+            return []
+
+        days = np.arange(start, end + 1)
+        balances = self.get_balances_on(days, [account_id]).get(account_id, [])
+        return [{'date': str(day), 'balance': balance} for day, balance in zip(days, balances)]
+
+    def _initial_balances(self, cursor: sqlite3.Cursor,
+                          account_ids: Optional[List[int]]) -> Dict[int, float]:
+        """Opening balance per account (balance before its first transaction)."""
+        query = "SELECT id, COALESCE(initial_balance, 0) as balance FROM accounts"
+        params: List[int] = []
+        if account_ids is not None:
+            query += f" WHERE id IN ({', '.join('?' * len(account_ids))})"
+            params.extend(account_ids)
+        cursor.execute(query + " ORDER BY id", params)
+        return {row['id']: float(row['balance']) for row in cursor.fetchall()}
+
+    def _daily_series(self, cursor: sqlite3.Cursor,
+                      account_ids: Optional[List[int]]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Per account: sorted days with transactions and the cumulative net change
+        at the end of each. Reads daily_balances, or aggregates the
+        transactions when the migration has not been run.
+        """
+        if table_exists(cursor, 'daily_balances'):
+            source = "daily_balances"
+        else:
+            source = """(
+                SELECT account_id, date, SUM(amount) as net_change
+                FROM transactions
+                GROUP BY account_id, date
+            )"""
+
+        query = f"SELECT account_id, date, net_change FROM {source}"
+        params: List[int] = []
+        if account_ids is not None:
+            query += f" WHERE account_id IN ({', '.join('?' * len(account_ids))})"
+            params.extend(account_ids)
+        cursor.execute(query + " ORDER BY account_id, date", params)
+
+        rows = cursor.fetchall()
+        if not rows:
+            return {}
+
+        accounts = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        days = np.array([row[1] for row in rows], dtype='datetime64[D]')
+        changes = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+
+        # Split the account-ordered rows into one run per account
+        starts = np.flatnonzero(np.r_[True, accounts[1:] != accounts[:-1]])
+        ends = np.r_[starts[1:], len(rows)]
+        return {
+            int(accounts[start]): (days[start:end], np.cumsum(changes[start:end]))
+            for start, end in zip(starts, ends)
+        }
+
+    def rebuild(self, progress: Optional[Callable] = None) -> Dict:
+        """
+        Recompute current balances, running balance checkpoints and daily balances.
+
+        Args:
+            progress: Optional callback progress(current, total, message),
+                called before each step
+
+        Returns:
+            Dictionary with the number of accounts, checkpoints and account-days
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            daily = table_exists(cursor, 'daily_balances')
+            if progress:
+                progress(0, 2, 'Rebuilding balances and checkpoints')
+            for statement in BALANCE_TRACKING_REBUILD:
+                cursor.execute(statement)
+            if daily:
+                if progress:
+                    progress(1, 2, 'Rebuilding daily balances')
+                for statement in DAILY_BALANCES_REBUILD:
+                    cursor.execute(statement)
+            conn.commit()
+
+            counts = {}
+            for key, table in (('accounts', 'accounts'),
+                               ('checkpoints', 'account_balance_checkpoints'),
+                               ('account_days', 'daily_balances' if daily else None)):
+                if table:
+                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                    counts[key] = cursor.fetchone()[0]
+                else:
+                    counts[key] = 0
+            return counts
+        finally:
+            conn.close()
+
+    def _refresh_checkpoints(self, cursor: sqlite3.Cursor, account_id: int) -> int:
+        """
+        Add the checkpoints missing after the account's last valid one.
+
+        Returns:
+            Number of checkpoints added
+        """
+        cursor.execute("""
+            SELECT date, transaction_id, position, cumulative
+            FROM account_balance_checkpoints
+            WHERE account_id = ?
+            ORDER BY date DESC, transaction_id DESC
+            LIMIT 1
+        """, (account_id,))
+        row = cursor.fetchone()
+        last = dict(row) if row else {'date': '', 'transaction_id': 0, 'position': 0, 'cumulative': 0.0}
+
+        cursor.execute("""
+            INSERT INTO account_balance_checkpoints (account_id, date, transaction_id, position, cumulative)
+            SELECT account_id, date, id, position, cumulative
+            FROM (
+                SELECT account_id, date, id,
+                       ? + ROW_NUMBER() OVER w as position,
+                       ? + SUM(amount) OVER w as cumulative
+                FROM transactions
+                WHERE account_id = ? AND (date, id) > (?, ?)
+                WINDOW w AS (ORDER BY date, id ROWS UNBOUNDED PRECEDING)
+            )
+            WHERE position % ? = 0
+        """, (last['position'], last['cumulative'], account_id, last['date'],
+              last['transaction_id'], CHECKPOINT_INTERVAL))
+        return cursor.rowcount
@@ -0,0 +1,477 @@
+"""
+Batch Import
+
+Imports many CSV statements (or zip archives of them) in one go:
+
+1. Zip archives are extracted and every file is mapped to an account
+   (explicit filename mapping, then filename rules, then an `<id>_`
+   filename prefix, then an account name contained in the filename, then
+   the default account)
+2. Files whose content was already imported into their account (the
+   imported files ledger) or appears earlier in the batch are skipped;
+   the rest are parsed in parallel on a process pool
+3. Each file runs through the validate, dedupe and categorize stages of
+   the import pipeline. Dedupe also drops rows that duplicate rows kept
+   from earlier files of the same batch; identical rows within one file
+   are kept, as in a single-file import.
+4. All rows are inserted in one transaction, each file as its own import
+   batch (services/import_batches.py) that can be undone on its own; a
+   file that cannot be read or mapped aborts the batch before anything is
+   written
+5. Recurring linking and archiving (a copy; source files are kept) run
+   per file after the commit
+
+The result is one combined summary with a section per file; every file is
+also stored in the import history.
+"""
+
+import fnmatch
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.transaction import Transaction
+from services.csv_parser import CSVParser
+from services.import_batches import ImportBatches
+from services.import_history import ImportHistory
+from services.imported_files import ImportedFiles, hash_file
+from services.import_pipeline import (
+    CategorizeStage, DedupeStage, ImportContext, ImportPipeline, ImportStage,
+    RecurringLinkStage, StageMetrics, ValidateStage, archive_source, discard_import, link_batch,
+    record_imported_file
+)
+from services.job_runner import JobCancelled
+from utils.db import get_connection
+from utils.metrics import record_import
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the bytes extracted from one zip archive
+MAX_EXTRACTED_BYTES = 500 * 1024 * 1024
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+_ID_PREFIX_RE = re.compile(r'^(\d+)_')
+
+
+class BatchImportError(Exception):
+    """Raised when a batch cannot be imported; nothing has been written."""
+
+
+class BatchDedupeStage(DedupeStage):
+    """Dedupe against the database and against earlier files of the batch."""
+
+    def __init__(self, db_path: str, max_id: int, pending: Dict):
+        """
+        Initialize the stage for one file.
+
+        Args:
+            db_path: Path to SQLite database
+            max_id: Highest transaction id before the batch started
+            pending: Rows kept from earlier files (DuplicateDetector.add_pending)
+        """
+        super().__init__(db_path)
+        self.max_id = max_id
+        self.pending = pending
+        self.kept: List[Dict] = []
+
+    def process(self, batch, context):
+        results = self.detector.check_duplicates_batch(batch, max_id=self.max_id, pending=self.pending)
+        unique = []
+        for result in results:
+            if not result['is_duplicate']:
+                unique.append(result['transaction'])
+            elif 'id' not in result['matches'][0]['existing_transaction']:
+                context.count('batch_duplicates')
+            else:
+                context.count('duplicates')
+        self.kept.extend(unique)
+        return unique
+
+    def finish(self, context):
+        # Only later files are compared with this file's rows
+        self.detector.add_pending(self.pending, self.kept)
+
+
+class CollectStage(ImportStage):
+    """Keep the rows that reach the end of the chain instead of inserting them."""
+
+    name = 'collect'
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+
+    def process(self, batch, context):
+        self.rows.extend(batch)
+        return batch
+
+
+def _normalize(name: str) -> str:
+    return _NON_ALNUM_RE.sub('', name.lower())
+
+
+def resolve_account(filename: str, accounts: List[Dict], mapping: Optional[Dict[str, int]] = None,
+                    rules: Optional[List[Tuple[str, int]]] = None,
+                    default_account_id: Optional[int] = None) -> Optional[int]:
+    """
+    Pick the account a statement file belongs to.
+
+    Args:
+        filename: Statement file name (without directories)
+        accounts: Accounts with 'id' and 'name'
+        mapping: Explicit filename -> account ID
+        rules: (glob pattern, account ID) pairs matched case-insensitively,
+               first match wins
+        default_account_id: Account used when nothing else matches
+
+    Returns:
+        Account ID, or None if the file cannot be mapped
+    """
+    if mapping and filename in mapping:
+        return int(mapping[filename])
+
+    for pattern, account_id in rules or []:
+        if fnmatch.fnmatch(filename.lower(), pattern.lower()):
+            return int(account_id)
+
+    account_ids = {account['id'] for account in accounts}
+    prefix = _ID_PREFIX_RE.match(filename)
+    if prefix and int(prefix.group(1)) in account_ids:
+        return int(prefix.group(1))
+
+    # Longest account name contained in the file name
+    stem = _normalize(os.path.splitext(filename)[0])
+    named = [(len(_normalize(a['name'])), a['id']) for a in accounts
+             if _normalize(a['name']) and _normalize(a['name']) in stem]
+    if named:
+        return max(named)[1]
+
+    return default_account_id
+
+
+def extract_csv_files(paths: List[str], work_dir: str) -> List[Tuple[str, str]]:
+    """
+    Expand zip archives into their CSV members.
+
+    Args:
+        paths: CSV files and zip archives
+        work_dir: Directory the zip members are extracted to
+
+    Returns:
+        (filename, path) pairs, zip members in archive order
+
+    Raises:
+        BatchImportError: If an archive is invalid or too large
+    """
+    files = []
+    for path in paths:
+        if not zipfile.is_zipfile(path):
+            files.append((os.path.basename(path), path))
+            continue
+
+        try:
+            with zipfile.ZipFile(path) as archive:
+                members = [m for m in archive.infolist()
+                           if not m.is_dir() and m.filename.lower().endswith('.csv')
+                           and not m.filename.startswith('__MACOSX/')]
+                if sum(m.file_size for m in members) > MAX_EXTRACTED_BYTES:
+                    raise BatchImportError(f"{os.path.basename(path)}: archive is too large to import")
+
+                for member in members:
+                    # Members are flattened; a directory per file keeps equal names apart
+                    filename = os.path.basename(member.filename)
+                    target_dir = os.path.join(work_dir, str(len(files)))
+                    os.mkdir(target_dir)
+                    target = os.path.join(target_dir, filename)
+                    with archive.open(member) as source, open(target, 'wb') as out:
+                        shutil.copyfileobj(source, out)
+                    files.append((filename, target))
+        except zipfile.BadZipFile as e:
+            raise BatchImportError(f"{os.path.basename(path)}: {e}")
+
+    return files
+
+
+def _parse_file(file_path: str) -> Tuple[Optional[List[Dict]], int, Optional[str], float]:
+    """Parse one statement (runs in a worker process)."""
+    start = time.perf_counter()
+    parser = CSVParser()
+    try:
+        rows = parser.parse_file(file_path)
+    except Exception as e:
+        return None, parser.skipped_rows, str(e), time.perf_counter() - start
+    return rows, parser.skipped_rows, None, time.perf_counter() - start
+
+
+def parse_files(file_paths: List[str], workers: Optional[int] = None) -> List[Tuple]:
+    """
+    Parse statements, in parallel when there are several.
+
+    Args:
+        file_paths: CSV files
+        workers: Worker processes (default: one per file up to the CPU count;
+                 1 parses in-process)
+
+    Returns:
+        (rows or None, skipped rows, error or None, seconds) per file, in order
+    """
+    if workers is None:
+        workers = min(len(file_paths), os.cpu_count() or 1)
+    if workers <= 1 or len(file_paths) <= 1:
+        return [_parse_file(path) for path in file_paths]
+
+    # Spawned, not forked: this runs on job threads of a multithreaded server,
+    # and a forked child can inherit a lock held by another thread
+    with ProcessPoolExecutor(max_workers=min(workers, len(file_paths)),
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(_parse_file, file_paths))
+
+
+def import_batch(db_path: str, paths: List[str], default_account_id: Optional[int] = None,
+                 mapping: Optional[Dict[str, int]] = None, rules: Optional[List[Tuple[str, int]]] = None,
+                 archive_dir: Optional[str] = None, workers: Optional[int] = None,
+                 work_dir: Optional[str] = None, progress: Optional[Callable] = None) -> Dict:
+    """
+    Import several statements (or zip archives of statements) in one transaction.
+
+    Args:
+        db_path: Path to SQLite database
+        paths: CSV files and zip archives
+        default_account_id: Account for files no mapping or rule matches
+        mapping: Explicit filename -> account ID
+        rules: (glob pattern, account ID) pairs
+        archive_dir: Archive base directory (None to skip archiving)
+        workers: Parser processes (see parse_files)
+        work_dir: Temporary directory holding the files, removed when done
+        progress: Optional callback progress(current, total, message)
+
+    Returns:
+        Combined summary with totals and a section per file
+
+    Raises:
+        BatchImportError: If a file cannot be read or mapped to an account
+    """
+    batch_start = time.perf_counter()
+    started_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    extract_dir = tempfile.mkdtemp(prefix='batch_import_')
+    contexts: List[ImportContext] = []
+
+    try:
+        files = extract_csv_files(paths, extract_dir)
+        if not files:
+            raise BatchImportError("No CSV files found")
+
+        conn = get_connection(db_path)
+        try:
+            accounts = [{'id': row[0], 'name': row[1]}
+                        for row in conn.execute("SELECT id, name FROM accounts").fetchall()]
+        finally:
+            conn.close()
+        account_ids = {account['id'] for account in accounts}
+
+        problems = []
+        for filename, file_path in files:
+            account_id = resolve_account(filename, accounts, mapping, rules, default_account_id)
+            if account_id is None:
+                problems.append(f"{filename}: no account matches this file")
+            elif account_id not in account_ids:
+                problems.append(f"{filename}: account {account_id} not found")
+            contexts.append(ImportContext(db_path, account_id, file_path, filename, archive_dir))
+
+        # Exact re-uploads (in the ledger or earlier in this batch) are not parsed
+        ledger = ImportedFiles(db_path)
+        seen = set()
+        for context in contexts:
+            context.file_hash, context.file_size = hash_file(context.file_path)
+            key = (context.file_hash, context.account_id)
+            if key in seen or (context.account_id in account_ids and ledger.find(*key)):
+                context.count('already_imported')
+            seen.add(key)
+        active = [context for context in contexts if not context.counts.get('already_imported')]
+
+        if progress:
+            progress(0, len(files), f'Parsing {len(active)} files')
+        parsed_active = iter(parse_files([context.file_path for context in active], workers))
+        parsed = [None if context.counts.get('already_imported') else next(parsed_active)
+                  for context in contexts]
+
+        for context, result in zip(contexts, parsed):
+            if result is None:
+                continue
+            rows, skipped, error, _ = result
+            context.count('rows_skipped', skipped)
+            if error:
+                problems.append(f"{context.filename}: {error}")
+        if problems:
+            raise BatchImportError('; '.join(problems))
+
+        # Validate, dedupe and categorize file by file; nothing is written yet
+        max_id = DedupeStage(db_path).max_id
+        pending: Dict = {}
+        metrics: List[List[StageMetrics]] = []
+        rows_by_file: List[List[Dict]] = []
+        for index, (context, result) in enumerate(zip(contexts, parsed)):
+            if result is None:
+                metrics.append([])
+                rows_by_file.append([])
+                continue
+
+            rows, _, _, seconds = result
+            context.set_rows(rows)
+            parse_metrics = StageMetrics('parse')
+            parse_metrics.record(len(rows), len(rows), seconds)
+            context.count('rows_parsed', len(rows))
+
+            kept: List[Dict] = []
+            stages = [ValidateStage(db_path), BatchDedupeStage(db_path, max_id, pending),
+                      CategorizeStage(db_path), CollectStage(kept)]
+            metrics.append([parse_metrics] + ImportPipeline(stages).run(rows, context))
+            rows_by_file.append(kept)
+
+            if progress:
+                progress(index + 1, len(files), f'Checked {context.filename}')
+
+        conn = get_connection(db_path)
+        try:
+            batches = ImportBatches(db_path)
+            for context, rows in zip(contexts, rows_by_file):
+                if context.counts.get('already_imported'):
+                    continue
+                context.import_batch_id = batches.create(
+                    context.account_id, context.filename, context.file_hash, source='batch', conn=conn)
+                if rows:
+                    context.count('inserted', Transaction.bulk_create(
+                        rows, conn=conn, import_batch_id=context.import_batch_id))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        # Committed: link recurring patterns and archive each file (the
+        # sources are left in place; temporary copies go with work_dir;
+        # identical content is archived once per account)
+        link = RecurringLinkStage(db_path)
+        for context, rows in zip(contexts, rows_by_file):
+            if context.counts.get('already_imported'):
+                continue
+            if rows:
+                link.link(rows, context)
+            if archive_dir:
+                result = archive_source(context)
+                if result['success']:
+                    context.archive_path = result['archive_path']
+                else:
+                    context.warn(f"Failed to archive file: {result.get('error')}")
+    except JobCancelled:
+        for context in contexts:
+            discard_import(context)
+        _record_runs(db_path, contexts, started_at, batch_start, error='Cancelled', status='cancelled')
+        logger.warning("Batch import of %d files cancelled", len(contexts))
+        raise
+    except Exception as e:
+        for context in contexts:
+            discard_import(context)
+        _record_runs(db_path, contexts, started_at, batch_start, error=str(e))
+        logger.error("Batch import of %d files failed: %s", len(contexts), e)
+        raise
+    finally:
+        shutil.rmtree(extract_dir, ignore_errors=True)
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    import_ids = _record_runs(db_path, contexts, started_at, batch_start, metrics=metrics)
+    for context, result, import_id in zip(contexts, parsed, import_ids):
+        if result is not None:
+            link_batch(context, import_id)
+            record_imported_file(context, import_id)
+    total_rows = sum(context.counts.get('rows_parsed', 0) for context in contexts)
+    record_import(total_rows, time.perf_counter() - batch_start)
+
+    summary = {'files': []}
+    for context, file_metrics, import_id in zip(contexts, metrics, import_ids):
+        summary['files'].append({
+            'filename': context.filename,
+            'account_id': context.account_id,
+            'import_id': import_id,
+            'import_batch_id': context.import_batch_id,
+            'already_imported': bool(context.counts.get('already_imported')),
+            'rows_parsed': context.counts.get('rows_parsed', 0),
+            'rows_skipped': context.counts.get('rows_skipped', 0),
+            'invalid': context.counts.get('invalid', 0),
+            'duplicates_skipped': context.counts.get('duplicates', 0),
+            'batch_duplicates': context.counts.get('batch_duplicates', 0),
+            'count': context.counts.get('inserted', 0),
+            'categorized': context.counts.get('categorized', 0),
+            'recurring_linked': context.counts.get('recurring_linked', 0),
+            'warnings': context.warnings,
+            'stages': [m.to_dict() for m in file_metrics]
+        })
+
+    for key in ('rows_parsed', 'invalid', 'duplicates_skipped', 'batch_duplicates', 'count',
+                'categorized', 'recurring_linked'):
+        summary[key] = sum(f[key] for f in summary['files'])
+    summary['files_already_imported'] = sum(f['already_imported'] for f in summary['files'])
+    summary['elapsed_ms'] = round((time.perf_counter() - batch_start) * 1000, 3)
+
+    message_parts = [f"Successfully imported {summary['count']} new transactions from {len(contexts)} files"]
+    if summary['files_already_imported']:
+        message_parts.append(f"Skipped {summary['files_already_imported']} file(s) already imported")
+    skipped = summary['duplicates_skipped'] + summary['batch_duplicates']
+    if skipped:
+        message_parts.append(f'Skipped {skipped} duplicate(s)')
+    if summary['categorized']:
+        message_parts.append(f"Auto-categorized {summary['categorized']} transactions")
+    summary['message'] = '. '.join(message_parts) + '.'
+
+    logger.info("Imported batch of %d files", len(contexts), extra={'fields': {
+        key: summary[key] for key in ('rows_parsed', 'invalid', 'duplicates_skipped',
+                                      'batch_duplicates', 'count', 'elapsed_ms')}})
+
+    return summary
+
+
+def _record_runs(db_path: str, contexts: List[ImportContext], started_at: str, batch_start: float,
+                 metrics: Optional[List[List[StageMetrics]]] = None,
+                 error: Optional[str] = None, status: Optional[str] = None) -> List[Optional[int]]:
+    """Store one import run per file; a history failure never fails the batch."""
+    status = status or ('failed' if error else 'completed')
+    history = ImportHistory(db_path)
+    elapsed_ms = round((time.perf_counter() - batch_start) * 1000, 3)
+    import_ids = []
+    for index, context in enumerate(contexts):
+        if context.counts.get('already_imported'):
+            import_ids.append(None)
+            continue
+        run = {
+            'account_id': context.account_id,
+            'filename': context.filename,
+            'status': status,
+            'rows_parsed': context.counts.get('rows_parsed', 0),
+            'rows_skipped': context.counts.get('rows_skipped', 0),
+            'invalid': context.counts.get('invalid', 0),
+            'duplicates': context.counts.get('duplicates', 0) + context.counts.get('batch_duplicates', 0),
+            'inserted': context.counts.get('inserted', 0) if not error else 0,
+            'categorized': context.counts.get('categorized', 0),
+            'recurring_linked': context.counts.get('recurring_linked', 0),
+            'warnings': context.warnings,
+            'stages': [m.to_dict() for m in metrics[index]] if metrics else [],
+            'error': error,
+            'elapsed_ms': elapsed_ms,
+            'started_at': started_at
+        }
+        try:
+            import_ids.append(history.record(run))
+        except Exception as e:
+            logger.error("Failed to record import run: %s", e)
+            import_ids.append(None)
+    return import_ids
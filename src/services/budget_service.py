@@ -4,8 +4,9 @@ Calculates budget progress, alerts, and analysis
 """
 
 import sqlite3
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import date
+from utils.db import get_connection, table_exists
 
 
 class BudgetService:
@@ -16,56 +17,55 @@ class BudgetService:
     
     def _get_connection(self):
         """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
     
-    def get_budget_progress(self, budget_id: int) -> Dict[str, Any]:
+    def _query_progress(self, where: str, params: tuple) -> List[Dict[str, Any]]:
         """
-        Calculate progress for a specific budget.
+        Budget progress for every budget matching `where`, in one query.
         
-        Returns: {
-            "budget_id": 1,
-            "category_name": "Groceries",
-            "budgeted": 800.00,
-            "actual": 654.32,
-            "remaining": 145.68,
-            "percentage": 81.79,
-            "status": "warning",  # "good", "warning", "over"
-            "alert": False
-        }
+        Spending is summed by joining each budget to the expense transactions
+        of its category inside its date range, grouped by budget. With the
+        category_closure table, a budget covers its category's whole subtree
+        (a budget on "Fixed Expenses" includes Housing → Rent).
         """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        # Get budget details
-        cursor.execute("""
-            SELECT b.*, c.name as category_name
+        if table_exists(cursor, 'category_closure'):
+            categories_join = """
+            LEFT JOIN category_closure cc ON cc.ancestor_id = b.category_id
+            LEFT JOIN transactions t
+                ON t.category_id = cc.descendant_id"""
+        else:
+            categories_join = """
+            LEFT JOIN transactions t
+                ON t.category_id = b.category_id"""
+        
+        cursor.execute(f"""
+            SELECT b.id, b.category_id, b.amount, b.period_type, b.start_date,
+                   b.end_date, b.alert_threshold, c.name as category_name,
+                   COALESCE(SUM(ABS(t.amount)), 0) as actual
             FROM budgets b
-            LEFT JOIN categories c ON b.category_id = c.id
-            WHERE b.id = ?
-        """, (budget_id,))
-        
-        budget = cursor.fetchone()
-        if not budget:
-            conn.close()
-            return None
-        
-        # Calculate actual spending
-        cursor.execute("""
-            SELECT SUM(ABS(amount)) as total
-            FROM transactions
-            WHERE category_id = ?
-            AND amount < 0
-            AND date >= ?
-            AND date <= ?
-        """, (budget['category_id'], budget['start_date'], budget['end_date']))
-        
-        result = cursor.fetchone()
-        actual = float(result['total']) if result['total'] else 0.0
-        
+            LEFT JOIN categories c ON b.category_id = c.id{categories_join}
+                AND t.amount < 0
+                AND t.date >= b.start_date
+                AND t.date <= b.end_date
+            WHERE {where}
+            GROUP BY b.id
+            ORDER BY b.id ASC
+        """, params)
+        
+        rows = cursor.fetchall()
         conn.close()
         
+        return [self._build_progress(row) for row in rows]
+    
+    @staticmethod
+    def _build_progress(budget: sqlite3.Row) -> Dict[str, Any]:
+        """Progress dictionary for a budget row with its actual spending"""
+        actual = float(budget['actual'])
         budgeted = float(budget['amount'])
         remaining = budgeted - actual
         percentage = (actual / budgeted * 100) if budgeted > 0 else 0.0
@@ -93,38 +93,41 @@ class BudgetService:
             'end_date': budget['end_date']
         }
     
-    def get_all_budgets_progress(self, period_type: str = 'monthly') -> List[Dict[str, Any]]:
-        """Get progress for all budgets"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def get_budget_progress(self, budget_id: int) -> Dict[str, Any]:
+        """
+        Calculate progress for a specific budget.
         
-        # Get all budgets for the current period
+        Returns: {
+            "budget_id": 1,
+            "category_name": "Groceries",
+            "budgeted": 800.00,
+            "actual": 654.32,
+            "remaining": 145.68,
+            "percentage": 81.79,
+            "status": "warning",  # "good", "warning", "over"
+            "alert": False
+        }
+        """
+        progress = self._query_progress("b.id = ?", (budget_id,))
+        return progress[0] if progress else None
+    
+    def get_all_budgets_progress(self, period_type: str = 'monthly') -> List[Dict[str, Any]]:
+        """Get progress for all budgets of the current period"""
         today = date.today().isoformat()
         
-        cursor.execute("""
-            SELECT id FROM budgets
-            WHERE period_type = ?
-            AND start_date <= ?
-            AND end_date >= ?
-            ORDER BY id ASC
-        """, (period_type, today, today))
-        
-        budget_ids = [row['id'] for row in cursor.fetchall()]
-        conn.close()
-        
-        # Calculate progress for each
-        progress_list = []
-        for budget_id in budget_ids:
-            progress = self.get_budget_progress(budget_id)
-            if progress:
-                progress_list.append(progress)
-        
-        return progress_list
+        return self._query_progress(
+            "b.period_type = ? AND b.start_date <= ? AND b.end_date >= ?",
+            (period_type, today, today)
+        )
     
-    def get_budget_summary(self) -> Dict[str, Any]:
+    def get_budget_summary(self, progress_list: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Get overall budget summary.
         
+        Args:
+            progress_list: Current monthly progress from get_all_budgets_progress(),
+                           to avoid computing it twice (computed when omitted)
+        
         Returns: {
             "total_budgeted": 5000.00,
             "total_actual": 3245.67,
@@ -134,7 +137,8 @@ class BudgetService:
             "at_risk_count": 2
         }
         """
-        progress_list = self.get_all_budgets_progress()
+        if progress_list is None:
+            progress_list = self.get_all_budgets_progress()
         
         total_budgeted = sum(p['budgeted'] for p in progress_list)
         total_actual = sum(p['actual'] for p in progress_list)
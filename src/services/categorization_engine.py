@@ -6,8 +6,9 @@ Uses pattern-based rules to automatically categorize transactions.
 
 import sqlite3
 import re
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime
+from utils.db import get_connection
 
 
 class CategorizationEngine:
@@ -20,6 +21,9 @@ class CategorizationEngine:
     MEDIUM_CONFIDENCE_THRESHOLD = 0.70
     LOW_CONFIDENCE_THRESHOLD = 0.50
     
+    # Transactions categorized between two progress reports
+    PROGRESS_BATCH = 200
+    
     def __init__(self, db_path: str):
         """
         Initialize the categorization engine.
@@ -91,6 +95,128 @@ class CategorizationEngine:
         """
         return [self.categorize_transaction(txn) for txn in transactions]
     
+    def compile_rule_terms(self) -> List[Tuple]:
+        """
+        Flatten the rules into match terms for set-based (SQL) categorization.
+        
+        Each rule yields rows (rank, category_id, kind, needle, word_count):
+            - 'full': the whole pattern, matched as a substring of the
+              uppercased description (confidence 0.85-1.0 by length share)
+            - 'alt': one alternative of an OR pattern (confidence 0.85)
+            - 'word': one pattern word padded with spaces, matched against
+              the space-padded description words (confidence 0.70 plus
+              0.15 times the share of pattern words found)
+        
+        A rule's confidence is the best of its matching terms and the rule
+        with the highest confidence wins, the lowest rank on ties, which is
+        the same choice categorize_transaction() makes.
+        
+        Returns:
+            List of term tuples, rank following rule priority order
+        """
+        terms = []
+        for rank, rule in enumerate(self._get_all_rules()):
+            pattern_upper = rule['pattern'].upper()
+            pattern_words = pattern_upper.split()
+            category_id = rule['category_id']
+            
+            terms.append((rank, category_id, 'full', pattern_upper, len(pattern_words)))
+            if '|' in pattern_upper:
+                for alternative in pattern_upper.split('|'):
+                    terms.append((rank, category_id, 'alt', alternative.strip(), len(pattern_words)))
+            for word in pattern_words:
+                terms.append((rank, category_id, 'word', f' {word} ', len(pattern_words)))
+        
+        return terms
+    
+    def recategorize_all(self, mode: str = 'soft',
+                         progress: Optional[Callable] = None) -> Dict:
+        """
+        Apply categorization rules to stored transactions.
+        
+        All updates are written in one transaction, so an error or a
+        cancellation raised by `progress` leaves categories unchanged.
+        
+        Args:
+            mode: 'soft' (uncategorized only) or 'hard' (ALL transactions, override existing)
+            progress: Optional callback progress(current, total, message)
+        
+        Returns:
+            Dictionary with total, categorized, success_rate and mode
+        """
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            # Get transactions based on mode
+            if mode == 'hard':
+                # HARD mode: Get ALL transactions (override existing categories)
+                cursor.execute("""
+                    SELECT id, description, amount, category_id
+                    FROM transactions
+                    ORDER BY date DESC
+                """)
+            else:
+                # SOFT mode (default): Only uncategorized transactions
+                cursor.execute("""
+                    SELECT id, description, amount, category_id
+                    FROM transactions
+                    WHERE category_id IS NULL
+                    ORDER BY date DESC
+                """)
+            
+            transactions = cursor.fetchall()
+            total_transactions = len(transactions)
+            
+            if total_transactions == 0:
+                message = 'All transactions are already categorized!' if mode == 'soft' else 'No transactions found!'
+                return {
+                    'total': 0,
+                    'categorized': 0,
+                    'success_rate': 100.0,
+                    'message': message
+                }
+            
+            categorized_count = 0
+            
+            for index, txn in enumerate(transactions):
+                if progress and index % self.PROGRESS_BATCH == 0:
+                    progress(index, total_transactions, 'Categorizing transactions')
+                
+                # Try to categorize
+                result = self.categorize_transaction({
+                    'id': txn['id'],
+                    'description': txn['description'],
+                    'amount': txn['amount']
+                })
+                
+                if result and result['category_id']:
+                    cursor.execute("""
+                        UPDATE transactions 
+                        SET category_id = ?
+                        WHERE id = ?
+                    """, (result['category_id'], txn['id']))
+                    
+                    categorized_count += 1
+            
+            if progress:
+                progress(total_transactions, total_transactions, 'Saving categories')
+            
+            conn.commit()
+            
+            success_rate = (categorized_count / total_transactions * 100) if total_transactions > 0 else 0
+            
+            return {
+                'total': total_transactions,
+                'categorized': categorized_count,
+                'success_rate': round(success_rate, 1),
+                'mode': mode
+            }
+        
+        finally:
+            conn.close()
+    
     def create_rule(self, pattern: str, category_id: int, 
                    priority: int = 0) -> int:
         """
@@ -104,7 +230,7 @@ class CategorizationEngine:
         Returns:
             Rule ID
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -130,7 +256,7 @@ class CategorizationEngine:
         Args:
             rule_id: Rule ID
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -161,7 +287,7 @@ class CategorizationEngine:
             return None
         
         # Check if rule already exists
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -199,7 +325,7 @@ class CategorizationEngine:
     
     def _get_all_rules(self) -> List[Dict]:
         """Get all categorization rules, sorted by priority."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -299,7 +425,7 @@ class CategorizationEngine:
     
     def _get_category_path(self, category_id: int) -> str:
         """Get full category path."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4,11 +4,16 @@ CSV Parser Service for importing bank/credit card statements.
 Handles various CSV formats with flexible column detection and date parsing.
 """
 
+import logging
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Optional
 from dateutil import parser as date_parser
 import re
+from utils.log import SampledLogger
+
+
+logger = logging.getLogger(__name__)
 
 
 class CSVParseError(Exception):
@@ -52,6 +57,11 @@ class CSVParser:
     BALANCE_COLUMNS = ['balance', 'running balance', 'available balance',
                       'closing balance', 'current balance']
     
+    def __init__(self):
+        """Initialize the parser."""
+        # Rows of the last parsed file that could not be parsed
+        self.skipped_rows = 0
+    
     def parse_file(self, file_path: str) -> List[Dict]:
         """
         Parse a CSV file and extract transactions.
@@ -75,6 +85,7 @@ class CSVParser:
         Raises:
             CSVParseError: If file cannot be parsed or required fields missing
         """
+        self.skipped_rows = 0
         try:
             # Try to detect delimiter and read CSV
             df = self._read_csv_with_delimiter_detection(file_path)
@@ -99,6 +110,7 @@ class CSVParser:
             
             # Parse transactions
             transactions = []
+            row_warnings = SampledLogger(logger)
             for index, row in df.iterrows():
                 try:
                     transaction = self._parse_row(row, column_map)
@@ -106,9 +118,13 @@ class CSVParser:
                         transactions.append(transaction)
                 except Exception as e:
                     # Log error but continue with other rows
-                    print(f"Warning: Could not parse row {int(index) + 1}: {str(e)}")
+                    row_warnings.warning('unparseable row', "Could not parse row %d of %s: %s",
+                                         int(index) + 1, file_path, e)
                     continue
             
+            self.skipped_rows = row_warnings.total()
+            row_warnings.flush()
+            
             if not transactions:
                 raise CSVParseError("No valid transactions found in CSV file")
             
@@ -0,0 +1,167 @@
+"""
+Description Similarity Index
+
+Finds pairs of strings whose Levenshtein ratio meets a threshold without
+comparing every pair. Candidates are produced by three lossless filters:
+
+- Length buckets: ratio(a, b) = 2 * LCS / (len(a) + len(b)), so strings whose
+  lengths differ too much can never reach the threshold.
+- Prefix filtering on q-grams: two strings within the allowed edit distance
+  share a minimum number of q-grams, so they must share at least one gram in
+  the "prefix" of their rarest grams.
+- Exact keys: callers pass distinct strings; identical values are merged
+  before indexing.
+
+Every candidate is verified with Levenshtein.ratio, so results are exactly
+those of an all-pairs comparison.
+"""
+
+import math
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import Levenshtein
+
+
+# Slack applied to the float bounds so borderline pairs are always verified
+_EPS = 1e-9
+
+
+class DescriptionIndex:
+    """
+    Similarity index over a list of distinct strings.
+
+    Args:
+        strings: Distinct strings to index (position = string id)
+        threshold: Minimum Levenshtein.ratio for two strings to be similar
+        q: Gram length used for prefix filtering
+    """
+
+    def __init__(self, strings: List[str], threshold: float, q: int = 2):
+        self.strings = strings
+        self.threshold = threshold
+        self.q = q
+        self.lengths = [len(s) for s in strings]
+
+        # Length buckets: length -> string ids
+        self._by_length: Dict[int, List[int]] = defaultdict(list)
+        for i, length in enumerate(self.lengths):
+            self._by_length[length].append(i)
+
+        self._min_common_cache: Dict[int, int] = {}
+        self._prefixes: List[List[Tuple[str, int]]] = []
+        self._index: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+        # Strings too short for the q-gram bound; compared by length alone
+        self._unprunable: Set[int] = set()
+        self._build()
+
+    # ------------------------------------------------------------------
+    # Bounds
+    # ------------------------------------------------------------------
+
+    def length_range(self, length: int) -> Tuple[int, int]:
+        """Partner lengths that could reach the threshold with a string of `length`."""
+        t = self.threshold
+        if t <= 0:
+            return 0, max(self._by_length, default=0)
+        low = math.floor(length * t / (2 - t) - _EPS)
+        high = math.ceil(length * (2 - t) / t + _EPS)
+        return max(low, 0), high
+
+    def _compatible(self, la: int, lb: int) -> bool:
+        return 2 * min(la, lb) + _EPS >= self.threshold * (la + lb)
+
+    def _min_common(self, la: int, lb: int) -> int:
+        """Lower bound on shared q-grams for a similar pair of these lengths."""
+        max_edits = math.floor((1 - self.threshold) * (la + lb) + _EPS)
+        return max(la, lb) - self.q + 1 - self.q * max_edits
+
+    def _min_common_for(self, length: int) -> int:
+        """Smallest _min_common over every compatible partner length."""
+        if length not in self._min_common_cache:
+            low, high = self.length_range(length)
+            bounds = [
+                self._min_common(length, other)
+                for other in range(low, high + 1)
+                if self._compatible(length, other)
+            ]
+            self._min_common_cache[length] = min(bounds) if bounds else 0
+        return self._min_common_cache[length]
+
+    # ------------------------------------------------------------------
+    # Index construction
+    # ------------------------------------------------------------------
+
+    def _grams(self, s: str) -> List[Tuple[str, int]]:
+        """q-grams tagged with their occurrence number (multiset as a set)."""
+        seen: Dict[str, int] = defaultdict(int)
+        grams = []
+        for i in range(len(s) - self.q + 1):
+            gram = s[i:i + self.q]
+            grams.append((gram, seen[gram]))
+            seen[gram] += 1
+        return grams
+
+    def _build(self):
+        all_grams = [self._grams(s) for s in self.strings]
+
+        frequency: Dict[Tuple[str, int], int] = defaultdict(int)
+        for grams in all_grams:
+            for gram in grams:
+                frequency[gram] += 1
+
+        for i, grams in enumerate(all_grams):
+            min_common = self._min_common_for(self.lengths[i])
+            if min_common <= 0 or not grams:
+                self._unprunable.add(i)
+                self._prefixes.append([])
+                continue
+
+            # Rarest grams first; ties broken by value so the order is global
+            grams.sort(key=lambda g: (frequency[g], g))
+            prefix = grams[:len(grams) - min_common + 1]
+            self._prefixes.append(prefix)
+            for gram in prefix:
+                self._index[gram].append(i)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def candidates(self, i: int) -> Set[int]:
+        """Ids that may be similar to string i (a superset of the true matches)."""
+        la = self.lengths[i]
+        found: Set[int] = set()
+
+        for gram in self._prefixes[i]:
+            found.update(self._index[gram])
+
+        low, high = self.length_range(la)
+        if i in self._unprunable:
+            for length in range(low, high + 1):
+                found.update(self._by_length.get(length, ()))
+        else:
+            found.update(j for j in self._unprunable if low <= self.lengths[j] <= high)
+
+        found.discard(i)
+        return {j for j in found if self._compatible(la, self.lengths[j])}
+
+    def is_similar(self, i: int, j: int) -> bool:
+        """Verify a pair: Levenshtein.ratio(strings[i], strings[j]) >= threshold."""
+        return Levenshtein.ratio(self.strings[i], self.strings[j]) >= self.threshold
+
+    def similar(self, i: int, where: Optional[Callable[[int], bool]] = None) -> List[int]:
+        """
+        Ids whose ratio with string i meets the threshold, in ascending order.
+
+        Args:
+            i: Query string id
+            where: Optional predicate limiting which ids are verified
+
+        Returns:
+            Sorted list of matching ids (excluding i)
+        """
+        return sorted(
+            j for j in self.candidates(i)
+            if (where is None or where(j)) and self.is_similar(i, j)
+        )
@@ -4,10 +4,19 @@ Duplicate Detection Service for Financial Assistant
 This service detects duplicate transactions to prevent re-importing the same data.
 """
 
+import logging
 import sqlite3
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from difflib import SequenceMatcher
+from utils.db import get_connection
+from utils.log import SampledLogger
+
+
+logger = logging.getLogger(__name__)
+
+# Unparseable dates can repeat for every row of a file
+_date_warnings = SampledLogger(logger)
 
 
 class DuplicateDetector:
@@ -77,6 +86,151 @@ class DuplicateDetector:
         """
         return [self.check_duplicate(txn) for txn in transactions]
     
+    def check_duplicates_batch(self, transactions: List[Dict],
+                               max_id: Optional[int] = None,
+                               pending: Optional[Dict[int, Dict[str, List[Dict]]]] = None) -> List[Dict]:
+        """
+        Check a batch of transactions for duplicates with one query per account.
+        
+        Loads every stored transaction of the account within the batch's
+        date range (widened by DATE_TOLERANCE_DAYS) once, then applies the
+        same date, amount and confidence rules as check_duplicate.
+        
+        Args:
+            transactions: List of transaction dictionaries
+            max_id: Only compare with stored transactions up to this id
+                    (e.g. those that existed before the current import)
+            pending: Transactions not stored yet that also count as existing
+                     (built with add_pending); matches on them have no 'id'
+        
+        Returns:
+            List of duplicate check results, in input order
+        """
+        # Account -> date -> stored transactions on that date
+        candidates: Dict[int, Dict[str, List[Dict]]] = {}
+        
+        by_account: Dict[int, List[datetime]] = {}
+        for txn in transactions:
+            if txn.get('account_id') and txn.get('date'):
+                by_account.setdefault(txn['account_id'], []).append(self._parse_date(txn['date']))
+        
+        if by_account:
+            conn = get_connection(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            
+            try:
+                tolerance = timedelta(days=self.DATE_TOLERANCE_DAYS)
+                query = """
+                    SELECT id, date, description, amount, account_id
+                    FROM transactions
+                    WHERE account_id = ?
+                    AND date BETWEEN ? AND ?
+                """
+                if max_id is not None:
+                    query += " AND id <= ?"
+                
+                for account_id, dates in by_account.items():
+                    params = [account_id, (min(dates) - tolerance).date().isoformat(),
+                              (max(dates) + tolerance).date().isoformat()]
+                    if max_id is not None:
+                        params.append(max_id)
+                    cursor.execute(query, params)
+                    
+                    by_date = candidates.setdefault(account_id, {})
+                    for row in cursor.fetchall():
+                        by_date.setdefault(row['date'], []).append(dict(row))
+            finally:
+                conn.close()
+        
+        pending = pending or {}
+        results = []
+        for txn in transactions:
+            account_id = txn.get('account_id')
+            matches = self._match_candidates(txn, candidates.get(account_id, {}),
+                                             pending.get(account_id, {}))
+            best = matches[0]['confidence'] if matches else 0.0
+            results.append({
+                'transaction': txn,
+                'is_duplicate': best >= self.HIGH_CONFIDENCE_THRESHOLD,
+                'confidence': best,
+                'matches': matches
+            })
+        
+        return results
+    
+    def add_pending(self, pending: Dict[int, Dict[str, List[Dict]]], transactions: List[Dict]):
+        """
+        Add not-yet-stored transactions to a pending index for check_duplicates_batch.
+        
+        Args:
+            pending: Index of account -> ISO date -> transactions, updated in place
+            transactions: Transactions with account_id, date, description and amount
+        """
+        for txn in transactions:
+            if txn.get('account_id') and txn.get('date'):
+                day = self._parse_date(txn['date']).date().isoformat()
+                pending.setdefault(txn['account_id'], {}).setdefault(day, []).append(txn)
+    
+    def get_max_transaction_id(self) -> int:
+        """
+        Get the highest stored transaction id (0 when there are none).
+        
+        Returns:
+            Maximum transaction id
+        """
+        conn = get_connection(self.db_path)
+        
+        try:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+        finally:
+            conn.close()
+    
+    def _match_candidates(self, transaction: Dict, *indexes: Dict[str, List[Dict]]) -> List[Dict]:
+        """
+        Score preloaded transactions against one transaction.
+        
+        Args:
+            transaction: Transaction to check
+            *indexes: Transactions of its account keyed by ISO date
+        
+        Returns:
+            List of potential matches with confidence scores, highest first
+        """
+        account_id = transaction.get('account_id')
+        txn_date = self._parse_date(transaction.get('date'))
+        amount = float(transaction.get('amount', 0))
+        description = str(transaction.get('description', '')).strip()
+        
+        if not all([account_id, txn_date, description]):
+            return []
+        
+        amount_tolerance = abs(amount) * (self.AMOUNT_TOLERANCE_PERCENT / 100)
+        amount_min = amount - amount_tolerance
+        amount_max = amount + amount_tolerance
+        
+        matches = []
+        for offset in range(-self.DATE_TOLERANCE_DAYS, self.DATE_TOLERANCE_DAYS + 1):
+            day = (txn_date + timedelta(days=offset)).date().isoformat()
+            for by_date in indexes:
+                for candidate in by_date.get(day, []):
+                    if not amount_min <= candidate['amount'] <= amount_max:
+                        continue
+                    
+                    confidence, match_type = self._calculate_confidence(transaction, candidate)
+                    
+                    if confidence >= self.POSSIBLE_MATCH_THRESHOLD:
+                        matches.append({
+                            'existing_transaction': candidate,
+                            'confidence': confidence,
+                            'match_type': match_type
+                        })
+        
+        # Sort by confidence (highest first)
+        matches.sort(key=lambda m: m['confidence'], reverse=True)
+        
+        return matches
+    
     def _find_potential_matches(self, transaction: Dict) -> List[Dict]:
         """
         Find potential duplicate matches in the database.
@@ -87,7 +241,7 @@ class DuplicateDetector:
         Returns:
             List of potential matches with confidence scores
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -278,6 +432,7 @@ class DuplicateDetector:
                     continue
         
         # If all else fails, return a very old date
-        print(f"WARNING: Could not parse date: {date_value} (type: {type(date_value)})")
+        _date_warnings.warning('unparseable date', "Could not parse date: %r (type: %s)",
+                               date_value, type(date_value).__name__)
         return datetime(1970, 1, 1)
 
@@ -2,12 +2,82 @@
 File Archiving Service for Financial Assistant
 
 Archives uploaded CSV files in YYYY/MM directory structure for future reference.
+
+Archives are stored compressed (gzip, or zstd when the optional zstandard
+package is installed and requested) and read back transparently with
+open_archive(); pandas also infers the compression from the extension, so
+CSVParser.parse_file() can re-parse an archive directly. When the archiver
+is given a database, every archive is recorded in the archive_manifest
+table (migrate_add_archive_manifest.py) with its account, statement
+period, row count, hash and sizes: listing is a query instead of a
+directory walk, and content that is already archived for the account is
+not stored again.
 """
 
+import gzip
+import hashlib
+import io
+import logging
 import os
-import shutil
+import sqlite3
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.db import get_connection
+from utils.schema import ARCHIVE_MANIFEST_SCHEMA
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+# Codec used when none is configured (ARCHIVE_CODEC environment variable)
+DEFAULT_CODEC = 'gzip'
+
+# File extension added per codec
+CODEC_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+
+# Bytes read per chunk while compressing
+CHUNK_SIZE = 64 * 1024
+
+
+def codec_for_path(path: str) -> str:
+    """Compression codec of an archive, from its extension."""
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return 'none'
+
+
+def open_archive(path: str, mode: str = 'rb'):
+    """
+    Open an archived file, decompressing it transparently.
+    
+    Args:
+        path: Archive path (.csv, .csv.gz or .csv.zst)
+        mode: 'rb' for bytes or 'r' for text (UTF-8)
+    
+    Returns:
+        Readable file object
+    """
+    codec = codec_for_path(path)
+    if codec == 'gzip':
+        raw = gzip.open(path, 'rb')
+    elif codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} requires the zstandard package")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    else:
+        raw = open(path, 'rb')
+    
+    if mode == 'r':
+        return io.TextIOWrapper(raw, encoding='utf-8-sig')
+    return raw
 
 
 class FileArchiver:
@@ -15,16 +85,40 @@ class FileArchiver:
     Service to archive CSV files in organized directory structure.
     """
     
-    def __init__(self, base_archive_path: str):
+    def __init__(self, base_archive_path: str, db_path: Optional[str] = None,
+                 codec: Optional[str] = None):
         """
         Initialize the file archiver.
         
         Args:
             base_archive_path: Base directory for archives (e.g., 'data/archives')
+            db_path: Optional database path; enables the archive manifest
+            codec: 'gzip', 'zstd' or 'none' (default: ARCHIVE_CODEC or gzip;
+                   zstd falls back to gzip without the zstandard package)
         """
         self.base_archive_path = Path(base_archive_path)
+        self.db_path = db_path
+        
+        codec = codec or os.environ.get('ARCHIVE_CODEC') or DEFAULT_CODEC
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown archive codec: {codec}")
+        if codec == 'zstd' and zstandard is None:
+            logger.warning("zstandard is not installed; archiving with gzip")
+            codec = 'gzip'
+        self.codec = codec
     
-    def archive_file(self, file_path: str, account_id: int, original_filename: str) -> dict:
+    def _connect(self) -> sqlite3.Connection:
+        """Connection with the archive_manifest table in place."""
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        for statement in ARCHIVE_MANIFEST_SCHEMA:
+            cursor.execute(statement)
+        return conn
+    
+    def archive_file(self, file_path: str, account_id: int, original_filename: str,
+                     sha256: Optional[str] = None, row_count: Optional[int] = None,
+                     period_start=None, period_end=None) -> dict:
         """
         Archive a CSV file.
         
@@ -32,14 +126,29 @@ class FileArchiver:
             file_path: Path to the file to archive
             account_id: Account ID the file belongs to
             original_filename: Original name of the uploaded file
-            
+            sha256: Hex SHA-256 of the content, if already known
+            row_count: Rows parsed from the file (for the manifest)
+            period_start: First transaction date in the file
+            period_end: Last transaction date in the file
+        
         Returns:
             Dictionary with keys:
                 - success: Boolean indicating success
                 - archive_path: Path where file was archived
+                - reused: True if identical content was already archived for the account
                 - error: Error message if failed
         """
         try:
+            if sha256 and self.db_path:
+                existing = self._find_by_hash(sha256, account_id)
+                if existing:
+                    return {
+                        'success': True,
+                        'archive_path': existing['archive_path'],
+                        'archived_at': existing['archived_at'],
+                        'reused': True
+                    }
+            
             # Get current date for directory structure
             now = datetime.now()
             year = now.strftime('%Y')
@@ -50,18 +159,36 @@ class FileArchiver:
             archive_dir = self.base_archive_path / year / month
             archive_dir.mkdir(parents=True, exist_ok=True)
             
-            # Generate unique filename: accountID_originalname_timestamp.csv
+            # Generate unique filename: accountID_originalname_timestamp.csv[.gz|.zst]
             name, ext = os.path.splitext(original_filename)
-            archive_filename = f"{account_id}_{name}_{timestamp}{ext}"
+            archive_filename = f"{account_id}_{name}_{timestamp}{ext}{CODEC_EXTENSIONS[self.codec]}"
             archive_path = archive_dir / archive_filename
             
-            # Copy file to archive
-            shutil.copy2(file_path, archive_path)
+            # Compress into the archive, hashing the original on the way
+            digest, original_size = self._write_compressed(file_path, archive_path)
+            
+            if self.db_path:
+                conn = self._connect()
+                try:
+                    conn.execute("""
+                        INSERT OR REPLACE INTO archive_manifest
+                            (archive_path, account_id, original_filename, sha256, codec,
+                             original_size, size, row_count, period_start, period_end, archived_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (str(archive_path), account_id, original_filename, digest, self.codec,
+                          original_size, archive_path.stat().st_size, row_count,
+                          str(period_start) if period_start else None,
+                          str(period_end) if period_end else None,
+                          now.strftime('%Y-%m-%d %H:%M:%S')))
+                    conn.commit()
+                finally:
+                    conn.close()
             
             return {
                 'success': True,
                 'archive_path': str(archive_path),
-                'archived_at': now.isoformat()
+                'archived_at': now.isoformat(),
+                'reused': False
             }
         
         except Exception as e:
@@ -70,18 +197,59 @@ class FileArchiver:
                 'error': str(e)
             }
     
+    def _write_compressed(self, file_path: str, archive_path: Path):
+        """Copy a file into the archive with the configured codec; returns (sha256, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        
+        if self.codec == 'gzip':
+            out = gzip.open(archive_path, 'wb')
+        elif self.codec == 'zstd':
+            out = zstandard.ZstdCompressor().stream_writer(open(archive_path, 'wb'), closefd=True)
+        else:
+            out = open(archive_path, 'wb')
+        
+        with open(file_path, 'rb') as source, out:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        
+        return digest.hexdigest(), size
+    
+    def _find_by_hash(self, sha256: str, account_id: int) -> Optional[Dict]:
+        """Manifest entry of an existing archive of the account with this content."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT * FROM archive_manifest WHERE sha256 = ? AND account_id = ? ORDER BY id DESC
+            """, (sha256, account_id)).fetchall()
+        finally:
+            conn.close()
+        
+        for row in rows:
+            if os.path.exists(row['archive_path']):
+                return dict(row)
+        return None
+    
     def list_archives(self, year: int = None, month: int = None, account_id: int = None):
         """
         List archived files with optional filtering.
         
+        Uses the archive manifest when the archiver has a database and walks
+        the archive directory otherwise.
+        
         Args:
             year: Filter by year
             month: Filter by month (1-12)
             account_id: Filter by account ID
-            
+        
         Returns:
             List of archived file information
         """
+        if self.db_path:
+            return self._list_from_manifest(year, month, account_id)
+        
         archives = []
         
         try:
@@ -96,8 +264,11 @@ class FileArchiver:
             if not search_path.exists():
                 return archives
             
-            # Find all CSV files
-            for csv_file in search_path.rglob('*.csv'):
+            # Find all archived CSV files, compressed or not
+            for csv_file in search_path.rglob('*.csv*'):
+                if not csv_file.name.endswith(('.csv', '.csv.gz', '.csv.zst')):
+                    continue
+                
                 # Parse filename to extract account_id
                 filename = csv_file.name
                 try:
@@ -121,17 +292,55 @@ class FileArchiver:
             archives.sort(key=lambda x: x['modified'], reverse=True)
         
         except Exception as e:
-            print(f"Error listing archives: {e}")
+            logger.error("Error listing archives: %s", e)
         
         return archives
     
+    def _list_from_manifest(self, year: int = None, month: int = None,
+                            account_id: int = None) -> List[Dict]:
+        """List archives from the manifest (same keys as the directory walk, plus metadata)."""
+        query = "SELECT * FROM archive_manifest WHERE 1=1"
+        params: List = []
+        if year and month:
+            query += " AND archived_at >= ? AND archived_at < ?"
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            params += [f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"]
+        elif year:
+            query += " AND archived_at >= ? AND archived_at < ?"
+            params += [f"{year:04d}-01-01", f"{year + 1:04d}-01-01"]
+        if account_id:
+            query += " AND account_id = ?"
+            params.append(account_id)
+        query += " ORDER BY archived_at DESC, id DESC"
+        
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        
+        return [{
+            'filename': os.path.basename(row['archive_path']),
+            'path': row['archive_path'],
+            'account_id': row['account_id'],
+            'size': row['size'],
+            'modified': datetime.fromisoformat(row['archived_at']).isoformat(),
+            'original_filename': row['original_filename'],
+            'original_size': row['original_size'],
+            'codec': row['codec'],
+            'sha256': row['sha256'],
+            'row_count': row['row_count'],
+            'period_start': row['period_start'],
+            'period_end': row['period_end']
+        } for row in rows]
+    
     def get_archive(self, archive_path: str) -> str:
         """
         Get the full path to an archived file.
         
         Args:
             archive_path: Path to the archive
-            
+        
         Returns:
             Full path to the archived file, or None if not found
         """
@@ -146,7 +355,7 @@ class FileArchiver:
         
         Args:
             archive_path: Path to the archive to delete
-            
+        
         Returns:
             True if deleted successfully, False otherwise
         """
@@ -155,6 +364,14 @@ class FileArchiver:
             if path.exists() and path.is_file():
                 path.unlink()
                 
+                if self.db_path:
+                    conn = self._connect()
+                    try:
+                        conn.execute("DELETE FROM archive_manifest WHERE archive_path = ?", (str(path),))
+                        conn.commit()
+                    finally:
+                        conn.close()
+                
                 # Clean up empty directories
                 try:
                     path.parent.rmdir()  # Remove month dir if empty
@@ -164,7 +381,6 @@ class FileArchiver:
                 
                 return True
         except Exception as e:
-            print(f"Error deleting archive: {e}")
+            logger.error("Error deleting archive %s: %s", archive_path, e)
         
         return False
-
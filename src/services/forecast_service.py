@@ -0,0 +1,242 @@
+"""
+Cash-Flow Forecast Service
+
+Projects daily balances per account for the coming months from:
+- active recurring patterns, scheduled forward on calendar-aware cadences
+- category baselines: the average monthly net amount per account and
+  category over recent history, excluding transactions already linked to
+  a recurring pattern (so they are not counted twice)
+
+Starting balances are the point-in-time balances on the day before the
+forecast starts. The projection is computed with NumPy over a (accounts x days) grid, so
+multi-year, all-account forecasts need no per-day Python loop.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.balance_service import BalanceService
+from services.recurring_analyzer import MONTH_STEPS, add_months, anchored_dates
+from services.recurring_detector import RecurringDetector
+from utils.db import get_connection
+
+
+class ForecastService:
+    """Service for projecting account balances forward."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the forecast service.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def forecast(self, months: int = 12, account_id: Optional[int] = None,
+                 start_date: Optional[date] = None, history_months: int = 6) -> Dict:
+        """
+        Project daily balances for the next `months` months.
+
+        Args:
+            months: Number of months to project
+            account_id: Optional account ID to limit scope
+            start_date: First projected day (defaults to today)
+            history_months: Full months of history used for category baselines
+
+        Returns:
+            Dictionary with 'dates', per-account 'accounts' projections,
+            combined 'total' balances, and the 'recurring' and 'baselines'
+            inputs used. Patterns with no linked transaction have no known
+            account and are only counted in 'unassigned_recurring'.
+        """
+        start = start_date or date.today()
+        end = add_months(start, months) - timedelta(days=1)
+        days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        try:
+            accounts = self._starting_balances(cursor, account_id, start)
+            recurring = self._recurring_patterns(cursor, account_id)
+            baselines = self._category_baselines(cursor, account_id, start, history_months)
+        finally:
+            conn.close()
+
+        account_ids = [a['id'] for a in accounts]
+        row_of = {aid: row for row, aid in enumerate(account_ids)}
+        flows = np.zeros((len(accounts), len(days)), dtype=np.float64)
+
+        # Recurring payments as impulses on their scheduled days
+        schedule = []
+        unassigned = 0
+        for rec in recurring:
+            if rec['account_id'] not in row_of:
+                unassigned += 1
+                continue
+            occurrences = self._schedule(rec, days[0], days[-1])
+            if len(occurrences):
+                np.add.at(flows[row_of[rec['account_id']]], (occurrences - days[0]).astype(np.int64),
+                          -rec['average_amount'])
+            schedule.append({
+                'recurring_id': rec['id'],
+                'merchant_name': rec['merchant_name'],
+                'account_id': rec['account_id'],
+                'frequency': rec['frequency'],
+                'amount': -round(rec['average_amount'], 2),
+                'occurrences': len(occurrences),
+                'next_date': str(occurrences[0]) if len(occurrences) else None
+            })
+
+        # Category baselines spread evenly over the days of each month
+        monthly_baseline = np.zeros(len(accounts), dtype=np.float64)
+        for baseline in baselines:
+            if baseline['account_id'] in row_of:
+                monthly_baseline[row_of[baseline['account_id']]] += baseline['monthly_amount']
+
+        months_of_days = days.astype('datetime64[M]')
+        month_length = ((months_of_days + 1).astype('datetime64[D]')
+                        - months_of_days.astype('datetime64[D]')).astype(np.float64)
+        flows += monthly_baseline[:, None] / month_length[None, :]
+
+        starting = np.array([a['balance'] for a in accounts], dtype=np.float64)
+        balances = starting[:, None] + np.cumsum(flows, axis=1)
+
+        dates = [str(d) for d in days]
+        projections = []
+        for row, account in enumerate(accounts):
+            series = balances[row]
+            low = int(np.argmin(series)) if len(series) else 0
+            projections.append({
+                'account_id': account['id'],
+                'name': account['name'],
+                'starting_balance': round(account['balance'], 2),
+                'ending_balance': round(float(series[-1]), 2) if len(series) else round(account['balance'], 2),
+                'min_balance': round(float(series[low]), 2) if len(series) else round(account['balance'], 2),
+                'min_balance_date': dates[low] if len(series) else None,
+                'monthly_baseline': round(float(monthly_baseline[row]), 2),
+                'balances': np.round(series, 2).tolist()
+            })
+
+        total = balances.sum(axis=0) if len(accounts) else np.zeros(len(days))
+
+        return {
+            'start_date': dates[0],
+            'end_date': dates[-1],
+            'dates': dates,
+            'accounts': projections,
+            'total': np.round(total, 2).tolist(),
+            'recurring': schedule,
+            'unassigned_recurring': unassigned,
+            'baselines': baselines
+        }
+
+    def _starting_balances(self, cursor: sqlite3.Cursor, account_id: Optional[int],
+                           start: date) -> List[Dict]:
+        """Balance per account at the end of the day before the first projected day."""
+        query = "SELECT id, name FROM accounts"
+        params = []
+        if account_id:
+            query += " WHERE id = ?"
+            params.append(account_id)
+        query += " ORDER BY id"
+
+        cursor.execute(query, params)
+        accounts = [dict(row) for row in cursor.fetchall()]
+
+        balances = BalanceService(self.db_path).get_balances_on(
+            [start - timedelta(days=1)], [a['id'] for a in accounts])
+        for account in accounts:
+            account['balance'] = balances[account['id']][0]
+        return accounts
+
+    def _recurring_patterns(self, cursor: sqlite3.Cursor, account_id: Optional[int]) -> List[Dict]:
+        """Active patterns with the account of their most recent linked transaction."""
+        cursor.execute("""
+            SELECT r.id, r.merchant_name, r.frequency, r.average_amount,
+                   r.last_transaction_date, r.next_expected_date,
+                   (
+                       SELECT t.account_id
+                       FROM recurring_transaction_instances i
+                       JOIN transactions t ON t.id = i.transaction_id
+                       WHERE i.recurring_id = r.id
+                       ORDER BY i.actual_date DESC
+                       LIMIT 1
+                   ) as account_id
+            FROM recurring_transactions r
+            WHERE r.status = 'active'
+              AND r.next_expected_date IS NOT NULL
+            ORDER BY r.next_expected_date
+        """)
+
+        patterns = [dict(row) for row in cursor.fetchall()]
+        if account_id:
+            patterns = [p for p in patterns if p['account_id'] == account_id]
+        return patterns
+
+    def _category_baselines(self, cursor: sqlite3.Cursor, account_id: Optional[int],
+                            start: date, history_months: int) -> List[Dict]:
+        """Average monthly net amount per account and category, excluding recurring payments."""
+        history_end = start.replace(day=1)
+        history_start = add_months(history_end, -history_months)
+
+        query = """
+            SELECT t.account_id, t.category_id,
+                   COALESCE(c.name, 'Uncategorized') as category,
+                   SUM(t.amount) as total
+            FROM transactions t
+            LEFT JOIN categories c ON t.category_id = c.id
+            WHERE t.date >= ? AND t.date < ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM recurring_transaction_instances i
+                  WHERE i.transaction_id = t.id
+              )
+        """
+        params = [history_start.strftime('%Y-%m-%d'), history_end.strftime('%Y-%m-%d')]
+        if account_id:
+            query += " AND t.account_id = ?"
+            params.append(account_id)
+        query += " GROUP BY t.account_id, t.category_id ORDER BY t.account_id, total"
+
+        cursor.execute(query, params)
+        return [
+            {
+                'account_id': row['account_id'],
+                'category_id': row['category_id'],
+                'category': row['category'],
+                'monthly_amount': round(row['total'] / history_months, 2)
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def _schedule(self, rec: Dict, first_day: np.datetime64, last_day: np.datetime64) -> np.ndarray:
+        """
+        Scheduled dates of a pattern within [first_day, last_day].
+
+        Monthly, quarterly and annual patterns keep the day of month of
+        next_expected_date (clamped to month end); weekly and biweekly ones
+        step by a fixed number of days. Occurrences before first_day,
+        including overdue ones, are skipped.
+        """
+        next_date = np.datetime64(rec['next_expected_date'], 'D')
+        if next_date > last_day:
+            return np.array([], dtype='datetime64[D]')
+
+        frequency = rec['frequency']
+        if frequency in MONTH_STEPS:
+            step = MONTH_STEPS[frequency]
+            first_month = next_date.astype('datetime64[M]')
+            span = (last_day.astype('datetime64[M]') - first_month).astype(np.int64)
+            months = first_month + np.arange(0, span + 1, step)
+            anchor = int((next_date - first_month.astype('datetime64[D]')).astype(np.int64)) + 1
+            occurrences = anchored_dates(months, np.full(len(months), anchor))
+        else:
+            step_days, _ = RecurringDetector.FREQUENCIES.get(frequency, (30, 3))
+            occurrences = np.arange(next_date, last_day + 1, np.timedelta64(step_days, 'D'))
+
+        return occurrences[(occurrences >= first_day) & (occurrences <= last_day)]
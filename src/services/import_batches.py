@@ -0,0 +1,290 @@
+"""
+Import Batches
+
+Tracks which transactions came from which imported file. Every import
+creates an import_batches row (migrate_add_import_batches.py) and stamps
+its rows with transactions.import_batch_id, so a batch can be summarized
+or undone with one indexed query.
+
+Undoing a batch deletes its rows with a single DELETE in one transaction.
+Current balances, running balance checkpoints and daily balances follow
+through their triggers; recurring instances linked to the rows are
+removed and the affected patterns' last/next expected dates recomputed,
+and the file is released from the imported files ledger so it can be
+imported again. The table and column are created on first use if the
+migration has not been run.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from services.recurring_detector import RecurringDetector
+from utils.db import get_connection, table_exists
+from utils.schema import ensure_import_batches_schema
+
+
+# Tables whose rows belong to a transaction and go with it
+DEPENDENT_TABLES = ['recurring_transaction_instances', 'transaction_notes', 'transaction_tags']
+
+
+class ImportBatches:
+    """Service for import batches and undoing them."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the service.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection with the import_batches table and column in place."""
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        ensure_import_batches_schema(conn.cursor())
+        return conn
+
+    def create(self, account_id: int, filename: str, sha256: Optional[str] = None,
+               source: str = 'upload', conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Start a batch for an imported file.
+
+        Args:
+            account_id: Account the rows are imported into
+            filename: Original file name
+            sha256: Hex SHA-256 of the file content
+            source: What imported the file ('upload' or 'batch')
+            conn: Optional open connection; the batch is then created in its
+                  transaction, which the caller commits
+
+        Returns:
+            Import batch ID
+        """
+        own_connection = conn is None
+        if own_connection:
+            conn = self._connect()
+        else:
+            ensure_import_batches_schema(conn.cursor())
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO import_batches (account_id, filename, sha256, source)
+                VALUES (?, ?, ?, ?)
+            """, (account_id, filename, sha256, source))
+            if own_connection:
+                conn.commit()
+            return cursor.lastrowid
+        finally:
+            if own_connection:
+                conn.close()
+
+    def set_import_id(self, batch_id: int, import_id: Optional[int]):
+        """
+        Link a batch to its import run (import_runs).
+
+        Args:
+            batch_id: Import batch ID
+            import_id: Import run ID
+        """
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE import_batches SET import_id = ? WHERE id = ?", (import_id, batch_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, batch_id: int) -> Optional[Dict]:
+        """
+        Get a batch with a summary of its rows.
+
+        Args:
+            batch_id: Import batch ID
+
+        Returns:
+            Batch with row_count, total_amount, date_from and date_to, or None
+        """
+        batches = self._query("SELECT * FROM import_batches WHERE id = ?", [batch_id])
+        return batches[0] if batches else None
+
+    def list(self, account_id: Optional[int] = None, status: Optional[str] = None,
+             limit: int = 50) -> List[Dict]:
+        """
+        Get batches with a summary of their rows, newest first.
+
+        Args:
+            account_id: Optional account filter
+            status: Optional status filter ('active' or 'undone')
+            limit: Maximum number of batches
+
+        Returns:
+            List of batches (see get)
+        """
+        query = "SELECT * FROM import_batches WHERE 1=1"
+        params: List = []
+        if account_id:
+            query += " AND account_id = ?"
+            params.append(account_id)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return self._query(query, params)
+
+    def _query(self, batches_query: str, params: List) -> List[Dict]:
+        """Summarize the rows of the selected batches (one indexed lookup per batch)."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"""
+                SELECT b.*,
+                       COUNT(t.id) as row_count,
+                       COALESCE(SUM(t.amount), 0) as total_amount,
+                       MIN(t.date) as date_from,
+                       MAX(t.date) as date_to
+                FROM ({batches_query}) b
+                LEFT JOIN transactions t ON t.import_batch_id = b.id
+                GROUP BY b.id
+                ORDER BY b.id DESC
+            """, params).fetchall()
+        finally:
+            conn.close()
+
+        batches = []
+        for row in rows:
+            batch = dict(row)
+            batch['total_amount'] = round(batch['total_amount'], 2)
+            batches.append(batch)
+        return batches
+
+    def undo(self, batch_id: int) -> Optional[Dict]:
+        """
+        Delete every transaction of a batch.
+
+        Args:
+            batch_id: Import batch ID
+
+        Returns:
+            Counts of deleted transactions, removed recurring instances and
+            updated recurring patterns, or None if the batch does not exist
+
+        Raises:
+            ValueError: If the batch was already undone
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT * FROM import_batches WHERE id = ?", (batch_id,))
+            batch = cursor.fetchone()
+            if not batch:
+                return None
+            if batch['status'] == 'undone':
+                raise ValueError(f"Import batch {batch_id} was already undone")
+
+            batch_rows = "SELECT id FROM transactions WHERE import_batch_id = ?"
+
+            # Pattern -> expected date of its first instance from this batch
+            # (the pattern's next expected date before the batch was linked)
+            first_expected: Dict[int, Optional[str]] = {}
+            instances_removed = 0
+            for table in DEPENDENT_TABLES:
+                if not table_exists(cursor, table):
+                    continue
+                if table == 'recurring_transaction_instances':
+                    cursor.execute(f"""
+                        SELECT recurring_id, expected_date FROM recurring_transaction_instances
+                        WHERE transaction_id IN ({batch_rows})
+                        ORDER BY actual_date DESC, id DESC
+                    """, (batch_id,))
+                    first_expected = {row['recurring_id']: row['expected_date'] for row in cursor.fetchall()}
+                cursor.execute(f"DELETE FROM {table} WHERE transaction_id IN ({batch_rows})", (batch_id,))
+                if table == 'recurring_transaction_instances':
+                    instances_removed = cursor.rowcount
+
+            cursor.execute("DELETE FROM transactions WHERE import_batch_id = ?", (batch_id,))
+            deleted = cursor.rowcount
+
+            patterns_updated = self._rewind_patterns(cursor, first_expected)
+
+            cursor.execute("""
+                UPDATE import_batches SET status = 'undone', undone_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (batch_id,))
+
+            # Release the file for re-import unless an active batch of a
+            # completed import still holds it
+            if batch['sha256'] and table_exists(cursor, 'imported_files'):
+                query = "DELETE FROM imported_files WHERE sha256 = ? AND account_id = ?"
+                params = [batch['sha256'], batch['account_id']]
+                if table_exists(cursor, 'import_runs'):
+                    query += """
+                        AND NOT EXISTS (
+                            SELECT 1 FROM import_batches b
+                            JOIN import_runs r ON r.id = b.import_id
+                            WHERE b.sha256 = ? AND b.account_id = ?
+                              AND b.status = 'active' AND r.status = 'completed'
+                        )
+                    """
+                    params += [batch['sha256'], batch['account_id']]
+                cursor.execute(query, params)
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        return {
+            'batch_id': batch_id,
+            'transactions_deleted': deleted,
+            'recurring_instances_removed': instances_removed,
+            'recurring_patterns_updated': patterns_updated
+        }
+
+    def _rewind_patterns(self, cursor: sqlite3.Cursor, first_expected: Dict[int, Optional[str]]) -> int:
+        """
+        Recompute the last/next expected dates of patterns that lost instances.
+
+        A pattern with remaining linked instances continues from the latest
+        one; a pattern without any gets back the next expected date it had
+        before the batch (its previous last date is not known).
+        """
+        if not first_expected:
+            return 0
+
+        detector = RecurringDetector(self.db_path)
+        recurring_ids = list(first_expected)
+
+        placeholders = ','.join('?' * len(recurring_ids))
+        cursor.execute(f"""
+            SELECT r.id, r.frequency, MAX(i.actual_date) as last_date
+            FROM recurring_transactions r
+            LEFT JOIN recurring_transaction_instances i
+              ON i.recurring_id = r.id AND i.transaction_id IS NOT NULL
+            WHERE r.id IN ({placeholders})
+            GROUP BY r.id
+        """, recurring_ids)
+
+        now = datetime.now()
+        updates = []
+        for row in cursor.fetchall():
+            if row['last_date']:
+                last_date = datetime.strptime(row['last_date'], '%Y-%m-%d').date()
+                next_date = detector.calculate_next_expected_date(last_date, row['frequency'])
+                updates.append((row['last_date'], next_date.strftime('%Y-%m-%d'), now, row['id']))
+            elif first_expected[row['id']]:
+                updates.append((None, first_expected[row['id']], now, row['id']))
+
+        cursor.executemany("""
+            UPDATE recurring_transactions
+            SET last_transaction_date = ?,
+                next_expected_date = ?,
+                updated_at = ?
+            WHERE id = ?
+        """, updates)
+        return len(updates)
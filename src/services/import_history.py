@@ -0,0 +1,134 @@
+"""
+Import History
+
+Persists one summary row per CSV import in the import_runs table
+(migrate_add_import_runs.py): row counts per outcome, warnings, per-stage
+metrics and elapsed time, for completed, failed and cancelled imports
+alike. The table is created on first use if the migration has not been
+run.
+"""
+
+import json
+import sqlite3
+from typing import Dict, List, Optional
+
+from utils.db import get_connection
+from utils.schema import ensure_import_runs_schema
+
+
+# Summary keys stored in their own columns
+COUNT_COLUMNS = ['rows_parsed', 'rows_skipped', 'invalid', 'duplicates', 'inserted',
+                 'categorized', 'recurring_linked']
+
+
+class ImportHistory:
+    """Service for recording and querying import run summaries."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the import history.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection with the import_runs table in place."""
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        ensure_import_runs_schema(conn.cursor())
+        return conn
+
+    def record(self, run: Dict) -> int:
+        """
+        Store an import run.
+
+        Args:
+            run: Summary with account_id, filename, status, the COUNT_COLUMNS
+                 counts, warnings, stages, error, elapsed_ms and started_at
+                 (missing keys are stored as defaults)
+
+        Returns:
+            Import run ID
+        """
+        columns = ['account_id', 'filename', 'status'] + COUNT_COLUMNS + [
+            'warnings', 'stages', 'error', 'elapsed_ms', 'started_at']
+        values = [run.get('account_id'), run.get('filename'), run['status']]
+        values += [run.get(column, 0) for column in COUNT_COLUMNS]
+        values += [
+            json.dumps(run.get('warnings') or []),
+            json.dumps(run.get('stages') or []),
+            run.get('error'),
+            run.get('elapsed_ms'),
+            run.get('started_at')
+        ]
+
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                INSERT INTO import_runs ({', '.join(columns)})
+                VALUES ({', '.join('?' for _ in columns)})
+            """, values)
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def get(self, run_id: int) -> Optional[Dict]:
+        """
+        Get one import run.
+
+        Args:
+            run_id: Import run ID
+
+        Returns:
+            Run dictionary (warnings and stages decoded) or None if not found
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM import_runs WHERE id = ?", (run_id,)).fetchone()
+        finally:
+            conn.close()
+
+        return self._build_run(row) if row else None
+
+    def list(self, account_id: Optional[int] = None, status: Optional[str] = None,
+             limit: int = 50) -> List[Dict]:
+        """
+        Get import runs, newest first.
+
+        Args:
+            account_id: Optional account filter
+            status: Optional status filter ('completed', 'failed' or 'cancelled')
+            limit: Maximum number of runs
+
+        Returns:
+            List of run dictionaries
+        """
+        query = "SELECT * FROM import_runs WHERE 1=1"
+        params: List = []
+        if account_id:
+            query += " AND account_id = ?"
+            params.append(account_id)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        return [self._build_run(row) for row in rows]
+
+    @staticmethod
+    def _build_run(row: sqlite3.Row) -> Dict:
+        run = dict(row)
+        run['warnings'] = json.loads(run['warnings']) if run['warnings'] else []
+        run['stages'] = json.loads(run['stages']) if run['stages'] else []
+        return run
@@ -0,0 +1,774 @@
+"""
+Import Pipeline
+
+Imports a parsed CSV statement as a chain of stages that each work on
+batches of rows:
+
+    validate -> dedupe -> categorize -> insert -> link recurring -> archive
+
+Stages are composed as generators: each one consumes the batches yielded
+by the previous stage and yields the rows it keeps, so a batch travels the
+whole chain before the next one is sliced off the parsed rows and progress
+can be reported per batch. The file itself is parsed up front (the row
+count and statement period are known before the first batch is inserted).
+Every stage records its rows in/out, batches and elapsed time (its own
+work only, not upstream time) in a StageMetrics.
+
+A new stage only needs a `name` and a `process(batch, context)` method
+(plus an optional `finish(context)` hook run once all batches are done,
+timed into the stage's metrics) and is inserted into the list built by
+default_stages(); the other stages are unaffected.
+
+staged_stages() is the set-based alternative: rows are bulk-loaded into a
+TEMP staging table and validated, deduplicated (exact matches only),
+categorized and inserted with SQL in one transaction.
+
+Batches are inserted through one connection held in the ImportContext
+and committed together when the insert stage finishes, so a cancelled or
+failed import leaves no rows behind: import_file() rolls the connection
+back and marks the import batch undone. Stages that need committed rows
+(recurring linking, archiving) do their work in finish().
+
+Every run, completed, failed or cancelled, is logged as one summary line and stored
+in the import history (services/import_history.py); completed files are
+also added to the imported files ledger (services/imported_files.py).
+Inserted rows carry the run's import batch (services/import_batches.py),
+so a bad import, even a partially inserted one, can be undone.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from models.transaction import Transaction
+from services.categorization_engine import CategorizationEngine
+from services.csv_parser import CSVParser
+from services.duplicate_detector import DuplicateDetector
+from services.file_archiver import FileArchiver
+from services.import_batches import ImportBatches
+from services.import_history import ImportHistory
+from services.imported_files import ImportedFiles, hash_file
+from services.job_runner import JobCancelled
+from services.recurring_detector import RecurringDetector
+from services.transaction_validator import TransactionValidator
+from utils.db import get_connection
+from utils.metrics import record_import
+
+
+logger = logging.getLogger(__name__)
+
+# Rows per batch travelling through the pipeline
+BATCH_SIZE = 250
+
+
+class StageMetrics:
+    """Rows in/out, batches and elapsed time of one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.batches = 0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.seconds = 0.0
+
+    def record(self, rows_in: int, rows_out: int, elapsed: float):
+        """Record one processed batch."""
+        self.batches += 1
+        self.rows_in += rows_in
+        self.rows_out += rows_out
+        self.seconds += elapsed
+
+    def to_dict(self) -> Dict:
+        return {
+            'stage': self.name,
+            'batches': self.batches,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'ms': round(self.seconds * 1000, 3),
+            'rows_per_second': round(self.rows_in / self.seconds, 1) if self.seconds > 0 else None
+        }
+
+
+class ImportContext:
+    """State shared by the stages of one import run."""
+
+    def __init__(self, db_path: str, account_id: int, file_path: str, filename: str,
+                 archive_dir: Optional[str] = None, file_hash: Optional[str] = None):
+        self.db_path = db_path
+        self.account_id = account_id
+        self.file_path = file_path
+        self.filename = filename
+        self.archive_dir = archive_dir
+        # SHA-256 of the source file, for the ledger and archive reuse
+        self.file_hash = file_hash
+        self.file_size: Optional[int] = None
+        # Parsed rows and their date range, for the ledger and the archive manifest
+        self.row_count = 0
+        self.date_from = None
+        self.date_to = None
+        self.archive_path: Optional[str] = None
+        # Import batch the inserted rows are stamped with (services/import_batches.py)
+        self.import_batch_id: Optional[int] = None
+        # Connection the rows are inserted through, committed once at the end
+        self.conn: Optional[sqlite3.Connection] = None
+        # Named counters stages report (e.g. 'duplicates', 'categorized')
+        self.counts: Dict[str, int] = {}
+        self.warnings: List[str] = []
+
+    def set_rows(self, rows: List[Dict]):
+        """Record the number and date range of the parsed source rows."""
+        dates = [row['date'] for row in rows if row.get('date')]
+        self.row_count = len(rows)
+        self.date_from = min(dates) if dates else None
+        self.date_to = max(dates) if dates else None
+
+    def count(self, name: str, amount: int = 1):
+        """Add to a named counter."""
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def warn(self, message: str):
+        """Record a non-fatal problem (the import continues)."""
+        self.warnings.append(message)
+        logger.warning(message)
+
+    def connection(self) -> sqlite3.Connection:
+        """The import's write connection, opened on first use."""
+        if self.conn is None:
+            self.conn = get_connection(self.db_path)
+        return self.conn
+
+    def commit(self):
+        """Commit and close the write connection, if one was opened."""
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def rollback(self):
+        """Discard everything written through the write connection."""
+        if self.conn is not None:
+            self.conn.rollback()
+            self.conn.close()
+            self.conn = None
+
+
+class ImportStage:
+    """A pipeline step that transforms batches of rows."""
+
+    name = 'stage'
+
+    def process(self, batch: List[Dict], context: ImportContext) -> List[Dict]:
+        """
+        Process one batch.
+
+        Args:
+            batch: Rows from the previous stage
+            context: Shared import state
+
+        Returns:
+            Rows passed on to the next stage
+        """
+        raise NotImplementedError
+
+    def finish(self, context: ImportContext):
+        """Run once after every batch has passed through all stages."""
+
+
+class ValidateStage(ImportStage):
+    """Drop rows that fail TransactionValidator."""
+
+    name = 'validate'
+
+    def __init__(self, db_path: str):
+        self.validator = TransactionValidator(db_path)
+
+    def process(self, batch, context):
+        for txn in batch:
+            txn['account_id'] = context.account_id
+        failures = self.validator.validate_batch(batch)
+        context.count('invalid', len(failures))
+        return [txn for index, txn in enumerate(batch) if index not in failures]
+
+
+class DedupeStage(ImportStage):
+    """Drop rows that duplicate stored transactions (one lookup per batch)."""
+
+    name = 'dedupe'
+
+    def __init__(self, db_path: str):
+        self.detector = DuplicateDetector(db_path)
+        # Rows inserted by this import are not duplicates of each other
+        self.max_id = self.detector.get_max_transaction_id()
+
+    def process(self, batch, context):
+        results = self.detector.check_duplicates_batch(batch, max_id=self.max_id)
+        unique = [result['transaction'] for result in results if not result['is_duplicate']]
+        context.count('duplicates', len(batch) - len(unique))
+        return unique
+
+
+class CategorizeStage(ImportStage):
+    """Assign categories from the categorization rules."""
+
+    name = 'categorize'
+
+    def __init__(self, db_path: str):
+        self.engine = CategorizationEngine(db_path)
+
+    def process(self, batch, context):
+        for txn in batch:
+            result = self.engine.categorize_transaction(txn)
+            if result['category_id']:
+                txn['category_id'] = result['category_id']
+                context.count('categorized')
+        return batch
+
+
+class InsertStage(ImportStage):
+    """
+    Insert each batch in the import's transaction (rows get their new 'id'
+    and the import batch); everything is committed once all batches are in.
+    """
+
+    name = 'insert'
+
+    def process(self, batch, context):
+        context.count('inserted', Transaction.bulk_create(
+            batch, conn=context.connection(), import_batch_id=context.import_batch_id))
+        return batch
+
+    def finish(self, context):
+        context.commit()
+
+
+class RecurringLinkStage(ImportStage):
+    """
+    Link inserted rows to known recurring patterns once they are committed
+    (failures do not fail the import).
+    """
+
+    name = 'link_recurring'
+
+    def __init__(self, db_path: str):
+        self.detector = RecurringDetector(db_path)
+        self.pending: List[Dict] = []
+
+    def process(self, batch, context):
+        self.pending.extend(batch)
+        return batch
+
+    def finish(self, context):
+        rows, self.pending = self.pending, []
+        self.link(rows, context)
+
+    def link(self, rows: List[Dict], context: ImportContext):
+        """Link committed rows now."""
+        if not rows:
+            return
+        try:
+            context.count('recurring_linked', self.detector.link_new_transactions(rows))
+        except Exception as e:
+            context.warn(f"Failed to link recurring transactions: {str(e)}")
+
+
+class ArchiveStage(ImportStage):
+    """
+    Archive the source file once the import has finished and remove the temp
+    copy. Content that is already archived is not stored again.
+    """
+
+    name = 'archive'
+
+    def process(self, batch, context):
+        return batch
+
+    def finish(self, context):
+        if not context.archive_dir or not os.path.exists(context.file_path):
+            return
+        try:
+            result = archive_source(context)
+
+            if result['success']:
+                context.archive_path = result['archive_path']
+            else:
+                context.warn(f"Failed to archive file: {result.get('error')}")
+
+            os.remove(context.file_path)
+        except Exception as e:
+            context.warn(f"Error during file archiving: {str(e)}")
+
+
+class StagedInsertStage(ImportStage):
+    """
+    Set-based alternative to the validate -> dedupe -> categorize -> insert
+    -> link recurring stages.
+
+    Batches are bulk-loaded into a TEMP staging table; once all rows are
+    staged, finish() validates them (TransactionValidator's limits and the
+    account id), drops exact duplicates of stored transactions (same
+    account, date, amount and description), assigns categories from the
+    compiled rule terms (CategorizationEngine.compile_rule_terms) and
+    inserts the remaining rows with one INSERT ... SELECT in one
+    transaction, then links them to recurring patterns.
+
+    Unlike DedupeStage, only exact duplicates are dropped; near matches
+    (shifted dates, edited descriptions) are imported.
+    """
+
+    name = 'staged_insert'
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = None
+
+    def process(self, batch, context):
+        if self.conn is None:
+            self.conn = get_connection(self.db_path)
+            self.conn.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS import_staging (
+                    seq INTEGER PRIMARY KEY,
+                    account_id INTEGER,
+                    date TEXT,
+                    description TEXT,
+                    description_length INTEGER,
+                    description_upper TEXT,
+                    description_words TEXT,
+                    amount REAL,
+                    category_id INTEGER
+                )
+            """)
+            self.conn.execute("DELETE FROM import_staging")
+            self.seq = 0
+
+        rows = []
+        for txn in batch:
+            txn['account_id'] = context.account_id
+            txn_date = txn.get('date')
+            description = txn.get('description')
+            text = str(description).strip() if description is not None else None
+            try:
+                amount = float(txn['amount']) if txn.get('amount') is not None else None
+            except (ValueError, TypeError):
+                amount = None
+            self.seq += 1
+            rows.append((
+                self.seq, context.account_id,
+                txn_date.isoformat() if isinstance(txn_date, date) else None,
+                description, len(text) if text is not None else None,
+                text.upper() if text else None,
+                ' ' + ' '.join(text.upper().split()) + ' ' if text else None,
+                amount
+            ))
+
+        self.conn.executemany("""
+            INSERT INTO import_staging
+                (seq, account_id, date, description, description_length,
+                 description_upper, description_words, amount)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        return batch
+
+    def finish(self, context):
+        if self.conn is None:
+            return
+        cursor = self.conn.cursor()
+
+        try:
+            context.count('invalid', self._delete_invalid(cursor))
+
+            cursor.execute("""
+                DELETE FROM import_staging
+                WHERE EXISTS (
+                    SELECT 1 FROM transactions t
+                    WHERE t.account_id = import_staging.account_id
+                      AND t.date = import_staging.date
+                      AND ROUND(t.amount, 2) = ROUND(import_staging.amount, 2)
+                      AND t.description = import_staging.description
+                )
+            """)
+            context.count('duplicates', cursor.rowcount)
+
+            context.count('categorized', self._categorize(cursor))
+
+            cursor.execute(f"""
+                INSERT INTO transactions
+                    (account_id, date, description, amount, category_id{', import_batch_id' if context.import_batch_id else ''})
+                SELECT account_id, date, description, amount, category_id{', ?' if context.import_batch_id else ''}
+                FROM import_staging
+                ORDER BY seq
+            """, (context.import_batch_id,) if context.import_batch_id else ())
+            inserted_count = cursor.rowcount
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.conn.commit()
+            context.count('inserted', inserted_count)
+
+            inserted = self._inserted_rows(cursor, inserted_count, last_id)
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.execute("DROP TABLE IF EXISTS temp.import_staging")
+            self.conn.execute("DROP TABLE IF EXISTS temp.import_rule_terms")
+            self.conn.close()
+            self.conn = None
+
+        RecurringLinkStage(self.db_path).link(inserted, context)
+
+    @staticmethod
+    def _delete_invalid(cursor) -> int:
+        """Drop rows TransactionValidator would reject; returns how many."""
+        today = date.today()
+        min_date = today - timedelta(days=TransactionValidator.MAX_PAST_YEARS * 365)
+        cursor.execute("""
+            DELETE FROM import_staging
+            WHERE date IS NULL OR date > ? OR date < ?
+               OR amount IS NULL OR amount = 0 OR ABS(amount) > ?
+               OR description_length IS NULL OR description_length < ? OR description_length > ?
+               OR account_id IS NULL
+               OR NOT EXISTS (SELECT 1 FROM accounts a WHERE a.id = import_staging.account_id)
+        """, (today.isoformat(), min_date.isoformat(), TransactionValidator.MAX_AMOUNT,
+              TransactionValidator.MIN_DESCRIPTION_LENGTH, TransactionValidator.MAX_DESCRIPTION_LENGTH))
+        return cursor.rowcount
+
+    def _categorize(self, cursor) -> int:
+        """Assign each staged row the category of its best matching rule; returns how many."""
+        terms = CategorizationEngine(self.db_path).compile_rule_terms()
+        if not terms:
+            return 0
+
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS import_rule_terms (
+                rank INTEGER NOT NULL,
+                category_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                needle TEXT NOT NULL,
+                word_count INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("DELETE FROM import_rule_terms")
+        cursor.executemany("INSERT INTO import_rule_terms VALUES (?, ?, ?, ?, ?)", terms)
+
+        # Confidence of every matching rule per row, as in
+        # CategorizationEngine._calculate_match_confidence
+        cursor.execute("""
+            UPDATE import_staging
+            SET category_id = (
+                SELECT category_id FROM (
+                    SELECT r.rank, r.category_id,
+                           MAX(
+                               MAX(CASE r.kind
+                                   WHEN 'full' THEN
+                                       CASE WHEN length(r.needle) >= length(import_staging.description_upper) * 0.7 THEN 1.0
+                                            WHEN length(r.needle) >= length(import_staging.description_upper) * 0.5 THEN 0.95
+                                            WHEN length(r.needle) >= length(import_staging.description_upper) * 0.3 THEN 0.90
+                                            ELSE 0.85 END
+                                   WHEN 'alt' THEN 0.85
+                                   ELSE 0 END),
+                               CASE WHEN SUM(r.kind = 'word') > 0
+                                    THEN 0.70 + SUM(r.kind = 'word') * 0.15 / r.word_count
+                                    ELSE 0 END
+                           ) as confidence
+                    FROM import_rule_terms r
+                    WHERE instr(CASE r.kind WHEN 'word' THEN import_staging.description_words
+                                            ELSE import_staging.description_upper END,
+                                r.needle) > 0
+                    GROUP BY r.rank
+                )
+                WHERE confidence >= ?
+                ORDER BY confidence DESC, rank
+                LIMIT 1
+            )
+            WHERE description_upper IS NOT NULL
+        """, (CategorizationEngine.LOW_CONFIDENCE_THRESHOLD,))
+        cursor.execute("SELECT COUNT(*) FROM import_staging WHERE category_id IS NOT NULL")
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def _inserted_rows(cursor, count: int, last_id: int) -> List[Dict]:
+        """The rows inserted by the INSERT ... SELECT (consecutive ids ending at last_id)."""
+        if not count:
+            return []
+        cursor.execute("""
+            SELECT id, account_id, date, description, amount, category_id
+            FROM transactions WHERE id BETWEEN ? AND ?
+            ORDER BY id
+        """, (last_id - count + 1, last_id))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def archive_source(context: ImportContext) -> Dict:
+    """Archive an import's source file (compressed, recorded in the manifest)."""
+    archiver = FileArchiver(context.archive_dir, db_path=context.db_path)
+    return archiver.archive_file(
+        context.file_path, context.account_id, context.filename, sha256=context.file_hash,
+        row_count=context.row_count, period_start=context.date_from, period_end=context.date_to)
+
+
+def default_stages(db_path: str) -> List[ImportStage]:
+    """The standard CSV import stages, in order."""
+    return [
+        ValidateStage(db_path),
+        DedupeStage(db_path),
+        CategorizeStage(db_path),
+        InsertStage(),
+        RecurringLinkStage(db_path),
+        ArchiveStage(),
+    ]
+
+
+def staged_stages(db_path: str) -> List[ImportStage]:
+    """The set-based import stages (StagedInsertStage), in order."""
+    return [
+        StagedInsertStage(db_path),
+        ArchiveStage(),
+    ]
+
+
+class ImportPipeline:
+    """Runs batches of rows through a chain of stages."""
+
+    def __init__(self, stages: List[ImportStage], batch_size: int = BATCH_SIZE):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages in execution order
+            batch_size: Rows per batch
+        """
+        self.stages = stages
+        self.batch_size = batch_size
+
+    def run(self, rows: List[Dict], context: ImportContext,
+            progress: Optional[Callable] = None) -> List[StageMetrics]:
+        """
+        Push rows through every stage.
+
+        Args:
+            rows: Source rows
+            context: Shared import state
+            progress: Optional callback progress(current, total, message),
+                called after each source batch has passed every stage
+
+        Returns:
+            Metrics per stage, in stage order
+        """
+        metrics = [StageMetrics(stage.name) for stage in self.stages]
+        consumed = [0]
+
+        def source() -> Iterator[List[Dict]]:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                consumed[0] = start + len(batch)
+                yield batch
+
+        batches: Iterable[List[Dict]] = source()
+        for stage, stage_metrics in zip(self.stages, metrics):
+            batches = self._run_stage(stage, batches, context, stage_metrics)
+
+        if progress:
+            progress(0, len(rows), 'Importing')
+        for _ in batches:
+            if progress:
+                progress(consumed[0], len(rows), 'Importing')
+
+        for stage, stage_metrics in zip(self.stages, metrics):
+            start = time.perf_counter()
+            stage.finish(context)
+            stage_metrics.seconds += time.perf_counter() - start
+        if progress:
+            progress(len(rows), len(rows), 'Done')
+
+        return metrics
+
+    @staticmethod
+    def _run_stage(stage: ImportStage, batches: Iterable[List[Dict]], context: ImportContext,
+                   metrics: StageMetrics) -> Iterator[List[Dict]]:
+        """Apply one stage to every upstream batch, timing only the stage's own work."""
+        for batch in batches:
+            start = time.perf_counter()
+            kept = stage.process(batch, context)
+            metrics.record(len(batch), len(kept), time.perf_counter() - start)
+            if kept:
+                yield kept
+
+
+def import_file(db_path: str, file_path: str, account_id: int, filename: str,
+                archive_dir: Optional[str] = None, expected_count: Optional[int] = None,
+                file_hash: Optional[str] = None, file_size: Optional[int] = None,
+                progress: Optional[Callable] = None, staged: bool = False) -> Dict:
+    """
+    Parse a CSV statement and import it through the default stages.
+
+    Args:
+        db_path: Path to SQLite database
+        file_path: Uploaded CSV file (removed after archiving)
+        account_id: Account the rows belong to
+        filename: Original file name (for the archive)
+        archive_dir: Archive base directory (None to skip archiving)
+        expected_count: Valid rows counted at upload, to detect changed files
+        file_hash: SHA-256 of the file computed at upload (hashed here if missing)
+        file_size: File size in bytes computed at upload
+        progress: Optional callback progress(current, total, message)
+        staged: Use the set-based staging-table stages (staged_stages)
+                instead of the default per-row stages
+
+    Returns:
+        Import summary with counts, a message, per-stage metrics and the
+        ID of the stored import run
+    """
+    import_start = time.perf_counter()
+    started_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    context = ImportContext(db_path, account_id, file_path, filename, archive_dir, file_hash)
+    context.file_size = file_size
+    parser = CSVParser()
+    parse_metrics = StageMetrics('parse')
+    stage_metrics: List[StageMetrics] = []
+
+    def run_summary(status: str, error: Optional[str] = None) -> Dict:
+        return {
+            'account_id': account_id,
+            'filename': filename,
+            'status': status,
+            'rows_parsed': parse_metrics.rows_out,
+            'rows_skipped': parser.skipped_rows,
+            'invalid': context.counts.get('invalid', 0),
+            'duplicates': context.counts.get('duplicates', 0),
+            'inserted': context.counts.get('inserted', 0),
+            'categorized': context.counts.get('categorized', 0),
+            'recurring_linked': context.counts.get('recurring_linked', 0),
+            'warnings': context.warnings,
+            'stages': [m.to_dict() for m in [parse_metrics] + stage_metrics],
+            'error': error,
+            'elapsed_ms': round((time.perf_counter() - import_start) * 1000, 3),
+            'started_at': started_at
+        }
+
+    try:
+        if progress:
+            progress(0, None, 'Parsing')
+
+        if context.file_hash is None:
+            context.file_hash, context.file_size = hash_file(file_path)
+
+        parse_start = time.perf_counter()
+        rows = parser.parse_file(file_path)
+        context.set_rows(rows)
+        parse_metrics.record(len(rows), len(rows), time.perf_counter() - parse_start)
+
+        context.import_batch_id = ImportBatches(db_path).create(account_id, filename, context.file_hash)
+
+        stages = staged_stages(db_path) if staged else default_stages(db_path)
+        stage_metrics = ImportPipeline(stages).run(rows, context, progress)
+        record_import(len(rows), time.perf_counter() - import_start)
+
+        valid_count = len(rows) - context.counts.get('invalid', 0)
+        if expected_count is not None and valid_count != expected_count:
+            context.warn(f"Expected {expected_count} valid transactions, got {valid_count}")
+    except JobCancelled:
+        discard_import(context)
+        run = run_summary('cancelled', 'Cancelled')
+        link_batch(context, _record_run(db_path, run))
+        logger.warning("Import of %s cancelled", filename, extra={'fields': _log_fields(run)})
+        raise
+    except Exception as e:
+        discard_import(context)
+        run = run_summary('failed', str(e))
+        link_batch(context, _record_run(db_path, run))
+        logger.error("Import of %s failed: %s", filename, e, extra={'fields': _log_fields(run)})
+        raise
+
+    run = run_summary('completed')
+    import_id = _record_run(db_path, run)
+    link_batch(context, import_id)
+    record_imported_file(context, import_id)
+    logger.info("Imported %s", filename, extra={'fields': _log_fields(run)})
+
+    count = run['inserted']
+    duplicate_count = run['duplicates']
+    categorized_count = run['categorized']
+    recurring_linked = run['recurring_linked']
+
+    # Build response message
+    message_parts = [f'Successfully imported {count} new transactions']
+
+    if duplicate_count > 0:
+        message_parts.append(f'Skipped {duplicate_count} duplicate(s)')
+
+    if categorized_count > 0:
+        message_parts.append(f'Auto-categorized {categorized_count} transactions')
+
+    if recurring_linked > 0:
+        message_parts.append(f'Linked {recurring_linked} to recurring payments')
+
+    return {
+        'message': '. '.join(message_parts) + '.',
+        'import_id': import_id,
+        'import_batch_id': context.import_batch_id,
+        'count': count,
+        'duplicates_skipped': duplicate_count,
+        'categorized': categorized_count,
+        'recurring_linked': recurring_linked,
+        'invalid': run['invalid'],
+        'rows_skipped': run['rows_skipped'],
+        'account_id': account_id,
+        'warnings': context.warnings,
+        'stages': run['stages'],
+        'elapsed_ms': run['elapsed_ms']
+    }
+
+
+def discard_import(context: ImportContext):
+    """Roll back the rows of a cancelled or failed import and undo its batch."""
+    context.rollback()
+    context.counts.pop('inserted', None)
+    context.counts.pop('recurring_linked', None)
+    if context.import_batch_id is None:
+        return
+    # Also removes rows committed before the import stopped
+    try:
+        ImportBatches(context.db_path).undo(context.import_batch_id)
+    except Exception as e:
+        logger.error("Failed to undo import batch: %s", e)
+
+
+def _record_run(db_path: str, run: Dict) -> Optional[int]:
+    """Store an import run; a history failure never fails the import."""
+    try:
+        return ImportHistory(db_path).record(run)
+    except Exception as e:
+        logger.error("Failed to record import run: %s", e)
+        return None
+
+
+def link_batch(context: ImportContext, import_id: Optional[int]):
+    """Link the import batch to its run; a failure never fails the import."""
+    if context.import_batch_id is None or import_id is None:
+        return
+    try:
+        ImportBatches(context.db_path).set_import_id(context.import_batch_id, import_id)
+    except Exception as e:
+        logger.error("Failed to link import batch: %s", e)
+
+
+def record_imported_file(context: ImportContext, import_id: Optional[int]):
+    """Add an imported file to the ledger; a ledger failure never fails the import."""
+    try:
+        ImportedFiles(context.db_path).record(
+            context.file_hash, context.account_id, context.filename, size=context.file_size,
+            row_count=context.row_count, date_from=context.date_from, date_to=context.date_to,
+            archive_path=context.archive_path, import_id=import_id)
+    except Exception as e:
+        logger.error("Failed to record imported file: %s", e)
+
+
+def _log_fields(run: Dict) -> Dict:
+    """Key=value fields of the import summary log line."""
+    fields = {key: run[key] for key in ('account_id', 'status', 'rows_parsed', 'rows_skipped',
+                                         'invalid', 'duplicates', 'inserted', 'categorized',
+                                         'recurring_linked', 'elapsed_ms')}
+    fields['warnings'] = len(run['warnings'])
+    return fields
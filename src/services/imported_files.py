@@ -0,0 +1,200 @@
+"""
+Imported Files Ledger
+
+Records every statement file imported into an account in the
+imported_files table (migrate_add_imported_files.py), keyed by the SHA-256
+of the file content. Uploads are hashed while they are written to disk
+(save_and_hash), so an exact re-upload for the same account is recognized
+before it is parsed. An entry no longer counts as imported once none of
+its import batches is both active and from a completed import. The table is created on first use if the
+migration has not been run.
+"""
+
+import hashlib
+import sqlite3
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from utils.db import get_connection, table_exists
+from utils.schema import IMPORTED_FILES_SCHEMA
+
+
+# Bytes read per chunk when streaming or hashing a file
+CHUNK_SIZE = 64 * 1024
+
+
+def save_and_hash(stream: BinaryIO, path: str) -> Tuple[str, int]:
+    """
+    Write a stream to disk, hashing it on the way.
+
+    Args:
+        stream: Readable binary stream (e.g. an upload's stream)
+        path: Destination file
+
+    Returns:
+        (hex SHA-256, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'wb') as out:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def hash_file(path: str) -> Tuple[str, int]:
+    """
+    Hash a file on disk.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        (hex SHA-256, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class ImportedFiles:
+    """Service for the ledger of imported statement files."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the ledger.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection with the imported_files table in place."""
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        for statement in IMPORTED_FILES_SCHEMA:
+            cursor.execute(statement)
+        return conn
+
+    def find(self, sha256: str, account_id: Optional[int] = None) -> Optional[Dict]:
+        """
+        Find an imported file by content hash.
+
+        Args:
+            sha256: Hex SHA-256 of the file content
+            account_id: Only match imports into this account
+
+        Returns:
+            Most recent matching ledger entry with an active batch from a
+            completed import (or predating import batches), or None
+        """
+        query = "SELECT * FROM imported_files f WHERE sha256 = ?"
+        params: List = [sha256]
+        if account_id is not None:
+            query += " AND account_id = ?"
+            params.append(account_id)
+
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            if table_exists(cursor, 'import_batches'):
+                # Only a batch whose import completed holds the file (a
+                # cancelled or failed import leaves no rows)
+                completed = "0"
+                if table_exists(cursor, 'import_runs'):
+                    completed = """EXISTS (SELECT 1 FROM import_batches b
+                                           JOIN import_runs r ON r.id = b.import_id
+                                           WHERE b.sha256 = f.sha256 AND b.account_id = f.account_id
+                                             AND b.status = 'active' AND r.status = 'completed')"""
+                query += f"""
+                    AND ({completed}
+                         OR NOT EXISTS (SELECT 1 FROM import_batches b
+                                        WHERE b.sha256 = f.sha256 AND b.account_id = f.account_id))
+                """
+            query += " ORDER BY id DESC LIMIT 1"
+            row = conn.execute(query, params).fetchone()
+        finally:
+            conn.close()
+
+        return dict(row) if row else None
+
+    def record(self, sha256: str, account_id: int, filename: str, size: Optional[int] = None,
+               row_count: int = 0, date_from=None, date_to=None,
+               archive_path: Optional[str] = None, import_id: Optional[int] = None) -> int:
+        """
+        Add a file to the ledger (a forced re-import replaces the entry).
+
+        Args:
+            sha256: Hex SHA-256 of the file content
+            account_id: Account the file was imported into
+            filename: Original file name
+            size: File size in bytes
+            row_count: Rows parsed from the file
+            date_from: First transaction date in the file
+            date_to: Last transaction date in the file
+            archive_path: Where the file is archived
+            import_id: Import run ID (import_runs)
+
+        Returns:
+            Ledger entry ID
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO imported_files
+                    (sha256, account_id, filename, size, row_count, date_from, date_to,
+                     archive_path, import_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(sha256, account_id) DO UPDATE SET
+                    filename = excluded.filename,
+                    size = excluded.size,
+                    row_count = excluded.row_count,
+                    date_from = excluded.date_from,
+                    date_to = excluded.date_to,
+                    archive_path = COALESCE(excluded.archive_path, imported_files.archive_path),
+                    import_id = excluded.import_id,
+                    imported_at = CURRENT_TIMESTAMP
+            """, (sha256, account_id, filename, size, row_count,
+                  str(date_from) if date_from else None, str(date_to) if date_to else None,
+                  archive_path, import_id))
+            conn.commit()
+            return conn.execute("""
+                SELECT id FROM imported_files WHERE sha256 = ? AND account_id = ?
+            """, (sha256, account_id)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def list(self, account_id: Optional[int] = None, limit: int = 50) -> List[Dict]:
+        """
+        Get ledger entries, newest first.
+
+        Args:
+            account_id: Optional account filter
+            limit: Maximum number of entries
+
+        Returns:
+            List of ledger entries
+        """
+        query = "SELECT * FROM imported_files"
+        params: List = []
+        if account_id:
+            query += " WHERE account_id = ?"
+            params.append(account_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        return [dict(row) for row in rows]
@@ -0,0 +1,326 @@
+"""
+Background Job Runner
+
+Runs long operations (recategorization, recurring scans, balance rebuilds)
+on an in-process thread pool instead of inside a Flask request. Every job
+has a row in the jobs table (migrate_add_jobs.py) with its type, status,
+parameters, progress counters, result and error, so clients can poll
+/jobs/api/<id> and the history survives server restarts.
+
+A job is a plain callable taking its parameters as keyword arguments plus
+a `progress(current, total=None, message=None)` callback. Live progress is
+kept in memory (a job holding a write transaction would otherwise block
+its own progress writes) and stored with the final status. The callback
+raises JobCancelled once cancellation is requested, so a job stops at its
+next progress report.
+
+Jobs still pending or running when the process stopped are marked failed
+the first time the runner touches their database after a restart.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.db import get_connection
+from utils.metrics import record_job
+from utils.schema import JOBS_SCHEMA
+
+
+# Worker threads shared by all jobs in this process
+MAX_WORKERS = 2
+
+# Error recorded for jobs that were interrupted by a server restart
+INTERRUPTED_ERROR = 'Interrupted by server restart'
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# In-process state of pending and running jobs, keyed by (db_path, job_id)
+_futures: Dict[Tuple[str, int], Future] = {}
+_cancel_events: Dict[Tuple[str, int], threading.Event] = {}
+_progress: Dict[Tuple[str, int], Dict] = {}
+
+# Databases whose interrupted jobs have been recovered in this process
+_ready_databases = set()
+_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Raised by the progress callback of a job that has been cancelled."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Shared worker pool, created on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='job')
+        return _executor
+
+
+class JobRunner:
+    """Service for submitting, tracking and cancelling background jobs."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the job runner.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def _get_connection(self):
+        """Get database connection"""
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Connection with the jobs table in place. The first connection to a
+        database in this process also fails the jobs a restart interrupted.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        for statement in JOBS_SCHEMA:
+            cursor.execute(statement)
+
+        with _lock:
+            if self.db_path not in _ready_databases:
+                cursor.execute("""
+                    UPDATE jobs
+                    SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP
+                    WHERE status IN ('pending', 'running')
+                """, (INTERRUPTED_ERROR,))
+                conn.commit()
+                _ready_databases.add(self.db_path)
+
+        return conn
+
+    def submit(self, job_type: str, func: Callable, params: Optional[Dict] = None) -> int:
+        """
+        Queue a job on the worker pool.
+
+        Args:
+            job_type: Job type shown in the job history (e.g. 'recategorize')
+            func: Callable run as func(progress=..., **params)
+            params: JSON-serializable keyword arguments for func
+
+        Returns:
+            Job ID
+        """
+        params = params or {}
+
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO jobs (type, status, params)
+                VALUES (?, 'pending', ?)
+            """, (job_type, json.dumps(params)))
+            job_id = cursor.lastrowid
+            conn.commit()
+        finally:
+            conn.close()
+
+        key = (self.db_path, job_id)
+        cancel_event = threading.Event()
+        with _lock:
+            _cancel_events[key] = cancel_event
+            _progress[key] = {'progress_current': 0, 'progress_total': None, 'message': None}
+
+        future = _get_executor().submit(self._run, job_id, job_type, func, params, cancel_event)
+        with _lock:
+            _futures[key] = future
+        future.add_done_callback(lambda _: self._forget(key))
+
+        return job_id
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """
+        Get a job with its live progress.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job dictionary (params and result decoded) or None if not found
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+
+        return self._build_job(row) if row else None
+
+    def list(self, status: Optional[str] = None, job_type: Optional[str] = None,
+             limit: int = 50) -> List[Dict]:
+        """
+        Get the job history, newest first.
+
+        Args:
+            status: Optional status filter
+            job_type: Optional job type filter
+            limit: Maximum number of jobs
+
+        Returns:
+            List of job dictionaries
+        """
+        query = "SELECT * FROM jobs WHERE 1=1"
+        params: List = []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if job_type:
+            query += " AND type = ?"
+            params.append(job_type)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+
+        return [self._build_job(row) for row in rows]
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Request cancellation of a pending or running job.
+
+        A pending job is cancelled before it starts; a running job stops at
+        its next progress report.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            True if the job was still active in this process, False otherwise
+        """
+        with _lock:
+            cancel_event = _cancel_events.get((self.db_path, job_id))
+        if cancel_event is None:
+            return False
+
+        cancel_event.set()
+        return True
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Block until a job has finished.
+
+        Args:
+            job_id: Job ID
+            timeout: Optional seconds to wait
+
+        Returns:
+            Job dictionary or None if not found
+        """
+        with _lock:
+            future = _futures.get((self.db_path, job_id))
+        if future is not None:
+            future.exception(timeout=timeout)
+        return self.get(job_id)
+
+    def _run(self, job_id: int, job_type: str, func: Callable, params: Dict,
+             cancel_event: threading.Event):
+        """Run a job on a worker thread and record its outcome."""
+        key = (self.db_path, job_id)
+
+        if cancel_event.is_set():
+            self._finish(job_id, 'cancelled', message='Cancelled before start')
+            record_job(job_type, 'cancelled', 0.0)
+            return
+
+        conn = self._get_connection()
+        try:
+            conn.execute("""
+                UPDATE jobs SET status = 'running', started_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (job_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        def progress(current: int, total: Optional[int] = None, message: Optional[str] = None):
+            if cancel_event.is_set():
+                raise JobCancelled()
+            with _lock:
+                state = _progress[key]
+                state['progress_current'] = current
+                if total is not None:
+                    state['progress_total'] = total
+                if message is not None:
+                    state['message'] = message
+
+        started = time.perf_counter()
+        try:
+            result = func(progress=progress, **params)
+        except JobCancelled:
+            self._finish(job_id, 'cancelled', message='Cancelled')
+            status = 'cancelled'
+        except Exception as e:
+            self._finish(job_id, 'failed', error=str(e))
+            status = 'failed'
+        else:
+            self._finish(job_id, 'completed', result=result)
+            status = 'completed'
+
+        record_job(job_type, status, time.perf_counter() - started)
+
+    def _finish(self, job_id: int, status: str, result=None, error: Optional[str] = None,
+                message: Optional[str] = None):
+        """Store a job's final status, result and last progress."""
+        with _lock:
+            state = dict(_progress.get((self.db_path, job_id), {}))
+        if message is not None:
+            state['message'] = message
+
+        conn = self._get_connection()
+        try:
+            conn.execute("""
+                UPDATE jobs
+                SET status = ?, result = ?, error = ?, message = ?,
+                    progress_current = ?, progress_total = ?,
+                    finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (status, json.dumps(result, default=str) if result is not None else None, error,
+                  state.get('message'), state.get('progress_current', 0),
+                  state.get('progress_total'), job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _forget(self, key: Tuple[str, int]):
+        """Drop the in-memory state of a finished job."""
+        with _lock:
+            _futures.pop(key, None)
+            _cancel_events.pop(key, None)
+            _progress.pop(key, None)
+
+    def _build_job(self, row: sqlite3.Row) -> Dict:
+        """Job dictionary with decoded JSON fields and live progress overlaid."""
+        job = dict(row)
+        job['params'] = json.loads(job['params']) if job['params'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+
+        key = (self.db_path, job['id'])
+        with _lock:
+            live = dict(_progress[key]) if job['status'] == 'running' and key in _progress else None
+            job['cancel_requested'] = key in _cancel_events and _cancel_events[key].is_set()
+        if live:
+            job.update(live)
+
+        total = job['progress_total']
+        job['percent'] = round(job['progress_current'] / total * 100, 1) if total else None
+        return job
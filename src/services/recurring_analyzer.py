@@ -0,0 +1,250 @@
+"""
+Vectorized Recurring Pattern Analysis
+
+Computes intervals, frequency fits and amount consistency for many groups
+of transactions at once. Groups are passed as flat NumPy arrays with an
+offsets array marking where each group starts (group g is
+values[offsets[g]:offsets[g + 1]]), so no per-group Python loop is needed.
+
+Cadences are either fixed day steps (weekly = 7 days, ...) or, when
+calendar-aware, whole calendar months: a monthly charge on the 31st is
+expected on the last day of shorter months instead of drifting by 30 days.
+"""
+
+import calendar
+from datetime import date
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Cadences measured in calendar months when calendar-aware
+MONTH_STEPS = {
+    'monthly': 1,
+    'quarterly': 3,
+    'annual': 12,
+}
+
+
+def add_months(day: date, months: int, anchor_day: Optional[int] = None) -> date:
+    """
+    Add calendar months to a date, clamping to the end of shorter months.
+
+    Args:
+        day: Start date
+        months: Number of months to add
+        anchor_day: Preferred day of month (defaults to day.day)
+
+    Returns:
+        Date `months` calendar months later
+    """
+    month_index = day.month - 1 + months
+    year = day.year + month_index // 12
+    month = month_index % 12 + 1
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, min(anchor_day or day.day, last_day))
+
+
+def nominal_date(day: date, anchor_day: int) -> date:
+    """
+    Nearest date falling on the anchor day (clamped to month end).
+
+    A monthly payment due on the 30th that posts on the 2nd of the next
+    month has a nominal date of the 30th of the previous month.
+    """
+    candidates = [add_months(day, shift, anchor_day) for shift in (-1, 0, 1)]
+    return min(candidates, key=lambda candidate: abs((candidate - day).days))
+
+
+def anchored_dates(months: np.ndarray, anchor_days: np.ndarray) -> np.ndarray:
+    """
+    Vectorized anchor dates: the anchor day in each month, clamped to month end.
+
+    Args:
+        months: datetime64[M] months
+        anchor_days: Preferred day of month for each entry
+
+    Returns:
+        datetime64[D] array of dates
+    """
+    month_start = months.astype('datetime64[D]')
+    month_length = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    return month_start + (np.minimum(anchor_days, month_length) - 1)
+
+
+class RecurringAnalyzer:
+    """
+    Batch interval, frequency and amount analysis.
+
+    Args:
+        frequencies: Mapping of frequency name to (expected_days, tolerance_days)
+        calendar_aware: Measure MONTH_STEPS cadences in calendar months
+        amount_tolerance: Maximum relative deviation from the average amount
+    """
+
+    def __init__(self, frequencies: Dict[str, Tuple[int, int]], calendar_aware: bool = False,
+                 amount_tolerance: float = 0.10):
+        self.frequency_names = list(frequencies)
+        self.expected_days = np.array([frequencies[f][0] for f in self.frequency_names], dtype=np.int64)
+        self.tolerances = np.array([frequencies[f][1] for f in self.frequency_names], dtype=np.float64)
+        self.calendar_aware = calendar_aware
+        self.amount_tolerance = amount_tolerance
+
+    @staticmethod
+    def pack(date_groups: Sequence[Sequence[str]],
+             amount_groups: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Flatten per-group ISO dates and amounts into analyzer input arrays.
+
+        Args:
+            date_groups: Sorted 'YYYY-MM-DD' dates for each group
+            amount_groups: Amounts for each group (same shape as date_groups)
+
+        Returns:
+            Tuple of (day ordinals since 1970-01-01, amounts, offsets)
+        """
+        counts = np.fromiter((len(g) for g in date_groups), dtype=np.int64, count=len(date_groups))
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        flat_dates = [d for group in date_groups for d in group]
+        flat_amounts = [a for group in amount_groups for a in group]
+        ordinals = np.array(flat_dates, dtype='datetime64[D]').astype(np.int64)
+        amounts = np.array(flat_amounts, dtype=np.float64)
+        return ordinals, amounts, offsets
+
+    def analyze(self, ordinals: np.ndarray, amounts: np.ndarray, offsets: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Analyze every group in one pass.
+
+        Args:
+            ordinals: Transaction dates as days since 1970-01-01, sorted within each group
+            amounts: Transaction amounts (sign ignored)
+            offsets: Group boundaries, length n_groups + 1
+
+        Returns:
+            Dictionary of per-group arrays:
+            - 'count': transactions in the group
+            - 'frequency': index into frequency_names, or -1 if no cadence fits
+            - 'frequency_confidence': confidence of the chosen cadence (0 if none)
+            - 'average_amount': mean absolute amount
+            - 'amount_variance': max deviation from the mean, relative to the mean
+            - 'consistent': amount_variance within amount_tolerance (and mean > 0)
+        """
+        counts = np.diff(offsets)
+
+        frequency, confidence = self._fit_frequencies(ordinals, offsets, counts)
+        average, variance, consistent = self._amount_consistency(amounts, offsets, counts)
+
+        return {
+            'count': counts,
+            'frequency': frequency,
+            'frequency_confidence': confidence,
+            'average_amount': average,
+            'amount_variance': variance,
+            'consistent': consistent,
+        }
+
+    def _fit_frequencies(self, ordinals: np.ndarray, offsets: np.ndarray,
+                         counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best-fitting cadence per group (same rule as RecurringDetector.detect_frequency)."""
+        n_groups = len(counts)
+        frequency = np.full(n_groups, -1, dtype=np.int64)
+        confidence = np.zeros(n_groups, dtype=np.float64)
+
+        # Need at least two intervals to judge a cadence
+        interval_counts = np.maximum(counts - 1, 0)
+        fitted = interval_counts >= 2
+        if not fitted.any():
+            return frequency, confidence
+
+        # Intervals within fitted groups (pairs straddling a boundary are dropped)
+        group_of = np.repeat(np.arange(n_groups), counts)
+        keep = (group_of[1:] == group_of[:-1]) & fitted[group_of[1:]]
+        previous = ordinals[:-1][keep]
+        intervals = (ordinals[1:] - ordinals[:-1])[keep]
+        interval_group = group_of[1:][keep]
+
+        # Signed deviation of every interval from every cadence: (frequencies, intervals)
+        deviations = intervals[None, :] - self.expected_days[:, None]
+
+        if self.calendar_aware:
+            anchor_days = self._day_of_month(ordinals[offsets[:-1][counts > 0]])
+            anchor_by_group = np.zeros(n_groups, dtype=np.int64)
+            anchor_by_group[counts > 0] = anchor_days
+            anchors = anchor_by_group[interval_group]
+
+            # Snap each previous date to its nominal schedule date (the nearest
+            # anchor date), so a payment that slipped into the next month is
+            # not measured from the wrong month
+            previous_month = previous.astype('datetime64[D]').astype('datetime64[M]')
+            candidates = np.stack([
+                anchored_dates(previous_month + shift, anchors).astype(np.int64)
+                for shift in (-1, 0, 1)
+            ])
+            nearest = np.argmin(np.abs(candidates - previous[None, :]), axis=0)
+            nominal_month = previous_month + (nearest - 1)
+
+            for row, name in enumerate(self.frequency_names):
+                if name in MONTH_STEPS:
+                    target = anchored_dates(nominal_month + MONTH_STEPS[name], anchors).astype(np.int64)
+                    deviations[row] = (previous + intervals) - target
+
+        absolute = np.abs(deviations)
+
+        # Per-group reductions over each group's contiguous run of intervals
+        n = interval_counts[fitted]
+        starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+        n = n.astype(np.float64)
+        mean_signed = np.add.reduceat(deviations, starts, axis=1) / n
+        mean_absolute = np.add.reduceat(absolute, starts, axis=1) / n
+        max_absolute = np.maximum.reduceat(absolute, starts, axis=1)
+
+        tolerance = self.tolerances[:, None]
+        matches = (np.abs(mean_signed) <= tolerance) & (max_absolute <= tolerance)
+        scores = np.where(matches, np.clip(1.0 - (mean_absolute / tolerance), 0.0, 1.0), 0.0)
+
+        # First cadence with the highest confidence, as in detect_frequency()
+        best = np.argmax(scores, axis=0)
+        best_score = scores[best, np.arange(len(best))]
+        accepted = best_score >= 0.5
+
+        fitted_index = np.flatnonzero(fitted)
+        frequency[fitted_index[accepted]] = best[accepted]
+        confidence[fitted_index[accepted]] = best_score[accepted]
+        return frequency, confidence
+
+    def _amount_consistency(self, amounts: np.ndarray, offsets: np.ndarray,
+                            counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Average amount and relative max deviation per group (as is_consistent_amount)."""
+        n_groups = len(counts)
+        average = np.zeros(n_groups, dtype=np.float64)
+        variance = np.zeros(n_groups, dtype=np.float64)
+        consistent = np.zeros(n_groups, dtype=bool)
+
+        present = counts > 0
+        if not present.any():
+            return average, variance, consistent
+
+        absolute = np.abs(amounts)
+        starts = offsets[:-1][present]
+        average[present] = np.add.reduceat(absolute, starts) / counts[present]
+
+        group_of = np.repeat(np.arange(n_groups), counts)
+        max_deviation = np.zeros(n_groups, dtype=np.float64)
+        max_deviation[present] = np.maximum.reduceat(np.abs(absolute - average[group_of]), starts)
+
+        positive = average > 0
+        variance[positive] = max_deviation[positive] / average[positive]
+        consistent[positive] = variance[positive] <= self.amount_tolerance
+        average[~positive] = 0.0
+        return average, variance, consistent
+
+    @staticmethod
+    def _day_of_month(ordinals: np.ndarray) -> np.ndarray:
+        days = ordinals.astype('datetime64[D]')
+        return (days - days.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64) + 1
+
+    def frequency_name(self, index: int) -> Optional[str]:
+        """Frequency name for an index from analyze()['frequency']."""
+        return self.frequency_names[index] if index >= 0 else None
@@ -8,11 +8,23 @@ Created: 2025-10-19
 Author: Saeed Hoss
 """
 
+import logging
+import multiprocessing
 import sqlite3
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Optional, Tuple
-from collections import defaultdict
+from typing import Callable, List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import re
 import Levenshtein
+import numpy as np
+from services.description_index import DescriptionIndex
+from services.recurring_analyzer import MONTH_STEPS, RecurringAnalyzer, add_months, nominal_date
+from utils.db import get_connection
+
+
+logger = logging.getLogger(__name__)
+
+_NUMBERS_RE = re.compile(r'[#\d]+')
 
 
 class RecurringDetector:
@@ -33,14 +45,37 @@ class RecurringDetector:
     MAX_AMOUNT_VARIANCE = 0.10     # ±10% amount variance
     MIN_CONFIDENCE = 0.75          # Minimum confidence to save pattern
     
-    def __init__(self, db_path: str):
+    # Parallel detection: merchant blocks handed to each worker process
+    BLOCKS_PER_WORKER = 4
+    
+    def __init__(self, db_path: str, calendar_aware: bool = False):
         """
         Initialize the detector.
         
         Args:
             db_path: Path to SQLite database
+            calendar_aware: Fit monthly/quarterly/annual cadences in calendar
+                months (e.g. the 31st, then the last day of shorter months)
+                instead of fixed 30/90/365-day steps
         """
         self.db_path = db_path
+        self.calendar_aware = calendar_aware
+        self.analyzer = RecurringAnalyzer(self.FREQUENCIES, calendar_aware, self.MAX_AMOUNT_VARIANCE)
+    
+    def normalize_description(self, description: str) -> str:
+        """
+        Normalize a description for similarity comparison.
+        
+        Lowercases, strips whitespace and removes numbers/# so that
+        NETFLIX #123 and NETFLIX #456 compare equal.
+        
+        Args:
+            description: Transaction description
+        
+        Returns:
+            Normalized description
+        """
+        return _NUMBERS_RE.sub('', description.lower().strip()).strip()
     
     def is_similar_description(self, desc1: str, desc2: str, threshold: float = MIN_SIMILARITY) -> bool:
         """
@@ -57,17 +92,8 @@ class RecurringDetector:
         if not desc1 or not desc2:
             return False
         
-        # Normalize (lowercase, strip whitespace)
-        d1 = desc1.lower().strip()
-        d2 = desc2.lower().strip()
-        
-        # Remove numbers for better matching (NETFLIX #123 == NETFLIX #456)
-        import re
-        d1_no_nums = re.sub(r'[#\d]+', '', d1).strip()
-        d2_no_nums = re.sub(r'[#\d]+', '', d2).strip()
-        
         # Calculate similarity ratio on normalized strings
-        ratio = Levenshtein.ratio(d1_no_nums, d2_no_nums)
+        ratio = Levenshtein.ratio(self.normalize_description(desc1), self.normalize_description(desc2))
         
         return ratio >= threshold
     
@@ -186,63 +212,95 @@ class RecurringDetector:
         """
         Group transactions by similar descriptions.
         
+        Each ungrouped transaction (in input order) starts a group and claims
+        every later ungrouped transaction whose description is similar to it.
+        Descriptions are normalized once, identical normalized descriptions
+        are handled together, and a DescriptionIndex limits fuzzy comparison
+        to plausible candidates, so results match comparing every pair.
+        
         Args:
             transactions: List of transaction dictionaries
         
         Returns:
             Dictionary mapping merchant name to list of similar transactions
         """
-        groups = defaultdict(list)
-        processed = set()
+        # Distinct normalized descriptions in order of first appearance,
+        # with the positions of the transactions that share each one
+        key_ids: Dict[str, int] = {}
+        keys: List[str] = []
+        members: List[List[int]] = []
         
         for i, txn in enumerate(transactions):
-            if i in processed:
+            description = txn['description']
+            if not description:
+                continue  # Never similar to anything
+            key = self.normalize_description(description)
+            key_id = key_ids.get(key)
+            if key_id is None:
+                key_id = key_ids[key] = len(keys)
+                keys.append(key)
+                members.append([])
+            members[key_id].append(i)
+        
+        index = DescriptionIndex(keys, self.MIN_SIMILARITY)
+        processed = [False] * len(keys)
+        groups = {}
+        
+        for key_id in range(len(keys)):
+            if processed[key_id]:
                 continue
+            processed[key_id] = True
             
-            merchant = self.extract_merchant_name(txn['description'])
-            group = [txn]
-            processed.add(i)
+            # Later descriptions first appear after this one, so "later and
+            # not yet grouped" reduces to a higher id that is unprocessed
+            matches = index.similar(key_id, where=lambda other: other > key_id and not processed[other])
+            positions = list(members[key_id])
+            for other in matches:
+                processed[other] = True
+                positions.extend(members[other])
             
-            # Find similar transactions
-            for j, other_txn in enumerate(transactions):
-                if j <= i or j in processed:
-                    continue
-                
-                if self.is_similar_description(txn['description'], other_txn['description']):
-                    group.append(other_txn)
-                    processed.add(j)
-            
-            if len(group) >= self.MIN_OCCURRENCES:
-                groups[merchant] = group
+            if len(positions) >= self.MIN_OCCURRENCES:
+                positions.sort()
+                first = transactions[positions[0]]
+                groups[self.extract_merchant_name(first['description'])] = [transactions[p] for p in positions]
         
-        return dict(groups)
+        return groups
     
-    def calculate_next_expected_date(self, last_date: date, frequency: str) -> date:
+    def calculate_next_expected_date(self, last_date: date, frequency: str,
+                                     anchor_day: Optional[int] = None) -> date:
         """
         Calculate next expected transaction date.
         
         Args:
             last_date: Date of last transaction
             frequency: Frequency type
+            anchor_day: Usual day of month for calendar-aware cadences
         
         Returns:
             Expected date of next transaction
         """
+        if self.calendar_aware and frequency in MONTH_STEPS:
+            if anchor_day:
+                last_date = nominal_date(last_date, anchor_day)
+            return add_months(last_date, MONTH_STEPS[frequency], anchor_day)
+        
         expected_days, _ = self.FREQUENCIES.get(frequency, (30, 3))
         return last_date + timedelta(days=expected_days)
     
-    def detect_patterns(self, account_id: Optional[int] = None, min_confidence: float = MIN_CONFIDENCE) -> List[Dict]:
+    def detect_patterns(self, account_id: Optional[int] = None, min_confidence: float = MIN_CONFIDENCE,
+                        workers: int = 1) -> List[Dict]:
         """
         Scan transactions to detect recurring patterns.
         
         Args:
             account_id: Optional account ID to limit scope
             min_confidence: Minimum confidence score to save pattern
+            workers: Number of processes analyzing merchant groups (1 = in-process)
         
         Returns:
             List of detected recurring patterns
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -263,86 +321,152 @@ class RecurringDetector:
             
             cursor.execute(query, params)
             transactions = [dict(row) for row in cursor.fetchall()]
-            
-            if not transactions:
-                return []
-            
-            # Group by similar descriptions
-            groups = self.group_similar_transactions(transactions)
-            
-            detected_patterns = []
-            
-            # Analyze each group
-            for merchant, txn_group in groups.items():
-                if len(txn_group) < self.MIN_OCCURRENCES:
-                    continue
-                
-                # Sort by date
-                txn_group.sort(key=lambda x: x['date'])
-                
-                # Extract dates and amounts
-                dates = [datetime.strptime(t['date'], '%Y-%m-%d').date() for t in txn_group]
-                amounts = [abs(t['amount']) for t in txn_group]
-                
-                # Calculate intervals
-                intervals = self.calculate_intervals(dates)
-                
-                if not intervals:
-                    continue
-                
-                # Detect frequency
-                freq_result = self.detect_frequency(intervals)
-                if not freq_result:
-                    continue
-                
-                frequency, freq_confidence = freq_result
-                
-                # Check amount consistency
-                is_consistent, avg_amount, amount_variance = self.is_consistent_amount(amounts)
-                
-                if not is_consistent:
-                    continue  # Amounts too variable
-                
-                # Calculate overall confidence
-                # Factors: frequency confidence, amount consistency, occurrence count
-                amount_confidence = 1.0 - amount_variance  # Lower variance = higher confidence
-                occurrence_bonus = min(0.1 * (len(txn_group) - 3), 0.2)  # Bonus for more occurrences
-                
-                overall_confidence = (
-                    freq_confidence * 0.5 +      # 50% weight on frequency
-                    amount_confidence * 0.3 +    # 30% weight on amount consistency
-                    0.2 + occurrence_bonus       # 20% base + bonus for occurrences
-                )
-                overall_confidence = min(1.0, overall_confidence)
-                
-                if overall_confidence < min_confidence:
-                    continue  # Confidence too low
-                
-                # Get most common category
-                category_ids = [t['category_id'] for t in txn_group if t['category_id']]
-                most_common_category = max(set(category_ids), key=category_ids.count) if category_ids else None
-                
-                # Create pattern
-                pattern = {
-                    'merchant_name': merchant,
-                    'description_pattern': txn_group[0]['description'][:100],
-                    'frequency': frequency,
-                    'average_amount': round(avg_amount, 2),
-                    'amount_variance': round(amount_variance * avg_amount, 2),
-                    'category_id': most_common_category,
-                    'last_transaction_date': dates[-1].strftime('%Y-%m-%d'),
-                    'next_expected_date': self.calculate_next_expected_date(dates[-1], frequency).strftime('%Y-%m-%d'),
-                    'confidence_score': round(overall_confidence, 2),
-                    'transaction_count': len(txn_group),
-                    'transaction_ids': [t['id'] for t in txn_group]
-                }
-                
-                detected_patterns.append(pattern)
-            
-            return detected_patterns
-            
         finally:
             conn.close()
+        
+        if not transactions:
+            return []
+        
+        # Group by similar descriptions
+        groups = list(self.group_similar_transactions(transactions).items())
+        
+        if workers > 1 and len(groups) > 1:
+            return self._analyze_groups_parallel(groups, min_confidence, workers)
+        
+        return self.analyze_groups(groups, min_confidence)
+    
+    def _analyze_groups_parallel(self, groups: List[Tuple[str, List[Dict]]], min_confidence: float,
+                                 workers: int) -> List[Dict]:
+        """
+        Analyze merchant groups in a process pool.
+        
+        Groups are split into contiguous blocks of roughly equal transaction
+        count (several per worker to even out uneven merchants), so merging
+        the block results in order gives the same list as the serial path.
+        
+        Args:
+            groups: (merchant, transactions) pairs from group_similar_transactions()
+            min_confidence: Minimum confidence score to keep a pattern
+            workers: Number of worker processes
+        
+        Returns:
+            List of detected recurring patterns
+        """
+        total = sum(len(txn_group) for _, txn_group in groups)
+        target = max(1, total // (workers * self.BLOCKS_PER_WORKER))
+        
+        blocks = [[]]
+        block_size = 0
+        for group in groups:
+            if block_size >= target:
+                blocks.append([])
+                block_size = 0
+            blocks[-1].append(group)
+            block_size += len(group[1])
+        
+        detected_patterns = []
+        # Scans also run as background jobs: start clean worker processes
+        # instead of forking the threaded server
+        with ProcessPoolExecutor(max_workers=min(workers, len(blocks)),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            for patterns in executor.map(_analyze_block, [self.calendar_aware] * len(blocks),
+                                            [min_confidence] * len(blocks), blocks):
+                detected_patterns.extend(patterns)
+        
+        return detected_patterns
+    
+    def analyze_group(self, merchant: str, txn_group: List[Dict],
+                      min_confidence: float = MIN_CONFIDENCE) -> Optional[Dict]:
+        """
+        Analyze one group of similar transactions for a recurring pattern.
+        
+        Args:
+            merchant: Merchant name for the group
+            txn_group: Transactions with similar descriptions
+            min_confidence: Minimum confidence score to keep the pattern
+        
+        Returns:
+            Pattern dictionary, or None if the group is not recurring
+        """
+        patterns = self.analyze_groups([(merchant, txn_group)], min_confidence)
+        return patterns[0] if patterns else None
+    
+    def analyze_groups(self, groups: List[Tuple[str, List[Dict]]],
+                       min_confidence: float = MIN_CONFIDENCE) -> List[Dict]:
+        """
+        Analyze groups of similar transactions for recurring patterns.
+        
+        Intervals, frequency fit and amount consistency are computed for all
+        groups at once by RecurringAnalyzer; only groups that pass are turned
+        into pattern dictionaries.
+        
+        Args:
+            groups: (merchant, transactions) pairs from group_similar_transactions()
+            min_confidence: Minimum confidence score to keep a pattern
+        
+        Returns:
+            List of detected recurring patterns, in group order
+        """
+        groups = [(merchant, txn_group) for merchant, txn_group in groups
+                  if len(txn_group) >= self.MIN_OCCURRENCES]
+        if not groups:
+            return []
+        
+        # Sort by date
+        for _, txn_group in groups:
+            txn_group.sort(key=lambda x: x['date'])
+        
+        ordinals, amounts, offsets = RecurringAnalyzer.pack(
+            [[t['date'] for t in txn_group] for _, txn_group in groups],
+            [[t['amount'] for t in txn_group] for _, txn_group in groups]
+        )
+        result = self.analyzer.analyze(ordinals, amounts, offsets)
+        
+        # Overall confidence: 50% frequency, 30% amount consistency,
+        # 20% base + bonus for occurrences
+        counts = result['count']
+        amount_confidence = 1.0 - result['amount_variance']
+        occurrence_bonus = np.minimum(0.1 * (counts - 3), 0.2)
+        overall_confidence = np.minimum(1.0, (
+            result['frequency_confidence'] * 0.5 +
+            amount_confidence * 0.3 +
+            0.2 + occurrence_bonus
+        ))
+        
+        accepted = (
+            (result['frequency'] >= 0) &
+            result['consistent'] &
+            (overall_confidence >= min_confidence)
+        )
+        
+        detected_patterns = []
+        for g in np.flatnonzero(accepted):
+            merchant, txn_group = groups[g]
+            frequency = self.analyzer.frequency_name(result['frequency'][g])
+            avg_amount = float(result['average_amount'][g])
+            first_date = datetime.strptime(txn_group[0]['date'], '%Y-%m-%d').date()
+            last_date = datetime.strptime(txn_group[-1]['date'], '%Y-%m-%d').date()
+            next_date = self.calculate_next_expected_date(last_date, frequency, anchor_day=first_date.day)
+            
+            # Get most common category
+            category_ids = [t['category_id'] for t in txn_group if t['category_id']]
+            most_common_category = max(set(category_ids), key=category_ids.count) if category_ids else None
+            
+            detected_patterns.append({
+                'merchant_name': merchant,
+                'description_pattern': txn_group[0]['description'][:100],
+                'frequency': frequency,
+                'average_amount': round(avg_amount, 2),
+                'amount_variance': round(float(result['amount_variance'][g]) * avg_amount, 2),
+                'category_id': most_common_category,
+                'last_transaction_date': last_date.strftime('%Y-%m-%d'),
+                'next_expected_date': next_date.strftime('%Y-%m-%d'),
+                'confidence_score': round(float(overall_confidence[g]), 2),
+                'transaction_count': len(txn_group),
+                'transaction_ids': [t['id'] for t in txn_group]
+            })
+        
+        return detected_patterns
     
     def save_recurring_pattern(self, pattern: Dict) -> int:
         """
@@ -352,95 +476,182 @@ class RecurringDetector:
             pattern: Pattern dictionary from detect_patterns()
         
         Returns:
-            ID of created recurring_transaction
+            ID of the created (or updated) recurring_transaction
+        """
+        return self.save_recurring_patterns([pattern])[0]
+    
+    def save_recurring_patterns(self, patterns: List[Dict]) -> List[int]:
+        """
+        Save detected recurring patterns in a single transaction.
+        
+        A pattern whose merchant already has a recurring transaction updates
+        that row (keeping its status and alert settings) instead of creating
+        a duplicate, and only transactions not yet linked to it get new
+        instances. Member transactions are fetched with one join against a
+        temporary table and instances are written with executemany.
+        
+        Args:
+            patterns: Pattern dictionaries from detect_patterns()
+        
+        Returns:
+            IDs of the saved recurring_transactions, in input order
         """
-        conn = sqlite3.connect(self.db_path)
+        if not patterns:
+            return []
+        
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
+            now = datetime.now()
+            
+            # Existing patterns by merchant (oldest wins if duplicated by hand)
+            existing = {}
+            cursor.execute("SELECT id, merchant_name FROM recurring_transactions ORDER BY id")
+            for recurring_id, merchant_name in cursor.fetchall():
+                existing.setdefault(merchant_name, recurring_id)
+            
+            recurring_ids = []
+            for pattern in patterns:
+                values = (
+                    pattern['description_pattern'],
+                    pattern['frequency'],
+                    pattern['average_amount'],
+                    pattern['amount_variance'],
+                    pattern.get('category_id'),
+                    pattern['last_transaction_date'],
+                    pattern['next_expected_date'],
+                    pattern.get('confidence_score', 0.85),
+                )
+                recurring_id = existing.get(pattern['merchant_name'])
+                
+                if recurring_id:
+                    # A category set on the pattern is kept over the detected one
+                    cursor.execute("""
+                        UPDATE recurring_transactions
+                        SET description_pattern = ?, frequency = ?,
+                            average_amount = ?, amount_variance = ?,
+                            category_id = COALESCE(category_id, ?),
+                            last_transaction_date = ?, next_expected_date = ?,
+                            confidence_score = ?, updated_at = ?
+                        WHERE id = ?
+                    """, values + (now, recurring_id))
+                else:
+                    cursor.execute("""
+                        INSERT INTO recurring_transactions (
+                            merchant_name, description_pattern, frequency,
+                            average_amount, amount_variance, category_id,
+                            last_transaction_date, next_expected_date,
+                            confidence_score, status, alert_if_missing,
+                            alert_if_amount_changes, created_at, updated_at
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (pattern['merchant_name'],) + values + (
+                        'active',
+                        1,  # alert_if_missing
+                        1,  # alert_if_amount_changes
+                        now,
+                        now
+                    ))
+                    recurring_id = cursor.lastrowid
+                    existing[pattern['merchant_name']] = recurring_id
+                
+                recurring_ids.append(recurring_id)
+            
+            # Member transactions of every pattern, fetched with one join
             cursor.execute("""
-                INSERT INTO recurring_transactions (
-                    merchant_name, description_pattern, frequency,
-                    average_amount, amount_variance, category_id,
-                    last_transaction_date, next_expected_date,
-                    status, alert_if_missing, alert_if_amount_changes,
-                    confidence_score, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                pattern['merchant_name'],
-                pattern['description_pattern'],
-                pattern['frequency'],
-                pattern['average_amount'],
-                pattern['amount_variance'],
-                pattern.get('category_id'),
-                pattern['last_transaction_date'],
-                pattern['next_expected_date'],
-                'active',
-                1,  # alert_if_missing
-                1,  # alert_if_amount_changes
-                pattern.get('confidence_score', 0.85),
-                datetime.now(),
-                datetime.now()
-            ))
+                CREATE TEMP TABLE IF NOT EXISTS recurring_scan_members (
+                    recurring_id INTEGER NOT NULL,
+                    transaction_id INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("DELETE FROM recurring_scan_members")
+            cursor.executemany(
+                "INSERT INTO recurring_scan_members (recurring_id, transaction_id) VALUES (?, ?)",
+                [
+                    (recurring_id, txn_id)
+                    for recurring_id, pattern in zip(recurring_ids, patterns)
+                    for txn_id in pattern.get('transaction_ids', [])
+                ]
+            )
             
-            recurring_id = cursor.lastrowid
+            cursor.execute("""
+                SELECT m.recurring_id, t.id, t.date, t.amount
+                FROM recurring_scan_members m
+                JOIN transactions t ON t.id = m.transaction_id
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM recurring_transaction_instances i
+                    WHERE i.recurring_id = m.recurring_id
+                      AND i.transaction_id = m.transaction_id
+                )
+            """)
+            members = cursor.fetchall()
+            cursor.execute("DELETE FROM recurring_scan_members")
             
             # Create instances for matched transactions
-            if 'transaction_ids' in pattern:
-                for txn_id in pattern['transaction_ids']:
-                    # Get transaction details
-                    cursor.execute("SELECT date, amount FROM transactions WHERE id = ?", (txn_id,))
-                    txn = cursor.fetchone()
-                    if txn:
-                        cursor.execute("""
-                            INSERT INTO recurring_transaction_instances (
-                                recurring_id, transaction_id, expected_date,
-                                actual_date, expected_amount, actual_amount,
-                                variance_amount, status, created_at
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            recurring_id,
-                            txn_id,
-                            txn[0],  # expected = actual for historical
-                            txn[0],  # actual date
-                            pattern['average_amount'],
-                            abs(txn[1]),
-                            abs(abs(txn[1]) - pattern['average_amount']),
-                            'on_time',  # Historical transactions assumed on time
-                            datetime.now()
-                        ))
+            average_amounts = {
+                recurring_id: pattern['average_amount']
+                for recurring_id, pattern in zip(recurring_ids, patterns)
+            }
+            cursor.executemany("""
+                INSERT INTO recurring_transaction_instances (
+                    recurring_id, transaction_id, expected_date,
+                    actual_date, expected_amount, actual_amount,
+                    variance_amount, status, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    recurring_id,
+                    txn_id,
+                    txn_date,  # expected = actual for historical
+                    txn_date,  # actual date
+                    average_amounts[recurring_id],
+                    abs(amount),
+                    abs(abs(amount) - average_amounts[recurring_id]),
+                    'on_time',  # Historical transactions assumed on time
+                    now
+                )
+                for recurring_id, txn_id, txn_date, amount in members
+            ])
             
             conn.commit()
-            return recurring_id
+            return recurring_ids
             
-        except Exception as e:
+        except Exception:
             conn.rollback()
             raise
         finally:
             conn.close()
     
-    def scan_and_save_all(self, account_id: Optional[int] = None) -> Dict[str, int]:
+    def scan_and_save_all(self, account_id: Optional[int] = None, min_confidence: float = MIN_CONFIDENCE,
+                          workers: int = 1, progress: Optional[Callable] = None) -> Dict[str, int]:
         """
         Scan for patterns and save all detected recurring transactions.
         
         Args:
             account_id: Optional account ID to limit scope
+            min_confidence: Minimum confidence score to save pattern
+            workers: Number of processes used for detection
+            progress: Optional callback progress(current, total, message),
+                called before each stage
         
         Returns:
             Dictionary with scan results
         """
-        patterns = self.detect_patterns(account_id=account_id)
+        if progress:
+            progress(0, 2, 'Detecting patterns')
+        patterns = self.detect_patterns(account_id=account_id, min_confidence=min_confidence, workers=workers)
+        
+        if progress:
+            progress(1, 2, f'Saving {len(patterns)} patterns')
         
         saved_count = 0
         skipped_count = 0
         
-        for pattern in patterns:
-            try:
-                self.save_recurring_pattern(pattern)
-                saved_count += 1
-            except Exception as e:
-                print(f"Skipped pattern '{pattern['merchant_name']}': {e}")
-                skipped_count += 1
+        try:
+            saved_count = len(self.save_recurring_patterns(patterns))
+        except Exception as e:
+            logger.error("Failed to save %d patterns: %s", len(patterns), e)
+            skipped_count = len(patterns)
         
         return {
             'total_patterns': len(patterns),
@@ -458,7 +669,7 @@ class RecurringDetector:
         Returns:
             Recurring transaction ID if matched, None otherwise
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -484,4 +695,184 @@ class RecurringDetector:
             
         finally:
             conn.close()
+    
+    def match_transactions(self, transactions: List[Dict]) -> List[Tuple[Dict, Dict]]:
+        """
+        Match transactions against the active recurring patterns.
+        
+        A transaction matches the highest-confidence pattern whose description
+        is similar and whose average amount is within MAX_AMOUNT_VARIANCE.
+        Same rule as check_new_transaction(), but patterns are loaded once and
+        indexed by normalized description, so each distinct description is
+        compared only with plausible patterns.
+        
+        Args:
+            transactions: Transaction dictionaries with description and amount
+        
+        Returns:
+            List of (transaction, pattern) pairs for matched transactions
+        """
+        if not transactions:
+            return []
+        
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            # Get all active recurring transactions
+            cursor.execute("""
+                SELECT * FROM recurring_transactions
+                WHERE status = 'active'
+                ORDER BY confidence_score DESC
+            """)
+            patterns = [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+        
+        if not patterns:
+            return []
+        
+        # Normalized descriptions: pattern keys first, then transaction keys
+        key_ids: Dict[str, int] = {}
+        keys: List[str] = []
+        
+        def key_id(description: str) -> int:
+            key = self.normalize_description(description)
+            if key not in key_ids:
+                key_ids[key] = len(keys)
+                keys.append(key)
+            return key_ids[key]
+        
+        # Key id -> pattern positions, in confidence order
+        patterns_by_key: Dict[int, List[int]] = {}
+        for position, rec in enumerate(patterns):
+            if rec['description_pattern']:
+                patterns_by_key.setdefault(key_id(rec['description_pattern']), []).append(position)
+        
+        txn_keys = [key_id(txn['description']) if txn.get('description') else None for txn in transactions]
+        index = DescriptionIndex(keys, self.MIN_SIMILARITY)
+        
+        candidates: Dict[int, List[int]] = {}
+        matches = []
+        
+        for txn, txn_key in zip(transactions, txn_keys):
+            if txn_key is None:
+                continue
+            
+            if txn_key not in candidates:
+                similar_keys = index.similar(txn_key, where=lambda other: other in patterns_by_key)
+                if txn_key in patterns_by_key:
+                    similar_keys.append(txn_key)
+                candidates[txn_key] = sorted(
+                    position for other in similar_keys for position in patterns_by_key[other]
+                )
+            
+            amount = abs(txn['amount'])
+            for position in candidates[txn_key]:
+                rec = patterns[position]
+                if not rec['average_amount']:
+                    continue
+                # Check amount consistency (±10%)
+                amount_diff = abs(amount - rec['average_amount'])
+                if amount_diff / rec['average_amount'] <= self.MAX_AMOUNT_VARIANCE:
+                    matches.append((txn, rec))
+                    break
+        
+        return matches
+    
+    def link_new_transactions(self, transactions: List[Dict]) -> int:
+        """
+        Link newly imported transactions to their recurring patterns.
+        
+        Inserts a recurring_transaction_instances row for every matched
+        expense and advances each pattern's last/next expected dates, all
+        with batched writes in one transaction.
+        
+        Args:
+            transactions: Saved transaction dictionaries (with 'id')
+        
+        Returns:
+            Number of transactions linked
+        """
+        expenses = [t for t in transactions if t.get('id') and t['amount'] < 0]
+        matches = self.match_transactions(expenses)
+        
+        if not matches:
+            return 0
+        
+        # Pattern id -> (pattern, matched transactions)
+        by_pattern: Dict[int, Tuple[Dict, List[Dict]]] = {}
+        for txn, rec in matches:
+            by_pattern.setdefault(rec['id'], (rec, []))[1].append(txn)
+        
+        now = datetime.now()
+        instances = []
+        updates = []
+        
+        for recurring_id, (rec, txns) in by_pattern.items():
+            _, tolerance = self.FREQUENCIES.get(rec['frequency'], (30, 3))
+            expected = rec['next_expected_date']
+            last = rec['last_transaction_date']
+            
+            for txn in sorted(txns, key=lambda t: str(t['date'])):
+                actual = txn['date'].isoformat() if isinstance(txn['date'], date) else txn['date']
+                actual_date = datetime.strptime(actual, '%Y-%m-%d').date()
+                
+                status = 'on_time'
+                if expected:
+                    late_after = datetime.strptime(expected, '%Y-%m-%d').date() + timedelta(days=tolerance)
+                    if actual_date > late_after:
+                        status = 'late'
+                
+                actual_amount = abs(txn['amount'])
+                instances.append((
+                    recurring_id, txn['id'], expected, actual,
+                    rec['average_amount'], actual_amount,
+                    abs(actual_amount - rec['average_amount']),
+                    status, now
+                ))
+                
+                expected = self.calculate_next_expected_date(actual_date, rec['frequency']).strftime('%Y-%m-%d')
+                if not last or actual > last:
+                    last = actual
+            
+            if last != rec['last_transaction_date']:
+                last_date = datetime.strptime(last, '%Y-%m-%d').date()
+                next_date = self.calculate_next_expected_date(last_date, rec['frequency'])
+                updates.append((last, next_date.strftime('%Y-%m-%d'), now, recurring_id))
+        
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany("""
+                INSERT INTO recurring_transaction_instances (
+                    recurring_id, transaction_id, expected_date,
+                    actual_date, expected_amount, actual_amount,
+                    variance_amount, status, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, instances)
+            
+            cursor.executemany("""
+                UPDATE recurring_transactions
+                SET last_transaction_date = ?,
+                    next_expected_date = ?,
+                    updated_at = ?
+                WHERE id = ?
+            """, updates)
+            
+            conn.commit()
+            return len(instances)
+            
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
+def _analyze_block(calendar_aware: bool, min_confidence: float,
+                   groups: List[Tuple[str, List[Dict]]]) -> List[Dict]:
+    """Worker entry point: analyze a block of merchant groups."""
+    # Analysis never touches the database, so no path is needed
+    return RecurringDetector(None, calendar_aware=calendar_aware).analyze_groups(groups, min_confidence)
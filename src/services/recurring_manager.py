@@ -9,7 +9,9 @@ Author: Saeed Hoss
 
 import sqlite3
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from utils.db import get_connection, get_data_version
+from utils.metrics import record_cache_hit, record_cache_miss
 
 
 class RecurringManager:
@@ -36,7 +38,7 @@ class RecurringManager:
         Returns:
             Dictionary with recurring transaction data or None
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -64,7 +66,7 @@ class RecurringManager:
         Returns:
             List of recurring transaction dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -107,7 +109,7 @@ class RecurringManager:
         Returns:
             ID of created recurring transaction
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -154,7 +156,7 @@ class RecurringManager:
         Returns:
             True if updated, False if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -163,7 +165,7 @@ class RecurringManager:
             params = []
             
             for field in ['merchant_name', 'description_pattern', 'frequency', 'average_amount',
-                         'amount_variance', 'category_id', 'alert_if_missing', 'alert_if_amount_changes']:
+                         'amount_variance', 'category_id', 'status', 'alert_if_missing', 'alert_if_amount_changes']:
                 if field in updates:
                     update_fields.append(f"{field} = ?")
                     params.append(updates[field])
@@ -197,7 +199,7 @@ class RecurringManager:
         Returns:
             True if deleted, False if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -228,7 +230,7 @@ class RecurringManager:
         Returns:
             List of upcoming recurring transactions
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -259,7 +261,7 @@ class RecurringManager:
         Returns:
             List of recurring transactions
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -285,7 +287,7 @@ class RecurringManager:
         Returns:
             Sum of all monthly recurring transaction amounts
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -314,38 +316,11 @@ class RecurringManager:
         Returns:
             List of missing payment alerts
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
         
         try:
-            cutoff_date = (date.today() - timedelta(days=days_overdue)).strftime('%Y-%m-%d')
-            
-            cursor.execute("""
-                SELECT r.*, c.name as category_name
-                FROM recurring_transactions r
-                LEFT JOIN categories c ON r.category_id = c.id
-                WHERE r.status = 'active'
-                  AND r.alert_if_missing = 1
-                  AND r.next_expected_date <= ?
-                ORDER BY r.next_expected_date ASC
-            """, (cutoff_date,))
-            
-            alerts = []
-            for row in cursor.fetchall():
-                rec = dict(row)
-                expected_date = datetime.strptime(rec['next_expected_date'], '%Y-%m-%d').date()
-                days_late = (date.today() - expected_date).days
-                
-                alerts.append({
-                    **rec,
-                    'alert_type': 'missing_payment',
-                    'days_late': days_late,
-                    'severity': 'high' if days_late > 7 else 'medium'
-                })
-            
-            return alerts
-            
+            return self._find_missing_payments(conn.cursor(), days_overdue)
         finally:
             conn.close()
     
@@ -359,43 +334,11 @@ class RecurringManager:
         Returns:
             List of amount change alerts
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
         
         try:
-            # Get recurring transactions with recent instances
-            cursor.execute("""
-                SELECT r.*, c.name as category_name,
-                       i.actual_amount, i.actual_date,
-                       ABS(i.actual_amount - r.average_amount) as variance
-                FROM recurring_transactions r
-                LEFT JOIN categories c ON r.category_id = c.id
-                LEFT JOIN recurring_transaction_instances i ON r.id = i.recurring_id
-                WHERE r.status = 'active'
-                  AND r.alert_if_amount_changes = 1
-                  AND i.actual_date = r.last_transaction_date
-                ORDER BY i.actual_date DESC
-            """)
-            
-            alerts = []
-            for row in cursor.fetchall():
-                rec = dict(row)
-                variance_pct = rec['variance'] / rec['average_amount'] if rec['average_amount'] > 0 else 0
-                
-                if variance_pct > variance_threshold:
-                    alerts.append({
-                        **rec,
-                        'alert_type': 'amount_changed',
-                        'variance_percent': round(variance_pct * 100, 1),
-                        'old_amount': rec['average_amount'],
-                        'new_amount': rec['actual_amount'],
-                        'difference': round(rec['variance'], 2),
-                        'severity': 'high' if variance_pct > 0.25 else 'medium'
-                    })
-            
-            return alerts
-            
+            return self._find_amount_changes(conn.cursor(), variance_threshold)
         finally:
             conn.close()
     
@@ -403,15 +346,188 @@ class RecurringManager:
         """
         Get all alerts (missing payments and amount changes).
         
+        Alerts are read from the recurring_alerts table, which is recomputed
+        only when the recurring data version or the current day changes.
+        Without that table (migration not run) they are computed directly.
+        
         Returns:
             Dictionary with 'missing' and 'changed' alert lists
         """
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            if self._refresh_alerts(cursor):
+                missing, changed = self._read_alerts(cursor)
+            else:
+                missing = self._find_missing_payments(cursor)
+                changed = self._find_amount_changes(cursor)
+            
+            return {
+                'missing': missing,
+                'changed': changed,
+                'total_count': len(missing) + len(changed)
+            }
+            
+        finally:
+            conn.close()
+    
+    def _find_missing_payments(self, cursor: sqlite3.Cursor, days_overdue: int = 3) -> List[Dict]:
+        """Missing payment alerts computed from recurring_transactions."""
+        cutoff_date = (date.today() - timedelta(days=days_overdue)).strftime('%Y-%m-%d')
+        
+        cursor.execute("""
+            SELECT r.*, c.name as category_name
+            FROM recurring_transactions r
+            LEFT JOIN categories c ON r.category_id = c.id
+            WHERE r.status = 'active'
+              AND r.alert_if_missing = 1
+              AND r.next_expected_date <= ?
+            ORDER BY r.next_expected_date ASC
+        """, (cutoff_date,))
+        
+        alerts = []
+        for row in cursor.fetchall():
+            rec = dict(row)
+            expected_date = datetime.strptime(rec['next_expected_date'], '%Y-%m-%d').date()
+            days_late = (date.today() - expected_date).days
+            
+            alerts.append({
+                **rec,
+                'alert_type': 'missing_payment',
+                'days_late': days_late,
+                'severity': 'high' if days_late > 7 else 'medium'
+            })
+        
+        return alerts
+    
+    def _find_amount_changes(self, cursor: sqlite3.Cursor, variance_threshold: float = 0.10) -> List[Dict]:
+        """Amount change alerts computed from the latest instance of each pattern."""
+        # Get recurring transactions with recent instances
+        cursor.execute("""
+            SELECT r.*, c.name as category_name,
+                   i.actual_amount, i.actual_date,
+                   ABS(i.actual_amount - r.average_amount) as variance
+            FROM recurring_transactions r
+            LEFT JOIN categories c ON r.category_id = c.id
+            LEFT JOIN recurring_transaction_instances i ON r.id = i.recurring_id
+            WHERE r.status = 'active'
+              AND r.alert_if_amount_changes = 1
+              AND i.actual_date = r.last_transaction_date
+            ORDER BY i.actual_date DESC
+        """)
+        
+        alerts = []
+        for row in cursor.fetchall():
+            rec = dict(row)
+            variance_pct = rec['variance'] / rec['average_amount'] if rec['average_amount'] > 0 else 0
+            
+            if variance_pct > variance_threshold:
+                alerts.append(self._amount_change_alert(rec, variance_pct))
+        
+        return alerts
+    
+    def _amount_change_alert(self, rec: Dict, variance_pct: float) -> Dict:
+        """Build an amount change alert from a pattern row with its latest instance."""
         return {
-            'missing': self.get_missing_payments(),
-            'changed': self.get_amount_changes(),
-            'total_count': len(self.get_missing_payments()) + len(self.get_amount_changes())
+            **rec,
+            'alert_type': 'amount_changed',
+            'variance_percent': round(variance_pct * 100, 1),
+            'old_amount': rec['average_amount'],
+            'new_amount': rec['actual_amount'],
+            'difference': round(rec['variance'], 2),
+            'severity': 'high' if variance_pct > 0.25 else 'medium'
         }
     
+    def _refresh_alerts(self, cursor: sqlite3.Cursor) -> bool:
+        """
+        Recompute recurring_alerts if recurring data or the day has changed.
+        
+        Args:
+            cursor: Cursor on the application database
+        
+        Returns:
+            True if recurring_alerts is current, False if the alert tables are missing
+        """
+        version = get_data_version(cursor, 'recurring')
+        if version is None:
+            return False
+        
+        try:
+            cursor.execute("SELECT data_version, computed_for FROM recurring_alerts_state WHERE id = 1")
+        except sqlite3.OperationalError:
+            return False
+        
+        today = date.today().strftime('%Y-%m-%d')
+        state = cursor.fetchone()
+        if state and state[0] == version and state[1] == today:
+            record_cache_hit('recurring_alerts')
+            return True
+        
+        record_cache_miss('recurring_alerts')
+        missing = self._find_missing_payments(cursor)
+        changed = self._find_amount_changes(cursor)
+        
+        cursor.execute("DELETE FROM recurring_alerts")
+        cursor.executemany("""
+            INSERT INTO recurring_alerts (
+                recurring_id, alert_type, severity, days_late,
+                actual_amount, actual_date, variance, variance_percent
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (alert['id'], alert['alert_type'], alert['severity'], alert['days_late'],
+             None, None, None, None)
+            for alert in missing
+        ] + [
+            (alert['id'], alert['alert_type'], alert['severity'], None,
+             alert['actual_amount'], alert['actual_date'], alert['variance'], alert['variance_percent'])
+            for alert in changed
+        ])
+        cursor.execute("""
+            INSERT OR REPLACE INTO recurring_alerts_state (id, data_version, computed_for, computed_at)
+            VALUES (1, ?, ?, ?)
+        """, (version, today, datetime.now()))
+        cursor.connection.commit()
+        
+        return True
+    
+    def _read_alerts(self, cursor: sqlite3.Cursor) -> Tuple[List[Dict], List[Dict]]:
+        """Read materialized alerts as (missing, changed) lists."""
+        cursor.execute("""
+            SELECT r.*, c.name as category_name,
+                   a.alert_type as _alert_type, a.severity as _severity,
+                   a.days_late as _days_late, a.actual_amount as _actual_amount,
+                   a.actual_date as _actual_date, a.variance as _variance
+            FROM recurring_alerts a
+            JOIN recurring_transactions r ON r.id = a.recurring_id
+            LEFT JOIN categories c ON r.category_id = c.id
+            ORDER BY a.id
+        """)
+        
+        missing = []
+        changed = []
+        for row in cursor.fetchall():
+            rec = {key: row[key] for key in row.keys() if not key.startswith('_')}
+            
+            if row['_alert_type'] == 'missing_payment':
+                missing.append({
+                    **rec,
+                    'alert_type': 'missing_payment',
+                    'days_late': row['_days_late'],
+                    'severity': row['_severity']
+                })
+            else:
+                rec.update({
+                    'actual_amount': row['_actual_amount'],
+                    'actual_date': row['_actual_date'],
+                    'variance': row['_variance']
+                })
+                variance_pct = rec['variance'] / rec['average_amount'] if rec['average_amount'] > 0 else 0
+                changed.append(self._amount_change_alert(rec, variance_pct))
+        
+        return missing, changed
+    
     # Instance Management
     
     def add_instance(self, recurring_id: int, transaction_id: int, 
@@ -433,7 +549,7 @@ class RecurringManager:
         Returns:
             Instance ID
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -484,7 +600,7 @@ class RecurringManager:
         Returns:
             List of instance dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -514,7 +630,7 @@ class RecurringManager:
         Returns:
             True if updated, False if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -543,7 +659,7 @@ class RecurringManager:
         Returns:
             Next expected date (YYYY-MM-DD)
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -580,37 +696,43 @@ class RecurringManager:
         Returns:
             Dictionary with counts and totals
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         try:
-            # Count by status
-            cursor.execute("""
-                SELECT status, COUNT(*) as count
-                FROM recurring_transactions
-                GROUP BY status
-            """)
-            
-            status_counts = {row[0]: row[1] for row in cursor.fetchall()}
+            alerts_ready = self._refresh_alerts(cursor)
+            upcoming_end = (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
+            alert_column = ", (SELECT COUNT(*) FROM recurring_alerts) as alert_count" if alerts_ready else ""
             
-            # Calculate monthly recurring total
-            monthly_total = self.get_monthly_total()
+            # Counts, monthly total and upcoming (next 7 days) in one pass
+            cursor.execute(f"""
+                SELECT COUNT(*) as total_count,
+                       COALESCE(SUM(CASE WHEN status = 'active' THEN 1 ELSE 0 END), 0) as active_count,
+                       COALESCE(SUM(CASE WHEN status = 'paused' THEN 1 ELSE 0 END), 0) as paused_count,
+                       SUM(CASE WHEN status = 'active' AND frequency = 'monthly'
+                                THEN average_amount ELSE 0 END) as monthly_total,
+                       COALESCE(SUM(CASE WHEN status = 'active' AND next_expected_date <= ?
+                                         THEN 1 ELSE 0 END), 0) as upcoming_count
+                       {alert_column}
+                FROM recurring_transactions
+            """, (upcoming_end,))
             
-            # Count upcoming (next 7 days)
-            upcoming = self.get_upcoming(days=7)
+            stats = dict(cursor.fetchone())
             
-            # Get alerts
-            alerts = self.get_all_alerts()
+            if not alerts_ready:
+                stats['alert_count'] = (
+                    len(self._find_missing_payments(cursor)) + len(self._find_amount_changes(cursor))
+                )
             
             return {
-                'active_count': status_counts.get('active', 0),
-                'paused_count': status_counts.get('paused', 0),
-                'total_count': sum(status_counts.values()),
-                'monthly_total': round(monthly_total, 2),
-                'upcoming_count': len(upcoming),
-                'alert_count': alerts['total_count']
+                'active_count': stats['active_count'],
+                'paused_count': stats['paused_count'],
+                'total_count': stats['total_count'],
+                'monthly_total': round(stats['monthly_total'] or 0.0, 2),
+                'upcoming_count': stats['upcoming_count'],
+                'alert_count': stats['alert_count']
             }
             
         finally:
             conn.close()
-
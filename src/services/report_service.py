@@ -5,8 +5,9 @@ Aggregates transaction data for financial reports and charts
 
 import sqlite3
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from flask import current_app
+from utils.db import get_connection, table_exists
 
 
 class ReportService:
@@ -17,7 +18,7 @@ class ReportService:
     
     def _get_connection(self):
         """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -94,15 +95,93 @@ class ReportService:
         conn.close()
         return results
     
+    def _category_scope(
+        self,
+        cursor: sqlite3.Cursor,
+        level: Optional[int] = None,
+        category_id: Optional[int] = None
+    ) -> Tuple[str, List[Any], str, List[Any]]:
+        """
+        Category join and subtree filter for transaction aggregates (alias t).
+        
+        Args:
+            cursor: Cursor used to check for the category_closure table
+            level: Roll each transaction up to its ancestor at this level (1-3);
+                   categories above that level are kept as they are
+            category_id: Only include transactions in this category's subtree
+        
+        Returns:
+            Tuple of (join SQL exposing the reported category as c, join params,
+            WHERE fragment, WHERE params). Without the category_closure table
+            (migration not run) level is ignored and category_id matches exactly.
+        """
+        if not (level or category_id) or not table_exists(cursor, 'category_closure'):
+            where = " AND t.category_id = ?" if category_id else ""
+            return ("LEFT JOIN categories c ON t.category_id = c.id", [],
+                    where, [category_id] if category_id else [])
+        
+        join = "LEFT JOIN categories c ON t.category_id = c.id"
+        join_params: List[Any] = []
+        if level:
+            # The level-N ancestor of a level-L category is (L - N) steps up
+            join = """
+                LEFT JOIN categories tc ON t.category_id = tc.id
+                LEFT JOIN category_closure cc
+                    ON cc.descendant_id = t.category_id
+                    AND cc.depth = MAX(tc.level - ?, 0)
+                LEFT JOIN categories c ON cc.ancestor_id = c.id
+            """
+            join_params.append(level)
+        
+        where = ""
+        where_params: List[Any] = []
+        if category_id:
+            where = """ AND t.category_id IN (
+                SELECT descendant_id FROM category_closure WHERE ancestor_id = ?
+            )"""
+            where_params.append(category_id)
+        
+        return join, join_params, where, where_params
+    
+    def _transaction_filters(
+        self,
+        account_id: Optional[int],
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ) -> Tuple[str, List[Any]]:
+        """WHERE fragment for the common account and date filters (alias t)"""
+        where = ""
+        params: List[Any] = []
+        
+        if account_id:
+            where += " AND t.account_id = ?"
+            params.append(account_id)
+        
+        if start_date:
+            where += " AND t.date >= ?"
+            params.append(self._format_date(start_date))
+        
+        if end_date:
+            where += " AND t.date <= ?"
+            params.append(self._format_date(end_date))
+        
+        return where, params
+    
     def get_category_breakdown(
         self,
         account_id: Optional[int] = None,
         start_date: Optional[date] = None,
-        end_date: Optional[date] = None
+        end_date: Optional[date] = None,
+        level: Optional[int] = None,
+        category_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Get spending breakdown by category.
         
+        Args:
+            level: Roll spending up to the categories of this level (1-3)
+            category_id: Only break down spending within this category's subtree
+        
         Returns: [
             {
                 "category": "Groceries",
@@ -116,60 +195,31 @@ class ReportService:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        # First, get total expenses for percentage calculation
-        total_query = """
-            SELECT SUM(ABS(amount)) as total
-            FROM transactions
-            WHERE amount < 0
-        """
-        total_params = []
-        
-        if account_id:
-            total_query += " AND account_id = ?"
-            total_params.append(account_id)
-        
-        if start_date:
-            total_query += " AND date >= ?"
-            total_params.append(self._format_date(start_date))
+        join, join_params, scope, scope_params = self._category_scope(cursor, level, category_id)
+        filters, filter_params = self._transaction_filters(account_id, start_date, end_date)
         
-        if end_date:
-            total_query += " AND date <= ?"
-            total_params.append(self._format_date(end_date))
-        
-        cursor.execute(total_query, total_params)
+        # First, get total expenses for percentage calculation
+        cursor.execute(f"""
+            SELECT SUM(ABS(t.amount)) as total
+            FROM transactions t
+            WHERE t.amount < 0{filters}{scope}
+        """, filter_params + scope_params)
         total_row = cursor.fetchone()
         total_expenses = float(total_row['total']) if total_row['total'] else 0.0
         
         # Now get category breakdown
-        query = """
+        cursor.execute(f"""
             SELECT 
                 COALESCE(c.name, 'Uncategorized') as category,
                 SUM(ABS(t.amount)) as amount,
                 COUNT(t.id) as transaction_count
             FROM transactions t
-            LEFT JOIN categories c ON t.category_id = c.id
-            WHERE t.amount < 0
-        """
-        params = []
-        
-        if account_id:
-            query += " AND t.account_id = ?"
-            params.append(account_id)
-        
-        if start_date:
-            query += " AND t.date >= ?"
-            params.append(self._format_date(start_date))
-        
-        if end_date:
-            query += " AND t.date <= ?"
-            params.append(self._format_date(end_date))
-        
-        query += """
+            {join}
+            WHERE t.amount < 0{filters}{scope}
             GROUP BY c.name
             ORDER BY amount DESC
-        """
+        """, join_params + filter_params + scope_params)
         
-        cursor.execute(query, params)
         results = []
         
         for row in cursor.fetchall():
@@ -190,11 +240,17 @@ class ReportService:
         account_id: Optional[int] = None,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-        top_n: int = 10
+        top_n: int = 10,
+        level: Optional[int] = None,
+        category_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Get monthly expenses broken down by category.
         
+        Args:
+            level: Roll spending up to the categories of this level (1-3)
+            category_id: Only include spending within this category's subtree
+        
         Returns: {
             "months": ["2025-01", "2025-02", ...],
             "categories": {
@@ -207,93 +263,53 @@ class ReportService:
         conn = self._get_connection()
         cursor = conn.cursor()
         
+        join, join_params, scope, scope_params = self._category_scope(cursor, level, category_id)
+        filters, filter_params = self._transaction_filters(account_id, start_date, end_date)
+        params = join_params + filter_params + scope_params
+        
         # Get top N categories by total spending
-        top_categories_query = """
+        cursor.execute(f"""
             SELECT 
                 COALESCE(c.name, 'Uncategorized') as category,
                 SUM(ABS(t.amount)) as total
             FROM transactions t
-            LEFT JOIN categories c ON t.category_id = c.id
-            WHERE t.amount < 0
-        """
-        top_params = []
-        
-        if account_id:
-            top_categories_query += " AND t.account_id = ?"
-            top_params.append(account_id)
-        
-        if start_date:
-            top_categories_query += " AND t.date >= ?"
-            top_params.append(self._format_date(start_date))
-        
-        if end_date:
-            top_categories_query += " AND t.date <= ?"
-            top_params.append(self._format_date(end_date))
-        
-        top_categories_query += f"""
+            {join}
+            WHERE t.amount < 0{filters}{scope}
             GROUP BY c.name
             ORDER BY total DESC
-            LIMIT {top_n}
-        """
-        
-        cursor.execute(top_categories_query, top_params)
+            LIMIT {int(top_n)}
+        """, params)
         top_categories = [row['category'] for row in cursor.fetchall()]
         
         # Get all unique months
-        months_query = """
-            SELECT DISTINCT strftime('%Y-%m', date) as month
-            FROM transactions
-            WHERE amount < 0
-        """
-        months_params = []
-        
-        if account_id:
-            months_query += " AND account_id = ?"
-            months_params.append(account_id)
-        
-        if start_date:
-            months_query += " AND date >= ?"
-            months_params.append(self._format_date(start_date))
-        
-        if end_date:
-            months_query += " AND date <= ?"
-            months_params.append(self._format_date(end_date))
-        
-        months_query += " ORDER BY month ASC"
-        
-        cursor.execute(months_query, months_params)
+        cursor.execute(f"""
+            SELECT DISTINCT strftime('%Y-%m', t.date) as month
+            FROM transactions t
+            WHERE t.amount < 0{filters}{scope}
+            ORDER BY month ASC
+        """, filter_params + scope_params)
         months = [row['month'] for row in cursor.fetchall()]
         
-        # Get data for each category and month
-        categories_data = {}
-        
-        for category in top_categories:
-            category_data = []
-            
-            for month in months:
-                query = """
-                    SELECT SUM(ABS(t.amount)) as amount
-                    FROM transactions t
-                    LEFT JOIN categories c ON t.category_id = c.id
-                    WHERE t.amount < 0
-                    AND strftime('%Y-%m', t.date) = ?
-                    AND COALESCE(c.name, 'Uncategorized') = ?
-                """
-                params = [month, category]
-                
-                if account_id:
-                    query += " AND t.account_id = ?"
-                    params.append(account_id)
-                
-                cursor.execute(query, params)
-                row = cursor.fetchone()
-                amount = float(row['amount']) if row['amount'] else 0.0
-                category_data.append(round(amount, 2))
-            
-            categories_data[category] = category_data
+        # Monthly totals for every category in one grouped query
+        cursor.execute(f"""
+            SELECT 
+                strftime('%Y-%m', t.date) as month,
+                COALESCE(c.name, 'Uncategorized') as category,
+                SUM(ABS(t.amount)) as amount
+            FROM transactions t
+            {join}
+            WHERE t.amount < 0{filters}{scope}
+            GROUP BY month, c.name
+        """, params)
+        amounts = {(row['category'], row['month']): row['amount'] for row in cursor.fetchall()}
         
         conn.close()
         
+        categories_data = {
+            category: [round(float(amounts.get((category, month)) or 0.0), 2) for month in months]
+            for category in top_categories
+        }
+        
         return {
             'months': months,
             'categories': categories_data
@@ -2,12 +2,21 @@
 Transaction Validation Service.
 
 Validates transaction data for integrity before database storage.
+
+validate_batch() applies the same rules to a whole batch at once: each
+field is extracted into a column and checked with numpy comparisons, the
+account ids are looked up with one query (existing ids are cached on the
+validator), and only the failing rows are returned.
 """
 
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Set, Tuple, Optional
 import sqlite3
 
+import numpy as np
+
+from utils.db import get_connection
+
 
 class ValidationError:
     """Represents a single validation error."""
@@ -70,6 +79,8 @@ class TransactionValidator:
             db_path: Path to database (for account validation)
         """
         self.db_path = db_path
+        # Account ids known to exist (accounts are looked up once per validator)
+        self._known_accounts: Set[int] = set()
     
     def validate_transaction(self, transaction: Dict) -> ValidationResult:
         """
@@ -117,6 +128,138 @@ class TransactionValidator:
             for transaction in transactions
         ]
     
+    def validate_batch(self, transactions: List[Dict]) -> Dict[int, List[ValidationError]]:
+        """
+        Validate a batch of transactions with column-wise checks.
+        
+        Applies the same rules, with the same messages, as
+        validate_transaction(), without building a result per row.
+        
+        Args:
+            transactions: List of transaction dictionaries
+        
+        Returns:
+            Dictionary of failing row index to its errors, in row order
+            (valid rows are not included)
+        """
+        failures: Dict[int, List[ValidationError]] = {}
+        
+        def fail(mask: np.ndarray, field: str, message: str):
+            for index in np.flatnonzero(mask):
+                failures.setdefault(int(index), []).append(ValidationError(field, message))
+        
+        if not transactions:
+            return failures
+        
+        # Dates: 0 = missing, -1 = not a date object, otherwise the ordinal
+        dates = np.array([
+            0 if value is None else value.toordinal() if isinstance(value, date) else -1
+            for value in (txn.get('date') for txn in transactions)
+        ], dtype=np.int64)
+        today = date.today()
+        min_date = today - timedelta(days=self.MAX_PAST_YEARS * 365)
+        is_date = dates > 0
+        
+        # Amounts: NaN where missing or not a number
+        amount_values = [txn.get('amount') for txn in transactions]
+        amounts, amount_missing, amount_invalid = self._amount_column(amount_values)
+        
+        # Descriptions: stripped length, -1 where missing
+        lengths = np.array([
+            -1 if value is None else len(str(value).strip())
+            for value in (txn.get('description') for txn in transactions)
+        ], dtype=np.int64)
+        
+        # Rules in validate_transaction() order, so each row's errors keep that order
+        fail(dates == 0, 'date', 'Date is required')
+        fail(dates == -1, 'date', 'Date must be a date object')
+        fail(is_date & (dates > today.toordinal()), 'date', 'Date cannot be in the future')
+        fail(is_date & (dates < min_date.toordinal()), 'date',
+             f'Date cannot be more than {self.MAX_PAST_YEARS} years in the past')
+        
+        fail(amount_missing, 'amount', 'Amount is required')
+        fail(amount_invalid, 'amount', 'Amount must be a valid number')
+        with np.errstate(invalid='ignore'):
+            fail(amounts == 0, 'amount', 'Amount cannot be zero')
+            fail(np.abs(amounts) > self.MAX_AMOUNT, 'amount', f'Amount cannot exceed ${self.MAX_AMOUNT:,.2f}')
+        
+        fail(lengths == -1, 'description', 'Description is required')
+        fail((lengths >= 0) & (lengths < self.MIN_DESCRIPTION_LENGTH), 'description',
+             'Description cannot be empty')
+        fail(lengths > self.MAX_DESCRIPTION_LENGTH, 'description',
+             f'Description cannot exceed {self.MAX_DESCRIPTION_LENGTH} characters')
+        
+        self._validate_account_ids(transactions, fail)
+        
+        return dict(sorted(failures.items()))
+    
+    @staticmethod
+    def _amount_column(values: List) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Amounts as floats (NaN where unusable), with missing and invalid masks."""
+        missing = np.array([value is None for value in values])
+        try:
+            # Parsed statements hold numbers only
+            return np.array(values, dtype=float), missing, np.zeros(len(values), dtype=bool)
+        except (ValueError, TypeError):
+            pass
+        
+        amounts = np.full(len(values), np.nan)
+        invalid = np.zeros(len(values), dtype=bool)
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+            try:
+                amounts[index] = float(value)
+            except (ValueError, TypeError):
+                invalid[index] = True
+        return amounts, missing, invalid
+    
+    def _validate_account_ids(self, transactions: List[Dict], fail):
+        """Check the batch's account ids with one lookup of the distinct ids."""
+        account_ids = [txn.get('account_id') for txn in transactions]
+        if all(account_id is None for account_id in account_ids):
+            return
+        
+        parsed = []
+        for account_id in account_ids:
+            try:
+                parsed.append(None if account_id is None else int(account_id))
+            except (ValueError, TypeError):
+                parsed.append(False)
+        fail(np.array([value is False for value in parsed]), 'account_id',
+             'Account ID must be a valid integer')
+        
+        if not self.db_path:
+            return
+        
+        ids = {value for value in parsed if value is not None and value is not False}
+        try:
+            existing = self._existing_accounts(ids)
+        except sqlite3.Error as e:
+            fail(np.array([value is not None and value is not False for value in parsed]),
+                 'account_id', f'Database error: {str(e)}')
+            return
+        
+        for missing_id in sorted(ids - existing):
+            fail(np.array([value is not False and value == missing_id for value in parsed]),
+                 'account_id', f'Account with ID {missing_id} does not exist')
+    
+    def _existing_accounts(self, account_ids: Iterable[int]) -> Set[int]:
+        """The given account ids that exist (only ids not seen before are queried)."""
+        account_ids = set(account_ids)
+        unknown = account_ids - self._known_accounts
+        if unknown:
+            conn = get_connection(self.db_path)
+            try:
+                placeholders = ','.join('?' * len(unknown))
+                rows = conn.execute(
+                    f"SELECT id FROM accounts WHERE id IN ({placeholders})", list(unknown)
+                ).fetchall()
+            finally:
+                conn.close()
+            self._known_accounts.update(row[0] for row in rows)
+        return account_ids & self._known_accounts
+    
     def _validate_date(self, transaction_date, result: ValidationResult):
         """Validate transaction date."""
         # Check if date is provided
@@ -205,16 +348,7 @@ class TransactionValidator:
         # Check if account exists in database (if db_path is provided)
         if self.db_path:
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id FROM accounts WHERE id = ?",
-                    (account_id_int,)
-                )
-                row = cursor.fetchone()
-                conn.close()
-                
-                if not row:
+                if not self._existing_accounts([account_id_int]):
                     result.add_error(
                         'account_id',
                         f'Account with ID {account_id_int} does not exist'
@@ -0,0 +1,59 @@
+"""
+Shared SQLite connection helper.
+
+Models, services and routes open their connections through get_connection()
+so cross-cutting concerns such as query tracing live in one place.
+"""
+
+import sqlite3
+from typing import Optional
+
+from utils import sql_tracer
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Open a connection to the application database.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        sqlite3.Connection (traced when a request trace is active)
+    """
+    return sql_tracer.connect(db_path)
+
+
+def get_data_version(cursor: sqlite3.Cursor, name: str) -> Optional[int]:
+    """
+    Read a data version counter (bumped by triggers when tracked tables change).
+
+    Args:
+        cursor: Cursor on the application database
+        name: Version counter name (e.g. 'recurring')
+
+    Returns:
+        Current version, or None if the data_versions table or the counter's
+        row does not exist (its migration has not been run)
+    """
+    try:
+        cursor.execute("SELECT version FROM data_versions WHERE name = ?", (name,))
+    except sqlite3.OperationalError:
+        return None
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def table_exists(cursor: sqlite3.Cursor, name: str) -> bool:
+    """
+    Check whether a table exists (optional tables are added by migrations).
+
+    Args:
+        cursor: Cursor on the application database
+        name: Table name
+
+    Returns:
+        True if the table exists
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return cursor.fetchone() is not None
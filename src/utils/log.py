@@ -0,0 +1,126 @@
+"""
+Application logging.
+
+Services log through module loggers (`logging.getLogger(__name__)`)
+instead of printing. configure_logging() installs a single stderr handler
+on the root logger that writes one key=value line per record; the level
+comes from the LOG_LEVEL environment variable (default INFO). Structured
+fields are passed as `extra={'fields': {...}}` and appended to the line.
+
+Per-row messages inside hot loops (unparseable CSV rows, bad dates) go
+through a SampledLogger: it logs the first few occurrences of each message
+key, then only every Nth one, and counts all of them so the caller can log
+a single total once the loop is done.
+"""
+
+import logging
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+
+DEFAULT_LEVEL = 'INFO'
+
+LOG_FORMAT = 'time=%(asctime)s level=%(levelname)s logger=%(name)s msg="%(message)s"'
+
+# Occurrences of a sampled message logged in full before sampling starts
+SAMPLE_FIRST = 5
+
+# After that, every Nth occurrence is logged
+SAMPLE_EVERY = 1000
+
+
+def _format_value(value) -> str:
+    text = str(value)
+    if not text or any(c in text for c in ' "='):
+        return '"' + text.replace('"', '\\"') + '"'
+    return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Formatter that appends a record's `fields` extra as key=value pairs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f'{key}={_format_value(value)}' for key, value in fields.items())
+        return line
+
+
+def configure_logging(level: Optional[str] = None):
+    """
+    Install the application log handler on the root logger (once).
+
+    Args:
+        level: Level name (defaults to the LOG_LEVEL environment variable)
+    """
+    root = logging.getLogger()
+    level = (level or os.environ.get('LOG_LEVEL') or DEFAULT_LEVEL).upper()
+    root.setLevel(level)
+
+    if not any(getattr(handler, '_financial_assistant', False) for handler in root.handlers):
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(KeyValueFormatter(LOG_FORMAT))
+        handler._financial_assistant = True
+        root.addHandler(handler)
+
+
+class SampledLogger:
+    """Log a repeated message in full a few times, then only every Nth occurrence."""
+
+    def __init__(self, logger: logging.Logger, first: int = SAMPLE_FIRST, every: int = SAMPLE_EVERY):
+        """
+        Initialize the sampler.
+
+        Args:
+            logger: Logger the sampled records go to
+            first: Occurrences per key logged before sampling starts
+            every: Log every Nth occurrence after that
+        """
+        self.logger = logger
+        self.first = first
+        self.every = every
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def log(self, level: int, key: str, msg: str, *args):
+        """
+        Count an occurrence of `key` and log it if it is sampled.
+
+        Args:
+            level: Logging level
+            key: Message key the occurrences are counted under
+            msg: Message format string
+            *args: Message arguments
+        """
+        with self._lock:
+            count = self.counts[key] = self.counts.get(key, 0) + 1
+
+        if count > self.first and count % self.every:
+            return
+        if not self.logger.isEnabledFor(level):
+            return
+        if count > self.first:
+            msg += ' (occurrence %d, others not logged)'
+            args += (count,)
+        self.logger.log(level, msg, *args)
+
+    def warning(self, key: str, msg: str, *args):
+        self.log(logging.WARNING, key, msg, *args)
+
+    def total(self, key: Optional[str] = None) -> int:
+        """Occurrences counted for one key, or for all keys."""
+        with self._lock:
+            return self.counts.get(key, 0) if key else sum(self.counts.values())
+
+    def flush(self, level: int = logging.WARNING):
+        """Log the total of every key that was sampled and reset the counts."""
+        with self._lock:
+            counts, self.counts = self.counts, {}
+
+        for key, count in counts.items():
+            if count > self.first:
+                self.logger.log(level, '%s: %d occurrences (%d logged)', key, count,
+                                self.first + count // self.every - self.first // self.every)
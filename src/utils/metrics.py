@@ -0,0 +1,369 @@
+"""
+In-process application metrics.
+
+A small, dependency-free registry of counters, gauges and histograms that
+is rendered in the Prometheus text exposition format at /metrics. Request
+metrics are recorded by hooks registered in init_app(); services report
+import throughput and cache hits through the helpers at the bottom of this
+module.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Payload size buckets in bytes
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Queries issued per request
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+# Import throughput buckets in rows per second
+THROUGHPUT_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}'
+        ]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed bucket boundaries."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def get_count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return series[-1] if series else 0
+
+    def get_sum(self, **labels) -> float:
+        series = self._values.get(self._key(labels))
+        return series[-2] if series else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for i, bound in enumerate(self.buckets):
+                cumulative += series[i]
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series[-2])}')
+            lines.append(f'{self.name}_count{labels} {series[-1]}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        _update_cache_ratios()
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        """Reset all recorded values (used by tests)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_COUNT = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests handled',
+    ('blueprint', 'endpoint', 'method', 'status')
+)
+REQUEST_ERRORS = REGISTRY.counter(
+    'http_request_errors_total', 'HTTP requests that failed with a 5xx status or an unhandled exception',
+    ('blueprint', 'endpoint')
+)
+REQUEST_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Request latency per route',
+    ('blueprint', 'endpoint')
+)
+BLUEPRINT_LATENCY = REGISTRY.histogram(
+    'http_blueprint_request_duration_seconds', 'Request latency per blueprint',
+    ('blueprint',)
+)
+REQUEST_SIZE = REGISTRY.histogram(
+    'http_request_size_bytes', 'Request payload size per route',
+    ('blueprint', 'endpoint'), SIZE_BUCKETS
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    'http_response_size_bytes', 'Response payload size per route',
+    ('blueprint', 'endpoint'), SIZE_BUCKETS
+)
+REQUEST_QUERIES = REGISTRY.histogram(
+    'http_request_sql_queries', 'SQL queries issued per request',
+    ('blueprint', 'endpoint'), QUERY_COUNT_BUCKETS
+)
+IMPORT_ROWS = REGISTRY.counter(
+    'import_rows_total', 'Transaction rows imported', ('source',)
+)
+IMPORT_SECONDS = REGISTRY.counter(
+    'import_duration_seconds_total', 'Time spent importing transactions', ('source',)
+)
+IMPORT_THROUGHPUT = REGISTRY.histogram(
+    'import_throughput_rows_per_second', 'Rows per second for each import', ('source',),
+    THROUGHPUT_BUCKETS
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'cache_requests_total', 'Cache lookups by result', ('cache', 'result')
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    'cache_hit_ratio', 'Fraction of cache lookups that were hits', ('cache',)
+)
+JOB_RUNS = REGISTRY.counter(
+    'jobs_total', 'Background jobs finished by type and final status', ('type', 'status')
+)
+JOB_DURATION = REGISTRY.histogram(
+    'job_duration_seconds', 'Background job run time by type', ('type',),
+    (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+)
+
+
+def record_import(rows: int, elapsed: float, source: str = 'csv'):
+    """
+    Record an import's row count and duration.
+
+    Args:
+        rows: Number of rows processed
+        elapsed: Wall-clock seconds the import took
+        source: Import path (e.g. 'csv', 'batch')
+    """
+    IMPORT_ROWS.inc(rows, source=source)
+    IMPORT_SECONDS.inc(elapsed, source=source)
+    if elapsed > 0:
+        IMPORT_THROUGHPUT.observe(rows / elapsed, source=source)
+
+
+def record_cache_hit(cache: str):
+    """Record a cache hit for the named cache."""
+    CACHE_REQUESTS.inc(cache=cache, result='hit')
+
+
+def record_cache_miss(cache: str):
+    """Record a cache miss for the named cache."""
+    CACHE_REQUESTS.inc(cache=cache, result='miss')
+
+
+def record_job(job_type: str, status: str, elapsed: float):
+    """
+    Record a finished background job.
+
+    Args:
+        job_type: Job type (e.g. 'recategorize')
+        status: Final status ('completed', 'failed' or 'cancelled')
+        elapsed: Seconds the job ran
+    """
+    JOB_RUNS.inc(type=job_type, status=status)
+    JOB_DURATION.observe(elapsed, type=job_type)
+
+
+def _update_cache_ratios():
+    with CACHE_REQUESTS._lock:
+        items = list(CACHE_REQUESTS._values.items())
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in items:
+        hits_total = totals.setdefault(cache, [0, 0])
+        if result == 'hit':
+            hits_total[0] += value
+        hits_total[1] += value
+    for cache, (hits, total) in totals.items():
+        CACHE_HIT_RATIO.set(hits / total if total else 0.0, cache=cache)
+
+
+def _route_labels(request) -> Dict[str, str]:
+    """Low-cardinality labels for a request: blueprint and route template."""
+    return {
+        'blueprint': request.blueprint or 'app',
+        'endpoint': request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    }
+
+
+def init_app(app):
+    """Register request hooks that record latency, counts, errors and sizes."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.get('metrics_start')
+        if start is None:
+            return response
+
+        elapsed = time.perf_counter() - start
+        labels = _route_labels(request)
+
+        REQUEST_COUNT.inc(method=request.method, status=str(response.status_code), **labels)
+        REQUEST_LATENCY.observe(elapsed, **labels)
+        BLUEPRINT_LATENCY.observe(elapsed, blueprint=labels['blueprint'])
+        REQUEST_SIZE.observe(request.content_length or 0, **labels)
+        if response.content_length is not None:
+            RESPONSE_SIZE.observe(response.content_length, **labels)
+        if response.status_code >= 500:
+            REQUEST_ERRORS.inc(**labels)
+            g.metrics_error_recorded = True
+
+        sql_stats = g.get('sql_stats')
+        if sql_stats is not None:
+            REQUEST_QUERIES.observe(sql_stats.query_count, **labels)
+
+        return response
+
+    @app.teardown_request
+    def _record_request_error(exc):
+        # Unhandled exceptions that bypass after_request (e.g. when exceptions
+        # propagate) are still counted as errors.
+        if exc is not None and not g.get('metrics_error_recorded'):
+            REQUEST_ERRORS.inc(**_route_labels(request))
@@ -0,0 +1,504 @@
+"""
+Shared schema definitions.
+
+DDL and maintenance SQL for the tables added by the migrate_add_*.py
+scripts. The migrations apply these statements to an existing database;
+services that create their tables on first use (or rebuild derived data)
+import them from here, so application code never depends on a one-off
+migration script.
+
+Every statement is idempotent (IF NOT EXISTS / OR IGNORE) unless it is
+listed under a *_REBUILD name, which recomputes derived data from scratch.
+"""
+
+# ---------------------------------------------------------------------------
+# Balance tracking (migrate_add_balance_tracking.py)
+# ---------------------------------------------------------------------------
+
+# Transactions between two checkpoints of the same account
+CHECKPOINT_INTERVAL = 500
+
+BALANCE_TRACKING_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS account_balance_checkpoints (
+        account_id INTEGER NOT NULL,
+        date DATE NOT NULL,
+        transaction_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        cumulative DECIMAL(14, 2) NOT NULL,
+        PRIMARY KEY (account_id, date, transaction_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions(account_id, date)",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_insert_balance
+    AFTER INSERT ON transactions
+    BEGIN
+        UPDATE accounts
+        SET current_balance = COALESCE(current_balance, 0) + NEW.amount
+        WHERE id = NEW.account_id;
+        DELETE FROM account_balance_checkpoints
+        WHERE account_id = NEW.account_id
+          AND (date, transaction_id) >= (NEW.date, NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_delete_balance
+    AFTER DELETE ON transactions
+    BEGIN
+        UPDATE accounts
+        SET current_balance = COALESCE(current_balance, 0) - OLD.amount
+        WHERE id = OLD.account_id;
+        DELETE FROM account_balance_checkpoints
+        WHERE account_id = OLD.account_id
+          AND (date, transaction_id) >= (OLD.date, OLD.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_update_balance
+    AFTER UPDATE OF amount, account_id, date ON transactions
+    WHEN OLD.amount IS NOT NEW.amount
+      OR OLD.account_id IS NOT NEW.account_id
+      OR OLD.date IS NOT NEW.date
+    BEGIN
+        UPDATE accounts
+        SET current_balance = COALESCE(current_balance, 0) - OLD.amount
+        WHERE id = OLD.account_id;
+        UPDATE accounts
+        SET current_balance = COALESCE(current_balance, 0) + NEW.amount
+        WHERE id = NEW.account_id;
+        DELETE FROM account_balance_checkpoints
+        WHERE account_id = OLD.account_id
+          AND (date, transaction_id) >= (OLD.date, OLD.id);
+        DELETE FROM account_balance_checkpoints
+        WHERE account_id = NEW.account_id
+          AND (date, transaction_id) >= (NEW.date, NEW.id);
+    END
+    """,
+]
+
+# Recompute current balances and checkpoints from scratch
+BALANCE_TRACKING_REBUILD = [
+    """
+    UPDATE accounts
+    SET current_balance = COALESCE(initial_balance, 0) + COALESCE((
+        SELECT SUM(amount) FROM transactions WHERE transactions.account_id = accounts.id
+    ), 0)
+    """,
+    "DELETE FROM account_balance_checkpoints",
+    f"""
+    INSERT INTO account_balance_checkpoints (account_id, date, transaction_id, position, cumulative)
+    SELECT account_id, date, id, position, cumulative
+    FROM (
+        SELECT account_id, date, id,
+               ROW_NUMBER() OVER w as position,
+               SUM(amount) OVER w as cumulative
+        FROM transactions
+        WINDOW w AS (PARTITION BY account_id ORDER BY date, id ROWS UNBOUNDED PRECEDING)
+    )
+    WHERE position % {CHECKPOINT_INTERVAL} = 0
+    """,
+]
+
+
+# ---------------------------------------------------------------------------
+# Daily balances (migrate_add_daily_balances.py)
+# ---------------------------------------------------------------------------
+
+def _apply_daily(sign: str, row: str) -> str:
+    """Upsert adding a transaction's amount (sign '+' or '-') to its day."""
+    return f"""
+        INSERT INTO daily_balances (account_id, date, net_change)
+        VALUES ({row}.account_id, {row}.date, {sign}{row}.amount)
+        ON CONFLICT (account_id, date) DO UPDATE
+        SET net_change = net_change + excluded.net_change;
+    """
+
+
+DAILY_BALANCES_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS daily_balances (
+        account_id INTEGER NOT NULL,
+        date DATE NOT NULL,
+        net_change DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (account_id, date)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_insert_daily
+    AFTER INSERT ON transactions
+    BEGIN
+        {_apply_daily('+', 'NEW')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_delete_daily
+    AFTER DELETE ON transactions
+    BEGIN
+        {_apply_daily('-', 'OLD')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_update_daily
+    AFTER UPDATE OF amount, account_id, date ON transactions
+    WHEN OLD.amount IS NOT NEW.amount
+      OR OLD.account_id IS NOT NEW.account_id
+      OR OLD.date IS NOT NEW.date
+    BEGIN
+        {_apply_daily('-', 'OLD')}
+        {_apply_daily('+', 'NEW')}
+    END
+    """,
+]
+
+# Recompute every day from the transactions
+DAILY_BALANCES_REBUILD = [
+    "DELETE FROM daily_balances",
+    """
+    INSERT INTO daily_balances (account_id, date, net_change)
+    SELECT account_id, date, SUM(amount)
+    FROM transactions
+    GROUP BY account_id, date
+    """,
+]
+
+
+# ---------------------------------------------------------------------------
+# Category closure (migrate_add_category_closure.py)
+# ---------------------------------------------------------------------------
+
+CATEGORY_CLOSURE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS category_closure (
+        ancestor_id INTEGER NOT NULL,
+        descendant_id INTEGER NOT NULL,
+        depth INTEGER NOT NULL,
+        PRIMARY KEY (ancestor_id, descendant_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_category_closure_descendant
+    ON category_closure(descendant_id, depth)
+    """,
+    # New category: itself plus every ancestor of its parent
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_categories_insert_closure
+    AFTER INSERT ON categories
+    BEGIN
+        INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, NEW.id, depth + 1
+        FROM category_closure
+        WHERE descendant_id = NEW.parent_id
+        UNION ALL
+        SELECT NEW.id, NEW.id, 0;
+    END
+    """,
+    # Re-parented category: detach its subtree from the old ancestors and
+    # attach it below every ancestor of the new parent
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_categories_move_closure
+    AFTER UPDATE OF parent_id ON categories
+    WHEN OLD.parent_id IS NOT NEW.parent_id
+    BEGIN
+        DELETE FROM category_closure
+        WHERE descendant_id IN (
+                SELECT descendant_id FROM category_closure WHERE ancestor_id = NEW.id
+            )
+          AND ancestor_id NOT IN (
+                SELECT descendant_id FROM category_closure WHERE ancestor_id = NEW.id
+            );
+        INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+        SELECT p.ancestor_id, s.descendant_id, p.depth + s.depth + 1
+        FROM category_closure p
+        JOIN category_closure s ON s.ancestor_id = NEW.id
+        WHERE p.descendant_id = NEW.parent_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_categories_delete_closure
+    AFTER DELETE ON categories
+    BEGIN
+        DELETE FROM category_closure
+        WHERE descendant_id = OLD.id OR ancestor_id = OLD.id;
+    END
+    """,
+]
+
+# Rebuild the closure from categories.parent_id
+CATEGORY_CLOSURE_REBUILD = [
+    "DELETE FROM category_closure",
+    """
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM categories
+        UNION ALL
+        SELECT c.parent_id, tree.descendant_id, tree.depth + 1
+        FROM tree
+        JOIN categories c ON c.id = tree.ancestor_id
+        WHERE c.parent_id IS NOT NULL
+    )
+    SELECT ancestor_id, descendant_id, depth FROM tree
+    """,
+]
+
+
+# ---------------------------------------------------------------------------
+# Data versions (migrate_add_data_versions.py, migrate_add_recurring_alerts.py)
+# ---------------------------------------------------------------------------
+
+DATA_VERSIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+
+def version_triggers(tables, counter=None):
+    """Triggers bumping a data version counter on every change to the tables (default counter: the table name)."""
+    return [
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+    AFTER {event} ON {table}
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = '{counter or table}';
+    END
+    """
+        for table in tables
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+
+# Tables with their own version counter (counter name = table name)
+VERSIONED_TABLES = ['categories', 'transactions']
+
+DATA_VERSIONS_SCHEMA = [DATA_VERSIONS_TABLE] + [
+    f"INSERT OR IGNORE INTO data_versions (name, version) VALUES ('{table}', 0)"
+    for table in VERSIONED_TABLES
+] + version_triggers(VERSIONED_TABLES)
+
+
+# ---------------------------------------------------------------------------
+# Recurring alerts (migrate_add_recurring_alerts.py)
+# ---------------------------------------------------------------------------
+
+# Tables whose changes invalidate the recurring alerts
+RECURRING_VERSIONED_TABLES = ['recurring_transactions', 'recurring_transaction_instances']
+
+RECURRING_ALERTS_SCHEMA = [
+    DATA_VERSIONS_TABLE,
+    "INSERT OR IGNORE INTO data_versions (name, version) VALUES ('recurring', 0)",
+    """
+    CREATE TABLE IF NOT EXISTS recurring_alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recurring_id INTEGER NOT NULL,
+        alert_type TEXT NOT NULL CHECK(alert_type IN ('missing_payment', 'amount_changed')),
+        severity TEXT NOT NULL,
+        days_late INTEGER,
+        actual_amount DECIMAL(12, 2),
+        actual_date DATE,
+        variance DECIMAL(12, 2),
+        variance_percent REAL,
+        FOREIGN KEY (recurring_id) REFERENCES recurring_transactions(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recurring_alerts_state (
+        id INTEGER PRIMARY KEY CHECK(id = 1),
+        data_version INTEGER NOT NULL,
+        computed_for DATE NOT NULL,
+        computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+] + version_triggers(RECURRING_VERSIONED_TABLES, counter='recurring')
+
+
+# ---------------------------------------------------------------------------
+# Background jobs (migrate_add_jobs.py)
+# ---------------------------------------------------------------------------
+
+JOBS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending'
+            CHECK(status IN ('pending', 'running', 'completed', 'failed', 'cancelled')),
+        params TEXT,
+        progress_current INTEGER NOT NULL DEFAULT 0,
+        progress_total INTEGER,
+        message TEXT,
+        result TEXT,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)",
+]
+
+
+# ---------------------------------------------------------------------------
+# Import history (migrate_add_import_runs.py)
+# ---------------------------------------------------------------------------
+
+IMPORT_RUNS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS import_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id INTEGER,
+        filename TEXT,
+        status TEXT NOT NULL CHECK(status IN ('completed', 'failed', 'cancelled')),
+        rows_parsed INTEGER NOT NULL DEFAULT 0,
+        rows_skipped INTEGER NOT NULL DEFAULT 0,
+        invalid INTEGER NOT NULL DEFAULT 0,
+        duplicates INTEGER NOT NULL DEFAULT 0,
+        inserted INTEGER NOT NULL DEFAULT 0,
+        categorized INTEGER NOT NULL DEFAULT 0,
+        recurring_linked INTEGER NOT NULL DEFAULT 0,
+        warnings TEXT,
+        stages TEXT,
+        error TEXT,
+        elapsed_ms REAL,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_import_runs_account ON import_runs(account_id)",
+    "CREATE INDEX IF NOT EXISTS idx_import_runs_started ON import_runs(started_at)",
+]
+
+
+def ensure_import_runs_schema(cursor) -> bool:
+    """
+    Create the import_runs table, rebuilding one without the 'cancelled' status.
+
+    Args:
+        cursor: Database cursor
+
+    Returns:
+        True if an existing table was rebuilt
+    """
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'import_runs'")
+    row = cursor.fetchone()
+    rebuild = row is not None and "'cancelled'" not in row[0]
+    if rebuild:
+        # SQLite cannot alter a CHECK constraint: copy into a new table,
+        # in one transaction
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN")
+        cursor.execute("ALTER TABLE import_runs RENAME TO import_runs_old")
+        cursor.execute("DROP INDEX IF EXISTS idx_import_runs_account")
+        cursor.execute("DROP INDEX IF EXISTS idx_import_runs_started")
+
+    for statement in IMPORT_RUNS_SCHEMA:
+        cursor.execute(statement)
+
+    if rebuild:
+        cursor.execute("INSERT INTO import_runs SELECT * FROM import_runs_old")
+        cursor.execute("DROP TABLE import_runs_old")
+        cursor.connection.commit()
+    return rebuild
+
+
+# ---------------------------------------------------------------------------
+# Imported files ledger (migrate_add_imported_files.py)
+# ---------------------------------------------------------------------------
+
+IMPORTED_FILES_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS imported_files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sha256 TEXT NOT NULL,
+        account_id INTEGER NOT NULL,
+        filename TEXT,
+        size INTEGER,
+        row_count INTEGER NOT NULL DEFAULT 0,
+        date_from DATE,
+        date_to DATE,
+        archive_path TEXT,
+        import_id INTEGER,
+        imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(sha256, account_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_imported_files_sha256 ON imported_files(sha256)",
+]
+
+
+# ---------------------------------------------------------------------------
+# Archive manifest (migrate_add_archive_manifest.py)
+# ---------------------------------------------------------------------------
+
+ARCHIVE_MANIFEST_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS archive_manifest (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        archive_path TEXT NOT NULL UNIQUE,
+        account_id INTEGER,
+        original_filename TEXT,
+        sha256 TEXT,
+        codec TEXT NOT NULL DEFAULT 'none',
+        original_size INTEGER,
+        size INTEGER,
+        row_count INTEGER,
+        period_start DATE,
+        period_end DATE,
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_archive_manifest_account ON archive_manifest(account_id, archived_at)",
+    "CREATE INDEX IF NOT EXISTS idx_archive_manifest_archived ON archive_manifest(archived_at)",
+    "CREATE INDEX IF NOT EXISTS idx_archive_manifest_sha256 ON archive_manifest(sha256)",
+]
+
+
+# ---------------------------------------------------------------------------
+# Import batches (migrate_add_import_batches.py)
+# ---------------------------------------------------------------------------
+
+IMPORT_BATCHES_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS import_batches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id INTEGER,
+        filename TEXT,
+        sha256 TEXT,
+        source TEXT NOT NULL DEFAULT 'upload',
+        import_id INTEGER,
+        status TEXT NOT NULL DEFAULT 'active' CHECK(status IN ('active', 'undone')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        undone_at TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_import_batches_account ON import_batches(account_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_import_batches_created ON import_batches(created_at)",
+]
+
+# Created once the transactions.import_batch_id column exists
+IMPORT_BATCHES_TRANSACTION_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_transactions_import_batch ON transactions(import_batch_id)"
+)
+
+
+def ensure_import_batches_schema(cursor) -> bool:
+    """
+    Create the import_batches table and the transactions.import_batch_id column.
+
+    Args:
+        cursor: Database cursor
+
+    Returns:
+        True if the column was added
+    """
+    for statement in IMPORT_BATCHES_SCHEMA:
+        cursor.execute(statement)
+
+    cursor.execute("PRAGMA table_info(transactions)")
+    added = 'import_batch_id' not in [column[1] for column in cursor.fetchall()]
+    if added:
+        cursor.execute("ALTER TABLE transactions ADD COLUMN import_batch_id INTEGER REFERENCES import_batches(id)")
+    cursor.execute(IMPORT_BATCHES_TRANSACTION_INDEX)
+    return added
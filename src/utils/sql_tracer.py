@@ -0,0 +1,227 @@
+"""
+Request-scoped SQL tracing.
+
+Records how many queries a request issues, how long they take and which
+statements were slowest. Tracing is driven by SQLite's trace callback and
+a thin timing wrapper around connections opened through utils.db while a
+trace is active. Outside a traced request connections are left untouched.
+"""
+
+import heapq
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+import sqlite3
+
+
+# Default number of queries a single request may issue before a warning is logged
+DEFAULT_QUERY_BUDGET = 50
+
+# Number of slowest statements kept per request
+SLOWEST_LIMIT = 5
+
+_current_stats: ContextVar[Optional['QueryStats']] = ContextVar('sql_query_stats', default=None)
+
+
+class QueryStats:
+    """Query statistics collected for one request (or any traced block)."""
+
+    def __init__(self, slowest_limit: int = SLOWEST_LIMIT):
+        self.query_count = 0          # execute/executemany/executescript calls
+        self.statement_count = 0      # statements reported by SQLite's trace callback
+        self.connection_count = 0
+        self.total_time = 0.0         # seconds spent inside SQLite calls
+        self.slowest_limit = slowest_limit
+        self._slowest: List[Tuple[float, int, str]] = []
+        self._seq = 0
+
+    def on_statement(self, statement: str):
+        """Trace callback installed on each traced connection."""
+        self.statement_count += 1
+
+    def record(self, sql: str, elapsed: float):
+        """Record a completed query and its elapsed time."""
+        self.query_count += 1
+        self.total_time += elapsed
+        self._seq += 1
+        entry = (elapsed, self._seq, ' '.join(sql.split()))
+        if len(self._slowest) < self.slowest_limit:
+            heapq.heappush(self._slowest, entry)
+        elif elapsed > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def add_fetch_time(self, elapsed: float):
+        """Add time spent fetching rows to the running total."""
+        self.total_time += elapsed
+
+    @property
+    def slowest(self) -> List[Dict]:
+        """Slowest statements, slowest first."""
+        return [
+            {'sql': sql, 'ms': round(elapsed * 1000, 3)}
+            for elapsed, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+    def to_dict(self) -> Dict:
+        return {
+            'query_count': self.query_count,
+            'statement_count': self.statement_count,
+            'connection_count': self.connection_count,
+            'total_ms': round(self.total_time * 1000, 3),
+            'slowest': self.slowest
+        }
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports execution and fetch time to the active QueryStats."""
+
+    def _stats(self) -> 'QueryStats':
+        return self.connection.query_stats
+
+    def _timed(self, sql, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._stats().record(sql, time.perf_counter() - start)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(sql, super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(sql, super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._timed(sql_script, super().executescript, sql_script)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._stats().add_fetch_time(time.perf_counter() - start)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._fetch(super().fetchmany)
+        return self._fetch(super().fetchmany, size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors report to a QueryStats instance."""
+
+    query_stats: QueryStats = None
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute() and friends create plain cursors internally,
+    # so route them through our cursor to keep the timings complete.
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Return the QueryStats for the active trace, if any."""
+    return _current_stats.get()
+
+
+def start_trace() -> Tuple[QueryStats, object]:
+    """
+    Start a new trace in the current context.
+
+    Returns:
+        Tuple of (stats, token); pass the token to stop_trace()
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    return stats, token
+
+
+def stop_trace(token):
+    """End a trace started with start_trace()."""
+    _current_stats.reset(token)
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """
+    Open a connection, traced if a trace is active in this context.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        sqlite3.Connection (a TracedConnection while tracing)
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        return sqlite3.connect(db_path)
+
+    conn = sqlite3.connect(db_path, factory=TracedConnection)
+    conn.query_stats = stats
+    conn.set_trace_callback(stats.on_statement)
+    stats.connection_count += 1
+    return conn
+
+
+def init_app(app):
+    """
+    Register request hooks that trace SQL for every request.
+
+    Config:
+        SQL_QUERY_BUDGET: Queries per request before a warning is logged
+        SQL_TRACE_HEADERS: Expose X-SQL-* response headers (defaults to app.debug)
+    """
+    from flask import g, request
+
+    app.config.setdefault('SQL_QUERY_BUDGET', DEFAULT_QUERY_BUDGET)
+
+    @app.before_request
+    def _start_sql_trace():
+        g.sql_stats, g.sql_trace_token = start_trace()
+
+    @app.after_request
+    def _report_sql_trace(response):
+        stats = g.get('sql_stats')
+        if stats is None:
+            return response
+
+        budget = app.config['SQL_QUERY_BUDGET']
+        if budget and stats.query_count > budget:
+            slowest = stats.slowest[0]['sql'][:200] if stats.slowest else ''
+            app.logger.warning(
+                "SQL query budget exceeded on %s %s: %d queries (budget %d), "
+                "%d connections, %.1f ms total; slowest: %s",
+                request.method, request.path, stats.query_count, budget,
+                stats.connection_count, stats.total_time * 1000, slowest
+            )
+
+        if app.config.get('SQL_TRACE_HEADERS', app.debug):
+            response.headers['X-SQL-Query-Count'] = str(stats.query_count)
+            response.headers['X-SQL-Statement-Count'] = str(stats.statement_count)
+            response.headers['X-SQL-Connection-Count'] = str(stats.connection_count)
+            response.headers['X-SQL-Time-Ms'] = f"{stats.total_time * 1000:.3f}"
+            if stats.slowest:
+                top = stats.slowest[0]
+                response.headers['X-SQL-Slowest'] = f"{top['ms']:.3f}ms {top['sql'][:200]}"
+
+        return response
+
+    @app.teardown_request
+    def _stop_sql_trace(exc):
+        token = g.pop('sql_trace_token', None)
+        if token is not None:
+            stop_trace(token)
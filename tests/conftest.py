@@ -149,3 +149,124 @@ def sample_category(app):
     
     return category_id
 
+
+@pytest.fixture
+def recurring_tables(app):
+    """Create the recurring transaction tables (added by migration in production)."""
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.executescript("""
+        CREATE TABLE recurring_transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            merchant_name TEXT NOT NULL,
+            description_pattern TEXT,
+            frequency TEXT NOT NULL,
+            average_amount DECIMAL(12, 2) NOT NULL,
+            amount_variance DECIMAL(12, 2) DEFAULT 0.00,
+            category_id INTEGER,
+            last_transaction_date DATE,
+            next_expected_date DATE,
+            status TEXT DEFAULT 'active',
+            alert_if_missing BOOLEAN DEFAULT 1,
+            alert_if_amount_changes BOOLEAN DEFAULT 1,
+            confidence_score DECIMAL(3, 2) DEFAULT 0.85,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE recurring_transaction_instances (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recurring_id INTEGER NOT NULL,
+            transaction_id INTEGER,
+            expected_date DATE,
+            actual_date DATE,
+            expected_amount DECIMAL(12, 2),
+            actual_amount DECIMAL(12, 2),
+            variance_amount DECIMAL(12, 2),
+            status TEXT DEFAULT 'expected',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    conn.commit()
+    conn.close()
+
+@pytest.fixture
+def recurring_alert_tables(app, recurring_tables):
+    """Create the materialized recurring alert tables and version triggers."""
+    from utils.schema import RECURRING_ALERTS_SCHEMA
+    
+    conn = sqlite3.connect(app.config['DATABASE'])
+    for statement in RECURRING_ALERTS_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def budget_tables(app):
+    """Create the budgets table (added by migration in production)."""
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.execute("""
+        CREATE TABLE budgets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category_id INTEGER NOT NULL,
+            amount DECIMAL(10, 2) NOT NULL CHECK(amount > 0),
+            period_type TEXT NOT NULL CHECK(period_type IN ('monthly', 'yearly')),
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            alert_threshold INTEGER DEFAULT 80 CHECK(alert_threshold BETWEEN 0 AND 100),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(category_id, period_type, start_date)
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def category_closure(app):
+    """Create the category closure table and triggers, filled from existing categories."""
+    from utils.schema import CATEGORY_CLOSURE_REBUILD, CATEGORY_CLOSURE_SCHEMA
+    
+    conn = sqlite3.connect(app.config['DATABASE'])
+    for statement in CATEGORY_CLOSURE_SCHEMA + CATEGORY_CLOSURE_REBUILD:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def data_version_tables(app):
+    """Create the categories and transactions data versions and their triggers."""
+    from utils.schema import DATA_VERSIONS_SCHEMA
+    
+    conn = sqlite3.connect(app.config['DATABASE'])
+    for statement in DATA_VERSIONS_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def balance_tracking(app):
+    """Add account balance columns, balance triggers and running balance checkpoints."""
+    from utils.schema import BALANCE_TRACKING_SCHEMA
+    
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.execute("ALTER TABLE accounts ADD COLUMN initial_balance DECIMAL(12, 2) DEFAULT 0.00")
+    conn.execute("ALTER TABLE accounts ADD COLUMN current_balance DECIMAL(12, 2) DEFAULT 0.00")
+    for statement in BALANCE_TRACKING_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def daily_balances(balance_tracking, app):
+    """Add the daily balance table and its triggers."""
+    from utils.schema import DAILY_BALANCES_SCHEMA
+    
+    conn = sqlite3.connect(app.config['DATABASE'])
+    for statement in DAILY_BALANCES_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
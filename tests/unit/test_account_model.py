@@ -264,3 +264,33 @@ def test_get_transaction_count(temp_db):
     
     assert count == 3
 
+
+
+def test_get_statistics(temp_db):
+    """Test statistics are aggregated per account in SQL."""
+    import sqlite3
+    
+    conn = sqlite3.connect(temp_db)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO accounts (name, type) VALUES ('Checking', 'checking')")
+    account_id = cursor.lastrowid
+    cursor.execute("INSERT INTO accounts (name, type) VALUES ('Other', 'savings')")
+    other_id = cursor.lastrowid
+    
+    cursor.executemany("""
+        INSERT INTO transactions (account_id, date, description, amount)
+        VALUES (?, '2025-01-01', 'Transaction', ?)
+    """, [(account_id, 1500.0), (account_id, -200.25), (account_id, -49.75), (other_id, 999.0)])
+    
+    conn.commit()
+    conn.close()
+    
+    account = Account(temp_db)
+    
+    assert account.get_statistics(account_id) == {
+        'total_transactions': 3,
+        'total_credits': 1500.0,
+        'total_debits': 250.0,
+        'net_cash_flow': 1250.0
+    }
+    assert account.get_statistics(other_id + 1)['total_transactions'] == 0
@@ -0,0 +1,234 @@
+"""
+Unit tests for incrementally maintained, running and point-in-time account balances.
+"""
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from services import balance_service
+from services.balance_service import BalanceService
+
+
+def _balance(db_path, account_id):
+    conn = sqlite3.connect(db_path)
+    value = conn.execute("SELECT current_balance FROM accounts WHERE id = ?", (account_id,)).fetchone()[0]
+    conn.close()
+    return round(value, 2)
+
+
+@pytest.fixture
+def ledger(app, sample_account, balance_tracking):
+    """An account opened with 1000.00 and twelve transactions over six days."""
+    db_path = app.config['DATABASE']
+    conn = sqlite3.connect(db_path)
+    # Selected by Account.get_by_id()
+    conn.execute("ALTER TABLE accounts ADD COLUMN reference_date DATE")
+    conn.execute("UPDATE accounts SET initial_balance = 1000, current_balance = 1000 WHERE id = ?",
+                 (sample_account,))
+    conn.executemany("""
+        INSERT INTO transactions (account_id, date, description, amount)
+        VALUES (?, ?, ?, ?)
+    """, [(sample_account, f'2025-01-0{1 + i // 2}', f'TXN {i}', (-1) ** i * (i + 1) * 10.0)
+          for i in range(12)])
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _expected_running(db_path, account_id):
+    """Balances recomputed naively, newest first."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT id, amount FROM transactions WHERE account_id = ? ORDER BY date, id
+    """, (account_id,)).fetchall()
+    conn.close()
+    balance, result = 1000.0, []
+    for txn_id, amount in rows:
+        balance += amount
+        result.append((txn_id, round(balance, 2)))
+    return result[::-1]
+
+
+class TestCurrentBalance:
+    """Test suite for trigger-maintained current balances."""
+    
+    def test_insert_updates_balance(self, ledger, sample_account):
+        """Test inserted transactions are applied to current_balance."""
+        # 1000 + (10 - 20 + 30 - ... - 120)
+        assert _balance(ledger, sample_account) == 940.00
+    
+    def test_update_and_delete(self, ledger, sample_account, app):
+        """Test amount changes, moves and deletes keep the balance correct."""
+        conn = sqlite3.connect(ledger)
+        conn.execute("INSERT INTO accounts (name, type) VALUES ('Savings', 'savings')")
+        conn.execute("UPDATE transactions SET amount = 110 WHERE id = 1")
+        conn.execute("UPDATE transactions SET account_id = 2 WHERE id = 2")
+        conn.execute("DELETE FROM transactions WHERE id = 3")
+        conn.commit()
+        conn.close()
+        
+        assert _balance(ledger, sample_account) == 940.00 + 100 + 20 - 30
+        assert _balance(ledger, 2) == -20.00
+        assert BalanceService(ledger).get_current_balances() == {sample_account: 1030.00, 2: -20.00}
+    
+    def test_rebuild_reconciles(self, ledger, sample_account):
+        """Test rebuild repairs a stale balance."""
+        conn = sqlite3.connect(ledger)
+        conn.execute("UPDATE accounts SET current_balance = 0")
+        conn.commit()
+        conn.close()
+        
+        BalanceService(ledger).rebuild()
+        
+        assert _balance(ledger, sample_account) == 940.00
+
+
+class TestRunningBalances:
+    """Test suite for checkpointed running balances."""
+    
+    def test_full_history(self, ledger, sample_account):
+        """Test every transaction carries the balance after it."""
+        rows = BalanceService(ledger).get_running_balances(sample_account)
+        
+        assert [(r['id'], r['balance']) for r in rows] == _expected_running(ledger, sample_account)
+        assert rows[0]['balance'] == 940.00
+    
+    def test_pages_from_checkpoints(self, ledger, sample_account):
+        """Test pages start from checkpoints and match the full computation."""
+        expected = _expected_running(ledger, sample_account)
+        
+        with patch.object(balance_service, 'CHECKPOINT_INTERVAL', 3):
+            service = BalanceService(ledger)
+            pages = [service.get_running_balances(sample_account, limit=5, offset=offset)
+                     for offset in (0, 5, 10)]
+        
+        assert [(r['id'], r['balance']) for page in pages for r in page] == expected
+        conn = sqlite3.connect(ledger)
+        positions = [row[0] for row in conn.execute(
+            "SELECT position FROM account_balance_checkpoints ORDER BY position")]
+        conn.close()
+        assert positions == [3, 6, 9, 12]
+    
+    def test_checkpoints_invalidated_by_backdated_change(self, ledger, sample_account):
+        """Test a backdated transaction drops later checkpoints and they are rebuilt."""
+        with patch.object(balance_service, 'CHECKPOINT_INTERVAL', 3):
+            service = BalanceService(ledger)
+            service.get_running_balances(sample_account, limit=1)
+            
+            conn = sqlite3.connect(ledger)
+            conn.execute("""
+                INSERT INTO transactions (account_id, date, description, amount)
+                VALUES (?, '2025-01-02', 'BACKDATED', -500.00)
+            """, (sample_account,))
+            conn.commit()
+            remaining = conn.execute("SELECT COUNT(*) FROM account_balance_checkpoints").fetchone()[0]
+            conn.close()
+            assert remaining == 1
+            
+            rows = service.get_running_balances(sample_account, limit=4, offset=6)
+        
+        assert [(r['id'], r['balance']) for r in rows] == _expected_running(ledger, sample_account)[6:10]
+        assert _balance(ledger, sample_account) == 440.00
+    
+    def test_empty_page(self, ledger, sample_account):
+        """Test an offset past the last transaction returns nothing."""
+        assert BalanceService(ledger).get_running_balances(sample_account, limit=5, offset=50) == []
+
+
+@pytest.fixture
+def daily_ledger(daily_balances, ledger):
+    """The ledger account with the daily balance table maintained by triggers."""
+    return ledger
+
+
+def _daily_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT account_id, date, ROUND(net_change, 2) FROM daily_balances
+        ORDER BY account_id, date
+    """).fetchall()
+    conn.close()
+    return rows
+
+
+class TestPointInTimeBalance:
+    """Test suite for balances on arbitrary dates from daily net changes."""
+    
+    def test_balances_on_dates(self, daily_ledger, sample_account):
+        """Test balances include every transaction up to the end of the day."""
+        service = BalanceService(daily_ledger)
+        balances = service.get_balances_on(['2025-02-01', '2024-12-31', '2025-01-01', '2025-01-03'])
+        
+        # Each day nets to -10.00
+        assert balances == {sample_account: [940.00, 1000.00, 990.00, 970.00]}
+        assert service.get_balance_on(sample_account, '2025-01-04') == 960.00
+    
+    def test_triggers_keep_days_in_sync(self, daily_ledger, sample_account):
+        """Test backdated inserts, edits and deletes match a rebuild from scratch."""
+        conn = sqlite3.connect(daily_ledger)
+        conn.execute("""
+            INSERT INTO transactions (account_id, date, description, amount)
+            VALUES (?, '2024-12-15', 'BACKDATED', -500.00)
+        """, (sample_account,))
+        conn.execute("UPDATE transactions SET date = '2025-01-09' WHERE description = 'TXN 3'")
+        conn.execute("UPDATE transactions SET amount = 25.00 WHERE description = 'TXN 4'")
+        conn.execute("DELETE FROM transactions WHERE description = 'TXN 5'")
+        conn.commit()
+        conn.close()
+        
+        maintained = _daily_rows(daily_ledger)
+        BalanceService(daily_ledger).rebuild()
+        
+        assert maintained == _daily_rows(daily_ledger)
+        assert BalanceService(daily_ledger).get_balance_on(sample_account, '2024-12-31') == 500.00
+    
+    def test_matches_without_daily_table(self, daily_ledger, sample_account):
+        """Test the transaction aggregate fallback gives the same balances."""
+        dates = ['2024-12-31', '2025-01-02', '2025-01-05', '2025-03-01']
+        with_table = BalanceService(daily_ledger).get_balances_on(dates)
+        
+        conn = sqlite3.connect(daily_ledger)
+        conn.execute("DROP TABLE daily_balances")
+        conn.commit()
+        conn.close()
+        
+        assert BalanceService(daily_ledger).get_balances_on(dates) == with_table
+    
+    def test_balance_history(self, daily_ledger, sample_account):
+        """Test the daily history fills days without transactions."""
+        history = BalanceService(daily_ledger).get_balance_history(
+            sample_account, date_to='2025-01-08')
+        
+        assert [point['date'] for point in history][:2] == ['2025-01-01', '2025-01-02']
+        assert [point['balance'] for point in history] == [990.00, 980.00, 970.00, 960.00,
+                                                           950.00, 940.00, 940.00, 940.00]
+
+
+class TestAccountTransactionsEndpoint:
+    """Test suite for the paginated account transactions endpoint."""
+    
+    def test_pages_cover_history(self, ledger, sample_account, client):
+        """Test consecutive pages return every transaction once with running balances."""
+        pages = [client.get(f'/api/accounts/{sample_account}/transactions?limit=5&offset={offset}')
+                 .get_json() for offset in (0, 5, 10)]
+        
+        assert [(r['id'], r['balance']) for page in pages for r in page['transactions']] == \
+            _expected_running(ledger, sample_account)
+        assert [page['has_more'] for page in pages] == [True, True, False]
+        assert pages[0]['total'] == 12
+    
+    def test_limit_is_clamped(self, ledger, sample_account, client):
+        """Test out-of-range limits and offsets are clamped."""
+        data = client.get(f'/api/accounts/{sample_account}/transactions?limit=0&offset=-3').get_json()
+        
+        assert (data['limit'], data['offset']) == (1, 0)
+        assert len(data['transactions']) == 1
+    
+    def test_unknown_account(self, ledger, client):
+        """Test an unknown account is a 404."""
+        response = client.get('/api/accounts/999/transactions')
+        
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'Account not found'
@@ -0,0 +1,116 @@
+"""
+Unit tests for multi-file batch import.
+"""
+
+import io
+import json
+import sqlite3
+import zipfile
+
+import pytest
+
+from services.batch_import import BatchImportError, import_batch, resolve_account
+
+
+JANUARY = (
+    "Date,Description,Amount\n"
+    "2025-01-05,GROCERY STORE,-45.50\n"
+    "2025-01-06,COFFEE SHOP,-3.00\n"
+    "2025-01-06,COFFEE SHOP,-3.00\n"
+)
+
+# Overlaps January by one row
+FEBRUARY = (
+    "Date,Description,Amount\n"
+    "2025-01-06,COFFEE SHOP,-3.00\n"
+    "2025-02-01,SALARY,2500.00\n"
+)
+
+
+@pytest.fixture
+def savings_account(app):
+    """A second account for file mapping."""
+    conn = sqlite3.connect(app.config['DATABASE'])
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO accounts (name, type) VALUES ('Holiday Savings', 'savings')")
+    account_id = cursor.lastrowid
+    conn.commit()
+    conn.close()
+    return account_id
+
+
+def _rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT account_id, date, description FROM transactions ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_resolve_account_order():
+    """Mapping beats rules, rules beat prefixes, prefixes beat names, then the default."""
+    accounts = [{'id': 1, 'name': 'Checking'}, {'id': 2, 'name': 'Holiday Savings'},
+                {'id': 3, 'name': 'Savings'}]
+
+    assert resolve_account('2_checking.csv', accounts, mapping={'2_checking.csv': 3}) == 3
+    assert resolve_account('2_checking.csv', accounts, rules=[('*CHECKING*', 1)]) == 1
+    assert resolve_account('2_checking.csv', accounts) == 2
+    assert resolve_account('holiday-savings-2024.csv', accounts) == 2
+    assert resolve_account('statement.csv', accounts, default_account_id=3) == 3
+    assert resolve_account('statement.csv', accounts) is None
+
+
+def test_import_batch_dedupes_across_files(app, sample_account, tmp_path):
+    """Rows repeated in a later file are skipped; repeats within one file are kept."""
+    archive = tmp_path / 'statements.zip'
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('2025/january.csv', JANUARY)
+        zf.writestr('2025/february.csv', FEBRUARY)
+        zf.writestr('README.txt', 'not a statement')
+    db_path = app.config['DATABASE']
+
+    summary = import_batch(db_path, [str(archive)], default_account_id=sample_account, workers=2)
+
+    assert [f['filename'] for f in summary['files']] == ['january.csv', 'february.csv']
+    assert [f['count'] for f in summary['files']] == [3, 1]
+    assert summary['batch_duplicates'] == 1
+    assert summary['count'] == 4
+    assert len(_rows(db_path)) == 4
+    assert all(f['import_id'] for f in summary['files'])
+
+    # The same files again are recognized by content and not parsed
+    summary = import_batch(db_path, [str(archive)], default_account_id=sample_account, workers=1)
+    assert summary['files_already_imported'] == 2
+    assert summary['rows_parsed'] == 0
+    assert summary['count'] == 0
+
+
+def test_import_batch_aborts_without_writes(app, sample_account, tmp_path):
+    """A file that maps to no account aborts the batch before anything is inserted."""
+    (tmp_path / 'january.csv').write_text(JANUARY)
+    (tmp_path / 'unknown.csv').write_text(FEBRUARY)
+    db_path = app.config['DATABASE']
+
+    with pytest.raises(BatchImportError, match='unknown.csv'):
+        import_batch(db_path, [str(tmp_path / 'january.csv'), str(tmp_path / 'unknown.csv')],
+                     mapping={'january.csv': sample_account}, workers=1)
+
+    assert _rows(db_path) == []
+
+
+def test_batch_route_maps_files(app, client, sample_account, savings_account, tmp_path):
+    """The batch endpoint maps uploads by filename and reports one combined summary."""
+    app.config['ARCHIVE_DIR'] = str(tmp_path / 'archives')
+
+    response = client.post('/import/batch', data={
+        'files': [(io.BytesIO(JANUARY.encode()), 'january.csv'),
+                  (io.BytesIO(FEBRUARY.encode()), 'holiday savings feb.csv')],
+        'mapping': json.dumps({'january.csv': sample_account})
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [(f['filename'], f['account_id']) for f in data['files']] == [
+        ('january.csv', sample_account), ('holiday_savings_feb.csv', savings_account)]
+    # Different accounts, so the overlapping row is not a duplicate
+    assert data['count'] == 5
+    assert len(list((tmp_path / 'archives').rglob('*.csv.gz'))) == 2
@@ -0,0 +1,80 @@
+"""
+Unit tests for the benchmark data generator and result comparison.
+"""
+
+import sqlite3
+from datetime import date
+
+from benchmarks.generator import DataGenerator, STATEMENT_FORMATS
+from benchmarks.runner import compare
+from services.csv_parser import CSVParser
+
+
+END_DATE = date(2025, 6, 30)
+
+
+def _fingerprint(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("""
+            SELECT COUNT(*), ROUND(SUM(amount), 2), MIN(date), MAX(date),
+                   COUNT(DISTINCT description)
+            FROM transactions
+        """).fetchone()
+    finally:
+        conn.close()
+
+
+def test_generator_is_deterministic(tmp_path):
+    """The same seed produces the same database."""
+    first = DataGenerator(seed=7, years=1, end_date=END_DATE)
+    second = DataGenerator(seed=7, years=1, end_date=END_DATE)
+    first.build_database(str(tmp_path / 'a.db'), 3000)
+    second.build_database(str(tmp_path / 'b.db'), 3000)
+
+    assert _fingerprint(str(tmp_path / 'a.db')) == _fingerprint(str(tmp_path / 'b.db'))
+
+
+def test_generator_builds_complete_dataset(tmp_path):
+    """Accounts, rules, budgets and recurring merchants are generated."""
+    db_path = str(tmp_path / 'bench.db')
+    summary = DataGenerator(seed=1, years=1, end_date=END_DATE).build_database(db_path, 2000)
+
+    assert summary['transactions'] == 2000
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0] == len(summary['accounts'])
+        assert conn.execute("SELECT COUNT(*) FROM categorization_rules").fetchone()[0] > 0
+        assert conn.execute("SELECT COUNT(*) FROM budgets").fetchone()[0] > 0
+        netflix = conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE description = 'NETFLIX.COM'"
+        ).fetchone()[0]
+        assert netflix >= 12
+        assert conn.execute("SELECT MAX(date) FROM transactions").fetchone()[0] <= END_DATE.isoformat()
+    finally:
+        conn.close()
+
+
+def test_statements_parse_in_every_format(tmp_path):
+    """Every generated statement format is readable by the CSV parser."""
+    db_path = str(tmp_path / 'bench.db')
+    generator = DataGenerator(seed=3, years=1, end_date=END_DATE)
+    generator.build_database(db_path, 1000)
+    rows = generator.statement_rows(db_path, 50)
+    paths = generator.write_statements(rows, str(tmp_path / 'statements'))
+
+    assert set(paths) == set(STATEMENT_FORMATS)
+    parser = CSVParser()
+    for fmt, path in paths.items():
+        parsed = parser.parse_file(path)
+        assert len(parsed) == len(rows), fmt
+        assert round(sum(t['amount'] for t in parsed), 2) == round(sum(r['amount'] for r in rows), 2), fmt
+
+
+def test_compare_flags_regressions():
+    """Scenarios slower than the tolerance are reported as regressions."""
+    baseline = {'results': {'a': {'median_s': 0.100}, 'b': {'median_s': 0.100}, 'c': {'median_s': 0.100}}}
+    current = {'results': {'a': {'median_s': 0.150}, 'b': {'median_s': 0.050}, 'd': {'median_s': 0.01}}}
+
+    status = {row['scenario']: row['status'] for row in compare(current, baseline, tolerance=0.2)}
+    assert status == {'a': 'regression', 'b': 'improvement', 'c': 'missing', 'd': 'new'}
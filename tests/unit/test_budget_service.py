@@ -0,0 +1,106 @@
+"""
+Unit tests for BudgetService progress and summary.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from services.budget_service import BudgetService
+from utils import sql_tracer
+
+
+def _days_from_today(days):
+    return (date.today() + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+@pytest.fixture
+def budget_data(app, sample_account, budget_tables):
+    """Three current monthly budgets (good, warning, over) and an expired one."""
+    conn = sqlite3.connect(app.config['DATABASE'])
+    cursor = conn.cursor()
+    categories = []
+    for name in ('Groceries', 'Dining', 'Fuel'):
+        cursor.execute("INSERT INTO categories (name, level, type) VALUES (?, 1, 'expense')", (name,))
+        categories.append(cursor.lastrowid)
+
+    start, end = _days_from_today(-10), _days_from_today(10)
+    cursor.executemany("""
+        INSERT INTO budgets (category_id, amount, period_type, start_date, end_date, alert_threshold)
+        VALUES (?, ?, ?, ?, ?, 80)
+    """, [
+        (categories[0], 500, 'monthly', start, end),
+        (categories[1], 100, 'monthly', start, end),
+        (categories[2], 50, 'monthly', start, end),
+        (categories[0], 500, 'monthly', _days_from_today(-60), _days_from_today(-30)),
+    ])
+
+    cursor.executemany("""
+        INSERT INTO transactions (account_id, date, description, amount, category_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, [
+        (sample_account, _days_from_today(-1), 'SUPERMARKET', -100.00, categories[0]),
+        (sample_account, _days_from_today(-2), 'SUPERMARKET', -50.00, categories[0]),
+        (sample_account, _days_from_today(-40), 'SUPERMARKET', -75.00, categories[0]),
+        (sample_account, _days_from_today(-3), 'REFUND', 20.00, categories[0]),
+        (sample_account, _days_from_today(-1), 'BISTRO', -85.00, categories[1]),
+        (sample_account, _days_from_today(-1), 'GAS STATION', -60.00, categories[2]),
+    ])
+    conn.commit()
+    conn.close()
+    return app.config['DATABASE']
+
+
+class TestBudgetProgress:
+    """Test suite for budget progress calculations."""
+    
+    def test_all_budgets_progress(self, budget_data):
+        """Test current budgets get actual spending within their date range."""
+        progress = BudgetService(budget_data).get_all_budgets_progress()
+        
+        assert [p['budget_id'] for p in progress] == [1, 2, 3]
+        assert [p['actual'] for p in progress] == [150.00, 85.00, 60.00]
+        assert [p['status'] for p in progress] == ['good', 'warning', 'over']
+        assert progress[0]['remaining'] == 350.00
+        assert progress[1]['percentage'] == 85.0
+        assert progress[1]['alert'] is True
+        assert progress[0]['category_name'] == 'Groceries'
+    
+    def test_single_budget_matches_list(self, budget_data):
+        """Test get_budget_progress returns the same values as the list."""
+        service = BudgetService(budget_data)
+        
+        for progress in service.get_all_budgets_progress():
+            assert service.get_budget_progress(progress['budget_id']) == progress
+        assert service.get_budget_progress(999) is None
+    
+    def test_expired_budget_progress(self, budget_data):
+        """Test a past budget only counts spending inside its own period."""
+        progress = BudgetService(budget_data).get_budget_progress(4)
+        
+        assert progress['actual'] == 75.00
+    
+    def test_progress_is_one_query(self, budget_data):
+        """Test the list is computed with one aggregate query (plus a schema check)."""
+        stats, token = sql_tracer.start_trace()
+        try:
+            BudgetService(budget_data).get_all_budgets_progress()
+        finally:
+            sql_tracer.stop_trace(token)
+        
+        assert stats.query_count == 2
+    
+    def test_summary_reuses_progress(self, budget_data):
+        """Test the summary is the same whether or not progress is passed in."""
+        service = BudgetService(budget_data)
+        progress = service.get_all_budgets_progress()
+        
+        summary = service.get_budget_summary(progress)
+        
+        assert summary == service.get_budget_summary()
+        assert summary['budgets_count'] == 3
+        assert summary['total_budgeted'] == 650.00
+        assert summary['total_actual'] == 295.00
+        assert summary['over_budget_count'] == 1
+        assert summary['at_risk_count'] == 1
@@ -0,0 +1,185 @@
+"""
+Unit tests for the category closure table and subtree rollups.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from models.category import Category
+from services.budget_service import BudgetService
+from services.report_service import ReportService
+
+
+def _closure(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT ancestor_id, descendant_id, depth FROM category_closure
+        ORDER BY ancestor_id, descendant_id
+    """).fetchall()
+    conn.close()
+    return rows
+
+
+@pytest.fixture
+def category_tree(app, category_closure):
+    """Fixed Expenses → Housing → Rent / Utilities, plus Variable Expenses → Groceries."""
+    conn = sqlite3.connect(app.config['DATABASE'])
+    cursor = conn.cursor()
+    ids = {}
+    for name, parent, level in [
+        ('Fixed Expenses', None, 1),
+        ('Housing', 'Fixed Expenses', 2),
+        ('Rent', 'Housing', 3),
+        ('Utilities', 'Housing', 3),
+        ('Variable Expenses', None, 1),
+        ('Groceries', 'Variable Expenses', 2),
+    ]:
+        cursor.execute("""
+            INSERT INTO categories (name, parent_id, level, type)
+            VALUES (?, ?, ?, 'expense')
+        """, (name, ids.get(parent), level))
+        ids[name] = cursor.lastrowid
+    conn.commit()
+    conn.close()
+    return ids
+
+
+@pytest.fixture
+def tree_spending(app, sample_account, category_tree):
+    """Spending this month in Rent, Utilities, Housing itself and Groceries."""
+    today = date.today()
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.executemany("""
+        INSERT INTO transactions (account_id, date, description, amount, category_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, [
+        (sample_account, today.isoformat(), 'LANDLORD', -1500.00, category_tree['Rent']),
+        (sample_account, today.isoformat(), 'POWER CO', -120.00, category_tree['Utilities']),
+        (sample_account, today.isoformat(), 'HARDWARE', -80.00, category_tree['Housing']),
+        (sample_account, today.isoformat(), 'SUPERMARKET', -200.00, category_tree['Groceries']),
+        (sample_account, today.isoformat(), 'UNKNOWN', -10.00, None),
+    ])
+    conn.commit()
+    conn.close()
+    return category_tree
+
+
+class TestClosureMaintenance:
+    """Test suite for the closure triggers."""
+    
+    def test_insert_adds_ancestor_pairs(self, app, category_tree):
+        """Test new categories are linked to themselves and every ancestor."""
+        closure = _closure(app.config['DATABASE'])
+        
+        rent = category_tree['Rent']
+        assert (category_tree['Fixed Expenses'], rent, 2) in closure
+        assert (category_tree['Housing'], rent, 1) in closure
+        assert (rent, rent, 0) in closure
+        assert len(closure) == 6 + 5 + 1  # self pairs, parent pairs, grandparent pairs
+    
+    def test_rebuild_matches_triggers(self, app, category_tree):
+        """Test the migration rebuild produces the same rows as the triggers."""
+        from migrate_add_category_closure import REBUILD
+        
+        before = _closure(app.config['DATABASE'])
+        conn = sqlite3.connect(app.config['DATABASE'])
+        for statement in REBUILD:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+        
+        assert _closure(app.config['DATABASE']) == before
+    
+    def test_move_subtree(self, app, category_tree):
+        """Test re-parenting a category moves its whole subtree."""
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.execute("UPDATE categories SET parent_id = ? WHERE id = ?",
+                      (category_tree['Variable Expenses'], category_tree['Housing']))
+        conn.commit()
+        conn.close()
+        
+        model = Category(app.config['DATABASE'])
+        assert set(model.get_subtree_ids(category_tree['Fixed Expenses'])) == {category_tree['Fixed Expenses']}
+        assert set(model.get_subtree_ids(category_tree['Variable Expenses'])) == {
+            category_tree[name] for name in ('Variable Expenses', 'Groceries', 'Housing', 'Rent', 'Utilities')
+        }
+        assert (category_tree['Variable Expenses'], category_tree['Rent'], 2) in _closure(app.config['DATABASE'])
+    
+    def test_delete_removes_pairs(self, app, category_tree):
+        """Test deleting a category removes its closure rows."""
+        Category(app.config['DATABASE']).delete(category_tree['Utilities'])
+        
+        closure = _closure(app.config['DATABASE'])
+        assert all(category_tree['Utilities'] not in row[:2] for row in closure)
+    
+    def test_move_below_descendant_rejected(self, app, category_tree):
+        """Test a category cannot become its own ancestor."""
+        model = Category(app.config['DATABASE'])
+        
+        with pytest.raises(ValueError):
+            model.update(category_tree['Fixed Expenses'], parent_id=category_tree['Rent'])
+
+
+class TestSubtreeRollups:
+    """Test suite for budgets and reports aggregating whole subtrees."""
+    
+    def test_budget_covers_subtree(self, app, tree_spending, budget_tables):
+        """Test a budget on a parent category includes its descendants' spending."""
+        month_start = date.today().replace(day=1)
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.executemany("""
+            INSERT INTO budgets (category_id, amount, period_type, start_date, end_date)
+            VALUES (?, ?, 'monthly', ?, ?)
+        """, [
+            (tree_spending['Fixed Expenses'], 2000, month_start.isoformat(),
+             (month_start + timedelta(days=40)).isoformat()),
+            (tree_spending['Rent'], 1500, month_start.isoformat(),
+             (month_start + timedelta(days=40)).isoformat()),
+        ])
+        conn.commit()
+        conn.close()
+        
+        progress = BudgetService(app.config['DATABASE']).get_all_budgets_progress()
+        
+        assert [p['actual'] for p in progress] == [1700.00, 1500.00]
+        assert progress[1]['status'] == 'over'
+    
+    def test_breakdown_by_level(self, app, tree_spending):
+        """Test spending rolls up to level-1 and level-2 categories."""
+        service = ReportService(app.config['DATABASE'])
+        
+        level1 = {row['category']: row['amount'] for row in service.get_category_breakdown(level=1)}
+        level2 = {row['category']: row['amount'] for row in service.get_category_breakdown(level=2)}
+        
+        assert level1 == {'Fixed Expenses': 1700.00, 'Variable Expenses': 200.00, 'Uncategorized': 10.00}
+        assert level2 == {'Housing': 1700.00, 'Groceries': 200.00, 'Uncategorized': 10.00}
+    
+    def test_breakdown_within_subtree(self, app, tree_spending):
+        """Test a breakdown limited to one category's subtree."""
+        breakdown = ReportService(app.config['DATABASE']).get_category_breakdown(
+            category_id=tree_spending['Housing'], level=3
+        )
+        
+        assert {row['category']: row['amount'] for row in breakdown} == {
+            'Rent': 1500.00, 'Utilities': 120.00, 'Housing': 80.00
+        }
+        assert sum(row['percentage'] for row in breakdown) == pytest.approx(100.0, abs=0.2)
+    
+    def test_trends_by_level(self, app, tree_spending):
+        """Test monthly trends roll up to the requested level."""
+        trends = ReportService(app.config['DATABASE']).get_monthly_category_trends(level=1)
+        
+        assert trends['months'] == [date.today().strftime('%Y-%m')]
+        assert trends['categories'] == {
+            'Fixed Expenses': [1700.00], 'Variable Expenses': [200.00], 'Uncategorized': [10.00]
+        }
+    
+    def test_breakdown_endpoint_level(self, client, tree_spending):
+        """Test the breakdown endpoint accepts a level."""
+        response = client.get('/reports/api/category-breakdown?level=1')
+        data = response.get_json()
+        
+        assert data['labels'] == ['Fixed Expenses', 'Variable Expenses', 'Uncategorized']
+        assert data['datasets'][0]['data'] == [1700.00, 200.00, 10.00]
@@ -0,0 +1,130 @@
+"""
+Unit tests for the Category model catalog (counts, hierarchy and caching).
+"""
+
+import sqlite3
+
+import pytest
+
+from models.category import Category
+from utils import sql_tracer
+from utils.metrics import CACHE_REQUESTS
+
+
+def _cache_count(result):
+    return CACHE_REQUESTS.get(cache='categories', result=result)
+
+
+@pytest.fixture
+def categorized(app, sample_account):
+    """Housing → Rent plus Salary, with a few categorized transactions."""
+    conn = sqlite3.connect(app.config['DATABASE'])
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO categories (name, level, type) VALUES ('Housing', 1, 'expense')")
+    housing = cursor.lastrowid
+    cursor.execute("INSERT INTO categories (name, parent_id, level, type) VALUES ('Rent', ?, 2, 'expense')",
+                   (housing,))
+    rent = cursor.lastrowid
+    cursor.execute("INSERT INTO categories (name, level, type) VALUES ('Salary', 1, 'income')")
+    salary = cursor.lastrowid
+    cursor.executemany("""
+        INSERT INTO transactions (account_id, date, description, amount, category_id)
+        VALUES (?, '2025-01-01', ?, ?, ?)
+    """, [
+        (sample_account, 'LANDLORD', -1500.00, rent),
+        (sample_account, 'LANDLORD', -1500.00, rent),
+        (sample_account, 'EMPLOYER', 4000.00, salary),
+        (sample_account, 'UNKNOWN', -20.00, None),
+    ])
+    conn.commit()
+    conn.close()
+    return {'Housing': housing, 'Rent': rent, 'Salary': salary}
+
+
+class TestCategoryCatalog:
+    """Test suite for categories with counts and hierarchy."""
+    
+    def test_counts(self, app, categorized):
+        """Test transaction counts come back with every category."""
+        categories = Category(app.config['DATABASE']).get_all_with_counts()
+        counts = {c['name']: c['transaction_count'] for c in categories}
+        
+        assert counts == {'Housing': 0, 'Rent': 2, 'Salary': 1}
+    
+    def test_hierarchy(self, app, categorized):
+        """Test the hierarchy nests children under their parents."""
+        hierarchy = Category(app.config['DATABASE']).get_hierarchy()
+        
+        assert [c['name'] for c in hierarchy['income']] == ['Salary']
+        housing = hierarchy['expense'][0]
+        assert housing['name'] == 'Housing'
+        assert [c['name'] for c in housing['children']] == ['Rent']
+        assert housing['children'][0]['transaction_count'] == 2
+    
+    def test_counts_use_one_query(self, app, categorized):
+        """Test counts are not queried per category."""
+        stats, token = sql_tracer.start_trace()
+        try:
+            Category(app.config['DATABASE']).get_all_with_counts()
+        finally:
+            sql_tracer.stop_trace(token)
+        
+        # Two version lookups and the catalog query
+        assert stats.query_count == 3
+    
+    def test_cached_until_data_changes(self, app, categorized, data_version_tables):
+        """Test the catalog is cached until categories or transactions change."""
+        model = Category(app.config['DATABASE'])
+        model.get_catalog()
+        hits, misses = _cache_count('hit'), _cache_count('miss')
+        
+        first = model.get_all_with_counts()
+        assert (_cache_count('hit'), _cache_count('miss')) == (hits + 1, misses)
+        
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.execute("""
+            INSERT INTO transactions (account_id, date, description, amount, category_id)
+            VALUES (1, '2025-01-02', 'LANDLORD', -1500.00, ?)
+        """, (categorized['Rent'],))
+        conn.commit()
+        conn.close()
+        
+        counts = {c['name']: c['transaction_count'] for c in model.get_all_with_counts()}
+        assert counts['Rent'] == 3
+        assert _cache_count('miss') == misses + 1
+        
+        model.create('Utilities', 2, 'expense', categorized['Housing'])
+        names = [c['name'] for c in model.get_hierarchy()['expense'][0]['children']]
+        assert names == ['Rent', 'Utilities']
+        assert {c['name'] for c in first} == {'Housing', 'Rent', 'Salary'}
+    
+    def test_cached_results_are_copies(self, app, categorized, data_version_tables):
+        """Test callers cannot modify the cached catalog."""
+        model = Category(app.config['DATABASE'])
+        model.get_all_with_counts()[0]['name'] = 'Changed'
+        
+        assert 'Changed' not in [c['name'] for c in model.get_all_with_counts()]
+    
+    def test_not_cached_without_its_counters(self, app, categorized, recurring_alert_tables):
+        """Test a data_versions table holding only the recurring counter does not freeze the catalog."""
+        model = Category(app.config['DATABASE'])
+        model.get_all_with_counts()
+        model.create('Utilities', 2, 'expense', categorized['Housing'])
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.execute("""
+            INSERT INTO transactions (account_id, date, description, amount, category_id)
+            VALUES (1, '2025-01-02', 'LANDLORD', -1500.00, ?)
+        """, (categorized['Rent'],))
+        conn.commit()
+        conn.close()
+        
+        counts = {c['name']: c['transaction_count'] for c in model.get_all_with_counts()}
+        assert counts == {'Housing': 0, 'Rent': 3, 'Salary': 1, 'Utilities': 0}
+    
+    def test_all_endpoint(self, client, categorized):
+        """Test /categories/api/all returns counts."""
+        data = client.get('/categories/api/all').get_json()
+        
+        assert data['success'] is True
+        assert data['count'] == 3
+        assert {c['name']: c['transaction_count'] for c in data['categories']}['Rent'] == 2
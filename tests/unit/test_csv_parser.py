@@ -208,6 +208,21 @@ class TestCSVParser:
         assert len(transactions) == 1
         assert transactions[0]['description'] == 'Test'
     
+    def test_unparseable_rows_counted_and_sampled(self, parser, tmp_path, caplog):
+        """Test bad rows are skipped, counted and only logged a few times."""
+        csv_file = tmp_path / "bad_dates.csv"
+        csv_file.write_text("Date,Description,Amount\n10/19/2025,Test,100.00\n" +
+                            "not a date,Bad,1.00\n" * 20)
+        
+        with caplog.at_level('WARNING'):
+            transactions = parser.parse_file(str(csv_file))
+        
+        assert len(transactions) == 1
+        assert parser.skipped_rows == 20
+        # First 5 rows in full plus one total
+        assert len(caplog.records) == 6
+        assert '20 occurrences' in caplog.records[-1].getMessage()
+    
     def test_parse_amount_with_currency_symbols(self, parser):
         """Test parsing amounts with currency symbols."""
         assert parser._parse_amount("$100.00") == 100.00
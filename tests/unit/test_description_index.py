@@ -0,0 +1,69 @@
+"""
+Unit tests for DescriptionIndex.
+
+Tests that candidate filtering never drops a similar pair.
+"""
+
+import random
+import sys
+import os
+
+import Levenshtein
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'src'))
+
+from services.description_index import DescriptionIndex
+
+
+def _random_strings(rng, count):
+    words = ['netflix', 'spotify', 'costco whse', 'amazon', 'shell oil', 'gym', 'a', 'ab', 'rent']
+    strings = set()
+    while len(strings) < count:
+        s = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+        for _ in range(rng.randint(0, 3)):
+            pos = rng.randrange(len(s) + 1)
+            s = s[:pos] + rng.choice('abcxyz ') + s[pos + 1:]
+        strings.add(s[:rng.randint(0, len(s))] if rng.random() < 0.1 else s)
+    return sorted(strings)
+
+
+class TestDescriptionIndex:
+    """Test suite for DescriptionIndex."""
+    
+    def test_similar_matches_all_pairs(self):
+        """Test that the index finds exactly the pairs a full scan finds."""
+        rng = random.Random(3)
+        strings = _random_strings(rng, 300)
+        
+        for threshold in (0.6, 0.85, 0.95):
+            index = DescriptionIndex(strings, threshold)
+            for i in range(len(strings)):
+                expected = [
+                    j for j in range(len(strings))
+                    if j != i and Levenshtein.ratio(strings[i], strings[j]) >= threshold
+                ]
+                assert index.similar(i) == expected
+    
+    def test_similar_where_filter(self):
+        """Test that the predicate restricts results."""
+        index = DescriptionIndex(['netflix', 'netflix inc', 'netflx', 'spotify'], 0.8)
+        
+        assert index.similar(0) == [2]
+        assert index.similar(0, where=lambda j: j != 2) == []
+    
+    def test_length_range(self):
+        """Test partner lengths allowed by the threshold."""
+        index = DescriptionIndex([], 0.5)
+        low, high = index.length_range(9)
+        
+        # ratio <= 2 * min / (la + lb): 2*3/12 = 0.5, 2*9/36 = 0.5
+        assert low <= 3
+        assert high >= 27
+    
+    def test_empty_strings(self):
+        """Test that empty and very short strings are still verified."""
+        index = DescriptionIndex(['', 'a', 'ab'], 0.85)
+        
+        assert index.similar(0) == []
+        assert index.similar(1) == []
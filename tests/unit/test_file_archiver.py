@@ -0,0 +1,104 @@
+"""
+Unit tests for the compressed archive store and its manifest.
+"""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from migrate_add_archive_manifest import SCHEMA, index_existing_archives
+from services.csv_parser import CSVParser
+from services.file_archiver import FileArchiver, open_archive
+
+
+STATEMENT = (
+    "Date,Description,Amount\n"
+    "2025-01-05,GROCERY STORE,-45.50\n"
+    "2025-01-09,COFFEE SHOP,-3.00\n"
+)
+
+
+@pytest.fixture
+def statement(tmp_path):
+    path = tmp_path / 'statement.csv'
+    path.write_text(STATEMENT)
+    return str(path)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'archive.db')
+
+
+def test_archive_is_compressed_and_readable(tmp_path, statement):
+    """Archives are gzip files that read back (and re-parse) as the original CSV."""
+    archiver = FileArchiver(str(tmp_path / 'archives'))
+
+    result = archiver.archive_file(statement, 1, 'statement.csv')
+
+    assert result['success']
+    assert result['archive_path'].endswith('.csv.gz')
+    with open_archive(result['archive_path'], 'r') as f:
+        assert f.read() == STATEMENT
+    rows = CSVParser().parse_file(result['archive_path'])
+    assert [row['description'] for row in rows] == ['GROCERY STORE', 'COFFEE SHOP']
+
+    # Without a database, listing walks the directory
+    assert [a['path'] for a in archiver.list_archives(account_id=1)] == [result['archive_path']]
+
+
+def test_manifest_lists_filters_and_reuses(tmp_path, statement, db_path):
+    """The manifest carries the statement metadata and stores identical content once per account."""
+    archiver = FileArchiver(str(tmp_path / 'archives'), db_path=db_path)
+
+    first = archiver.archive_file(statement, 1, 'statement.csv', row_count=2,
+                                  period_start=date(2025, 1, 5), period_end=date(2025, 1, 9))
+    (tmp_path / 'other.csv').write_text(STATEMENT + "2025-01-10,BOOKS,-12.00\n")
+    archiver.archive_file(str(tmp_path / 'other.csv'), 2, 'other.csv')
+
+    archives = archiver.list_archives(account_id=1)
+    assert len(archives) == 1
+    assert archives[0]['path'] == first['archive_path']
+    assert archives[0]['codec'] == 'gzip'
+    assert archives[0]['row_count'] == 2
+    assert (archives[0]['period_start'], archives[0]['period_end']) == ('2025-01-05', '2025-01-09')
+    assert archives[0]['original_size'] == len(STATEMENT)
+    assert len(archiver.list_archives()) == 2
+
+    again = archiver.archive_file(statement, 1, 'statement.csv', sha256=archives[0]['sha256'])
+    assert again['reused']
+    assert again['archive_path'] == first['archive_path']
+
+    # The same content imported into another account is that account's archive
+    elsewhere = archiver.archive_file(statement, 2, 'statement.csv', sha256=archives[0]['sha256'])
+    assert not elsewhere['reused']
+    assert elsewhere['archive_path'] != first['archive_path']
+    assert elsewhere['archive_path'] in [a['path'] for a in archiver.list_archives(account_id=2)]
+
+    assert archiver.delete_archive(first['archive_path'])
+    assert archiver.list_archives(account_id=1) == []
+
+
+def test_unknown_codec_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        FileArchiver(str(tmp_path), codec='lzma')
+
+
+def test_migration_indexes_existing_archives(tmp_path, db_path):
+    """Uncompressed archives from before the manifest are indexed in place."""
+    month_dir = tmp_path / 'archives' / '2024' / '11'
+    month_dir.mkdir(parents=True)
+    (month_dir / '3_november_20241130_120000.csv').write_text(STATEMENT)
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    assert index_existing_archives(cursor, str(tmp_path / 'archives')) == 1
+    assert index_existing_archives(cursor, str(tmp_path / 'archives')) == 0
+    conn.commit()
+    conn.close()
+
+    archives = FileArchiver(str(tmp_path / 'archives'), db_path=db_path).list_archives(year=2024, month=11)
+    assert [(a['account_id'], a['codec']) for a in archives] == [(3, 'none')]
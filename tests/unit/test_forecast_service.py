@@ -0,0 +1,120 @@
+"""
+Unit tests for ForecastService.
+"""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from services.forecast_service import ForecastService
+
+
+START = date(2025, 1, 15)
+
+
+@pytest.fixture
+def forecast_data(app, sample_account, sample_category, recurring_tables):
+    """Monthly groceries, a linked streaming subscription and an unlinked pattern."""
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.execute("ALTER TABLE accounts ADD COLUMN initial_balance REAL DEFAULT 0")
+    conn.execute("UPDATE accounts SET initial_balance = 5000 WHERE id = ?", (sample_account,))
+
+    conn.executemany("""
+        INSERT INTO transactions (account_id, date, description, amount, category_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(sample_account, f'2024-{month:02d}-10', 'GROCERY STORE', -300.00, sample_category)
+          for month in range(7, 13)])
+    cursor = conn.execute("""
+        INSERT INTO transactions (account_id, date, description, amount)
+        VALUES (?, '2024-12-31', 'NETFLIX.COM', -15.99)
+    """, (sample_account,))
+    netflix_txn = cursor.lastrowid
+
+    conn.executemany("""
+        INSERT INTO recurring_transactions (merchant_name, description_pattern, frequency,
+            average_amount, last_transaction_date, next_expected_date, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [
+        ('NETFLIX', 'NETFLIX.COM', 'monthly', 15.99, '2024-12-31', '2025-01-31', 'active'),
+        ('GYM', 'CITY GYM', 'monthly', 40.00, '2024-12-20', '2025-01-20', 'active'),
+    ])
+    conn.execute("""
+        INSERT INTO recurring_transaction_instances (recurring_id, transaction_id, actual_date, actual_amount)
+        VALUES (1, ?, '2024-12-31', 15.99)
+    """, (netflix_txn,))
+    conn.commit()
+    conn.close()
+    return app.config['DATABASE']
+
+
+class TestForecastService:
+    """Test suite for the cash-flow forecast."""
+
+    def test_date_grid(self, forecast_data):
+        """Test the forecast covers each day of the requested months."""
+        result = ForecastService(forecast_data).forecast(months=3, start_date=START)
+
+        assert result['start_date'] == '2025-01-15'
+        assert result['end_date'] == '2025-04-14'
+        assert len(result['dates']) == 90
+        assert len(result['accounts'][0]['balances']) == 90
+        assert len(result['total']) == 90
+
+    def test_recurring_schedule_is_calendar_aware(self, forecast_data):
+        """Test a charge anchored on the 31st lands on the last day of short months."""
+        result = ForecastService(forecast_data).forecast(months=3, start_date=START)
+
+        assert len(result['recurring']) == 1
+        netflix = result['recurring'][0]
+        assert netflix['occurrences'] == 3
+        assert netflix['next_date'] == '2025-01-31'
+
+        balances = dict(zip(result['dates'], result['accounts'][0]['balances']))
+        baseline_per_day = -300 / 28
+        drop = balances['2025-02-28'] - balances['2025-02-27']
+        assert drop == pytest.approx(baseline_per_day - 15.99, abs=0.02)
+
+    def test_unlinked_patterns_are_unassigned(self, forecast_data):
+        """Test patterns without a linked transaction are counted, not projected."""
+        result = ForecastService(forecast_data).forecast(months=3, start_date=START)
+
+        assert result['unassigned_recurring'] == 1
+
+    def test_baselines_exclude_recurring_transactions(self, forecast_data):
+        """Test category baselines average history without linked recurring payments."""
+        result = ForecastService(forecast_data).forecast(months=3, start_date=START)
+
+        assert len(result['baselines']) == 1
+        assert result['baselines'][0]['category'] == 'Test Category'
+        assert result['baselines'][0]['monthly_amount'] == -300.00
+        assert result['accounts'][0]['monthly_baseline'] == -300.00
+
+    def test_balances(self, forecast_data):
+        """Test balances start from the current balance and apply all flows."""
+        result = ForecastService(forecast_data).forecast(months=3, start_date=START)
+        account = result['accounts'][0]
+
+        assert account['starting_balance'] == pytest.approx(5000 - 1800 - 15.99)
+        baseline = -300 * (17 / 31 + 1 + 1 + 14 / 30)
+        expected_end = account['starting_balance'] + baseline - 3 * 15.99
+        assert account['ending_balance'] == pytest.approx(expected_end, abs=0.01)
+        assert account['min_balance'] == account['ending_balance']
+        assert account['min_balance_date'] == '2025-04-14'
+
+    def test_account_filter(self, forecast_data, sample_account):
+        """Test forecasting a single account."""
+        service = ForecastService(forecast_data)
+
+        assert len(service.forecast(months=1, account_id=sample_account, start_date=START)['accounts']) == 1
+        assert service.forecast(months=1, account_id=sample_account + 1, start_date=START)['accounts'] == []
+
+    def test_forecast_endpoint(self, client, forecast_data):
+        """Test the report endpoint returns the forecast."""
+        response = client.get('/reports/api/cash-flow-forecast?months=2&start_date=2025-01-15')
+        data = response.get_json()
+
+        assert response.status_code == 200
+        assert data['success'] is True
+        assert data['end_date'] == '2025-03-14'
+        assert data['recurring'][0]['merchant_name'] == 'NETFLIX'
@@ -0,0 +1,146 @@
+"""
+Unit tests for import batch tracking and undo.
+"""
+
+import hashlib
+import sqlite3
+
+import pytest
+
+from services.batch_import import import_batch
+from services.import_batches import ImportBatches
+from services.import_pipeline import import_file
+from services.imported_files import ImportedFiles
+
+
+STATEMENT = (
+    "Date,Description,Amount\n"
+    "2025-02-14,NETFLIX.COM #555,-15.99\n"
+    "2025-02-20,GROCERY STORE,-45.50\n"
+    "2025-02-28,SALARY,2500.00\n"
+)
+
+
+def _import(db_path, tmp_path, account_id, content=STATEMENT, name='statement.csv'):
+    path = tmp_path / name
+    path.write_text(content)
+    return import_file(db_path, str(path), account_id, name)
+
+
+def test_import_stamps_rows_and_summarizes(app, sample_account, tmp_path):
+    """Imported rows carry their batch; the batch summary aggregates them."""
+    db_path = app.config['DATABASE']
+
+    result = _import(db_path, tmp_path, sample_account)
+
+    batches = ImportBatches(db_path).list(account_id=sample_account)
+    assert [b['id'] for b in batches] == [result['import_batch_id']]
+    batch = batches[0]
+    assert batch['import_id'] == result['import_id']
+    assert batch['sha256'] == hashlib.sha256(STATEMENT.encode()).hexdigest()
+    assert (batch['row_count'], batch['total_amount']) == (3, 2438.51)
+    assert (batch['date_from'], batch['date_to']) == ('2025-02-14', '2025-02-28')
+    assert batch['status'] == 'active'
+
+
+def test_undo_keeps_balances_consistent(app, daily_balances, sample_account, tmp_path):
+    """Undo deletes only the batch's rows; balance aggregates follow through the triggers."""
+    db_path = app.config['DATABASE']
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        INSERT INTO transactions (account_id, date, description, amount)
+        VALUES (?, '2025-02-20', 'MANUAL', -10.00)
+    """, (sample_account,))
+    conn.commit()
+    conn.close()
+
+    batch_id = _import(db_path, tmp_path, sample_account)['import_batch_id']
+    service = ImportBatches(db_path)
+
+    assert service.undo(batch_id)['transactions_deleted'] == 3
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT description FROM transactions").fetchall() == [('MANUAL',)]
+        assert conn.execute("SELECT current_balance FROM accounts WHERE id = ?",
+                            (sample_account,)).fetchone() == (-10.0,)
+        assert conn.execute("""
+            SELECT date, net_change FROM daily_balances WHERE net_change != 0
+        """).fetchall() == [('2025-02-20', -10.0)]
+    finally:
+        conn.close()
+
+    assert service.get(batch_id)['status'] == 'undone'
+    assert service.get(batch_id)['row_count'] == 0
+    # The file can be imported again
+    assert ImportedFiles(db_path).find(hashlib.sha256(STATEMENT.encode()).hexdigest()) is None
+    with pytest.raises(ValueError):
+        service.undo(batch_id)
+    assert service.undo(batch_id + 100) is None
+
+
+def test_undo_rewinds_recurring_patterns(app, recurring_tables, sample_account, tmp_path):
+    """Instances linked to the batch are removed and the pattern dates recomputed."""
+    db_path = app.config['DATABASE']
+    conn = sqlite3.connect(db_path)
+    earlier = conn.execute("""
+        INSERT INTO transactions (account_id, date, description, amount)
+        VALUES (?, '2025-01-15', 'NETFLIX.COM #554', -15.99)
+    """, (sample_account,)).lastrowid
+    conn.executescript(f"""
+        INSERT INTO recurring_transactions (merchant_name, description_pattern, frequency,
+            average_amount, last_transaction_date, next_expected_date, confidence_score)
+        VALUES ('NETFLIX', 'NETFLIX.COM #123', 'monthly', 15.99, '2025-01-15', '2025-02-14', 0.95);
+        INSERT INTO recurring_transaction_instances (recurring_id, transaction_id, expected_date, actual_date)
+        VALUES (1, {earlier}, '2025-01-15', '2025-01-15');
+    """)
+    conn.commit()
+    conn.close()
+
+    result = _import(db_path, tmp_path, sample_account)
+    assert result['recurring_linked'] == 1
+
+    undone = ImportBatches(db_path).undo(result['import_batch_id'])
+
+    assert undone['recurring_instances_removed'] == 1
+    assert undone['recurring_patterns_updated'] == 1
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("""
+            SELECT last_transaction_date, next_expected_date FROM recurring_transactions
+        """).fetchone() == ('2025-01-15', '2025-02-14')
+        assert conn.execute("SELECT transaction_id FROM recurring_transaction_instances").fetchall() == [(earlier,)]
+    finally:
+        conn.close()
+
+
+def test_batch_import_creates_a_batch_per_file(app, sample_account, tmp_path):
+    """Each file of a multi-file import is its own batch and can be undone alone."""
+    db_path = app.config['DATABASE']
+    (tmp_path / 'january.csv').write_text("Date,Description,Amount\n2025-01-05,BOOKS,-12.00\n")
+    (tmp_path / 'february.csv').write_text(STATEMENT)
+
+    summary = import_batch(db_path, [str(tmp_path / 'january.csv'), str(tmp_path / 'february.csv')],
+                           default_account_id=sample_account, workers=1)
+    january, february = [f['import_batch_id'] for f in summary['files']]
+
+    assert ImportBatches(db_path).get(january)['source'] == 'batch'
+    assert ImportBatches(db_path).undo(february)['transactions_deleted'] == 3
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT description FROM transactions").fetchall() == [('BOOKS',)]
+    conn.close()
+
+
+def test_undo_route(app, client, sample_account, tmp_path):
+    """The undo endpoint reports what it removed; unknown and repeated undos fail."""
+    batch_id = _import(app.config['DATABASE'], tmp_path, sample_account)['import_batch_id']
+
+    response = client.post(f'/import/api/batches/{batch_id}/undo')
+    assert response.status_code == 200
+    assert response.get_json()['transactions_deleted'] == 3
+
+    assert client.post(f'/import/api/batches/{batch_id}/undo').status_code == 409
+    assert client.post('/import/api/batches/999/undo').status_code == 404
+
+    response = client.get(f'/import/api/batches?account_id={sample_account}')
+    assert [b['status'] for b in response.get_json()['batches']] == ['undone']
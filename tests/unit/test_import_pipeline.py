@@ -0,0 +1,267 @@
+"""
+Unit tests for the staged import pipeline.
+"""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from services.import_pipeline import (
+    ImportContext, ImportPipeline, ImportStage, default_stages, import_file
+)
+from services.import_history import ImportHistory
+from services.job_runner import JobCancelled, JobRunner
+
+
+@pytest.fixture
+def statement(tmp_path):
+    """A CSV statement with two identical rows and one invalid row."""
+    path = tmp_path / 'statement.csv'
+    path.write_text(
+        "Date,Description,Amount\n"
+        "2025-01-01,GROCERY STORE,-45.50\n"
+        "2025-01-02,COFFEE SHOP,-3.00\n"
+        "2025-01-02,COFFEE SHOP,-3.00\n"
+        "2025-01-03,SALARY,2500.00\n"
+        "2025-01-04,REFUND,0.00\n"
+    )
+    return str(path)
+
+
+def _transaction_count(db_path):
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    conn.close()
+    return count
+
+
+class TestImportPipeline:
+    """Test suite for ImportPipeline and import_file."""
+
+    def test_import_file_counts_and_stage_metrics(self, app, sample_account, sample_category, statement):
+        """Test the summary counts and that every stage reports its rows."""
+        db_path = app.config['DATABASE']
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO categorization_rules (pattern, category_id) VALUES ('GROCERY', ?)",
+                     (sample_category,))
+        conn.commit()
+        conn.close()
+
+        result = import_file(db_path, statement, sample_account, 'statement.csv')
+
+        # Identical rows within one file are both kept
+        assert result['count'] == 4
+        assert result['duplicates_skipped'] == 0
+        assert result['categorized'] == 1
+        assert _transaction_count(db_path) == 4
+
+        stages = {stage['stage']: stage for stage in result['stages']}
+        assert result['import_id']
+        assert list(stages) == ['parse', 'validate', 'dedupe', 'categorize', 'insert',
+                                'link_recurring', 'archive']
+        assert (stages['validate']['rows_in'], stages['validate']['rows_out']) == (
+            stages['parse']['rows_out'], 4)
+        assert stages['insert']['rows_in'] == 4
+        assert all(stage['ms'] >= 0 for stage in result['stages'])
+
+    def test_reimport_skips_duplicates(self, app, sample_account, statement):
+        """Test importing the same file twice inserts nothing the second time."""
+        db_path = app.config['DATABASE']
+        import_file(db_path, statement, sample_account, 'statement.csv')
+        result = import_file(db_path, statement, sample_account, 'statement.csv')
+
+        assert result['count'] == 0
+        assert result['duplicates_skipped'] == 4
+        assert _transaction_count(db_path) == 4
+
+    def test_import_runs_recorded(self, app, client, sample_account, statement, tmp_path):
+        """Test completed and failed imports are stored and queryable."""
+        db_path = app.config['DATABASE']
+        result = import_file(db_path, statement, sample_account, 'statement.csv')
+        with pytest.raises(Exception):
+            import_file(db_path, str(tmp_path / 'missing.csv'), sample_account, 'missing.csv')
+
+        runs = client.get(f'/import/api/history?account_id={sample_account}').get_json()['imports']
+        assert [run['status'] for run in runs] == ['failed', 'completed']
+        assert runs[0]['filename'] == 'missing.csv' and runs[0]['error']
+
+        run = client.get(f"/import/api/history/{result['import_id']}").get_json()['import']
+        assert (run['rows_parsed'], run['invalid'], run['inserted'], run['duplicates']) == (5, 1, 4, 0)
+        assert [stage['stage'] for stage in run['stages']][:2] == ['parse', 'validate']
+        assert client.get('/import/api/history/999').status_code == 404
+
+    def test_cancelled_import_recorded(self, app, sample_account, statement):
+        """Test a cancelled import is stored as cancelled, also in a table from before cancellation."""
+        db_path = app.config['DATABASE']
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE import_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, account_id INTEGER, filename TEXT,
+                status TEXT NOT NULL CHECK(status IN ('completed', 'failed')),
+                rows_parsed INTEGER NOT NULL DEFAULT 0, rows_skipped INTEGER NOT NULL DEFAULT 0,
+                invalid INTEGER NOT NULL DEFAULT 0, duplicates INTEGER NOT NULL DEFAULT 0,
+                inserted INTEGER NOT NULL DEFAULT 0, categorized INTEGER NOT NULL DEFAULT 0,
+                recurring_linked INTEGER NOT NULL DEFAULT 0, warnings TEXT, stages TEXT, error TEXT,
+                elapsed_ms REAL, started_at TIMESTAMP, finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("INSERT INTO import_runs (filename, status) VALUES ('old.csv', 'completed')")
+        conn.commit()
+        conn.close()
+
+        def progress(current, total, message):
+            if message == 'Importing':
+                raise JobCancelled()
+
+        with pytest.raises(JobCancelled):
+            import_file(db_path, statement, sample_account, 'statement.csv', progress=progress)
+
+        runs = ImportHistory(db_path).list()
+        assert [(run['filename'], run['status']) for run in runs] == [
+            ('statement.csv', 'cancelled'), ('old.csv', 'completed')]
+        assert ImportHistory(db_path).list(status='cancelled')[0]['error'] == 'Cancelled'
+
+    def test_cancelled_import_leaves_no_rows(self, app, sample_account, tmp_path):
+        """Test batches inserted before a cancellation are rolled back."""
+        db_path = app.config['DATABASE']
+        path = tmp_path / 'large.csv'
+        path.write_text("Date,Description,Amount\n" + ''.join(
+            f"2025-01-{day % 28 + 1:02d},SHOP {index},-{index + 1}.00\n"
+            for index, day in enumerate(range(600))))
+        reports = []
+
+        def progress(current, total, message):
+            reports.append(current)
+            if message == 'Importing' and current >= 500:
+                raise JobCancelled()
+
+        with pytest.raises(JobCancelled):
+            import_file(db_path, str(path), sample_account, 'large.csv', progress=progress)
+
+        # Two batches had passed the insert stage when the import was cancelled
+        assert reports[-1] == 500
+        assert _transaction_count(db_path) == 0
+        assert ImportHistory(db_path).list()[0]['inserted'] == 0
+
+    def test_custom_stage_and_progress(self, app, sample_account):
+        """Test an inserted stage sees every batch and progress reaches the total."""
+        class TagStage(ImportStage):
+            name = 'tag'
+
+            def process(self, batch, context):
+                for txn in batch:
+                    txn['tags'] = 'imported'
+                context.count('tagged', len(batch))
+                return batch
+
+        db_path = app.config['DATABASE']
+        rows = [{'date': date(2025, 2, day), 'description': f'SHOP {day}', 'amount': -day}
+                for day in range(1, 11)]
+        stages = default_stages(db_path)
+        stages.insert(3, TagStage())
+        context = ImportContext(db_path, sample_account, '', 'rows.csv')
+        reports = []
+
+        metrics = ImportPipeline(stages, batch_size=4).run(
+            rows, context, lambda current, total, message: reports.append((current, total)))
+
+        assert context.counts['tagged'] == 10
+        assert context.counts['inserted'] == 10
+        assert [m.batches for m in metrics if m.name == 'tag'] == [3]
+        assert reports[-1] == (10, 10)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM transactions WHERE tags = 'imported'").fetchone()[0] == 10
+        conn.close()
+
+    def test_confirm_import_async(self, app, client, sample_account, statement, tmp_path):
+        """Test the confirm route runs the pipeline as a job when asked to."""
+        app.config['ARCHIVE_DIR'] = str(tmp_path / 'archives')
+        with client.session_transaction() as sess:
+            sess['import_temp_file'] = statement
+            sess['import_account_id'] = sample_account
+            sess['import_filename'] = 'statement.csv'
+            sess['import_valid_count'] = 4
+
+        response = client.post('/import/confirm?async=1')
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+
+        job = JobRunner(app.config['DATABASE']).wait(job_id, timeout=10)
+        assert job['type'] == 'import'
+        assert job['status'] == 'completed'
+        assert job['result']['count'] == 4
+
+        with client.session_transaction() as sess:
+            assert 'import_temp_file' not in sess
+
+
+class TestStagedImport:
+    """Test suite for the set-based staging-table import (staged=True)."""
+
+    def test_staged_import_counts(self, app, sample_account, sample_category, statement):
+        """Test invalid rows and exact duplicates are dropped and the rest inserted in one go."""
+        db_path = app.config['DATABASE']
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO categorization_rules (pattern, category_id) VALUES ('GROCERY', ?)",
+                     (sample_category,))
+        conn.execute("""
+            INSERT INTO transactions (account_id, date, description, amount)
+            VALUES (?, '2025-01-03', 'SALARY', 2500.00)
+        """, (sample_account,))
+        conn.commit()
+        conn.close()
+
+        result = import_file(db_path, statement, sample_account, 'statement.csv', staged=True)
+
+        assert (result['count'], result['invalid'], result['duplicates_skipped'],
+                result['categorized']) == (3, 1, 1, 1)
+        assert [stage['stage'] for stage in result['stages']] == ['parse', 'staged_insert', 'archive']
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("""
+            SELECT date, description, category_id, import_batch_id FROM transactions
+            WHERE import_batch_id IS NOT NULL ORDER BY id
+        """).fetchall()
+        conn.close()
+        batch = result['import_batch_id']
+        assert rows == [('2025-01-01', 'GROCERY STORE', sample_category, batch),
+                        ('2025-01-02', 'COFFEE SHOP', None, batch),
+                        ('2025-01-02', 'COFFEE SHOP', None, batch)]
+
+    def test_staged_categories_match_engine(self, app, sample_account, tmp_path):
+        """Test the compiled rule terms pick the same category as the rule engine."""
+        from services.categorization_engine import CategorizationEngine
+
+        db_path = app.config['DATABASE']
+        conn = sqlite3.connect(db_path)
+        categories = [conn.execute(
+            "INSERT INTO categories (name, level, type) VALUES (?, 1, 'expense')", (name,)).lastrowid
+            for name in ('Groceries', 'Coffee', 'Fuel', 'Travel')]
+        conn.executemany(
+            "INSERT INTO categorization_rules (pattern, category_id, priority) VALUES (?, ?, ?)", [
+                ('WHOLE FOODS', categories[0], 10),
+                ('STARBUCKS|PEET', categories[1], 5),
+                ('SHELL OIL', categories[2], 5),
+                ('AIR', categories[3], 1),
+                ('FOODS MARKET', categories[3], 0),
+            ])
+        conn.commit()
+        conn.close()
+
+        descriptions = ['WHOLE FOODS #123', 'PEETS COFFEE', 'SHELL STATION', 'AIR CANADA',
+                        'FOODS', 'Starbucks Store 5', 'CORNER STORE', 'AIRBNB', 'MARKET HALL FOODS']
+        path = tmp_path / 'statement.csv'
+        path.write_text("Date,Description,Amount\n" + ''.join(
+            f"2025-03-{day:02d},{description},-{day}.00\n" for day, description in enumerate(descriptions, 1)))
+
+        import_file(db_path, str(path), sample_account, 'statement.csv', staged=True)
+
+        conn = sqlite3.connect(db_path)
+        staged = dict(conn.execute("SELECT description, category_id FROM transactions").fetchall())
+        conn.close()
+        engine = CategorizationEngine(db_path)
+        expected = {d: engine.categorize_transaction({'description': d})['category_id'] for d in descriptions}
+        assert staged == expected
+        assert [d for d, category in staged.items() if category is None] == ['CORNER STORE']
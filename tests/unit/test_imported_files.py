@@ -0,0 +1,172 @@
+"""
+Unit tests for the imported files ledger.
+"""
+
+import hashlib
+import io
+import sqlite3
+
+import pytest
+
+from services.import_batches import ImportBatches
+from services.imported_files import ImportedFiles, hash_file, save_and_hash
+from services.import_pipeline import import_file
+from services.job_runner import JobCancelled
+
+
+STATEMENT = (
+    "Date,Description,Amount\n"
+    "2025-01-05,GROCERY STORE,-45.50\n"
+    "2025-01-09,COFFEE SHOP,-3.00\n"
+)
+
+
+@pytest.fixture
+def statement(tmp_path):
+    path = tmp_path / 'statement.csv'
+    path.write_text(STATEMENT)
+    return str(path)
+
+
+def _upload(client, account_id, **form):
+    return client.post('/import/upload', data={
+        'file': (io.BytesIO(STATEMENT.encode()), 'statement.csv'),
+        'account_id': str(account_id),
+        **form
+    }, content_type='multipart/form-data')
+
+
+def test_save_and_hash_matches_content(tmp_path):
+    """Streaming to disk yields the content's SHA-256 and size."""
+    path = str(tmp_path / 'copy.csv')
+    digest, size = save_and_hash(io.BytesIO(STATEMENT.encode() * 5000), path)
+
+    assert digest == hashlib.sha256(STATEMENT.encode() * 5000).hexdigest()
+    assert size == len(STATEMENT) * 5000
+    assert hash_file(path) == (digest, size)
+
+
+def test_import_records_ledger_and_archives_per_account(app, sample_account, tmp_path):
+    """Imports add ledger entries; identical content is archived once per account."""
+    db_path = app.config['DATABASE']
+    archive_dir = str(tmp_path / 'archives')
+    conn = sqlite3.connect(db_path)
+    other_account = conn.execute(
+        "INSERT INTO accounts (name, type) VALUES ('Other', 'savings')").lastrowid
+    conn.commit()
+    conn.close()
+
+    for account_id in (sample_account, other_account):
+        path = tmp_path / f'upload_{account_id}.csv'
+        path.write_text(STATEMENT)
+        import_file(db_path, str(path), account_id, 'statement.csv', archive_dir=archive_dir)
+
+    digest = hashlib.sha256(STATEMENT.encode()).hexdigest()
+    ledger = ImportedFiles(db_path)
+    first, second = ledger.find(digest, sample_account), ledger.find(digest, other_account)
+
+    assert (first['row_count'], first['date_from'], first['date_to']) == (2, '2025-01-05', '2025-01-09')
+    assert first['size'] == len(STATEMENT)
+    assert first['import_id']
+    assert first['archive_path'] != second['archive_path']
+    assert len(list((tmp_path / 'archives').rglob('*.csv.gz'))) == 2
+
+    # A forced re-import into the same account reuses its archive
+    path = tmp_path / 'again.csv'
+    path.write_text(STATEMENT)
+    import_file(db_path, str(path), sample_account, 'statement.csv', archive_dir=archive_dir)
+    assert ledger.find(digest, sample_account)['archive_path'] == first['archive_path']
+    assert len(list((tmp_path / 'archives').rglob('*.csv.gz'))) == 2
+
+
+def test_upload_rejects_exact_reupload(app, client, balance_tracking, sample_account, tmp_path):
+    """A file already imported into the account is rejected before parsing unless forced."""
+    app.config['ARCHIVE_DIR'] = str(tmp_path / 'archives')
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.execute("ALTER TABLE accounts ADD COLUMN reference_date DATE")
+    conn.commit()
+    conn.close()
+
+    assert _upload(client, sample_account).status_code == 200
+    assert client.post('/import/confirm').status_code == 200
+
+    response = _upload(client, sample_account)
+    assert response.status_code == 409
+    assert response.get_json()['already_imported']
+    assert response.get_json()['imported_file']['row_count'] == 2
+
+    assert _upload(client, sample_account, force='1').status_code == 200
+
+
+def test_reupload_after_reset(app, client, balance_tracking, sample_account, tmp_path):
+    """Resetting transactions releases imported files, so the same file can be uploaded again."""
+    app.config['ARCHIVE_DIR'] = str(tmp_path / 'archives')
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.execute("ALTER TABLE accounts ADD COLUMN reference_date DATE")
+    conn.commit()
+    conn.close()
+
+    assert _upload(client, sample_account).status_code == 200
+    assert client.post('/import/confirm').status_code == 200
+
+    response = client.post('/admin/api/reset-database', json={
+        'confirmation': 'DELETE ALL DATA', 'reset_type': 'transactions'
+    })
+    assert response.get_json()['transactions_deleted'] == 2
+
+    assert _upload(client, sample_account).status_code == 200
+
+
+def test_undone_batch_no_longer_counts_as_imported(app, sample_account, statement, tmp_path):
+    """A ledger entry whose only import batch was undone is not a re-upload."""
+    db_path = app.config['DATABASE']
+    import_file(db_path, statement, sample_account, 'statement.csv',
+                archive_dir=str(tmp_path / 'archives'))
+    digest = hashlib.sha256(STATEMENT.encode()).hexdigest()
+    assert ImportedFiles(db_path).find(digest, sample_account)
+
+    # Undone outside ImportBatches.undo(), which would also drop the entry
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE import_batches SET status = 'undone'")
+    conn.commit()
+    conn.close()
+
+    assert ImportedFiles(db_path).find(digest, sample_account) is None
+
+
+def test_cancelled_import_does_not_hold_file(app, sample_account, statement, tmp_path):
+    """A cancelled import is undone and never keeps a re-imported file in the ledger."""
+    db_path = app.config['DATABASE']
+    archive_dir = str(tmp_path / 'archives')
+    digest = hashlib.sha256(STATEMENT.encode()).hexdigest()
+
+    def progress(current, total, message):
+        # The rows are committed by then
+        if message == 'Done':
+            raise JobCancelled()
+
+    with pytest.raises(JobCancelled):
+        import_file(db_path, statement, sample_account, 'statement.csv',
+                    archive_dir=archive_dir, progress=progress)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 0
+    cancelled_batch, status = conn.execute("SELECT id, status FROM import_batches").fetchone()
+    assert status == 'undone'
+    conn.close()
+
+    # The archive stage moved the source away before the cancellation
+    with open(statement, 'w') as f:
+        f.write(STATEMENT)
+    result = import_file(db_path, statement, sample_account, 'statement.csv', archive_dir=archive_dir)
+    assert ImportedFiles(db_path).find(digest, sample_account)
+
+    # A cancelled batch left active (before cancelled imports were undone)
+    # does not hold the file either
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE import_batches SET status = 'active' WHERE id = ?", (cancelled_batch,))
+    conn.commit()
+    conn.close()
+
+    ImportBatches(db_path).undo(result['import_batch_id'])
+    assert ImportedFiles(db_path).find(digest, sample_account) is None
@@ -0,0 +1,142 @@
+"""
+Unit tests for the background job runner and job routes.
+"""
+
+import sqlite3
+import threading
+from unittest.mock import patch
+
+from services import job_runner
+from services.job_runner import JobRunner, INTERRUPTED_ERROR
+
+
+def _add_numbers(a, b, progress):
+    progress(1, 2, 'Adding')
+    return {'sum': a + b}
+
+
+def _fail(progress):
+    raise ValueError('boom')
+
+
+class TestJobRunner:
+    """Test suite for JobRunner."""
+
+    def test_completed_job_stores_result_and_progress(self, app):
+        """Test a finished job keeps its params, result and last progress."""
+        runner = JobRunner(app.config['DATABASE'])
+        job_id = runner.submit('add', _add_numbers, {'a': 2, 'b': 3})
+        job = runner.wait(job_id, timeout=5)
+
+        assert job['status'] == 'completed'
+        assert job['params'] == {'a': 2, 'b': 3}
+        assert job['result'] == {'sum': 5}
+        assert (job['progress_current'], job['progress_total'], job['message']) == (1, 2, 'Adding')
+        assert job['percent'] == 50.0
+        assert job['started_at'] and job['finished_at']
+
+    def test_failed_job_records_error(self, app):
+        """Test an exception marks the job failed with its message."""
+        runner = JobRunner(app.config['DATABASE'])
+        job = runner.wait(runner.submit('fail', _fail), timeout=5)
+
+        assert job['status'] == 'failed'
+        assert job['error'] == 'boom'
+        assert job['result'] is None
+
+    def test_cancel_running_job(self, app):
+        """Test a running job stops at its next progress report after cancel."""
+        runner = JobRunner(app.config['DATABASE'])
+        started, resume = threading.Event(), threading.Event()
+
+        def long_job(progress):
+            progress(0, 10, 'Working')
+            started.set()
+            resume.wait(5)
+            progress(1)
+            return {'finished': True}
+
+        job_id = runner.submit('long', long_job)
+        assert started.wait(5)
+        assert runner.get(job_id)['status'] == 'running'
+
+        assert runner.cancel(job_id)
+        resume.set()
+        job = runner.wait(job_id, timeout=5)
+
+        assert job['status'] == 'cancelled'
+        assert job['result'] is None
+        assert (job['progress_current'], job['progress_total']) == (0, 10)
+        assert not runner.cancel(job_id)
+
+    def test_interrupted_jobs_failed_after_restart(self, app):
+        """Test jobs left running by a previous process are marked failed."""
+        db_path = app.config['DATABASE']
+        JobRunner(db_path).list()
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO jobs (type, status) VALUES ('scan', 'running')")
+        conn.execute("INSERT INTO jobs (type, status, result) VALUES ('scan', 'completed', '{}')")
+        conn.commit()
+        conn.close()
+
+        # A new process has not seen this database yet
+        with patch.object(job_runner, '_ready_databases', set()):
+            jobs = JobRunner(db_path).list(job_type='scan')
+
+        assert [(job['status'], job['error']) for job in jobs] == [
+            ('completed', None),
+            ('failed', INTERRUPTED_ERROR)
+        ]
+
+
+class TestJobRoutes:
+    """Test suite for async routes and job polling."""
+
+    def test_recategorize_async(self, app, client, sample_account, sample_category):
+        """Test recategorize-all returns a job ID whose result matches the sync route."""
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.execute("INSERT INTO categorization_rules (pattern, category_id) VALUES ('GROCERY', ?)",
+                     (sample_category,))
+        conn.executemany("""
+            INSERT INTO transactions (account_id, date, description, amount)
+            VALUES (?, '2025-01-01', ?, -10.00)
+        """, [(sample_account, 'GROCERY STORE'), (sample_account, 'UNKNOWN SHOP')])
+        conn.commit()
+        conn.close()
+
+        response = client.post('/categories/api/recategorize-all?async=1')
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+        assert response.get_json()['status_url'] == f'/jobs/api/{job_id}'
+
+        JobRunner(app.config['DATABASE']).wait(job_id, timeout=10)
+        job = client.get(f'/jobs/api/{job_id}').get_json()['job']
+
+        assert job['type'] == 'recategorize'
+        assert job['status'] == 'completed'
+        assert job['result'] == {'total': 2, 'categorized': 1, 'success_rate': 50.0, 'mode': 'soft'}
+        assert client.get('/jobs/api/?type=recategorize').get_json()['jobs'][0]['id'] == job_id
+
+    def test_unknown_and_finished_jobs(self, app, client):
+        """Test polling a missing job is a 404 and cancelling a finished one a 409."""
+        assert client.get('/jobs/api/999').status_code == 404
+
+        runner = JobRunner(app.config['DATABASE'])
+        job_id = runner.submit('add', _add_numbers, {'a': 1, 'b': 1})
+        runner.wait(job_id, timeout=5)
+
+        assert client.post(f'/jobs/api/{job_id}/cancel').status_code == 409
+
+    def test_stream_ends_when_job_disappears(self, app, client):
+        """Test streaming a job removed mid-stream ends with an error event."""
+        runner = JobRunner(app.config['DATABASE'])
+        job_id = runner.submit('add', _add_numbers, {'a': 1, 'b': 1})
+        job = runner.wait(job_id, timeout=5)
+
+        with patch.object(JobRunner, 'get', side_effect=[job, None]):
+            response = client.get(f'/jobs/api/{job_id}/events')
+            body = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert body.startswith('event: error\n')
+        assert 'Job not found' in body
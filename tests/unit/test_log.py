@@ -0,0 +1,63 @@
+"""
+Unit tests for the logging helpers.
+"""
+
+import logging
+
+from utils.log import KeyValueFormatter, LOG_FORMAT, SampledLogger
+
+
+def test_sampled_logger_logs_first_and_every_nth(caplog):
+    """Only the first occurrences and every Nth one after them are logged."""
+    sampler = SampledLogger(logging.getLogger('test.sampled'), first=3, every=10)
+
+    with caplog.at_level(logging.WARNING):
+        for i in range(25):
+            sampler.warning('bad row', 'Bad row %d', i)
+
+    assert [r.getMessage() for r in caplog.records] == [
+        'Bad row 0', 'Bad row 1', 'Bad row 2',
+        'Bad row 9 (occurrence 10, others not logged)',
+        'Bad row 19 (occurrence 20, others not logged)'
+    ]
+    assert sampler.total('bad row') == 25
+
+
+def test_sampled_logger_flush_reports_totals(caplog):
+    """Flush logs one total per sampled key and resets the counts."""
+    sampler = SampledLogger(logging.getLogger('test.sampled'), first=2, every=100)
+    for _ in range(5):
+        sampler.warning('bad date', 'Bad date')
+    sampler.warning('bad amount', 'Bad amount')
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        sampler.flush()
+
+    assert [r.getMessage() for r in caplog.records] == ['bad date: 5 occurrences (2 logged)']
+    assert sampler.total() == 0
+
+
+def test_sampled_logger_counts_when_level_disabled(caplog):
+    """Occurrences are counted even when their level is not logged."""
+    logger = logging.getLogger('test.sampled.quiet')
+    logger.setLevel(logging.ERROR)
+    sampler = SampledLogger(logger)
+
+    with caplog.at_level(logging.WARNING):
+        sampler.warning('bad row', 'Bad row')
+
+    assert not caplog.records
+    assert sampler.total() == 1
+
+
+def test_key_value_formatter_appends_fields():
+    """Structured fields are appended as key=value pairs, quoted when needed."""
+    record = logging.LogRecord('services.import_pipeline', logging.INFO, __file__, 1,
+                               'Imported %s', ('a.csv',), None)
+    record.fields = {'inserted': 10, 'filename': 'my file.csv'}
+
+    line = KeyValueFormatter(LOG_FORMAT).format(record)
+
+    assert 'level=INFO logger=services.import_pipeline msg="Imported a.csv"' in line
+    assert line.endswith('inserted=10 filename="my file.csv"')
@@ -0,0 +1,110 @@
+"""
+Unit tests for the in-process metrics registry and /metrics endpoint.
+"""
+
+import pytest
+
+from utils import metrics
+from utils.metrics import MetricsRegistry
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    """Start each test with empty metric values."""
+    metrics.REGISTRY.clear()
+    yield
+    metrics.REGISTRY.clear()
+
+
+def test_counter_render():
+    """Counters render with labels and HELP/TYPE headers."""
+    registry = MetricsRegistry()
+    counter = registry.counter('jobs_total', 'Jobs run', ('kind',))
+    counter.inc(kind='scan')
+    counter.inc(2, kind='scan')
+
+    text = registry.render()
+    assert '# TYPE jobs_total counter' in text
+    assert 'jobs_total{kind="scan"} 3' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    """Histogram buckets are cumulative and include +Inf, sum and count."""
+    registry = MetricsRegistry()
+    hist = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    hist.observe(0.05)
+    hist.observe(0.5)
+    hist.observe(5)
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert 'latency_seconds_count 3' in text
+    assert hist.get_sum() == pytest.approx(5.55)
+
+
+def test_label_values_escaped():
+    """Quotes and backslashes in label values are escaped."""
+    registry = MetricsRegistry()
+    counter = registry.counter('odd_total', 'Odd labels', ('name',))
+    counter.inc(name='a"b\\c')
+
+    assert 'odd_total{name="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_wrong_labels_rejected():
+    """Metrics reject label sets that don't match their declaration."""
+    registry = MetricsRegistry()
+    counter = registry.counter('x_total', 'X', ('a',))
+    with pytest.raises(ValueError):
+        counter.inc(b='1')
+
+
+def test_request_metrics_recorded(client):
+    """Requests are counted and timed per blueprint and route."""
+    client.get('/health')
+    client.get('/categories/api/all')
+
+    assert metrics.REQUEST_COUNT.get(
+        blueprint='app', endpoint='/health', method='GET', status='200'
+    ) == 1
+    assert metrics.REQUEST_LATENCY.get_count(blueprint='categories', endpoint='/categories/api/all') == 1
+    assert metrics.BLUEPRINT_LATENCY.get_count(blueprint='categories') == 1
+    assert metrics.RESPONSE_SIZE.get_count(blueprint='app', endpoint='/health') == 1
+
+
+def test_unmatched_routes_share_label(client):
+    """404s are grouped under one label to keep cardinality bounded."""
+    client.get('/no-such-page-1')
+    client.get('/no-such-page-2')
+
+    assert metrics.REQUEST_COUNT.get(
+        blueprint='app', endpoint='unmatched', method='GET', status='404'
+    ) == 2
+
+
+def test_import_and_cache_metrics():
+    """Import throughput and cache hit ratio are derived from recorded events."""
+    metrics.record_import(1000, 0.5)
+    metrics.record_cache_hit('categories')
+    metrics.record_cache_hit('categories')
+    metrics.record_cache_hit('categories')
+    metrics.record_cache_miss('categories')
+
+    text = metrics.REGISTRY.render()
+    assert 'import_rows_total{source="csv"} 1000' in text
+    assert 'import_throughput_rows_per_second_bucket{source="csv",le="10000"} 1' in text
+    assert 'cache_hit_ratio{cache="categories"} 0.75' in text
+
+
+def test_metrics_endpoint(client):
+    """The /metrics endpoint serves the Prometheus text format."""
+    client.get('/health')
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    body = response.data.decode()
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_requests_total{blueprint="app",endpoint="/health",method="GET",status="200"} 1' in body
@@ -0,0 +1,105 @@
+"""
+Unit tests for RecurringAnalyzer.
+
+Tests the batch analysis against the per-group RecurringDetector helpers
+and the calendar-aware cadences.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from services.recurring_analyzer import RecurringAnalyzer, add_months, nominal_date
+from services.recurring_detector import RecurringDetector
+
+
+def _random_groups(rng, count):
+    date_groups, amount_groups = [], []
+    for _ in range(count):
+        step = rng.choice([7, 14, 30, 90, 365, 45])
+        size = rng.randint(0, 8)
+        day = date(2023, 1, 1) + timedelta(days=rng.randint(0, 60))
+        base = rng.uniform(5, 200)
+        dates, amounts = [], []
+        for _ in range(size):
+            dates.append(day.strftime('%Y-%m-%d'))
+            amounts.append(-round(base * rng.uniform(0.85, 1.15), 2))
+            day += timedelta(days=step + rng.randint(-4, 4))
+        date_groups.append(dates)
+        amount_groups.append(amounts)
+    return date_groups, amount_groups
+
+
+class TestRecurringAnalyzer:
+    """Test suite for RecurringAnalyzer."""
+    
+    @pytest.fixture
+    def detector(self):
+        return RecurringDetector(None)
+    
+    def test_matches_per_group_helpers(self, detector):
+        """Test batch results equal calculate_intervals/detect_frequency/is_consistent_amount."""
+        rng = random.Random(11)
+        date_groups, amount_groups = _random_groups(rng, 300)
+        
+        result = detector.analyzer.analyze(*RecurringAnalyzer.pack(date_groups, amount_groups))
+        
+        for g, (dates, amounts) in enumerate(zip(date_groups, amount_groups)):
+            intervals = detector.calculate_intervals([date.fromisoformat(d) for d in dates])
+            expected = detector.detect_frequency(intervals)
+            frequency = detector.analyzer.frequency_name(result['frequency'][g])
+            if expected is None:
+                assert frequency is None
+            else:
+                assert frequency == expected[0]
+                assert result['frequency_confidence'][g] == pytest.approx(expected[1])
+            
+            consistent, average, variance = detector.is_consistent_amount(amounts)
+            assert bool(result['consistent'][g]) == consistent
+            assert result['average_amount'][g] == pytest.approx(average)
+            assert result['amount_variance'][g] == pytest.approx(variance)
+    
+    def test_empty_input(self, detector):
+        """Test analyzing no groups."""
+        result = detector.analyzer.analyze(*RecurringAnalyzer.pack([], []))
+        
+        assert len(result['frequency']) == 0
+    
+    def test_calendar_aware_month_end(self):
+        """Test a month-end charge fits monthly only when calendar-aware."""
+        dates = ['2025-01-31', '2025-02-28', '2025-03-31', '2025-04-30', '2025-05-31', '2025-06-30']
+        packed = RecurringAnalyzer.pack([dates], [[-20.0] * len(dates)])
+        
+        fixed = RecurringDetector(None).analyzer.analyze(*packed)
+        calendar = RecurringDetector(None, calendar_aware=True).analyzer.analyze(*packed)
+        
+        assert fixed['frequency_confidence'][0] < 1.0
+        assert calendar['frequency'][0] == list(RecurringDetector.FREQUENCIES).index('monthly')
+        assert calendar['frequency_confidence'][0] == 1.0
+    
+    def test_calendar_aware_slipped_payment(self):
+        """Test a payment that slips into the next month is measured from its due date."""
+        dates = ['2025-01-30', '2025-03-02', '2025-03-30', '2025-04-30', '2025-05-30']
+        packed = RecurringAnalyzer.pack([dates], [[-80.0] * len(dates)])
+        
+        result = RecurringDetector(None, calendar_aware=True).analyzer.analyze(*packed)
+        
+        assert result['frequency'][0] == list(RecurringDetector.FREQUENCIES).index('monthly')
+    
+    def test_calendar_next_expected_date(self):
+        """Test calendar-aware next dates keep the anchor day."""
+        detector = RecurringDetector(None, calendar_aware=True)
+        
+        assert detector.calculate_next_expected_date(date(2025, 1, 31), 'monthly') == date(2025, 2, 28)
+        assert detector.calculate_next_expected_date(date(2025, 2, 28), 'monthly', anchor_day=31) == date(2025, 3, 31)
+        assert detector.calculate_next_expected_date(date(2025, 10, 2), 'monthly', anchor_day=30) == date(2025, 10, 30)
+        assert detector.calculate_next_expected_date(date(2024, 2, 29), 'annual') == date(2025, 2, 28)
+        assert detector.calculate_next_expected_date(date(2025, 1, 1), 'weekly') == date(2025, 1, 8)
+    
+    def test_add_months(self):
+        """Test calendar month arithmetic."""
+        assert add_months(date(2025, 1, 31), 1) == date(2025, 2, 28)
+        assert add_months(date(2025, 11, 15), 3) == date(2026, 2, 15)
+        assert add_months(date(2025, 3, 31), -1) == date(2025, 2, 28)
+        assert nominal_date(date(2025, 3, 2), 30) == date(2025, 2, 28)
@@ -240,3 +240,268 @@ class TestRecurringDetector:
         assert 4 not in netflix_ids
         assert 5 not in netflix_ids
 
+    
+    def test_group_similar_transactions_matches_pairwise(self, detector):
+        """Test grouping matches the pairwise comparison it replaces."""
+        import random
+        
+        def pairwise(transactions):
+            groups = {}
+            processed = set()
+            for i, txn1 in enumerate(transactions):
+                if i in processed:
+                    continue
+                group = [txn1]
+                processed.add(i)
+                for j, txn2 in enumerate(transactions):
+                    if j <= i or j in processed:
+                        continue
+                    if detector.is_similar_description(txn1['description'], txn2['description']):
+                        group.append(txn2)
+                        processed.add(j)
+                if len(group) >= detector.MIN_OCCURRENCES:
+                    groups[detector.extract_merchant_name(txn1['description'])] = group
+            return groups
+        
+        rng = random.Random(7)
+        merchants = ['NETFLIX', 'SPOTIFY PREMIUM', 'COSTCO WHSE', 'AMAZON MKTPLACE',
+                     'AMAZON MARKETPLACE', 'SHELL OIL', 'SHELL', 'GYM', 'PG&E UTILITY']
+        transactions = []
+        for i in range(400):
+            description = rng.choice(merchants)
+            if rng.random() < 0.3:
+                pos = rng.randrange(len(description))
+                description = description[:pos] + rng.choice('XYZ ') + description[pos + 1:]
+            if rng.random() < 0.5:
+                description += f" #{rng.randint(1, 9999)}"
+            if rng.random() < 0.03:
+                description = rng.choice(['', '  ', '#12'])
+            transactions.append({'id': i, 'description': description})
+        
+        assert detector.group_similar_transactions(transactions) == pairwise(transactions)
+        assert list(detector.group_similar_transactions(transactions)) == list(pairwise(transactions))
+    
+    def test_detect_patterns_parallel_matches_serial(self, detector, app):
+        """Test that worker processes produce the same patterns in the same order."""
+        conn = sqlite3.connect(app.config['DATABASE'])
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                INSERT INTO accounts (name, type, institution) 
+                VALUES ('Test Account', 'checking', 'Test Bank')
+            """)
+            account_id = cursor.lastrowid
+            
+            merchants = [('NETFLIX.COM', -15.99, 30), ('SPOTIFY USA', -9.99, 30),
+                         ('GYM MEMBERSHIP', -40.00, 30), ('CAR WASH CLUB', -12.00, 7),
+                         ('WATER UTILITY', -55.00, 90)]
+            base_date = date(2024, 1, 10)
+            for description, amount, step in merchants:
+                for i in range(6):
+                    txn_date = base_date + timedelta(days=step * i)
+                    cursor.execute("""
+                        INSERT INTO transactions (account_id, date, description, amount)
+                        VALUES (?, ?, ?, ?)
+                    """, (account_id, txn_date.strftime('%Y-%m-%d'), description, amount))
+            
+            conn.commit()
+            
+            serial = detector.detect_patterns()
+            parallel = detector.detect_patterns(workers=2)
+            
+            assert len(serial) == len(merchants)
+            assert parallel == serial
+            
+        finally:
+            conn.close()
+
+
+
+class TestRecurringLinking:
+    """Test suite for matching and linking new transactions to patterns."""
+    
+    @pytest.fixture
+    def detector(self, app, recurring_tables):
+        """Create detector with three saved patterns."""
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.executescript("""
+            INSERT INTO recurring_transactions (merchant_name, description_pattern, frequency,
+                average_amount, last_transaction_date, next_expected_date, confidence_score)
+            VALUES ('NETFLIX', 'NETFLIX.COM #123', 'monthly', 15.99, '2025-01-15', '2025-02-14', 0.95),
+                   ('NETFLIX', 'NETFLIX.COM', 'monthly', 22.99, '2025-01-20', '2025-02-19', 0.90),
+                   ('GYM', 'CITY GYM', 'monthly', 40.00, '2025-01-01', '2025-01-31', 0.80);
+        """)
+        conn.commit()
+        conn.close()
+        return RecurringDetector(app.config['DATABASE'])
+    
+    def test_match_transactions(self, detector):
+        """Test matching picks the most confident similar pattern within the amount tolerance."""
+        transactions = [
+            {'description': 'NETFLIX.COM #999', 'amount': -15.99},
+            {'description': 'Netflix.com', 'amount': -23.50},
+            {'description': 'CITY GYMS', 'amount': -41.00},
+            {'description': 'CITY GYM', 'amount': -80.00},
+            {'description': 'SPOTIFY', 'amount': -9.99},
+            {'description': '', 'amount': -15.99},
+        ]
+        
+        matches = detector.match_transactions(transactions)
+        
+        assert [(txn['description'], rec['id']) for txn, rec in matches] == [
+            ('NETFLIX.COM #999', 1),
+            ('Netflix.com', 2),
+            ('CITY GYMS', 3),
+        ]
+        assert detector.check_new_transaction(transactions[0]) == 1
+        assert detector.check_new_transaction(transactions[4]) is None
+    
+    def test_link_new_transactions(self, detector, app, sample_account):
+        """Test instances are inserted and pattern dates advanced."""
+        from models.transaction import Transaction
+        
+        transactions = [
+            {'account_id': sample_account, 'date': '2025-02-14', 'description': 'NETFLIX.COM #555', 'amount': -15.99},
+            {'account_id': sample_account, 'date': '2025-03-16', 'description': 'NETFLIX.COM #556', 'amount': -15.99},
+            {'account_id': sample_account, 'date': '2025-02-20', 'description': 'CITY GYM', 'amount': -40.00},
+            {'account_id': sample_account, 'date': '2025-02-21', 'description': 'PAYCHECK', 'amount': 2000.00},
+        ]
+        Transaction.bulk_create(transactions)
+        
+        assert detector.link_new_transactions(transactions) == 3
+        
+        conn = sqlite3.connect(app.config['DATABASE'])
+        try:
+            instances = conn.execute("""
+                SELECT recurring_id, transaction_id, expected_date, actual_date, status
+                FROM recurring_transaction_instances ORDER BY id
+            """).fetchall()
+            assert instances == [
+                (1, transactions[0]['id'], '2025-02-14', '2025-02-14', 'on_time'),
+                (1, transactions[1]['id'], '2025-03-16', '2025-03-16', 'on_time'),
+                (3, transactions[2]['id'], '2025-01-31', '2025-02-20', 'late'),
+            ]
+            
+            patterns = conn.execute("""
+                SELECT id, last_transaction_date, next_expected_date
+                FROM recurring_transactions ORDER BY id
+            """).fetchall()
+            assert patterns == [
+                (1, '2025-03-16', '2025-04-15'),
+                (2, '2025-01-20', '2025-02-19'),
+                (3, '2025-02-20', '2025-03-22'),
+            ]
+        finally:
+            conn.close()
+
+
+
+class TestRecurringPersistence:
+    """Test suite for saving detected patterns."""
+    
+    @pytest.fixture
+    def detector(self, app, sample_account, recurring_tables):
+        """Create detector with monthly Netflix charges."""
+        conn = sqlite3.connect(app.config['DATABASE'])
+        base_date = date(2025, 1, 15)
+        for i in range(5):
+            conn.execute("""
+                INSERT INTO transactions (account_id, date, description, amount)
+                VALUES (?, ?, ?, ?)
+            """, (sample_account, (base_date + timedelta(days=30 * i)).strftime('%Y-%m-%d'), 'NETFLIX.COM', -15.99))
+        conn.commit()
+        conn.close()
+        return RecurringDetector(app.config['DATABASE'])
+    
+    def test_rescan_updates_instead_of_duplicating(self, detector, app, sample_account):
+        """Test that scanning twice keeps one pattern, its status and one instance per transaction."""
+        first = detector.scan_and_save_all()
+        assert first['saved'] == 1
+        
+        conn = sqlite3.connect(app.config['DATABASE'])
+        try:
+            conn.execute("UPDATE recurring_transactions SET status = 'paused'")
+            conn.execute("""
+                INSERT INTO transactions (account_id, date, description, amount)
+                VALUES (?, '2025-06-14', 'NETFLIX.COM', -15.99)
+            """, (sample_account,))
+            conn.commit()
+            
+            second = detector.scan_and_save_all()
+            assert second['saved'] == 1
+            
+            patterns = conn.execute("""
+                SELECT status, last_transaction_date FROM recurring_transactions
+            """).fetchall()
+            assert patterns == [('paused', '2025-06-14')]
+            
+            instances = conn.execute("""
+                SELECT COUNT(*), COUNT(DISTINCT transaction_id) FROM recurring_transaction_instances
+            """).fetchone()
+            assert instances == (6, 6)
+        finally:
+            conn.close()
+    
+    def test_rescan_keeps_user_category(self, detector, app, sample_category):
+        """Test that a category set on a pattern survives a re-scan that detects none."""
+        detector.scan_and_save_all()
+        
+        conn = sqlite3.connect(app.config['DATABASE'])
+        try:
+            conn.execute("UPDATE recurring_transactions SET category_id = ?", (sample_category,))
+            conn.commit()
+            
+            detector.scan_and_save_all()
+            
+            assert conn.execute("SELECT category_id FROM recurring_transactions").fetchall() == [
+                (sample_category,)]
+        finally:
+            conn.close()
+    
+    def test_save_recurring_patterns_returns_ids_in_order(self, detector):
+        """Test batch save returns one id per pattern."""
+        patterns = detector.detect_patterns()
+        patterns.append(dict(patterns[0], merchant_name='OTHER', transaction_ids=[]))
+        
+        ids = detector.save_recurring_patterns(patterns)
+        
+        assert len(ids) == 2
+        assert ids[0] != ids[1]
+        assert detector.save_recurring_pattern(patterns[1]) == ids[1]
+
+
+class TestScanRoute:
+    """Test suite for the scan endpoint's parameters."""
+    
+    def test_workers_validated_and_clamped(self, client, recurring_tables, monkeypatch):
+        """Test non-integer workers are rejected and large values capped at the CPU count."""
+        import routes.recurring
+        calls = []
+        monkeypatch.setattr(routes.recurring.RecurringDetector, 'scan_and_save_all',
+                            lambda self, **params: calls.append(params) or {'patterns_found': 0})
+        
+        for workers in ('4', 2.5, True):
+            response = client.post('/recurring/api/scan', json={'workers': workers})
+            assert response.status_code == 400
+        assert calls == []
+        
+        assert client.post('/recurring/api/scan', json={'workers': 500}).status_code == 200
+        assert client.post('/recurring/api/scan', json={'workers': 0}).status_code == 200
+        assert [params['workers'] for params in calls] == [os.cpu_count() or 1, 1]
+    
+    def test_min_confidence_validated(self, client, recurring_tables, monkeypatch):
+        """Test min_confidence must be a number between 0 and 1."""
+        import routes.recurring
+        calls = []
+        monkeypatch.setattr(routes.recurring.RecurringDetector, 'scan_and_save_all',
+                            lambda self, **params: calls.append(params) or {'patterns_found': 0})
+        
+        for min_confidence in ('high', None, True, -0.1, 1.5):
+            response = client.post('/recurring/api/scan', json={'min_confidence': min_confidence})
+            assert response.status_code == 400
+        assert calls == []
+        
+        assert client.post('/recurring/api/scan', json={'min_confidence': 1}).status_code == 200
+        assert client.post('/recurring/api/scan', json={'min_confidence': 0.5}).status_code == 200
+        assert [params['min_confidence'] for params in calls] == [1.0, 0.5]
@@ -0,0 +1,111 @@
+"""
+Unit tests for RecurringManager alerts and statistics.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from services.recurring_manager import RecurringManager
+from utils.metrics import CACHE_REQUESTS
+
+
+def _days_ago(days):
+    return (date.today() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+@pytest.fixture
+def recurring_data(app, sample_category, recurring_tables):
+    """Patterns covering missing payments, amount changes and upcoming charges."""
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.executemany("""
+        INSERT INTO recurring_transactions (merchant_name, description_pattern, frequency,
+            average_amount, category_id, last_transaction_date, next_expected_date, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        ('NETFLIX', 'NETFLIX.COM', 'monthly', 15.99, sample_category, _days_ago(40), _days_ago(10), 'active'),
+        ('GYM', 'CITY GYM', 'monthly', 40.00, None, _days_ago(25), _days_ago(-5), 'active'),
+        ('WATER', 'WATER UTILITY', 'quarterly', 60.00, None, _days_ago(85), _days_ago(5), 'active'),
+        ('SPOTIFY', 'SPOTIFY', 'monthly', 9.99, None, _days_ago(20), _days_ago(-10), 'paused'),
+    ])
+    conn.executemany("""
+        INSERT INTO recurring_transaction_instances (recurring_id, actual_date, actual_amount)
+        VALUES (?, ?, ?)
+    """, [(1, _days_ago(40), 15.99), (2, _days_ago(25), 55.00)])
+    conn.commit()
+    conn.close()
+    return app.config['DATABASE']
+
+
+def _direct_alerts(manager):
+    missing = manager.get_missing_payments()
+    changed = manager.get_amount_changes()
+    return {'missing': missing, 'changed': changed, 'total_count': len(missing) + len(changed)}
+
+
+def _cache_count(result):
+    return CACHE_REQUESTS.get(cache='recurring_alerts', result=result)
+
+
+class TestRecurringAlerts:
+    """Test suite for materialized recurring alerts."""
+    
+    def test_alerts_without_materialized_tables(self, recurring_data):
+        """Test alerts are computed directly when the migration has not run."""
+        manager = RecurringManager(recurring_data)
+        
+        alerts = manager.get_all_alerts()
+        
+        assert alerts == _direct_alerts(manager)
+        assert [a['merchant_name'] for a in alerts['missing']] == ['NETFLIX', 'WATER']
+        assert [a['merchant_name'] for a in alerts['changed']] == ['GYM']
+    
+    def test_materialized_alerts_match_direct(self, recurring_data, recurring_alert_tables):
+        """Test materialized alerts equal the directly computed ones."""
+        manager = RecurringManager(recurring_data)
+        
+        assert manager.get_all_alerts() == _direct_alerts(manager)
+    
+    def test_alerts_recomputed_only_when_data_changes(self, recurring_data, recurring_alert_tables):
+        """Test the alert table is reused until a recurring table changes."""
+        manager = RecurringManager(recurring_data)
+        manager.get_all_alerts()
+        
+        hits, misses = _cache_count('hit'), _cache_count('miss')
+        manager.get_all_alerts()
+        assert (_cache_count('hit'), _cache_count('miss')) == (hits + 1, misses)
+        
+        manager.pause(1)
+        alerts = manager.get_all_alerts()
+        assert _cache_count('miss') == misses + 1
+        assert [a['merchant_name'] for a in alerts['missing']] == ['WATER']
+        assert alerts == _direct_alerts(manager)
+
+
+class TestRecurringStatistics:
+    """Test suite for RecurringManager.get_statistics."""
+    
+    @pytest.mark.parametrize('materialized', [False, True])
+    def test_statistics(self, request, recurring_data, materialized):
+        """Test statistics with and without the materialized alert tables."""
+        if materialized:
+            request.getfixturevalue('recurring_alert_tables')
+        manager = RecurringManager(recurring_data)
+        
+        assert manager.get_statistics() == {
+            'active_count': 3,
+            'paused_count': 1,
+            'total_count': 4,
+            'monthly_total': 55.99,
+            'upcoming_count': 3,
+            'alert_count': 3,
+        }
+    
+    def test_statistics_empty(self, app, recurring_tables, recurring_alert_tables):
+        """Test statistics with no recurring transactions."""
+        stats = RecurringManager(app.config['DATABASE']).get_statistics()
+        
+        assert stats['total_count'] == 0
+        assert stats['monthly_total'] == 0.0
+        assert stats['alert_count'] == 0
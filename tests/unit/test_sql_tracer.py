@@ -0,0 +1,77 @@
+"""
+Unit tests for request-scoped SQL tracing.
+"""
+
+import logging
+import sqlite3
+
+from utils import sql_tracer
+from utils.db import get_connection
+
+
+def test_connection_untraced_outside_trace(tmp_path):
+    """Outside a trace, get_connection returns a plain sqlite3 connection."""
+    conn = get_connection(str(tmp_path / 'plain.db'))
+    assert type(conn) is sqlite3.Connection
+    conn.close()
+
+
+def test_traced_connection_records_queries(tmp_path):
+    """Queries on a traced connection are counted and timed."""
+    stats, token = sql_tracer.start_trace()
+    try:
+        conn = get_connection(str(tmp_path / 'traced.db'))
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        cursor = conn.cursor()
+        cursor.executemany("INSERT INTO t (x) VALUES (?)", [(1,), (2,), (3,)])
+        cursor.execute("SELECT SUM(x) FROM t")
+        assert cursor.fetchone()[0] == 6
+        conn.close()
+    finally:
+        sql_tracer.stop_trace(token)
+
+    assert stats.connection_count == 1
+    assert stats.query_count == 3
+    assert stats.statement_count >= 3
+    assert stats.total_time > 0
+    assert len(stats.slowest) == 3
+    assert sql_tracer.current_stats() is None
+
+
+def test_slowest_keeps_limit():
+    """Only the configured number of slowest statements is kept."""
+    stats = sql_tracer.QueryStats(slowest_limit=2)
+    stats.record("SELECT 1", 0.001)
+    stats.record("SELECT 2", 0.003)
+    stats.record("SELECT 3", 0.002)
+
+    assert [s['sql'] for s in stats.slowest] == ["SELECT 2", "SELECT 3"]
+    assert stats.query_count == 3
+
+
+def test_trace_headers(app, client):
+    """Debug headers expose the per-request query count."""
+    app.config['SQL_TRACE_HEADERS'] = True
+    response = client.get('/categories/api/all')
+
+    assert response.status_code == 200
+    assert int(response.headers['X-SQL-Query-Count']) > 0
+    assert int(response.headers['X-SQL-Connection-Count']) > 0
+    assert 'X-SQL-Time-Ms' in response.headers
+
+
+def test_trace_headers_disabled(app, client):
+    """Headers are omitted unless enabled."""
+    app.config['SQL_TRACE_HEADERS'] = False
+    response = client.get('/categories/api/all')
+
+    assert 'X-SQL-Query-Count' not in response.headers
+
+
+def test_query_budget_warning(app, client, sample_category, caplog):
+    """Requests over the query budget log a warning."""
+    app.config['SQL_QUERY_BUDGET'] = 1
+    with caplog.at_level(logging.WARNING):
+        client.get('/categories/api/all')
+
+    assert any('SQL query budget exceeded' in r.getMessage() for r in caplog.records)
@@ -87,6 +87,11 @@ class TestTransactionModel:
         # Verify they were created
         txns = Transaction.get_by_account(sample_account)
         assert len(txns) >= 3
+        
+        # Each input dictionary gets the id of its new row
+        for txn in transactions:
+            saved = Transaction.get_by_id(txn['id'])
+            assert saved['description'] == txn['description']
     
     def test_get_by_id_not_found(self, app):
         """Test getting a non-existent transaction."""
@@ -405,4 +405,66 @@ class TestTransactionValidator:
         assert not result.is_valid
         assert any(error.field == 'account_id' for error in result.errors)
         assert any('does not exist' in error.message.lower() for error in result.errors)
-
+    
+    def test_validate_batch_matches_per_row_validation(self, validator):
+        """Test batch validation reports the same errors as validate_transaction."""
+        today = date.today()
+        transactions = [
+            {'date': today, 'description': 'Valid', 'amount': -12.50},
+            {'date': None, 'description': None, 'amount': None},
+            {'date': today + timedelta(days=1), 'description': '   ', 'amount': 0},
+            {'date': '2025-01-01', 'description': 'X' * 501, 'amount': 'abc'},
+            {'date': today - timedelta(days=365 * 11), 'description': 'Old', 'amount': -2_000_000},
+            {'date': today, 'description': 'Bad account', 'amount': 5.0, 'account_id': 'abc'},
+        ]
+        
+        failures = validator.validate_batch(transactions)
+        
+        expected = {
+            index: [error.to_dict() for error in validator.validate_transaction(txn).errors]
+            for index, txn in enumerate(transactions)
+        }
+        assert {index: [e.to_dict() for e in errors] for index, errors in failures.items()} == {
+            index: errors for index, errors in expected.items() if errors
+        }
+    
+    def test_validate_batch_returns_only_failures(self, validator):
+        """Test batch validation omits valid rows and handles an empty batch."""
+        transactions = [
+            {'date': date.today(), 'description': f'Row {i}', 'amount': float(i + 1)}
+            for i in range(5)
+        ]
+        transactions[3]['amount'] = 0
+        
+        failures = validator.validate_batch(transactions)
+        
+        assert list(failures) == [3]
+        assert failures[3][0].message == 'Amount cannot be zero'
+        assert validator.validate_batch([]) == {}
+    
+    def test_validate_batch_looks_up_accounts_once(self, validator_with_db, sample_account, monkeypatch):
+        """Test account ids are resolved with one query and cached on the validator."""
+        import src.services.transaction_validator as module
+        calls = []
+        real_get_connection = module.get_connection
+        
+        def counting_get_connection(db_path):
+            calls.append(db_path)
+            return real_get_connection(db_path)
+        
+        monkeypatch.setattr(module, 'get_connection', counting_get_connection)
+        transactions = [
+            {'date': date.today(), 'description': 'Test', 'amount': 1.0, 'account_id': account_id}
+            for account_id in [sample_account, 99999, sample_account, str(sample_account)]
+        ]
+        
+        failures = validator_with_db.validate_batch(transactions)
+        
+        assert list(failures) == [1]
+        assert failures[1][0].message == 'Account with ID 99999 does not exist'
+        assert len(calls) == 1
+        
+        # Known accounts are not queried again
+        assert validator_with_db.validate_batch(transactions[:1]) == {}
+        assert validator_with_db.validate_transaction(transactions[0]).is_valid
+        assert len(calls) == 1